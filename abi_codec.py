@@ -0,0 +1,95 @@
+import threading
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+
+def abi_type(entry):
+    """Canonical type string for an ABI input/output entry, expanding tuples"""
+    if entry["type"].startswith("tuple"):
+        components = ",".join(abi_type(component) for component in entry["components"])
+        return f"({components}){entry['type'][len('tuple'):]}"
+    return entry["type"]
+
+
+def _to_abi_value(entry, value):
+    """Accept structs as dicts keyed by component name, like web3's contract functions do"""
+    if entry["type"] == "tuple":
+        if isinstance(value, dict):
+            value = [value[component["name"]] for component in entry["components"]]
+        return tuple(_to_abi_value(component, item) for component, item in zip(entry["components"], value))
+    if entry["type"].endswith("[]"):
+        item_entry = dict(entry, type=entry["type"][:-2])
+        return [_to_abi_value(item_entry, item) for item in value]
+    return value
+
+
+class FunctionCodec:
+    """
+    Calldata encoder for one ABI function.
+
+    The signature, selector and argument types are worked out once, so
+    encoding is a local operation - no build_transaction() and none of the
+    chain_id / gas price requests it makes.
+    """
+
+    def __init__(self, function_abi):
+        self.name = function_abi["name"]
+        self.inputs = function_abi.get("inputs", [])
+        self.outputs = function_abi.get("outputs", [])
+        self.input_types = [abi_type(entry) for entry in self.inputs]
+        self.output_types = [abi_type(entry) for entry in self.outputs]
+        self.signature = f"{self.name}({','.join(self.input_types)})"
+        self.selector = bytes(Web3.keccak(text=self.signature)[:4])
+
+    def encode(self, *args):
+        """
+        Encode a call.
+
+        Returns:
+            bytes: Selector followed by the ABI-encoded arguments
+        """
+        if len(args) != len(self.inputs):
+            raise ValueError(f"{self.signature} takes {len(self.inputs)} arguments, got {len(args)}")
+        values = [_to_abi_value(entry, value) for entry, value in zip(self.inputs, args)]
+        return self.selector + encode(self.input_types, values)
+
+    def decode_output(self, return_data):
+        """Decode return data into a tuple of output values"""
+        return decode(self.output_types, bytes(return_data))
+
+
+class ContractCodec:
+    """Function codecs for every function in an ABI, built once per ABI"""
+
+    def __init__(self, abi):
+        self.functions = {}
+        for item in abi:
+            # Overloads aren't supported - the first definition wins
+            if item.get("type") == "function" and item["name"] not in self.functions:
+                self.functions[item["name"]] = FunctionCodec(item)
+
+    def function(self, name):
+        try:
+            return self.functions[name]
+        except KeyError:
+            raise ValueError(f"Function {name} not found in ABI")
+
+    def encode(self, name, *args):
+        """Calldata for calling function name with args"""
+        return self.function(name).encode(*args)
+
+
+_codecs = {}
+_codecs_lock = threading.Lock()
+
+
+def get_codec(abi):
+    """Codec for an ABI constant, built on first use and shared afterwards"""
+    with _codecs_lock:
+        entry = _codecs.get(id(abi))
+        # The ABI is kept alongside so a recycled id can't return the wrong codec
+        if entry is None or entry[0] is not abi:
+            entry = (abi, ContractCodec(abi))
+            _codecs[id(abi)] = entry
+        return entry[1]
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from config import ARTIFACT_CACHE_DIR
+
+# Features a token can be generated with (see FEATURE_TEMPLATES in contract_bridge.py)
+AVAILABLE_FEATURES = ["Burnable", "Mintable", "Pausable", "Access Control", "Flash Minting"]
+
+# Every token is compiled under the same contract name, so the generated source
+# only depends on the feature set and artifacts can be shared between tokens.
+# The token's real name and symbol are constructor arguments.
+CANONICAL_CONTRACT_NAME = "Token"
+
+
+def normalize_source(source):
+    """
+    Normalize generated Solidity so formatting-only differences hash the same.
+    Only trailing whitespace and blank lines are dropped - line breaks are kept
+    because removing them would let // comments swallow code.
+    """
+    lines = [line.rstrip() for line in source.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def get_cache_key(source, solc_version, optimizer):
+    """
+    Cache key for a compiled artifact.
+
+    Args:
+        source (str): Generated Solidity source
+        solc_version (str): Compiler version string
+        optimizer (dict): Optimizer settings ({"enabled": ..., "runs": ...})
+
+    Returns:
+        str: Hex digest identifying the artifact
+    """
+    key_data = json.dumps({
+        "source": normalize_source(source),
+        "solc": solc_version,
+        "optimizer": optimizer
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """On-disk cache of compiled ABI + bytecode, with an in-memory layer"""
+
+    def __init__(self, cache_dir=ARTIFACT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached artifact for a key, or None"""
+        with self._lock:
+            artifact = self._memory.get(key)
+            if artifact is None:
+                try:
+                    with open(self._path(key), "r") as f:
+                        artifact = json.load(f)
+                    self._memory[key] = artifact
+                except (OSError, json.JSONDecodeError):
+                    artifact = None
+
+            if artifact is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return artifact
+
+    def put(self, key, artifact):
+        """Store an artifact, writing it atomically so readers never see partial files"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(artifact, f)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._memory[key] = artifact
+
+    def get_stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory)}
+
+
+_artifact_cache = None
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_cache():
+    """Shared artifact cache instance"""
+    global _artifact_cache
+    with _artifact_cache_lock:
+        if _artifact_cache is None:
+            _artifact_cache = ArtifactCache()
+        return _artifact_cache
+
+
+def get_feature_combinations():
+    """All 32 subsets of AVAILABLE_FEATURES"""
+    combinations = []
+    for mask in range(2 ** len(AVAILABLE_FEATURES)):
+        combinations.append([
+            feature for i, feature in enumerate(AVAILABLE_FEATURES) if mask & (1 << i)
+        ])
+    return combinations
@@ -0,0 +1,266 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot import types
+from telebot.async_telebot import AsyncTeleBot
+
+from config import BOT_TOKEN, ASYNC_HANDLER_THREADS, ERC20_ABI
+from multicall import Call, aggregate_async
+from portfolio import get_portfolio_async
+from storage import get_user_wallet, get_user_tokens
+from uncx_locker import AsyncLiquidityLocker
+from wallet import get_async_web3
+import bot as sync_bot_module
+
+# Handler lists copied from the synchronous bot, in telebot's processing order
+HANDLER_TYPES = {
+    'message_handlers': 'register_message_handler',
+    'edited_message_handlers': 'register_edited_message_handler',
+    'callback_query_handlers': 'register_callback_query_handler',
+}
+
+
+def _offload(function, executor):
+    """Run a synchronous handler on the handler thread pool without blocking the event loop"""
+    async def handler(update):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(executor, function, update)
+        except Exception as e:
+            print(f"Error in handler {function.__name__}: {e}")
+
+    handler.__name__ = function.__name__
+    return handler
+
+
+def _routed(route, executor, overrides):
+    """
+    Async dispatcher for a DispatchRouter handler: the route lookup is cheap and
+    runs on the event loop, then the chosen handler runs as its override
+    coroutine or on the thread pool
+    """
+    async def handler(update):
+        function = route(update)
+        if function is None:
+            return
+        override = overrides.get(function.__name__)
+        if override is not None:
+            await override(update)
+        else:
+            await _offload(function, executor)(update)
+
+    handler.__name__ = route.__name__
+    return handler
+
+
+def mirror_handlers(sync_bot, async_bot, executor, overrides=None):
+    """
+    Register every handler of the synchronous bot on the async bot, with the same
+    filters and in the same order, so the first matching handler still wins.
+
+    Args:
+        sync_bot (TeleBot): Bot the handlers were declared on
+        async_bot (AsyncTeleBot): Bot receiving updates
+        executor (Executor): Thread pool running the synchronous handlers
+        overrides (dict): Optional handler name -> coroutine function used instead
+
+    Returns:
+        int: Number of handlers registered
+    """
+    overrides = overrides or {}
+    count = 0
+    for handler_list, register_name in HANDLER_TYPES.items():
+        register = getattr(async_bot, register_name)
+        for handler in getattr(sync_bot, handler_list):
+            function = handler['function']
+            route = getattr(function, 'route', None)
+            if route is not None:
+                callback = _routed(route, executor, overrides)
+            else:
+                callback = overrides.get(function.__name__) or _offload(function, executor)
+            register(callback, **handler['filters'])
+            count += 1
+    return count
+
+
+def build_balance_handler(async_bot):
+    """
+    Native async /balance: the balance reads are awaited on AsyncWeb3 and only the
+    wallet and token lookups (SQLite) go to a worker thread
+    """
+    async def check_balance(message):
+        wallet = await asyncio.to_thread(get_user_wallet, message.from_user.id)
+        if not wallet:
+            await async_bot.send_message(
+                message.chat.id,
+                "❌ **No wallet found!**\n\n"
+                "Please setup your wallet first using the '🔐 Setup Wallet' button or /wallet command.",
+                parse_mode='Markdown')
+            return
+
+        sent_msg = await async_bot.send_message(
+            message.chat.id,
+            "⏳ **Checking wallet balance...**",
+            parse_mode='Markdown')
+
+        try:
+            tokens = await asyncio.to_thread(get_user_tokens, message.from_user.id)
+            portfolio = await get_portfolio_async(wallet['address'], tokens)
+            balance_text = sync_bot_module.format_balance_text(portfolio)
+            await async_bot.edit_message_text(
+                balance_text,
+                sent_msg.chat.id,
+                sent_msg.message_id,
+                parse_mode='Markdown')
+        except Exception as e:
+            await async_bot.edit_message_text(
+                f"❌ **Error checking balance:**\n\n{str(e)}",
+                sent_msg.chat.id,
+                sent_msg.message_id,
+                parse_mode='Markdown')
+
+    return check_balance
+
+
+def build_position_handlers(async_bot):
+    """
+    Native async position views: the Multicall3 reads are awaited on AsyncWeb3 and
+    only the wallet and session lookups (SQLite) go to a worker thread
+    """
+    async def show_positions(call, loading_text, read, view, what):
+        wallet = await asyncio.to_thread(get_user_wallet, call.from_user.id)
+        if not wallet:
+            await async_bot.edit_message_text(
+                "❌ No wallet found!\n\nPlease setup your wallet first.",
+                call.message.chat.id,
+                call.message.message_id,
+                parse_mode='Markdown')
+            return None
+
+        await async_bot.edit_message_text(loading_text,
+                                          call.message.chat.id,
+                                          call.message.message_id,
+                                          parse_mode='Markdown')
+        try:
+            locker = AsyncLiquidityLocker(get_async_web3('polygon'), 'polygon')
+            positions = await read(locker, wallet['address'])
+            text, markup = view(positions)
+            await async_bot.edit_message_text(text,
+                                              call.message.chat.id,
+                                              call.message.message_id,
+                                              reply_markup=markup,
+                                              parse_mode='Markdown')
+            return positions
+        except Exception as e:
+            print(f"Error fetching {what}: {e}")
+            await async_bot.edit_message_text(
+                f"❌ Error fetching {what}: {str(e)}\n\n"
+                f"Please try again later.",
+                call.message.chat.id,
+                call.message.message_id,
+                reply_markup=sync_bot_module.back_to_liquidity_markup(),
+                parse_mode='Markdown')
+            return None
+
+    async def view_positions(call):
+        positions = await show_positions(
+            call, "🔍 Fetching your liquidity positions...",
+            lambda locker, address: locker.get_positions(address),
+            sync_bot_module.positions_view, "positions")
+        if positions:
+            # The lock buttons refer to positions by index, as in the threaded handler
+            await asyncio.to_thread(sync_bot_module.user_data.__setitem__,
+                                    call.from_user.id, {'positions': positions})
+
+    async def view_locked_positions(call):
+        await show_positions(
+            call, "🔍 Fetching your locked positions...",
+            lambda locker, address: locker.get_locked_positions(address),
+            sync_bot_module.locked_positions_view, "locked positions")
+
+    return {
+        'view_positions': view_positions,
+        'view_locked_positions': view_locked_positions,
+    }
+
+
+def build_custom_token_handler(async_bot):
+    """Native async validation of a custom token: name, symbol, decimals and supply in one read"""
+    async def custom_token_network_selected(call):
+        # Format: custom_network_NETWORK_ADDRESS
+        parts = call.data.split('_')
+        if len(parts) < 4:
+            await async_bot.answer_callback_query(call.id, "Invalid selection", show_alert=True)
+            return
+        network = parts[2]
+        token_address = parts[3]
+
+        try:
+            await async_bot.edit_message_text(
+                f"⏳ Validating token `{token_address}` on {network.title()}...",
+                call.message.chat.id,
+                call.message.message_id,
+                parse_mode='Markdown')
+
+            name, symbol, decimals, total_supply = await aggregate_async(get_async_web3(network), [
+                Call(token_address, ERC20_ABI, function_name)
+                for function_name in ('name', 'symbol', 'decimals', 'totalSupply')
+            ])
+        except Exception as e:
+            print(f"Error validating token: {e}")
+            await async_bot.edit_message_text(
+                f"❌ Error validating token: {str(e)}\n\n"
+                f"Please check the address and try again.",
+                call.message.chat.id,
+                call.message.message_id,
+                parse_mode='Markdown')
+            return
+
+        if name is None or symbol is None or decimals is None:
+            await async_bot.edit_message_text(
+                f"❌ Error validating token: Could not read token information.\n\n"
+                f"Make sure this is a valid ERC20 token on {network.title()} network.",
+                call.message.chat.id,
+                call.message.message_id,
+                parse_mode='Markdown')
+            return
+
+        print(f"Successfully validated token: {name} ({symbol})")
+        token_info = {'name': name, 'symbol': symbol, 'decimals': decimals}
+        if total_supply is not None:
+            token_info['total_supply'] = total_supply / (10 ** decimals)
+        # With the supply known this only touches the session store and the outbox
+        await asyncio.to_thread(sync_bot_module.create_pool_start, call, token_address, network, token_info)
+
+    return custom_token_network_selected
+
+
+async def run_async_bot():
+    """
+    Receive updates with AsyncTeleBot and dispatch them to the bot's handlers.
+
+    The read-only views that wait on RPC calls (/balance, positions, locked
+    positions and custom token validation) are coroutines on AsyncWeb3. The rest
+    (wizard steps, settings and chain-mutating operations, which go on to the job
+    executor) run unchanged on a bounded thread pool.
+    """
+    async_bot = AsyncTeleBot(BOT_TOKEN)
+    executor = ThreadPoolExecutor(max_workers=ASYNC_HANDLER_THREADS, thread_name_prefix="handler")
+    count = mirror_handlers(sync_bot_module.bot, async_bot, executor, overrides={
+        'check_balance': build_balance_handler(async_bot),
+        'custom_token_network_selected': build_custom_token_handler(async_bot),
+        **build_position_handlers(async_bot)
+    })
+    print(f"✅ {count} handlers registered on the async runtime")
+
+    await async_bot.set_my_commands([
+        types.BotCommand(command, description)
+        for command, description in sync_bot_module.BOT_COMMANDS
+    ])
+    await async_bot.remove_webhook()
+
+    try:
+        await async_bot.infinity_polling(timeout=60)
+    finally:
+        executor.shutdown(wait=False)
+        await async_bot.close_session()
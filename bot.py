@@ -1,36 +1,74 @@
+import atexit
 import telebot
 from telebot import types
-import json
 import os
 import time
 from datetime import datetime
-from web3 import Web3
-from eth_account import Account
-from config import BOT_TOKEN, UserState, TOKENS_FILE, USERS_FILE, POOLS_FILE, ERC20_ABI
-from storage import (
-    get_user_wallet, save_user_wallet, save_token_to_db, save_pool_to_db
+from config import (
+    BOT_TOKEN, BOT_HANDLER_THREADS, UserState, DATA_DIR, DATABASE_FILE, ERC20_ABI,
+    SESSION_BACKEND, SESSION_TTL, CALLBACK_DATA_TTL,
+    TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_BURST, TELEGRAM_SENDER_THREADS
 )
-from wallet import (
-    create_wallet, get_web3, sign_and_send_transaction,
-    wait_for_transaction_receipt, get_explorer_url
+from storage import (
+    get_user_wallet, save_user_wallet, save_token_to_db, save_pool_to_db,
+    get_user_tokens, get_user_ids, delete_user_data, get_wallet_cache_stats
 )
-from contracts import deploy_token
-from pool import create_uniswap_pool, execute_pool_creation
-from uncx_locker import LiquidityLocker, Position, LockedPosition
-from contract_renouncement import renounce_contract_ownership, get_token_info
+from job_executor import get_job_executor
+from session_store import create_session_store
+from dispatch_router import DispatchRouter
+from message_scheduler import MessageScheduler
 
 # Initialize bot
-bot = telebot.TeleBot(BOT_TOKEN)
+bot = telebot.TeleBot(BOT_TOKEN, num_threads=BOT_HANDLER_THREADS)
+
+# Messages and edits are queued and sent within Telegram's rate limits, so handlers
+# don't wait on Telegram; repeated progress edits of one message collapse into the latest
+outbox = MessageScheduler(bot, TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_BURST,
+                          senders=TELEGRAM_SENDER_THREADS)
+atexit.register(outbox.shutdown, True, 5)
+
+# Commands shown in the Telegram menu
+BOT_COMMANDS = [
+    ("start", "Start the bot and show main menu"),
+    ("help", "Show help and instructions"),
+    ("tokens", "View your created tokens"),
+    ("wallet", "Wallet management"),
+    ("balance", "Check your wallet balance"),
+    ("renounce", "Renounce contract ownership"),
+    ("debug", "Show debug information")
+]
+
+# Store callback data - confirmation buttons expire after CALLBACK_DATA_TTL
+callback_data_store = create_session_store('callback_data', CALLBACK_DATA_TTL)
+
+# User state management - conversations expire after SESSION_TTL without changes
+user_states = create_session_store('user_states', SESSION_TTL)
+user_data = create_session_store('user_data', SESSION_TTL)
+
+# Handlers are looked up by command, text, state and callback data instead of
+# testing every handler's predicate; registered on the bot at the end of this module
+router = DispatchRouter(get_state=lambda user_id: user_states.get(user_id))
+
+def submit_chain_job(call, name, run):
+    """
+    Run a chain-mutating handler on the job executor so a slow transaction
+    doesn't block other users' updates.
 
-# Store callback data
-callback_data_store = {}
+    Args:
+        call: The callback query that triggered the operation
+        name (str): Job name for logs and stats
+        run (callable): Called as run(call, job) on a worker thread
+    """
+    def edit_progress(text):
+        outbox.edit_message_text(text, call.message.chat.id, call.message.message_id)
 
-# User state management
-user_states = {}
-user_data = {}
+    result = get_job_executor().submit(
+        call.from_user.id, name, lambda job: run(call, job), on_progress=edit_progress)
+    if not result['success']:
+        bot.answer_callback_query(call.id, result['error'], show_alert=True)
 
 # Bot handlers
-@bot.message_handler(commands=['start'])
+@router.message_command('start')
 def send_welcome(message):
     user_id = message.from_user.id
     username = message.from_user.username or message.from_user.first_name
@@ -74,12 +112,12 @@ This bot helps you:
 Get started by setting up your wallet! 👇
     """
 
-    bot.send_message(message.chat.id,
-                     welcome_text,
-                     reply_markup=markup,
-                     parse_mode='Markdown')
+    outbox.send_message(message.chat.id,
+                        welcome_text,
+                        reply_markup=markup,
+                        parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: message.text == '🔐 Setup Wallet')
+@router.message_text('🔐 Setup Wallet')
 def setup_wallet(message):
     user_id = message.from_user.id
     user_states[user_id] = UserState.WALLET_SETUP
@@ -91,20 +129,21 @@ def setup_wallet(message):
                                       callback_data='import_wallet')
     markup.add(btn1, btn2)
 
-    bot.send_message(message.chat.id,
-                     "🔐 **Wallet Setup**\n\nChoose an option:",
-                     reply_markup=markup,
-                     parse_mode='Markdown')
+    outbox.send_message(message.chat.id,
+                        "🔐 **Wallet Setup**\n\nChoose an option:",
+                        reply_markup=markup,
+                        parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'create_wallet')
+@router.callback_data('create_wallet')
 def create_new_wallet(call):
+    from wallet import create_wallet
     user_id = call.from_user.id
     username = call.from_user.username or call.from_user.first_name
 
     wallet_data = create_wallet()
     save_user_wallet(user_id, username, wallet_data)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         f"✅ **Wallet Created Successfully!**\n\n"
         f"🏦 **Address:** `{wallet_data['address']}`\n\n"
         f"🔑 **Private Key:** `{wallet_data['private_key']}`\n\n"
@@ -116,26 +155,26 @@ def create_new_wallet(call):
         call.message.message_id,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'import_wallet')
+@router.callback_data('import_wallet')
 def import_wallet_prompt(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.WALLET_SETUP
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "🔑 **Import Wallet**\n\n"
         "Send your private key (it will be deleted after processing):",
         call.message.chat.id,
         call.message.message_id,
         parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: message.text == '🪙 Create Token')
+@router.message_text('🪙 Create Token')
 def create_token_start(message):
     user_id = message.from_user.id
 
     # Check if user has wallet
     wallet = get_user_wallet(user_id)
     if not wallet:
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ **No wallet found!**\n\nPlease setup your wallet first using the '🔐 Setup Wallet' button.",
             parse_mode='Markdown')
@@ -144,13 +183,13 @@ def create_token_start(message):
     user_states[user_id] = UserState.TOKEN_CREATION
     user_data[user_id] = {'step': 'name'}
 
-    bot.send_message(message.chat.id, "🪙 **Token Creation Wizard**\n\n"
-                     "Let's create your custom ERC20 token!\n\n"
-                     "**Step 1/7:** Enter your token name:\n"
-                     "(e.g., 'My Awesome Token')",
-                     parse_mode='Markdown')
+    outbox.send_message(message.chat.id, "🪙 **Token Creation Wizard**\n\n"
+                        "Let's create your custom ERC20 token!\n\n"
+                        "**Step 1/7:** Enter your token name:\n"
+                        "(e.g., 'My Awesome Token')",
+                        parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.TOKEN_CREATION)
+@router.message_state(UserState.TOKEN_CREATION)
 def handle_token_creation(message):
     user_id = message.from_user.id
 
@@ -162,11 +201,11 @@ def handle_token_creation(message):
     if step == 'name':
         user_data[user_id]['token_name'] = message.text
         user_data[user_id]['step'] = 'symbol'
-        bot.send_message(message.chat.id,
-                         f"✅ Token name: **{message.text}**\n\n"
-                         f"**Step 2/7:** Enter your token symbol:\n"
-                         f"(e.g., 'MAT' - usually 3-5 characters)",
-                         parse_mode='Markdown')
+        outbox.send_message(message.chat.id,
+                            f"✅ Token name: **{message.text}**\n\n"
+                            f"**Step 2/7:** Enter your token symbol:\n"
+                            f"(e.g., 'MAT' - usually 3-5 characters)",
+                            parse_mode='Markdown')
 
     elif step == 'symbol':
         user_data[user_id]['token_symbol'] = message.text.upper()
@@ -181,11 +220,11 @@ def handle_token_creation(message):
         btn5 = types.InlineKeyboardButton('Custom Amount', callback_data='supply_custom')
         markup.add(btn1, btn2, btn3, btn4, btn5)
         
-        bot.send_message(message.chat.id,
-                         f"✅ Token symbol: **{message.text.upper()}**\n\n"
-                         f"**Step 3/7:** Select total supply or enter a custom amount:",
-                         reply_markup=markup,
-                         parse_mode='Markdown')
+        outbox.send_message(message.chat.id,
+                            f"✅ Token symbol: **{message.text.upper()}**\n\n"
+                            f"**Step 3/7:** Select total supply or enter a custom amount:",
+                            reply_markup=markup,
+                            parse_mode='Markdown')
 
     elif step == 'supply':
         try:
@@ -201,13 +240,13 @@ def handle_token_creation(message):
             btn4 = types.InlineKeyboardButton('Custom', callback_data='decimals_custom')
             markup.add(btn1, btn2, btn3, btn4)
             
-            bot.send_message(message.chat.id,
-                             f"✅ Total supply: **{supply:,}**\n\n"
-                             f"**Step 4/7:** Select decimals or enter a custom value:",
-                             reply_markup=markup,
-                             parse_mode='Markdown')
+            outbox.send_message(message.chat.id,
+                                f"✅ Total supply: **{supply:,}**\n\n"
+                                f"**Step 4/7:** Select decimals or enter a custom value:",
+                                reply_markup=markup,
+                                parse_mode='Markdown')
         except ValueError:
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 "❌ Please enter a valid number for total supply.")
 
@@ -215,8 +254,8 @@ def handle_token_creation(message):
         try:
             decimals = int(message.text)
             if decimals < 0 or decimals > 18:
-                bot.send_message(message.chat.id,
-                                 "❌ Decimals must be between 0 and 18.")
+                outbox.send_message(message.chat.id,
+                                    "❌ Decimals must be between 0 and 18.")
                 return
 
             user_data[user_id]['decimals'] = decimals
@@ -243,7 +282,7 @@ def handle_token_creation(message):
                 False, False, False, False, False
             ]
 
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id, f"✅ Decimals: **{decimals}**\n\n"
                 f"**Step 5/7:** Select token features (click to toggle):\n\n"
                 f"🔥 Burnable: ❌\n"
@@ -255,16 +294,16 @@ def handle_token_creation(message):
                 reply_markup=markup,
                 parse_mode='Markdown')
         except ValueError:
-            bot.send_message(message.chat.id,
-                             "❌ Please enter a valid number for decimals.")
+            outbox.send_message(message.chat.id,
+                                "❌ Please enter a valid number for decimals.")
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('supply_'))
+@router.callback_prefix('supply_')
 def handle_supply_selection(call):
     user_id = call.from_user.id
     supply_option = call.data.split('_')[1]
     
     if supply_option == 'custom':
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "Please enter your custom token supply amount:",
             parse_mode='Markdown')
@@ -281,20 +320,20 @@ def handle_supply_selection(call):
         btn4 = types.InlineKeyboardButton('Custom', callback_data='decimals_custom')
         markup.add(btn1, btn2, btn3, btn4)
         
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             f"✅ Total supply: **{supply:,}**\n\n"
             f"**Step 4/7:** Select decimals or enter a custom value:",
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('decimals_'))
+@router.callback_prefix('decimals_')
 def handle_decimals_selection(call):
     user_id = call.from_user.id
     decimals_option = call.data.split('_')[1]
     
     if decimals_option == 'custom':
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "Please enter your custom decimals value (0-18):",
             parse_mode='Markdown')
@@ -324,7 +363,7 @@ def handle_decimals_selection(call):
             False, False, False, False, False
         ]
 
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id, f"✅ Decimals: **{decimals}**\n\n"
             f"**Step 5/7:** Select token features (click to toggle):\n\n"
             f"🔥 Burnable: ❌\n"
@@ -336,7 +375,7 @@ def handle_decimals_selection(call):
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('toggle_feature_'))
+@router.callback_prefix('toggle_feature_')
 def toggle_feature(call):
     user_id = call.from_user.id
     feature_index = int(call.data.split('_')[-1])
@@ -344,9 +383,10 @@ def toggle_feature(call):
     if user_id not in user_data:
         return
 
-    # Toggle feature
-    user_data[user_id]['features'][feature_index] = not user_data[user_id]['features'][feature_index]
-    features = user_data[user_id]['features']
+    # Toggle feature - the list is replaced rather than changed in place so the session store sees it
+    features = list(user_data[user_id]['features'])
+    features[feature_index] = not features[feature_index]
+    user_data[user_id]['features'] = features
 
     feature_names = [
         "🔥 Burnable", "➕ Mintable", "⏸️ Pausable", "🔒 Access Control", "⚡ Flash Minting"
@@ -373,7 +413,7 @@ def toggle_feature(call):
 
     markup.add(btn1, btn2, btn3, btn4, btn5, btn6)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         f"**Step 5/7:** Select token features (click to toggle):\n\n{feature_text}\n"
         f"Select up to 5 features, then click 'Continue to Taxes'",
         call.message.chat.id,
@@ -381,7 +421,7 @@ def toggle_feature(call):
         reply_markup=markup,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'continue_to_taxes')
+@router.callback_data('continue_to_taxes')
 def continue_to_taxes(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.SETTING_TAXES
@@ -397,7 +437,7 @@ def continue_to_taxes(call):
     btn6 = types.InlineKeyboardButton('Custom', callback_data='buy_tax_custom')
     markup.add(btn1, btn2, btn3, btn4, btn5, btn6)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "**Step 6/7:** Set Buy Tax\n\n"
         "Select a buy tax percentage or enter a custom value (0-25%):",
         call.message.chat.id,
@@ -405,13 +445,13 @@ def continue_to_taxes(call):
         reply_markup=markup,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('buy_tax_'))
+@router.callback_prefix('buy_tax_')
 def handle_buy_tax_selection(call):
     user_id = call.from_user.id
     tax_option = call.data.split('_')[2]
     
     if tax_option == 'custom':
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "Please enter your custom buy tax percentage (0-25):",
             parse_mode='Markdown')
@@ -430,7 +470,7 @@ def handle_buy_tax_selection(call):
         btn6 = types.InlineKeyboardButton('Custom', callback_data='sell_tax_custom')
         markup.add(btn1, btn2, btn3, btn4, btn5, btn6)
         
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             f"✅ Buy tax: **{tax_value}%**\n\n"
             f"**Step 7/7:** Set Sell Tax\n\n"
@@ -438,13 +478,13 @@ def handle_buy_tax_selection(call):
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('sell_tax_'))
+@router.callback_prefix('sell_tax_')
 def handle_sell_tax_selection(call):
     user_id = call.from_user.id
     tax_option = call.data.split('_')[2]
     
     if tax_option == 'custom':
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "Please enter your custom sell tax percentage (0-25):",
             parse_mode='Markdown')
@@ -457,7 +497,7 @@ def handle_sell_tax_selection(call):
         btn1 = types.InlineKeyboardButton('Use my wallet address (default)', callback_data='tax_wallet_default')
         markup.add(btn1)
         
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "**Step 8/8:** Enter the wallet address where taxes should be sent.\n\n"
             "You can enter a custom address or use your wallet address (default).",
@@ -468,7 +508,7 @@ def handle_sell_tax_selection(call):
         # Update user state
         user_states[user_id] = UserState.ENTERING_TAX_WALLET
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.SETTING_TAXES)
+@router.message_state(UserState.SETTING_TAXES)
 def handle_tax_setting(message):
     user_id = message.from_user.id
 
@@ -480,8 +520,8 @@ def handle_tax_setting(message):
     try:
         tax_value = float(message.text)
         if tax_value < 0 or tax_value > 25:
-            bot.send_message(message.chat.id,
-                             "❌ Tax must be between 0 and 25%")
+            outbox.send_message(message.chat.id,
+                                "❌ Tax must be between 0 and 25%")
             return
 
         if tax_step == 'buy':
@@ -498,12 +538,12 @@ def handle_tax_setting(message):
             btn6 = types.InlineKeyboardButton('Custom', callback_data='sell_tax_custom')
             markup.add(btn1, btn2, btn3, btn4, btn5, btn6)
             
-            bot.send_message(message.chat.id,
-                             f"✅ Buy tax: **{tax_value}%**\n\n"
-                             f"**Step 7/8:** Set Sell Tax\n\n"
-                             f"Select a sell tax percentage or enter a custom value (0-25%):",
-                             reply_markup=markup,
-                             parse_mode='Markdown')
+            outbox.send_message(message.chat.id,
+                                f"✅ Buy tax: **{tax_value}%**\n\n"
+                                f"**Step 7/8:** Set Sell Tax\n\n"
+                                f"Select a sell tax percentage or enter a custom value (0-25%):",
+                                reply_markup=markup,
+                                parse_mode='Markdown')
 
         elif tax_step == 'sell':
             user_data[user_id]['sell_tax'] = int(tax_value * 100)  # Convert to basis points
@@ -513,7 +553,7 @@ def handle_tax_setting(message):
             btn1 = types.InlineKeyboardButton('Use my wallet address (default)', callback_data='tax_wallet_default')
             markup.add(btn1)
             
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 "**Step 8/8:** Enter the wallet address where taxes should be sent.\n\n"
                 "You can enter a custom address or use your wallet address (default).",
@@ -524,15 +564,18 @@ def handle_tax_setting(message):
             user_states[user_id] = UserState.ENTERING_TAX_WALLET
 
     except ValueError:
-        bot.send_message(message.chat.id,
-                         "❌ Please enter a valid number for tax percentage.")
+        outbox.send_message(message.chat.id,
+                            "❌ Please enter a valid number for tax percentage.")
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('deploy_'))
+@router.callback_prefix('deploy_')
 def deploy_token_network(call):
+    from wallet import get_web3, get_fee_oracle
+    from contracts import estimate_deploy_gas
+    from token_launcher import can_launch
     user_id = call.from_user.id
     network = call.data.split('_')[1]
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         f"🚀 Preparing Token Deployment on {network.title()}...\n\n"
         f"⏳ Calculating gas fees and preparing transaction...",
         call.message.chat.id,
@@ -569,7 +612,7 @@ def deploy_token_network(call):
         user_wallet = get_user_wallet(user_id)
 
         if not user_wallet:
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ No wallet found!\n\nPlease set up your wallet first.",
                 call.message.chat.id,
                 call.message.message_id,
@@ -584,23 +627,27 @@ def deploy_token_network(call):
         buy_tax = token_data['buy_tax']
         sell_tax = token_data['sell_tax']
 
-        # Calculate estimated gas for the transaction
-        gas_price = web3.eth.gas_price
-        gas_limit = 3000000  # Estimated gas limit for token deployment
+        # Calculate estimated gas for the transaction from the network's fee oracle
+        fees = get_fee_oracle(web3).get_fees()
+        gas_price = fees['gas_price']
+        # eth_estimateGas on the token's bytecode, or the gas measured for these features if that fails
+        gas_limit = estimate_deploy_gas(web3, token_data, network, user_wallet['address'])
 
-        # Calculate the total transaction cost in ETH/MATIC
+        # Calculate the expected and the maximum transaction cost in ETH/MATIC
         transaction_cost_wei = gas_price * gas_limit
         transaction_cost_eth = web3.from_wei(transaction_cost_wei, 'ether')
+        max_cost_wei = fees['max_fee'] * gas_limit
+        max_cost_eth = web3.from_wei(max_cost_wei, 'ether')
 
         # Get current balance
         current_balance_wei = web3.eth.get_balance(user_wallet['address'])
         current_balance_eth = web3.from_wei(current_balance_wei, 'ether')
 
-        # Check if user has enough balance
-        if current_balance_wei < transaction_cost_wei:
-            bot.edit_message_text(
+        # Check if user has enough balance - the node requires the maximum fee to be covered
+        if current_balance_wei < max_cost_wei:
+            outbox.edit_message_text(
                 f"❌ Insufficient balance!\n\n"
-                f"You need at least {transaction_cost_eth:.6f} {network.upper()} for gas fees.\n"
+                f"You need at least {max_cost_eth:.6f} {network.upper()} for gas fees.\n"
                 f"Current balance: {current_balance_eth:.6f} {network.upper()}",
                 call.message.chat.id,
                 call.message.message_id,
@@ -640,6 +687,7 @@ Transaction Cost:
 • Gas Price: {web3.from_wei(gas_price, 'gwei')} Gwei
 • Gas Limit: {gas_limit:,}
 • Est. Cost: {transaction_cost_eth:.6f} {network.upper()}
+• Max Cost: {max_cost_eth:.6f} {network.upper()}
 • Your Balance: {current_balance_eth:.6f} {network.upper()}
 
 Do you want to proceed with deployment?
@@ -659,7 +707,17 @@ Do you want to proceed with deployment?
         btn2 = types.InlineKeyboardButton('❌ Cancel', callback_data='cancel_deploy')
         markup.add(btn1, btn2)
 
-        bot.edit_message_text(
+        # With a launcher contract on this network, the token and its pool can go out in one transaction
+        if can_launch(network, token_data['features']):
+            launch_id = f"l_{user_id}_{int(time.time())}"
+            callback_data_store[launch_id] = {
+                'type': 'launch',
+                'token_data': token_data,
+                'network': network
+            }
+            markup.add(types.InlineKeyboardButton('🚀 Deploy + Pool in 1 Transaction', callback_data=launch_id))
+
+        outbox.edit_message_text(
             tx_details,
             call.message.chat.id,
             call.message.message_id,
@@ -668,7 +726,7 @@ Do you want to proceed with deployment?
 
     except Exception as e:
         print(f"Error calculating deployment details: {e}")
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ Deployment Preparation Failed\n\n"
             f"Error: {str(e)}\n\n"
             f"Please check your wallet and try again.",
@@ -676,24 +734,27 @@ Do you want to proceed with deployment?
             call.message.message_id,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('c_'))
+@router.callback_prefix('c_')
 def confirm_deploy_token(call):
+    submit_chain_job(call, 'deploy_token', run_deploy_token_job)
+
+def run_deploy_token_job(call, job):
+    from wallet import get_explorer_url
     user_id = call.from_user.id
     callback_id = call.data
 
     # Retrieve stored data
-    if callback_id not in callback_data_store:
+    data = callback_data_store.get(callback_id)
+    if data is None:
         bot.answer_callback_query(call.id, "Session expired. Please try again.", show_alert=True)
         return
 
-    data = callback_data_store[callback_id]
-
     if data['type'] == 'confirm_deploy':
         token_data = data['token_data']
         network = data['network']
 
         # Show deploying message
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"🚀 Deploying Token on {network.title()}...\n\n"
             f"⏳ Transaction submitted. Waiting for confirmation...\n\n"
             f"This process can take 30-60 seconds depending on network congestion.",
@@ -701,8 +762,9 @@ def confirm_deploy_token(call):
             call.message.message_id,
             parse_mode='Markdown')
 
-        # Actually deploy the token
-        contract_address, details = deploy_token(user_id, token_data, network)
+        # Actually deploy the token - the deploy engines are only imported on the first deploy
+        from contracts import deploy_token
+        contract_address, details = deploy_token(user_id, token_data, network, progress=job.report)
 
         if isinstance(details, dict):  # Successful deployment
             # Generate pool callback ID
@@ -721,7 +783,7 @@ def confirm_deploy_token(call):
                                                 contract_address, network))
             markup.add(btn1, btn2)
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"🎉 Token Deployed Successfully!\n\n"
                 f"📍 Contract Address:\n`{contract_address}`\n\n"
                 f"🌐 Network: {network.title()}\n"
@@ -736,7 +798,7 @@ def confirm_deploy_token(call):
                 reply_markup=markup,
                 parse_mode='Markdown')
         else:  # Error occurred
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ Deployment Failed\n\n"
                 f"Error: {details}\n\n"
                 f"Please check your wallet balance and try again.",
@@ -744,14 +806,14 @@ def confirm_deploy_token(call):
                 call.message.message_id,
                 parse_mode='Markdown')
 
-    # Clean up callback data
-    del callback_data_store[callback_id]
+    # Clean up callback data (it may have expired while the job was queued)
+    callback_data_store.pop(callback_id, None)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'cancel_deploy')
+@router.callback_data('cancel_deploy')
 def cancel_token_deployment(call):
     user_id = call.from_user.id
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "❌ **Deployment Cancelled**\n\n"
         "Your token deployment has been cancelled. No fees were charged.\n\n"
         "Use /start to return to the main menu.",
@@ -764,17 +826,50 @@ def cancel_token_deployment(call):
     if user_id in user_data:
         del user_data[user_id]
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('p_'))
+@router.callback_prefix('l_')
+def start_token_launch(call):
+    user_id = call.from_user.id
+    callback_id = call.data
+
+    data = callback_data_store.pop(callback_id, None)
+    if data is None:
+        bot.answer_callback_query(call.id, "Session expired. Please try again.", show_alert=True)
+        return
+
+    token_data = data['token_data']
+
+    # Liquidity amounts are collected by the pool creation steps; the launch flag
+    # sends the confirmation to the launcher instead of a separate pool transaction
+    user_states[user_id] = UserState.POOL_CREATION
+    user_data[user_id] = {
+        'launch': token_data,
+        'token_address': 'deployed with the pool',
+        'token_info': {'name': token_data['name'], 'symbol': token_data['symbol']},
+        'token_supply': token_data['total_supply'],
+        'network': data['network'],
+        'step': 'token_amount'
+    }
+
+    outbox.edit_message_text(
+        f"🚀 Launch {token_data['name']} ({token_data['symbol']})\n\n"
+        f"The token, its Uniswap V3 pool and your liquidity position are created in one transaction.\n\n"
+        f"**Step 1/2:** Select token amount for initial liquidity or enter a custom amount:",
+        call.message.chat.id,
+        call.message.message_id,
+        reply_markup=pool_amount_markup(token_data['total_supply']),
+        parse_mode='Markdown')
+
+@router.callback_prefix('p_')
 def handle_pool_callback(call):
     user_id = call.from_user.id
     callback_id = call.data
 
     # Retrieve stored data
-    if callback_id not in callback_data_store:
+    data = callback_data_store.get(callback_id)
+    if data is None:
         bot.answer_callback_query(call.id, "Session expired. Please try again.", show_alert=True)
         return
 
-    data = callback_data_store[callback_id]
     print(f"Pool callback data: {data}")
 
     if data['type'] == 'pool':
@@ -782,9 +877,9 @@ def handle_pool_callback(call):
         create_pool_start(call, data['contract_address'], data['network'])
 
         # Remove the callback data after use
-        del callback_data_store[callback_id]
+        callback_data_store.pop(callback_id, None)
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.POOL_CREATION)
+@router.message_state(UserState.POOL_CREATION)
 def handle_pool_creation(message):
     user_id = message.from_user.id
 
@@ -810,13 +905,13 @@ def handle_pool_creation(message):
                 markup.add(btn)
             markup.add(types.InlineKeyboardButton('Custom Amount', callback_data='eth_amount_custom'))
 
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id, f"✅ Token amount: **{token_amount:,}**\n\n"
                 f"**Step 2/2:** Select {currency} amount for initial liquidity or enter a custom amount:",
                 reply_markup=markup,
                 parse_mode='Markdown')
         except ValueError:
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 "❌ Please enter a valid number for token amount.")
 
@@ -841,7 +936,7 @@ def handle_pool_creation(message):
             if token_info:
                 token_display = f"\n**Token:** {token_info['name']} ({token_info['symbol']})"
             
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id, f"💧 **Pool Creation Summary**\n\n"
                 f"🪙 **Token Amount:** {user_data[user_id]['token_amount']:,}\n"
                 f"💰 **{currency} Amount:** {eth_amount}\n"
@@ -853,14 +948,19 @@ def handle_pool_creation(message):
                 parse_mode='Markdown')
         except ValueError:
             currency = "MATIC" if user_data[user_id]['network'] == 'polygon' else "ETH"
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 f"❌ Please enter a valid number for {currency} amount.")
 
-@bot.callback_query_handler(func=lambda call: call.data == 'confirm_pool_creation')
+@router.callback_data('confirm_pool_creation')
 def confirm_pool_creation(call):
+    from pool import create_uniswap_pool
     user_id = call.from_user.id
 
+    if 'launch' in user_data.get(user_id, {}):
+        confirm_token_launch(call)
+        return
+
     # Get pool parameters from user data
     token_address = user_data[user_id]['token_address']
     network = user_data[user_id]['network']
@@ -895,6 +995,7 @@ Transaction Cost:
 • Gas Limit: {details['gas_limit']:,}
 • Gas Cost: {details['transaction_cost']:.6f} {currency}
 • Total Cost: {details['total_cost']:.6f} {currency} (including liquidity)
+• Max Total: {details['max_cost']:.6f} {currency} (including liquidity)
 • Your Balance: {details['current_balance']:.6f} {currency}
 
 Do you want to proceed with pool creation?
@@ -913,14 +1014,14 @@ Do you want to proceed with pool creation?
         btn2 = types.InlineKeyboardButton('❌ Cancel', callback_data='cancel_pool_creation')
         markup.add(btn1, btn2)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             tx_details,
             call.message.chat.id,
             call.message.message_id,
             reply_markup=markup,
             parse_mode='Markdown')
     else:  # Error occurred
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ Pool Creation Failed\n\n"
             f"Error: {details}\n\n"
             f"Please check your wallet balance and try again.",
@@ -933,34 +1034,171 @@ Do you want to proceed with pool creation?
         if user_id in user_data:
             del user_data[user_id]
 
-@bot.callback_query_handler(func=lambda call: call.data == 'cancel_pool_creation')
+def confirm_token_launch(call):
+    from token_launcher import prepare_launch
+    user_id = call.from_user.id
+    token_data = user_data[user_id]['launch']
+    network = user_data[user_id]['network']
+    liquidity_data = {
+        'token_amount': user_data[user_id]['token_amount'],
+        'eth_amount': user_data[user_id]['eth_amount']
+    }
+    currency = "MATIC" if network == 'polygon' else "ETH"
+
+    details = prepare_launch(user_id, token_data, liquidity_data, network)
+    if not details['success']:
+        outbox.edit_message_text(
+            f"❌ Launch Failed\n\n"
+            f"Error: {details['error']}\n\n"
+            f"Please check your wallet balance and try again.",
+            call.message.chat.id,
+            call.message.message_id,
+            parse_mode='Markdown')
+        user_states[user_id] = UserState.MAIN_MENU
+        del user_data[user_id]
+        return
+
+    tx_details = f"""
+🔍 Launch Details
+
+Token: {token_data['name']} ({token_data['symbol']})
+• Supply: {token_data['total_supply']:,}
+• Buy Tax: {token_data['buy_tax'] / 100}%
+• Sell Tax: {token_data['sell_tax'] / 100}%
+
+Liquidity:
+• Token Amount: {liquidity_data['token_amount']:,} tokens
+• {currency} Amount: {liquidity_data['eth_amount']} {currency}
+
+Network: {network.title()}
+
+Transaction Cost (one transaction):
+• Gas Price: {details['gas_price']} Gwei
+• Gas Limit: {details['gas_limit']:,}
+• Est. Gas Cost: {details['transaction_cost']:.6f} {currency}
+• Max Total: {details['max_cost']:.6f} {currency} (including liquidity)
+• Your Balance: {details['current_balance']:.6f} {currency}
+
+Do you want to proceed with the launch?
+        """
+
+    exec_id = f"x_{user_id}_{int(time.time())}"
+    callback_data_store[exec_id] = {
+        'type': 'execute_launch',
+        'network': network
+    }
+
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    btn1 = types.InlineKeyboardButton('✅ Approve', callback_data=exec_id)
+    btn2 = types.InlineKeyboardButton('❌ Cancel', callback_data='cancel_pool_creation')
+    markup.add(btn1, btn2)
+
+    outbox.edit_message_text(
+        tx_details,
+        call.message.chat.id,
+        call.message.message_id,
+        reply_markup=markup,
+        parse_mode='Markdown')
+
+@router.callback_prefix('x_')
+def handle_execute_launch_callback(call):
+    submit_chain_job(call, 'launch_token', run_token_launch_job)
+
+def run_token_launch_job(call, job):
+    from wallet import get_explorer_url
+    from token_launcher import launch_token
+    user_id = call.from_user.id
+    callback_id = call.data
+
+    data = callback_data_store.get(callback_id)
+    if data is None or user_id not in user_data:
+        bot.answer_callback_query(call.id, "Session expired. Please try again.", show_alert=True)
+        return
+
+    network = data['network']
+    token_data = user_data[user_id]['launch']
+    liquidity_data = {
+        'token_amount': user_data[user_id]['token_amount'],
+        'eth_amount': user_data[user_id]['eth_amount']
+    }
+
+    outbox.edit_message_text(
+        f"🚀 Launching {token_data['name']} on {network.title()}...\n\n"
+        f"⏳ This usually takes one block.",
+        call.message.chat.id,
+        call.message.message_id,
+        parse_mode='Markdown')
+
+    result = launch_token(user_id, token_data, liquidity_data, network, progress=job.report)
+
+    markup = types.InlineKeyboardMarkup(row_width=1)
+    if result['status'] == 'success':
+        currency = "MATIC" if network == 'polygon' else "ETH"
+        position_id = result.get('position_id')
+        position_id_display = f"`{position_id}`" if position_id is not None else "None"
+
+        markup.add(types.InlineKeyboardButton('📊 View Token on Explorer',
+                                              url=get_explorer_url(result['token_address'], network)))
+        markup.add(types.InlineKeyboardButton('🔄 Back to Main Menu', callback_data='back_to_main'))
+        outbox.edit_message_text(
+            f"🎉 Token Launched!\n\n"
+            f"📍 Contract Address:\n`{result['token_address']}`\n\n"
+            f"💧 Pool Address:\n`{result['pool_address']}`\n\n"
+            f"🔢 Position ID: {position_id_display}\n\n"
+            f"💧 Liquidity Added:\n"
+            f"• {liquidity_data['token_amount']:,} tokens\n"
+            f"• {liquidity_data['eth_amount']} {currency}\n\n"
+            f"📝 Transaction: `{result['tx_hash']}`\n\n"
+            f"🎯 Your token is now tradeable on Uniswap V3!",
+            call.message.chat.id,
+            call.message.message_id,
+            reply_markup=markup,
+            parse_mode='Markdown')
+    else:
+        markup.add(types.InlineKeyboardButton('🔄 Back to Main Menu', callback_data='back_to_main'))
+        outbox.edit_message_text(
+            f"❌ Launch Failed\n\n"
+            f"Error: {result.get('error', 'Unknown error')}\n\n"
+            f"Please check your wallet balance and try again.",
+            call.message.chat.id,
+            call.message.message_id,
+            reply_markup=markup,
+            parse_mode='Markdown')
+
+    user_states[user_id] = UserState.MAIN_MENU
+    if user_id in user_data:
+        del user_data[user_id]
+    # It may have expired while the job was queued
+    callback_data_store.pop(callback_id, None)
+
+@router.callback_data('cancel_pool_creation')
 def cancel_pool_creation(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.MAIN_MENU
     if user_id in user_data:
         del user_data[user_id]
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "❌ Pool creation cancelled.\n\nUse /start to return to main menu.",
         call.message.chat.id, call.message.message_id)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'back_to_main')
+@router.callback_data('back_to_main')
 def back_to_main_menu(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.MAIN_MENU
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "✅ Returning to main menu.\n\nUse /start to show all options.",
         call.message.chat.id, call.message.message_id)
 
-@bot.message_handler(func=lambda message: message.text == '💧 Create Pool')
+@router.message_text('💧 Create Pool')
 def create_pool_options(message):
     user_id = message.from_user.id
     
     # Check if user has wallet
     wallet = get_user_wallet(user_id)
     if not wallet:
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ **No wallet found!**\n\nPlease setup your wallet first using the '🔐 Setup Wallet' button.",
             parse_mode='Markdown')
@@ -971,7 +1209,7 @@ def create_pool_options(message):
     btn2 = types.InlineKeyboardButton('📝 Enter custom token address', callback_data='enter_custom_token')
     markup.add(btn1, btn2)
     
-    bot.send_message(
+    outbox.send_message(
         message.chat.id,
         "💧 **Create Liquidity Pool**\n\n"
         "Choose an option:\n"
@@ -981,17 +1219,15 @@ def create_pool_options(message):
         parse_mode='Markdown'
     )
 
-@bot.callback_query_handler(func=lambda call: call.data == 'select_my_tokens')
+@router.callback_data('select_my_tokens')
 def select_from_my_tokens(call):
     user_id = call.from_user.id
-    user_id_str = str(user_id)
     
     try:
-        with open(TOKENS_FILE, 'r') as f:
-            tokens = json.load(f)
+        user_tokens = get_user_tokens(user_id)
         
-        if user_id_str not in tokens or not tokens[user_id_str]:
-            bot.edit_message_text(
+        if not user_tokens:
+            outbox.edit_message_text(
                 "❌ You haven't created any tokens yet!\n\n"
                 "Use '🪙 Create Token' to deploy your first token or select 'Enter custom token address'.",
                 call.message.chat.id,
@@ -1002,7 +1238,7 @@ def select_from_my_tokens(call):
         markup = types.InlineKeyboardMarkup(row_width=1)
         
         # Add each token as a button
-        for i, token in enumerate(tokens[user_id_str]):
+        for i, token in enumerate(user_tokens):
             token_info = f"{token['token_name']} ({token['token_symbol']}) - {token['network'].title()}"
             callback_data = f"token_{token['contract_address']}_{token['network']}"
             btn = types.InlineKeyboardButton(token_info, callback_data=callback_data)
@@ -1012,7 +1248,7 @@ def select_from_my_tokens(call):
         back_btn = types.InlineKeyboardButton('⬅️ Back', callback_data='back_to_pool_options')
         markup.add(back_btn)
         
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "🔍 **Select a token:**\n\n"
             "Choose one of your tokens to create a pool for:",
             call.message.chat.id,
@@ -1021,20 +1257,20 @@ def select_from_my_tokens(call):
             parse_mode='Markdown')
     except Exception as e:
         print(f"Error loading tokens: {e}")
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ Error loading tokens: {str(e)}",
             call.message.chat.id,
             call.message.message_id,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'back_to_pool_options')
+@router.callback_data('back_to_pool_options')
 def back_to_pool_options(call):
     markup = types.InlineKeyboardMarkup(row_width=1)
     btn1 = types.InlineKeyboardButton('🔍 Select from my tokens', callback_data='select_my_tokens')
     btn2 = types.InlineKeyboardButton('📝 Enter custom token address', callback_data='enter_custom_token')
     markup.add(btn1, btn2)
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "💧 **Create Liquidity Pool**\n\n"
         "Choose an option:\n"
         "• Select from tokens you've created\n"
@@ -1044,7 +1280,7 @@ def back_to_pool_options(call):
         reply_markup=markup,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('token_'))
+@router.callback_prefix('token_')
 def token_selected(call):
     user_id = call.from_user.id
     
@@ -1060,12 +1296,12 @@ def token_selected(call):
     else:
         bot.answer_callback_query(call.id, "Invalid token selection", show_alert=True)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'enter_custom_token')
+@router.callback_data('enter_custom_token')
 def enter_custom_token(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.ENTERING_TOKEN_ADDRESS
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "📝 **Enter Custom Token Address**\n\n"
         "Please send the contract address of the token you want to create a pool for.\n\n"
         "Make sure it's a valid ERC20 token address.",
@@ -1074,12 +1310,12 @@ def enter_custom_token(call):
         parse_mode='Markdown')
     
     # Send a follow-up message to clarify what to do next
-    bot.send_message(
+    outbox.send_message(
         call.message.chat.id,
         "Reply to this message with the token contract address.",
         parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.ENTERING_TOKEN_ADDRESS)
+@router.message_state(UserState.ENTERING_TOKEN_ADDRESS)
 def handle_token_address(message):
     user_id = message.from_user.id
     token_address = message.text.strip()
@@ -1088,7 +1324,7 @@ def handle_token_address(message):
     
     # Basic validation for Ethereum address format
     if not (token_address.startswith('0x') and len(token_address) == 42):
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ Invalid Ethereum address format.\n\n"
             "Please enter a valid ERC20 token address starting with '0x' and 42 characters in length.",
@@ -1101,15 +1337,17 @@ def handle_token_address(message):
     btn2 = types.InlineKeyboardButton('🔷 Ethereum', callback_data=f'custom_network_ethereum_{token_address}')
     markup.add(btn1, btn2)
     
-    bot.send_message(
+    outbox.send_message(
         message.chat.id,
         f"✅ Token address received: `{token_address}`\n\n"
         f"Please select the network for this token:",
         reply_markup=markup,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('custom_network_'))
+@router.callback_prefix('custom_network_')
 def custom_token_network_selected(call):
+    from wallet import get_web3
+    from contract_registry import get_contract
     user_id = call.from_user.id
     
     # Extract network and token address from callback data
@@ -1126,7 +1364,7 @@ def custom_token_network_selected(call):
             web3 = get_web3(network)
             
             # Show validating message
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"⏳ Validating token `{token_address}` on {network.title()}...",
                 call.message.chat.id,
                 call.message.message_id,
@@ -1134,7 +1372,7 @@ def custom_token_network_selected(call):
             )
             
             # Try to create a contract instance and get basic info
-            token_contract = web3.eth.contract(address=token_address, abi=ERC20_ABI)
+            token_contract = get_contract(web3, token_address, ERC20_ABI)
             
             try:
                 token_name = token_contract.functions.name().call()
@@ -1151,7 +1389,7 @@ def custom_token_network_selected(call):
                 })
             except Exception as e:
                 print(f"Error getting token info: {e}")
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     f"❌ Error validating token: Could not read token information.\n\n"
                     f"Make sure this is a valid ERC20 token on {network.title()} network.",
                     call.message.chat.id,
@@ -1159,7 +1397,7 @@ def custom_token_network_selected(call):
                     parse_mode='Markdown')
         except Exception as e:
             print(f"Error validating token: {e}")
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ Error validating token: {str(e)}\n\n"
                 f"Please check the address and try again.",
                 call.message.chat.id,
@@ -1169,7 +1407,25 @@ def custom_token_network_selected(call):
         bot.answer_callback_query(call.id, "Invalid selection", show_alert=True)
 
 # Update the create_pool_start function to handle token_info parameter
+def pool_amount_markup(token_supply):
+    """Buttons suggesting 25-100% of the supply for the initial liquidity"""
+    amount_25_percent = int(token_supply * 0.25)
+    amount_50_percent = int(token_supply * 0.5)
+    amount_75_percent = int(token_supply * 0.75)
+    amount_100_percent = int(token_supply)
+
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    btn1 = types.InlineKeyboardButton(f'25% ({amount_25_percent:,})', callback_data=f'pool_amount_{amount_25_percent}')
+    btn2 = types.InlineKeyboardButton(f'50% ({amount_50_percent:,})', callback_data=f'pool_amount_{amount_50_percent}')
+    btn3 = types.InlineKeyboardButton(f'75% ({amount_75_percent:,})', callback_data=f'pool_amount_{amount_75_percent}')
+    btn4 = types.InlineKeyboardButton(f'100% ({amount_100_percent:,})', callback_data=f'pool_amount_{amount_100_percent}')
+    btn5 = types.InlineKeyboardButton('Custom Amount', callback_data='pool_amount_custom')
+    markup.add(btn1, btn2, btn3, btn4, btn5)
+    return markup
+
 def create_pool_start(call, token_address, network, token_info=None):
+    from wallet import get_web3
+    from contract_registry import get_contract
     user_id = call.from_user.id
     print(f"Creating pool for token: {token_address} on network: {network}")
 
@@ -1193,19 +1449,19 @@ def create_pool_start(call, token_address, network, token_info=None):
     token_supply = None
     try:
         # First check if we have this token in our database
-        with open(TOKENS_FILE, 'r') as f:
-            tokens = json.load(f)
-            user_id_str = str(user_id)
-            if user_id_str in tokens:
-                for token in tokens[user_id_str]:
-                    if token['contract_address'].lower() == token_address.lower():
-                        token_supply = token['total_supply']
-                        break
+        for token in get_user_tokens(user_id):
+            if token['contract_address'].lower() == token_address.lower():
+                token_supply = token['total_supply']
+                break
         
+        # Callers that already read the supply pass it along
+        if token_supply is None and token_info and 'total_supply' in token_info:
+            token_supply = token_info['total_supply']
+
         # If not found in database, try to get from contract
         if token_supply is None and token_info and 'decimals' in token_info:
             web3 = get_web3(network)
-            token_contract = web3.eth.contract(address=token_address, abi=ERC20_ABI)
+            token_contract = get_contract(web3, token_address, ERC20_ABI)
             total_supply_raw = token_contract.functions.totalSupply().call()
             token_supply = total_supply_raw / (10 ** token_info['decimals'])
     except Exception as e:
@@ -1215,20 +1471,7 @@ def create_pool_start(call, token_address, network, token_info=None):
     markup = None
     if token_supply:
         user_data[user_id]['token_supply'] = token_supply
-        
-        # Calculate suggested amounts
-        amount_25_percent = int(token_supply * 0.25)
-        amount_50_percent = int(token_supply * 0.5)
-        amount_75_percent = int(token_supply * 0.75)
-        amount_100_percent = int(token_supply)
-        
-        markup = types.InlineKeyboardMarkup(row_width=2)
-        btn1 = types.InlineKeyboardButton(f'25% ({amount_25_percent:,})', callback_data=f'pool_amount_{amount_25_percent}')
-        btn2 = types.InlineKeyboardButton(f'50% ({amount_50_percent:,})', callback_data=f'pool_amount_{amount_50_percent}')
-        btn3 = types.InlineKeyboardButton(f'75% ({amount_75_percent:,})', callback_data=f'pool_amount_{amount_75_percent}')
-        btn4 = types.InlineKeyboardButton(f'100% ({amount_100_percent:,})', callback_data=f'pool_amount_{amount_100_percent}')
-        btn5 = types.InlineKeyboardButton('Custom Amount', callback_data='pool_amount_custom')
-        markup.add(btn1, btn2, btn3, btn4, btn5)
+        markup = pool_amount_markup(token_supply)
     
     message_text = f"💧 Create Liquidity Pool{token_display}\n\n" \
                   f"We'll create a Uniswap V3 pool for your token.\n\n" \
@@ -1239,7 +1482,7 @@ def create_pool_start(call, token_address, network, token_info=None):
     else:
         message_text += f"Enter token amount for initial liquidity:\n(e.g., '10000' tokens)"
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         message_text,
         call.message.chat.id,
         call.message.message_id,
@@ -1248,18 +1491,18 @@ def create_pool_start(call, token_address, network, token_info=None):
 
     # Also send a new message to make it clearer to the user what to do next
     if not markup:
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "Please reply with the amount of tokens you want to add to the pool.",
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('pool_amount_'))
+@router.callback_prefix('pool_amount_')
 def handle_pool_amount_selection(call):
     user_id = call.from_user.id
     amount_option = call.data.split('_')[2]
     
     if amount_option == 'custom':
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "Please enter your custom token amount for the pool:",
             parse_mode='Markdown')
@@ -1280,20 +1523,20 @@ def handle_pool_amount_selection(call):
             markup.add(btn)
         markup.add(types.InlineKeyboardButton('Custom Amount', callback_data='eth_amount_custom'))
 
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id, 
             f"✅ Token amount: **{token_amount:,}**\n\n"
             f"**Step 2/2:** Select {currency} amount for initial liquidity or enter a custom amount:",
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('eth_amount_'))
+@router.callback_prefix('eth_amount_')
 def handle_eth_amount_selection(call):
     user_id = call.from_user.id
     amount_option = call.data.split('_')[2]
     
     if amount_option == 'custom':
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             f"Please enter your custom {user_data[user_id]['network'].title()} amount:",
             parse_mode='Markdown')
@@ -1317,7 +1560,7 @@ def handle_eth_amount_selection(call):
         if token_info:
             token_display = f"\n**Token:** {token_info['name']} ({token_info['symbol']})"
         
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id, f"💧 **Pool Creation Summary**\n\n"
             f"🪙 **Token Amount:** {user_data[user_id]['token_amount']:,}\n"
             f"💰 **{currency} Amount:** {eth_amount}\n"
@@ -1328,7 +1571,7 @@ def handle_eth_amount_selection(call):
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.POOL_CREATION)
+@router.message_state(UserState.POOL_CREATION)
 def handle_pool_creation(message):
     user_id = message.from_user.id
 
@@ -1354,13 +1597,13 @@ def handle_pool_creation(message):
                 markup.add(btn)
             markup.add(types.InlineKeyboardButton('Custom Amount', callback_data='eth_amount_custom'))
 
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id, f"✅ Token amount: **{token_amount:,}**\n\n"
                 f"**Step 2/2:** Select {currency} amount for initial liquidity or enter a custom amount:",
                 reply_markup=markup,
                 parse_mode='Markdown')
         except ValueError:
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 "❌ Please enter a valid number for token amount.")
 
@@ -1385,7 +1628,7 @@ def handle_pool_creation(message):
             if token_info:
                 token_display = f"\n**Token:** {token_info['name']} ({token_info['symbol']})"
             
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id, f"💧 **Pool Creation Summary**\n\n"
                 f"🪙 **Token Amount:** {user_data[user_id]['token_amount']:,}\n"
                 f"💰 **{currency} Amount:** {eth_amount}\n"
@@ -1397,36 +1640,34 @@ def handle_pool_creation(message):
                 parse_mode='Markdown')
         except ValueError:
             currency = "MATIC" if user_data[user_id]['network'] == 'polygon' else "ETH"
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 f"❌ Please enter a valid number for {currency} amount.")
 
-@bot.message_handler(func=lambda message: message.text == '📊 My Tokens')
+@router.message_text('📊 My Tokens')
 def show_my_tokens(message):
     user_id = message.from_user.id
-    user_id_str = str(user_id)
 
-    with open(TOKENS_FILE, 'r') as f:
-        tokens = json.load(f)
+    user_tokens = get_user_tokens(user_id)
 
-    if user_id_str not in tokens or not tokens[user_id_str]:
-        bot.send_message(message.chat.id, "📊 **My Tokens**\n\n"
-                         "You haven't created any tokens yet!\n\n"
-                         "Use '🪙 Create Token' to deploy your first token.",
-                         parse_mode='Markdown')
+    if not user_tokens:
+        outbox.send_message(message.chat.id, "📊 **My Tokens**\n\n"
+                            "You haven't created any tokens yet!\n\n"
+                            "Use '🪙 Create Token' to deploy your first token.",
+                            parse_mode='Markdown')
         return
 
     token_list = "📊 **Your Tokens:**\n\n"
 
-    for i, token in enumerate(tokens[user_id_str], 1):
+    for i, token in enumerate(user_tokens, 1):
         token_list += f"**{i}. {token['token_name']} ({token['token_symbol']})**\n"
         token_list += f"📍 `{token['contract_address']}`\n"
         token_list += f"🌐 {token['network'].title()}\n"
         token_list += f"📅 {token['created_at']}\n\n"
 
-    bot.send_message(message.chat.id, token_list, parse_mode='Markdown')
+    outbox.send_message(message.chat.id, token_list, parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: message.text == 'ℹ️ Help')
+@router.message_text('ℹ️ Help')
 def show_help(message):
     help_text = """
 ℹ️ **Help & Instructions**
@@ -1463,9 +1704,9 @@ def show_help(message):
 **Need more help?** Contact @YourSupportHandle
     """
 
-    bot.send_message(message.chat.id, help_text, parse_mode='Markdown')
+    outbox.send_message(message.chat.id, help_text, parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: message.text == '⚙️ Settings')
+@router.message_text('⚙️ Settings')
 def show_settings(message):
     user_id = message.from_user.id
     wallet = get_user_wallet(user_id)
@@ -1495,13 +1736,13 @@ def show_settings(message):
 **Options:**
     """
 
-    bot.send_message(message.chat.id,
-                     settings_text,
-                     reply_markup=markup,
-                     parse_mode='Markdown')
+    outbox.send_message(message.chat.id,
+                        settings_text,
+                        reply_markup=markup,
+                        parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'change_wallet')
+@router.callback_data('change_wallet')
 def change_wallet_callback(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.WALLET_SETUP
@@ -1513,7 +1754,7 @@ def change_wallet_callback(call):
                                       callback_data='import_wallet')
     markup.add(btn1, btn2)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "🔐 **Change Wallet**\n\n"
         "Choose an option to change your wallet:",
         call.message.chat.id,
@@ -1522,7 +1763,7 @@ def change_wallet_callback(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'export_wallet_key')
+@router.callback_data('export_wallet_key')
 def export_wallet_key(call):
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
@@ -1539,18 +1780,18 @@ This message will be deleted in 60 seconds for security.
         """
 
         # Send and setup message to delete after 60 seconds
-        sent_msg = bot.send_message(call.message.chat.id,
-                                    key_message,
-                                    parse_mode='Markdown')
+        sent_msg = outbox.send_message(call.message.chat.id,
+                                       key_message,
+                                       parse_mode='Markdown')
 
         # Delete the callback message to avoid confusion
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "🔒 Private key has been sent in a separate message.\nPlease save it securely and delete the message after you've saved it.",
             call.message.chat.id, call.message.message_id)
 
         # Schedule message deletion after 60 seconds
         # Since we can't use threading in this simplified version, we'll just advise the user
-        bot.send_message(
+        outbox.send_message(
             call.message.chat.id,
             "⏱ For security, please delete the message with your private key after saving it."
         )
@@ -1562,8 +1803,10 @@ This message will be deleted in 60 seconds for security.
 
 
 
-@bot.message_handler(commands=['debug'])
+@router.message_command('debug')
 def debug_info(message):
+    from token_metadata import get_token_metadata_stats
+    from portfolio import get_portfolio_stats
     user_id = message.from_user.id
 
     debug_text = "🔍 **Debug Information**\n\n"
@@ -1572,10 +1815,26 @@ def debug_info(message):
     debug_text += f"**Data Directory:** `{os.path.abspath(DATA_DIR)}`\n"
     debug_text += f"**Data Directory Exists:** {'✅' if os.path.exists(DATA_DIR) else '❌'}\n\n"
 
-    # Check files
-    debug_text += f"**Users File Exists:** {'✅' if os.path.exists(USERS_FILE) else '❌'}\n"
-    debug_text += f"**Tokens File Exists:** {'✅' if os.path.exists(TOKENS_FILE) else '❌'}\n"
-    debug_text += f"**Pools File Exists:** {'✅' if os.path.exists(POOLS_FILE) else '❌'}\n\n"
+    # Check database
+    debug_text += f"**Database File Exists:** {'✅' if os.path.exists(DATABASE_FILE) else '❌'}\n"
+    cache_stats = get_wallet_cache_stats()
+    debug_text += f"**Wallet Cache:** {cache_stats['size']} cached, {cache_stats['hits']} hits, {cache_stats['misses']} misses\n"
+    metadata_stats = get_token_metadata_stats()
+    debug_text += f"**Token Metadata Cache:** {metadata_stats['size']} cached, {metadata_stats['hits']} hits, {metadata_stats['misses']} misses\n"
+    portfolio_stats = get_portfolio_stats()
+    debug_text += f"**Balance Cache:** {portfolio_stats['size']} cached, {portfolio_stats['hits']} hits, {portfolio_stats['misses']} misses\n"
+    session_stats = user_data.get_stats()
+    callback_stats = callback_data_store.get_stats()
+    debug_text += (f"**Sessions ({SESSION_BACKEND}):** {session_stats['size']} conversations, "
+                   f"{callback_stats['size']} pending confirmations, "
+                   f"{session_stats['expired'] + callback_stats['expired']} expired, "
+                   f"{session_stats['evicted'] + callback_stats['evicted']} evicted\n")
+    job_stats = get_job_executor().get_stats()
+    debug_text += f"**Jobs:** {job_stats['running']} running, {job_stats['queued']} queued, {job_stats['failed']} failed, avg wait {job_stats['avg_wait_ms']} ms\n"
+    router_stats = router.get_stats()
+    debug_text += f"**Updates:** {router_stats['messages']} messages, {router_stats['callbacks']} callbacks, {router_stats['unmatched']} unmatched, avg routing {router_stats['avg_routing_us']} µs\n"
+    outbox_stats = outbox.get_stats()
+    debug_text += f"**Outbox:** {outbox_stats['queued']} queued, {outbox_stats['sent']} sent, {outbox_stats['coalesced']} edits coalesced, {outbox_stats['rate_limited']} rate limited\n\n"
 
     # Check user state
     debug_text += f"**Current User State:** `{user_states.get(user_id, 'Not set')}`\n\n"
@@ -1589,23 +1848,20 @@ def debug_info(message):
     else:
         debug_text += f"**Wallet Found:** ❌\n"
 
-    # Let's try to read the users file directly
+    # List the users stored in the database
     try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'r') as f:
-                content = f.read()
-                if content.strip():
-                    users = json.loads(content)
-                    debug_text += f"\n**User IDs in file:** {', '.join(users.keys())}\n"
-                    debug_text += f"**Your User ID:** `{user_id}`\n"
-                else:
-                    debug_text += "\n**Users file is empty**\n"
+        user_ids = get_user_ids()
+        if user_ids:
+            debug_text += f"\n**User IDs in database:** {', '.join(user_ids)}\n"
+            debug_text += f"**Your User ID:** `{user_id}`\n"
+        else:
+            debug_text += "\n**No users in database**\n"
     except Exception as e:
-        debug_text += f"\n**Error reading users file:** `{str(e)}`\n"
+        debug_text += f"\n**Error reading users:** `{str(e)}`\n"
 
-    bot.send_message(message.chat.id, debug_text, parse_mode='Markdown')
+    outbox.send_message(message.chat.id, debug_text, parse_mode='Markdown')
 
-@bot.message_handler(commands=['wallet'])
+@router.message_command('wallet')
 def wallet_command(message):
     user_id = message.from_user.id
     wallet = get_user_wallet(user_id)
@@ -1615,7 +1871,7 @@ def wallet_command(message):
         btn = types.InlineKeyboardButton('🔐 Setup Wallet', callback_data='setup_wallet')
         markup.add(btn)
 
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "🔑 **Wallet Management**\n\n"
             "You don't have a wallet set up yet. Would you like to create one?",
@@ -1637,19 +1893,46 @@ def wallet_command(message):
 Use the buttons below to manage your wallet.
         """
 
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             wallet_text,
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.message_handler(commands=['balance'])
+NETWORK_NAMES = {'polygon': 'Polygon', 'ethereum': 'Ethereum'}
+
+def format_balance_text(portfolio):
+    """Balance message for a portfolio from get_portfolio"""
+    lines = []
+    for entry in portfolio['networks']:
+        name = NETWORK_NAMES.get(entry['network'], entry['network'].title())
+        if 'error' in entry:
+            lines.append(f"**{name}:** ❌ unavailable")
+            continue
+        lines.append(f"**{name}:** {entry['native_balance']:.6f} {entry['native_symbol']}")
+        for token in entry['tokens']:
+            balance = 'unavailable' if token['balance'] is None else f"{token['balance']:,.4f}"
+            lines.append(f"  • {token['symbol']}: {balance}")
+    balances = "\n".join(lines)
+
+    return f"""
+💰 **Wallet Balance**
+
+**Address:** `{portfolio['address']}`
+
+{balances}
+
+_To add funds to your wallet, send MATIC/ETH to the address above._
+        """
+
+@router.message_command('balance')
 def check_balance(message):
+    from portfolio import get_portfolio
     user_id = message.from_user.id
     wallet = get_user_wallet(user_id)
 
     if not wallet:
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ **No wallet found!**\n\n"
             "Please setup your wallet first using the '🔐 Setup Wallet' button or /wallet command.",
@@ -1657,52 +1940,34 @@ def check_balance(message):
         return
 
     # Show balance checking message
-    sent_msg = bot.send_message(
+    sent_msg = outbox.send_message(
         message.chat.id,
         "⏳ **Checking wallet balance...**",
         parse_mode='Markdown')
 
     try:
-        # Check Polygon balance
-        polygon_web3 = get_web3('polygon')
-        polygon_balance_wei = polygon_web3.eth.get_balance(wallet['address'])
-        polygon_balance = polygon_web3.from_wei(polygon_balance_wei, 'ether')
-
-        # Check Ethereum balance 
-        eth_web3 = get_web3('ethereum')
-        eth_balance_wei = eth_web3.eth.get_balance(wallet['address'])
-        eth_balance = eth_web3.from_wei(eth_balance_wei, 'ether')
-
-        # Format the balances
-        balance_text = f"""
-💰 **Wallet Balance**
-
-**Address:** `{wallet['address']}`
-
-**Polygon:** {polygon_balance:.6f} MATIC
-**Ethereum:** {eth_balance:.6f} ETH
-
-_To add funds to your wallet, send MATIC/ETH to the address above._
-        """
+        # All networks at once, including the user's tokens; unchanged until the next block
+        portfolio = get_portfolio(wallet['address'], get_user_tokens(user_id))
+        balance_text = format_balance_text(portfolio)
 
         # Update message with balance info
-        bot.edit_message_text(
+        outbox.edit_message_text(
             balance_text,
             sent_msg.chat.id,
-            sent_msg.message_id,
+            sent_msg,
             parse_mode='Markdown')
 
     except Exception as e:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ **Error checking balance:**\n\n{str(e)}",
             sent_msg.chat.id,
-            sent_msg.message_id,
+            sent_msg,
             parse_mode='Markdown')
 
 # Handle private key import
-@bot.message_handler(
-    func=lambda message: user_states.get(message.from_user.id) == UserState.WALLET_SETUP and len(message.text) >= 64)
+@router.message_state(UserState.WALLET_SETUP, func=lambda message: len(message.text) >= 64)
 def import_wallet_handler(message):
+    from eth_account import Account
     user_id = message.from_user.id
     username = message.from_user.username or message.from_user.first_name
 
@@ -1730,37 +1995,41 @@ def import_wallet_handler(message):
 
 Use /start to return to main menu.
 """
-        bot.send_message(message.chat.id, confirmation_text, parse_mode='Markdown')
+        outbox.send_message(message.chat.id, confirmation_text, parse_mode='Markdown')
 
         # Delete message with private key if possible
         try:
             bot.delete_message(message.chat.id, message.message_id)
         except Exception:
             # If deletion fails, advise user to delete it themselves
-            bot.send_message(message.chat.id, "⚠️ Please delete your previous message containing the private key for security.")
+            outbox.send_message(message.chat.id, "⚠️ Please delete your previous message containing the private key for security.")
 
     except Exception as e:
         print(f"Wallet import error: {str(e)}")
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             f"❌ **Invalid private key!**\n\nPlease make sure you entered a valid private key (64 characters, with or without '0x' prefix)."
         )
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('e_'))
+@router.callback_prefix('e_')
 def handle_execute_pool_callback(call):
+    submit_chain_job(call, 'create_pool', run_pool_creation_job)
+
+def run_pool_creation_job(call, job):
+    from wallet import get_explorer_url
+    from pool import execute_pool_creation
     user_id = call.from_user.id
     callback_id = call.data
 
     # Retrieve stored data
-    if callback_id not in callback_data_store:
+    data = callback_data_store.get(callback_id)
+    if data is None:
         bot.answer_callback_query(call.id, "Session expired. Please try again.", show_alert=True)
         return
 
-    data = callback_data_store[callback_id]
-
     if data['type'] == 'execute_pool':
         # Show processing message
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"🚀 Creating Pool and Adding Liquidity...\n\n"
             f"⏳ This may take a minute or two. Please wait patiently.",
             call.message.chat.id,
@@ -1776,7 +2045,7 @@ def handle_execute_pool_callback(call):
         }
 
         # Execute pool creation with the new implementation
-        result = execute_pool_creation(user_id, token_address, liquidity_data, network)
+        result = execute_pool_creation(user_id, token_address, liquidity_data, network, progress=job.report)
 
         if result['status'] == 'success':
             # Success! Show completion message
@@ -1808,7 +2077,7 @@ def handle_execute_pool_callback(call):
             # Format transaction hash with 0x prefix
             tx_hash_display = f"0x{tx_hash[:8]}...{tx_hash[-8:]}" if not tx_hash.startswith('0x') else f"{tx_hash[:10]}...{tx_hash[-8:]}"
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"🎉 Success! Pool created and liquidity added!\n\n"
                 f"📍 Pool Address:\n`{pool_address}`\n\n"
                 f"🔢 Position ID: {position_id_display}\n\n"
@@ -1829,7 +2098,7 @@ def handle_execute_pool_callback(call):
             btn = types.InlineKeyboardButton('🔄 Back to Main Menu', callback_data='back_to_main')
             markup.add(btn)
             
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ Pool Creation Failed\n\n"
                 f"Error: {error_message}\n\n"
                 f"Please check your wallet balance and try again.",
@@ -1843,19 +2112,19 @@ def handle_execute_pool_callback(call):
         if user_id in user_data:
             del user_data[user_id]
 
-    # Clean up callback data
-    del callback_data_store[callback_id] 
+    # Clean up callback data (it may have expired while the job was queued)
+    callback_data_store.pop(callback_id, None)
 
 
 
-@bot.message_handler(func=lambda message: message.text == '🔒 Manage Liquidity')
+@router.message_text('🔒 Manage Liquidity')
 def manage_liquidity(message):
     user_id = message.from_user.id
 
     # Check if user has wallet
     wallet = get_user_wallet(user_id)
     if not wallet:
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ No wallet found!\n\nPlease setup your wallet first using the '🔐 Setup Wallet' button.",
             parse_mode='Markdown')
@@ -1873,7 +2142,7 @@ def manage_liquidity(message):
                                       callback_data='back_to_main')
     markup.add(btn1, btn2, btn3)
 
-    bot.send_message(
+    outbox.send_message(
         message.chat.id, "🔒 **Liquidity Management**\n\n"
         "Manage your Uniswap V3 liquidity positions and lock them using UNCX Locker.\n\n"
         "What would you like to do?",
@@ -1881,13 +2150,69 @@ def manage_liquidity(message):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'view_positions')
+def back_to_liquidity_markup():
+    markup = types.InlineKeyboardMarkup(row_width=1)
+    markup.add(types.InlineKeyboardButton('🔄 Back', callback_data='manage_liquidity'))
+    return markup
+
+def positions_view(positions):
+    """Message text and buttons listing a wallet's Uniswap V3 positions"""
+    if not positions:
+        return ("❌ No liquidity positions found!\n\n"
+                "You don't have any Uniswap V3 positions in your wallet.",
+                back_to_liquidity_markup())
+
+    # Create position list message
+    position_text = "🔍 **Your Liquidity Positions**\n\n"
+
+    markup = types.InlineKeyboardMarkup(row_width=1)
+
+    for i, position in enumerate(positions):
+        # Add position to message
+        position_text += f"{i+1}. **{position.token0_symbol}/{position.token1_symbol}** (Fee: {position.fee/10000}%)\n"
+        position_text += f"   ID: `{position.token_id}`\n"
+        position_text += f"   Liquidity: {position.liquidity}\n\n"
+
+        # Add button to lock this position
+        lock_btn = types.InlineKeyboardButton(
+            f'🔒 Lock Position #{i+1}', callback_data=f'lock_position_{i}')
+        markup.add(lock_btn)
+
+    # Add back button
+    back_btn = types.InlineKeyboardButton('🔄 Back',
+                                          callback_data='manage_liquidity')
+    markup.add(back_btn)
+    return position_text, markup
+
+def locked_positions_view(locked_positions):
+    """Message text and buttons listing a wallet's locked positions"""
+    if not locked_positions:
+        return ("❌ No locked positions found!\n\n"
+                "You don't have any locked Uniswap V3 positions.",
+                back_to_liquidity_markup())
+
+    # Create position list message
+    position_text = "🔒 **Your Locked Positions**\n\n"
+
+    for i, position in enumerate(locked_positions):
+        status = "🟢 Unlocked" if position.is_expired else "🔒 Locked"
+        position_text += f"{i+1}. **{position.token0_symbol}/{position.token1_symbol}**\n"
+        position_text += f"   Lock ID: `{position.lock_id}`\n"
+        position_text += f"   NFT ID: `{position.nft_id}`\n"
+        position_text += f"   Unlock Date: {position.unlock_date_formatted}\n"
+        position_text += f"   Status: {status}\n\n"
+
+    return position_text, back_to_liquidity_markup()
+
+@router.callback_data('view_positions')
 def view_positions(call):
+    from wallet import get_web3
+    from uncx_locker import LiquidityLocker
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
 
     if not wallet:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ No wallet found!\n\nPlease setup your wallet first.",
             call.message.chat.id,
             call.message.message_id,
@@ -1895,10 +2220,10 @@ def view_positions(call):
         return
 
     # Show loading message
-    bot.edit_message_text("🔍 Fetching your liquidity positions...",
-                          call.message.chat.id,
-                          call.message.message_id,
-                          parse_mode='Markdown')
+    outbox.edit_message_text("🔍 Fetching your liquidity positions...",
+                             call.message.chat.id,
+                             call.message.message_id,
+                             parse_mode='Markdown')
 
     try:
         # Initialize web3 and locker
@@ -1908,75 +2233,38 @@ def view_positions(call):
         # Get positions
         positions = locker.get_positions(wallet['address'])
 
-        if not positions:
-            markup = types.InlineKeyboardMarkup(row_width=1)
-            btn = types.InlineKeyboardButton('🔄 Back',
-                                             callback_data='manage_liquidity')
-            markup.add(btn)
-
-            bot.edit_message_text(
-                "❌ No liquidity positions found!\n\n"
-                "You don't have any Uniswap V3 positions in your wallet.",
-                call.message.chat.id,
-                call.message.message_id,
-                reply_markup=markup,
-                parse_mode='Markdown')
-            return
-
         # Store positions in user data
-        user_data[user_id] = {'positions': positions}
-
-        # Create position list message
-        position_text = "🔍 **Your Liquidity Positions**\n\n"
-
-        markup = types.InlineKeyboardMarkup(row_width=1)
-
-        for i, position in enumerate(positions):
-            # Add position to message
-            position_text += f"{i+1}. **{position.token0_symbol}/{position.token1_symbol}** (Fee: {position.fee/10000}%)\n"
-            position_text += f"   ID: `{position.token_id}`\n"
-            position_text += f"   Liquidity: {position.liquidity}\n\n"
+        if positions:
+            user_data[user_id] = {'positions': positions}
 
-            # Add button to lock this position
-            lock_btn = types.InlineKeyboardButton(
-                f'🔒 Lock Position #{i+1}', callback_data=f'lock_position_{i}')
-            markup.add(lock_btn)
-
-        # Add back button
-        back_btn = types.InlineKeyboardButton('🔄 Back',
-                                              callback_data='manage_liquidity')
-        markup.add(back_btn)
-
-        bot.edit_message_text(position_text,
-                              call.message.chat.id,
-                              call.message.message_id,
-                              reply_markup=markup,
-                              parse_mode='Markdown')
+        position_text, markup = positions_view(positions)
+        outbox.edit_message_text(position_text,
+                                 call.message.chat.id,
+                                 call.message.message_id,
+                                 reply_markup=markup,
+                                 parse_mode='Markdown')
 
     except Exception as e:
         print(f"Error fetching positions: {e}")
 
-        markup = types.InlineKeyboardMarkup(row_width=1)
-        btn = types.InlineKeyboardButton('🔄 Back',
-                                         callback_data='manage_liquidity')
-        markup.add(btn)
-
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ Error fetching positions: {str(e)}\n\n"
             f"Please try again later.",
             call.message.chat.id,
             call.message.message_id,
-            reply_markup=markup,
+            reply_markup=back_to_liquidity_markup(),
             parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'view_locked')
+@router.callback_data('view_locked')
 def view_locked_positions(call):
+    from wallet import get_web3
+    from uncx_locker import LiquidityLocker
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
 
     if not wallet:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ No wallet found!\n\nPlease setup your wallet first.",
             call.message.chat.id,
             call.message.message_id,
@@ -1984,10 +2272,10 @@ def view_locked_positions(call):
         return
 
     # Show loading message
-    bot.edit_message_text("🔍 Fetching your locked positions...",
-                          call.message.chat.id,
-                          call.message.message_id,
-                          parse_mode='Markdown')
+    outbox.edit_message_text("🔍 Fetching your locked positions...",
+                             call.message.chat.id,
+                             call.message.message_id,
+                             parse_mode='Markdown')
 
     try:
         # Initialize web3 and locker
@@ -1997,61 +2285,26 @@ def view_locked_positions(call):
         # Get locked positions
         locked_positions = locker.get_locked_positions(wallet['address'])
 
-        if not locked_positions:
-            markup = types.InlineKeyboardMarkup(row_width=1)
-            btn = types.InlineKeyboardButton('🔄 Back',
-                                             callback_data='manage_liquidity')
-            markup.add(btn)
-
-            bot.edit_message_text(
-                "❌ No locked positions found!\n\n"
-                "You don't have any locked Uniswap V3 positions.",
-                call.message.chat.id,
-                call.message.message_id,
-                reply_markup=markup,
-                parse_mode='Markdown')
-            return
-
-        # Create position list message
-        position_text = "🔒 **Your Locked Positions**\n\n"
-
-        for i, position in enumerate(locked_positions):
-            status = "🟢 Unlocked" if position.is_expired else "🔒 Locked"
-            position_text += f"{i+1}. **{position.token0_symbol}/{position.token1_symbol}**\n"
-            position_text += f"   Lock ID: `{position.lock_id}`\n"
-            position_text += f"   NFT ID: `{position.nft_id}`\n"
-            position_text += f"   Unlock Date: {position.unlock_date_formatted}\n"
-            position_text += f"   Status: {status}\n\n"
-
-        markup = types.InlineKeyboardMarkup(row_width=1)
-        btn = types.InlineKeyboardButton('🔄 Back',
-                                         callback_data='manage_liquidity')
-        markup.add(btn)
-
-        bot.edit_message_text(position_text,
-                              call.message.chat.id,
-                              call.message.message_id,
-                              reply_markup=markup,
-                              parse_mode='Markdown')
+        position_text, markup = locked_positions_view(locked_positions)
+        outbox.edit_message_text(position_text,
+                                 call.message.chat.id,
+                                 call.message.message_id,
+                                 reply_markup=markup,
+                                 parse_mode='Markdown')
 
     except Exception as e:
         print(f"Error fetching locked positions: {e}")
 
-        markup = types.InlineKeyboardMarkup(row_width=1)
-        btn = types.InlineKeyboardButton('🔄 Back',
-                                         callback_data='manage_liquidity')
-        markup.add(btn)
-
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ Error fetching locked positions: {str(e)}\n\n"
             f"Please try again later.",
             call.message.chat.id,
             call.message.message_id,
-            reply_markup=markup,
+            reply_markup=back_to_liquidity_markup(),
             parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'manage_liquidity')
+@router.callback_data('manage_liquidity')
 def manage_liquidity_callback(call):
     # Re-display the liquidity management options
     markup = types.InlineKeyboardMarkup(row_width=1)
@@ -2063,7 +2316,7 @@ def manage_liquidity_callback(call):
                                       callback_data='back_to_main')
     markup.add(btn1, btn2, btn3)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "🔒 **Liquidity Management**\n\n"
         "Manage your Uniswap V3 liquidity positions and lock them using UNCX Locker.\n\n"
         "What would you like to do?",
@@ -2073,8 +2326,7 @@ def manage_liquidity_callback(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(
-    func=lambda call: call.data.startswith('lock_position_'))
+@router.callback_prefix('lock_position_')
 def lock_position_start(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.LOCK_POSITION
@@ -2084,18 +2336,18 @@ def lock_position_start(call):
 
     # Get position from user data
     if user_id not in user_data or 'positions' not in user_data[user_id]:
-        bot.edit_message_text("❌ Session expired. Please try again.",
-                              call.message.chat.id,
-                              call.message.message_id,
-                              parse_mode='Markdown')
+        outbox.edit_message_text("❌ Session expired. Please try again.",
+                                 call.message.chat.id,
+                                 call.message.message_id,
+                                 parse_mode='Markdown')
         return
 
     positions = user_data[user_id]['positions']
     if position_idx >= len(positions):
-        bot.edit_message_text("❌ Invalid position selected. Please try again.",
-                              call.message.chat.id,
-                              call.message.message_id,
-                              parse_mode='Markdown')
+        outbox.edit_message_text("❌ Invalid position selected. Please try again.",
+                                 call.message.chat.id,
+                                 call.message.message_id,
+                                 parse_mode='Markdown')
         return
 
     position = positions[position_idx]
@@ -2117,7 +2369,7 @@ def lock_position_start(call):
     btn6 = types.InlineKeyboardButton('🔄 Back', callback_data='view_positions')
     markup.add(btn1, btn2, btn3, btn4, btn5, btn6)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         f"🔒 **Lock Position**\n\n"
         f"You're about to lock your **{position.token0_symbol}/{position.token1_symbol}** position.\n\n"
         f"Position ID: `{position.token_id}`\n"
@@ -2129,14 +2381,15 @@ def lock_position_start(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(
-    func=lambda call: call.data.startswith('lock_days_'))
+@router.callback_prefix('lock_days_')
 def lock_position_duration(call):
+    from wallet import get_web3
+    from uncx_locker import LiquidityLocker
     user_id = call.from_user.id
 
     if call.data == 'lock_days_custom':
         # Ask user for custom duration
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "🔒 **Lock Position - Custom Duration**\n\n"
             "Please reply with the number of days you want to lock your position (1-3650):",
             call.message.chat.id,
@@ -2171,7 +2424,7 @@ def lock_position_duration(call):
                                               callback_data='cancel_lock')
             markup.add(btn1, btn2)
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 "🔒 **Lock Position - Approval Required**\n\n"
                 "Before locking your position, you need to approve UNCX to access your positions.\n\n"
                 "This is a one-time approval that allows the UNCX contract to transfer your position NFT.",
@@ -2192,7 +2445,7 @@ def lock_position_duration(call):
                                           callback_data='cancel_lock')
         markup.add(btn1, btn2)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "🔒 **Lock Position - Approval Required**\n\n"
             "Before locking your position, you need to approve UNCX to access your positions.\n\n"
             "This is a one-time approval that allows the UNCX contract to transfer your position NFT.",
@@ -2202,15 +2455,16 @@ def lock_position_duration(call):
             parse_mode='Markdown')
 
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id)
-                     == UserState.LOCK_POSITION)
+@router.message_state(UserState.LOCK_POSITION)
 def handle_lock_position_input(message):
+    from wallet import get_web3
+    from uncx_locker import LiquidityLocker
     user_id = message.from_user.id
 
     if user_id not in user_data or 'lock_step' not in user_data[user_id]:
-        bot.send_message(message.chat.id,
-                         "❌ Session expired. Please try again.",
-                         parse_mode='Markdown')
+        outbox.send_message(message.chat.id,
+                            "❌ Session expired. Please try again.",
+                            parse_mode='Markdown')
         return
 
     step = user_data[user_id]['lock_step']
@@ -2219,7 +2473,7 @@ def handle_lock_position_input(message):
         try:
             days = int(message.text)
             if days < 1 or days > 3650:
-                bot.send_message(
+                outbox.send_message(
                     message.chat.id,
                     "❌ Invalid duration. Please enter a number between 1 and 3650 days.",
                     parse_mode='Markdown')
@@ -2245,7 +2499,7 @@ def handle_lock_position_input(message):
                         '❌ Cancel', callback_data='cancel_lock')
                     markup.add(btn1, btn2)
 
-                    bot.send_message(
+                    outbox.send_message(
                         message.chat.id,
                         "🔒 **Lock Position - Approval Required**\n\n"
                         "Before locking your position, you need to approve UNCX to access your positions.\n\n"
@@ -2265,7 +2519,7 @@ def handle_lock_position_input(message):
                                                   callback_data='cancel_lock')
                 markup.add(btn1, btn2)
 
-                bot.send_message(
+                outbox.send_message(
                     message.chat.id,
                     "🔒 **Lock Position - Approval Required**\n\n"
                     "Before locking your position, you need to approve UNCX to access your positions.\n\n"
@@ -2274,7 +2528,7 @@ def handle_lock_position_input(message):
                     parse_mode='Markdown')
 
         except ValueError:
-            bot.send_message(
+            outbox.send_message(
                 message.chat.id,
                 "❌ Invalid input. Please enter a number for the lock duration in days.",
                 parse_mode='Markdown')
@@ -2282,6 +2536,8 @@ def handle_lock_position_input(message):
 
 def show_lock_confirmation(message, user_id):
     # Get position and duration from user data
+    from wallet import get_web3
+    from uncx_locker import LiquidityLocker
     position = user_data[user_id]['lock_position']
     days = user_data[user_id]['lock_duration']
 
@@ -2305,7 +2561,7 @@ def show_lock_confirmation(message, user_id):
     # Send confirmation message
     if isinstance(message, types.Message):
         # If called from a message handler
-        bot.send_message(
+        outbox.send_message(
             message.chat.id, f"🔒 **Lock Position - Confirmation**\n\n"
             f"You're about to lock your **{position.token0_symbol}/{position.token1_symbol}** position.\n\n"
             f"Position ID: `{position.token_id}`\n"
@@ -2317,7 +2573,7 @@ def show_lock_confirmation(message, user_id):
             parse_mode='Markdown')
     else:
         # If called from a callback handler
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"🔒 **Lock Position - Confirmation**\n\n"
             f"You're about to lock your **{position.token0_symbol}/{position.token1_symbol}** position.\n\n"
             f"Position ID: `{position.token_id}`\n"
@@ -2331,13 +2587,18 @@ def show_lock_confirmation(message, user_id):
             parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'approve_uncx')
+@router.callback_data('approve_uncx')
 def approve_uncx(call):
+    submit_chain_job(call, 'approve_uncx', run_approve_uncx_job)
+
+def run_approve_uncx_job(call, job):
+    from wallet import get_web3, sign_and_send_transaction, wait_for_transaction_receipt
+    from uncx_locker import LiquidityLocker
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
 
     if not wallet:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ No wallet found!\n\nPlease setup your wallet first.",
             call.message.chat.id,
             call.message.message_id,
@@ -2351,7 +2612,7 @@ def approve_uncx(call):
                                          callback_data='processing')
         markup.add(btn)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "⏳ **Preparing Approval Transaction**\n\n"
             "Please wait while we prepare your approval transaction...",
             call.message.chat.id,
@@ -2367,7 +2628,7 @@ def approve_uncx(call):
         is_approved = locker.is_approved(wallet['address'])
         if is_approved:
             # If already approved, skip to lock confirmation
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 "✅ **Already Approved**\n\n"
                 "UNCX is already approved to access your positions.\n\n"
                 "Proceeding to lock confirmation...",
@@ -2383,17 +2644,18 @@ def approve_uncx(call):
             return
 
         # Get approval transaction
-        tx = locker.approve_uncx(wallet['address'])
+        approval = locker.approve_uncx(wallet['address'])
 
-        if tx == "Already approved":
+        if approval.get('already_approved'):
             # If already approved, show lock confirmation
             show_lock_confirmation(call.message, user_id)
             return
 
+        if not approval['success']:
+            raise Exception(approval['error'])
+
         # Sign and send the transaction
-        signed_tx = web3.eth.account.sign_transaction(tx,
-                                                      wallet['private_key'])
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = sign_and_send_transaction(web3, approval['transaction'], wallet['private_key'])
 
         # Update message with transaction hash
         markup = types.InlineKeyboardMarkup(row_width=1)
@@ -2402,7 +2664,7 @@ def approve_uncx(call):
         markup.add(btn)
 
         # Show transaction sent message
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"✅ **Approval Transaction Sent**\n\n"
             f"Transaction Hash: `{tx_hash.hex()}`\n\n"
             f"⏳ Waiting for confirmation...",
@@ -2413,12 +2675,11 @@ def approve_uncx(call):
 
         try:
             # Wait for transaction receipt with a timeout
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash,
-                                                            timeout=60)
+            receipt = wait_for_transaction_receipt(web3, tx_hash, timeout=60)
 
             if receipt.status == 1:
                 # Transaction successful, show lock confirmation
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     "✅ **Approval Successful**\n\n"
                     "UNCX has been approved to access your positions.\n\n"
                     "Proceeding to lock confirmation...",
@@ -2438,7 +2699,7 @@ def approve_uncx(call):
                                                  callback_data='approve_uncx')
                 markup.add(btn)
 
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     "❌ **Approval Failed**\n\n"
                     "The approval transaction failed. Please try again.",
                     call.message.chat.id,
@@ -2462,7 +2723,7 @@ def approve_uncx(call):
             # Store transaction hash for later checking
             user_data[user_id]['pending_tx_hash'] = tx_hash.hex()
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"⚠️ **Transaction Taking Longer Than Expected**\n\n"
                 f"Your approval transaction has been submitted but is taking longer than expected to confirm.\n\n"
                 f"Transaction Hash: `{tx_hash.hex()}`\n\n"
@@ -2480,7 +2741,7 @@ def approve_uncx(call):
                                          callback_data='approve_uncx')
         markup.add(btn)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ **Error Approving UNCX**\n\n"
             f"Error: {str(e)}\n\n"
             f"Please try again.",
@@ -2491,12 +2752,13 @@ def approve_uncx(call):
 
 
 # Add a handler for the check_approval callback
-@bot.callback_query_handler(func=lambda call: call.data == 'check_approval')
+@router.callback_data('check_approval')
 def check_approval_status(call):
+    from wallet import get_web3
     user_id = call.from_user.id
 
     if user_id not in user_data or 'pending_tx_hash' not in user_data[user_id]:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ Transaction information not found. Please try approving again.",
             call.message.chat.id,
             call.message.message_id,
@@ -2510,7 +2772,7 @@ def check_approval_status(call):
         web3 = get_web3('polygon')  # Default to polygon
 
         # Show checking message
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"🔍 **Checking Transaction Status**\n\n"
             f"Transaction Hash: `{tx_hash}`\n\n"
             f"Please wait...",
@@ -2524,7 +2786,7 @@ def check_approval_status(call):
         if receipt:
             if receipt.status == 1:
                 # Transaction successful
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     "✅ **Approval Successful**\n\n"
                     "UNCX has been approved to access your positions.\n\n"
                     "Proceeding to lock confirmation...",
@@ -2544,7 +2806,7 @@ def check_approval_status(call):
                                                  callback_data='approve_uncx')
                 markup.add(btn)
 
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     "❌ **Approval Failed**\n\n"
                     "The approval transaction failed. Please try again.",
                     call.message.chat.id,
@@ -2562,7 +2824,7 @@ def check_approval_status(call):
                                               callback_data='force_continue')
             markup.add(btn1, btn2, btn3)
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"⏳ **Transaction Still Pending**\n\n"
                 f"Your approval transaction is still being processed by the network.\n\n"
                 f"Transaction Hash: `{tx_hash}`\n\n"
@@ -2582,7 +2844,7 @@ def check_approval_status(call):
                                           callback_data='approve_uncx')
         markup.add(btn1, btn2)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ **Error Checking Status**\n\n"
             f"Error: {str(e)}\n\n"
             f"You can try checking again or start a new approval transaction.",
@@ -2593,12 +2855,12 @@ def check_approval_status(call):
 
 
 # Add a handler for the force_continue callback
-@bot.callback_query_handler(func=lambda call: call.data == 'force_continue')
+@router.callback_data('force_continue')
 def force_continue_to_lock(call):
     user_id = call.from_user.id
 
     # Show warning and proceed to lock confirmation
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "⚠️ **Proceeding Without Confirmation**\n\n"
         "You're proceeding without confirmation of the approval transaction.\n"
         "If the approval wasn't successful, the lock transaction will fail.\n\n"
@@ -2614,13 +2876,18 @@ def force_continue_to_lock(call):
     show_lock_confirmation(call.message, user_id)
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'confirm_lock')
+@router.callback_data('confirm_lock')
 def confirm_lock(call):
+    submit_chain_job(call, 'lock_position', run_lock_position_job)
+
+def run_lock_position_job(call, job):
+    from wallet import get_web3, sign_and_send_transaction, wait_for_transaction_receipt
+    from uncx_locker import LiquidityLocker
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
 
     if not wallet:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ No wallet found!\n\nPlease setup your wallet first.",
             call.message.chat.id,
             call.message.message_id,
@@ -2629,10 +2896,10 @@ def confirm_lock(call):
 
     if user_id not in user_data or 'lock_position' not in user_data[
             user_id] or 'lock_duration' not in user_data[user_id]:
-        bot.edit_message_text("❌ Session expired. Please try again.",
-                              call.message.chat.id,
-                              call.message.message_id,
-                              parse_mode='Markdown')
+        outbox.edit_message_text("❌ Session expired. Please try again.",
+                                 call.message.chat.id,
+                                 call.message.message_id,
+                                 parse_mode='Markdown')
         return
 
     position = user_data[user_id]['lock_position']
@@ -2645,7 +2912,7 @@ def confirm_lock(call):
                                          callback_data='processing')
         markup.add(btn)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"🔒 **Locking Position**\n\n"
             f"Preparing to lock your **{position.token0_symbol}/{position.token1_symbol}** position for {days} days.\n\n"
             f"Position ID: `{position.token_id}`\n\n"
@@ -2669,7 +2936,7 @@ def confirm_lock(call):
                                              callback_data='confirm_lock')
             markup.add(btn)
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ **Lock Failed**\n\n"
                 f"Error: {lock_result['error']}\n\n"
                 f"Please try again.",
@@ -2682,9 +2949,7 @@ def confirm_lock(call):
         tx = lock_result['transaction']
 
         # Sign and send the transaction
-        signed_tx = web3.eth.account.sign_transaction(tx,
-                                                      wallet['private_key'])
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = sign_and_send_transaction(web3, tx, wallet['private_key'])
 
         # Update message with transaction hash
         markup = types.InlineKeyboardMarkup(row_width=1)
@@ -2693,7 +2958,7 @@ def confirm_lock(call):
         markup.add(btn)
 
         # Show transaction sent message
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"✅ **Lock Transaction Sent**\n\n"
             f"Transaction Hash: `{tx_hash.hex()}`\n\n"
             f"⏳ Waiting for confirmation...",
@@ -2703,7 +2968,7 @@ def confirm_lock(call):
             parse_mode='Markdown')
 
         # Wait for transaction receipt
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        receipt = wait_for_transaction_receipt(web3, tx_hash)
 
         if receipt.status == 1:
             # Transaction successful
@@ -2718,7 +2983,7 @@ def confirm_lock(call):
             unlock_date = datetime.fromtimestamp(lock_result['unlock_date'])
             unlock_date_str = unlock_date.strftime("%Y-%m-%d %H:%M:%S")
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"🎉 **Position Locked Successfully!**\n\n"
                 f"Your **{position.token0_symbol}/{position.token1_symbol}** position has been locked.\n\n"
                 f"Position ID: `{position.token_id}`\n"
@@ -2736,7 +3001,7 @@ def confirm_lock(call):
                                              callback_data='confirm_lock')
             markup.add(btn)
 
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 "❌ **Lock Failed**\n\n"
                 "The lock transaction failed. Please try again.",
                 call.message.chat.id,
@@ -2760,7 +3025,7 @@ def confirm_lock(call):
                                          callback_data='confirm_lock')
         markup.add(btn)
 
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ **Error Locking Position**\n\n"
             f"Error: {error_message}\n\n"
             f"Please try again.",
@@ -2770,7 +3035,7 @@ def confirm_lock(call):
             parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'cancel_lock')
+@router.callback_data('cancel_lock')
 def cancel_lock(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.LIQUIDITY_MANAGEMENT
@@ -2788,7 +3053,7 @@ def cancel_lock(call):
     manage_liquidity_callback(call)
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'change_wallet')
+@router.callback_data('change_wallet')
 def change_wallet_callback(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.WALLET_SETUP
@@ -2800,7 +3065,7 @@ def change_wallet_callback(call):
                                       callback_data='import_wallet')
     markup.add(btn1, btn2)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "🔐 **Change Wallet**\n\n"
         "Choose an option to change your wallet:",
         call.message.chat.id,
@@ -2809,13 +3074,13 @@ def change_wallet_callback(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'export_wallet')
+@router.callback_data('export_wallet')
 def export_wallet_callback(call):
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
 
     if not wallet:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ **No wallet found!**\n\n"
             "You don't have a wallet configured yet.",
             call.message.chat.id,
@@ -2824,7 +3089,7 @@ def export_wallet_callback(call):
         return
 
     # Create a temporary message with the private key
-    private_key_message = bot.send_message(
+    private_key_message = outbox.send_message(
         call.message.chat.id,
         f"🔑 **Your Private Key:**\n\n"
         f"`{wallet['private_key']}`\n\n"
@@ -2837,7 +3102,7 @@ def export_wallet_callback(call):
     btn = types.InlineKeyboardButton('⬅️ Back to Settings', callback_data='back_to_settings')
     markup.add(btn)
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "📋 **Wallet Exported**\n\n"
         "Your private key has been sent in a separate message.\n"
         "⚠️ Please save it securely and delete the message afterward.",
@@ -2847,7 +3112,7 @@ def export_wallet_callback(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'back_to_settings')
+@router.callback_data('back_to_settings')
 def back_to_settings_callback(call):
     user_id = call.from_user.id
     wallet = get_user_wallet(user_id)
@@ -2877,7 +3142,7 @@ def back_to_settings_callback(call):
 **Options:**
     """
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         settings_text,
         call.message.chat.id,
         call.message.message_id,
@@ -2885,7 +3150,7 @@ def back_to_settings_callback(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'delete_data')
+@router.callback_data('delete_data')
 def delete_data_callback(call):
     user_id = call.from_user.id
     
@@ -2895,7 +3160,7 @@ def delete_data_callback(call):
     btn2 = types.InlineKeyboardButton('❌ No, Cancel', callback_data='back_to_settings')
     markup.add(btn1, btn2)
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "🗑️ **Delete Data**\n\n"
         "⚠️ **Warning:** This will delete your wallet configuration and all associated data.\n\n"
         "Are you sure you want to proceed?",
@@ -2905,31 +3170,13 @@ def delete_data_callback(call):
         parse_mode='Markdown')
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'confirm_delete_data')
+@router.callback_data('confirm_delete_data')
 def confirm_delete_data_callback(call):
     user_id = call.from_user.id
-    user_id_str = str(user_id)
     
     try:
-        # Delete wallet data
-        with open(USERS_FILE, 'r') as f:
-            users = json.load(f)
-        
-        if user_id_str in users:
-            del users[user_id_str]
-            
-            with open(USERS_FILE, 'w') as f:
-                json.dump(users, f, indent=4)
-        
-        # Delete token data
-        with open(TOKENS_FILE, 'r') as f:
-            tokens = json.load(f)
-        
-        if user_id_str in tokens:
-            del tokens[user_id_str]
-            
-            with open(TOKENS_FILE, 'w') as f:
-                json.dump(tokens, f, indent=4)
+        # Delete wallet and token data
+        delete_user_data(user_id)
         
         # Clear user state
         if user_id in user_states:
@@ -2939,7 +3186,7 @@ def confirm_delete_data_callback(call):
         if user_id in user_data:
             del user_data[user_id]
         
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "✅ **Data Deleted**\n\n"
             "Your wallet configuration and associated data have been deleted.\n\n"
             "Use /start to set up a new wallet.",
@@ -2954,7 +3201,7 @@ def confirm_delete_data_callback(call):
         btn = types.InlineKeyboardButton('⬅️ Back to Settings', callback_data='back_to_settings')
         markup.add(btn)
         
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ **Error Deleting Data**\n\n"
             f"Error: {str(e)}\n\n"
             f"Please try again later.",
@@ -2963,14 +3210,14 @@ def confirm_delete_data_callback(call):
             reply_markup=markup,
             parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: message.text == '⚓ Renounce Contract')
+@router.message_text('⚓ Renounce Contract')
 def renounce_contract_start(message):
     user_id = message.from_user.id
 
     # Check if user has wallet
     wallet = get_user_wallet(user_id)
     if not wallet:
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ **No wallet found!**\n\nPlease setup your wallet first using the '🔐 Setup Wallet' button.",
             parse_mode='Markdown')
@@ -2981,7 +3228,7 @@ def renounce_contract_start(message):
     btn2 = types.InlineKeyboardButton('📝 Custom Address', callback_data='renounce_custom_address')
     markup.add(btn1, btn2)
 
-    bot.send_message(
+    outbox.send_message(
         message.chat.id,
         "⚓ **Contract Renouncement**\n\n"
         "This will permanently renounce your ownership of the contract. "
@@ -2990,24 +3237,19 @@ def renounce_contract_start(message):
         reply_markup=markup,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'renounce_my_tokens')
+@router.callback_data('renounce_my_tokens')
 def select_token_for_renouncement(call):
     user_id = call.from_user.id
-    user_id_str = str(user_id)
     
     # Load user's tokens
     user_tokens = []
     try:
-        if os.path.exists(TOKENS_FILE):
-            with open(TOKENS_FILE, 'r') as f:
-                tokens_data = json.load(f)
-                if user_id_str in tokens_data:
-                    user_tokens = tokens_data[user_id_str]
+        user_tokens = get_user_tokens(user_id)
     except Exception as e:
         print(f"Error loading tokens: {e}")
         
     if not user_tokens:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ You don't have any deployed tokens.",
             call.message.chat.id,
             call.message.message_id,
@@ -3031,32 +3273,33 @@ def select_token_for_renouncement(call):
         user_data[user_id] = {}
     user_data[user_id]['tokens_for_renounce'] = user_tokens
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "Select a token to renounce ownership:",
         call.message.chat.id,
         call.message.message_id,
         reply_markup=markup)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'renounce_custom_address')
+@router.callback_data('renounce_custom_address')
 def enter_custom_address(call):
     user_id = call.from_user.id
     user_states[user_id] = UserState.ENTERING_CONTRACT_ADDRESS
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "📝 **Enter Contract Address**\n\n"
         "Please enter the contract address you want to renounce ownership of:",
         call.message.chat.id,
         call.message.message_id,
         parse_mode='Markdown')
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.ENTERING_CONTRACT_ADDRESS)
+@router.message_state(UserState.ENTERING_CONTRACT_ADDRESS)
 def handle_contract_address(message):
+    from web3 import Web3
     user_id = message.from_user.id
     address = message.text.strip()
     
     # Basic address validation
     if not Web3.is_address(address):
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ Invalid address format. Please enter a valid Ethereum/Polygon contract address.",
             parse_mode='Markdown')
@@ -3073,13 +3316,13 @@ def handle_contract_address(message):
     btn2 = types.InlineKeyboardButton('Ethereum (ETH)', callback_data='renounce_net_ethereum')
     markup.add(btn1, btn2)
     
-    bot.send_message(
+    outbox.send_message(
         message.chat.id,
         "Select the network for this contract:",
         reply_markup=markup)
 
 # Add new handler for token index selection
-@bot.callback_query_handler(func=lambda call: call.data.startswith('renounce_idx_'))
+@router.callback_prefix('renounce_idx_')
 def token_index_selected_for_renounce(call):
     user_id = call.from_user.id
     
@@ -3088,7 +3331,7 @@ def token_index_selected_for_renounce(call):
     
     # Get token from user data
     if user_id not in user_data or 'tokens_for_renounce' not in user_data[user_id]:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ Session expired. Please try again.",
             call.message.chat.id,
             call.message.message_id)
@@ -3096,7 +3339,7 @@ def token_index_selected_for_renounce(call):
     
     tokens = user_data[user_id]['tokens_for_renounce']
     if token_idx >= len(tokens):
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ Invalid token selection. Please try again.",
             call.message.chat.id,
             call.message.message_id)
@@ -3114,7 +3357,7 @@ def token_index_selected_for_renounce(call):
     confirm_renouncement_with_data(call, user_id, contract_address, network)
 
 # Add new handler for network selection
-@bot.callback_query_handler(func=lambda call: call.data.startswith('renounce_net_'))
+@router.callback_prefix('renounce_net_')
 def network_selected_for_renounce(call):
     user_id = call.from_user.id
     
@@ -3123,7 +3366,7 @@ def network_selected_for_renounce(call):
     
     # Get address from user data
     if user_id not in user_data or 'custom_contract_address' not in user_data[user_id]:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ Session expired. Please try again.",
             call.message.chat.id,
             call.message.message_id)
@@ -3140,10 +3383,13 @@ def network_selected_for_renounce(call):
 
 # Extract the common confirmation logic to a separate function
 def confirm_renouncement_with_data(call, user_id, contract_address, network):
+    from wallet import get_web3
+    from contract_renouncement import OWNERSHIP_ABI
+    from contract_registry import get_contract
     wallet = get_user_wallet(user_id)
     
     if not wallet:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ **No wallet found!**\n\nPlease setup your wallet first.",
             call.message.chat.id,
             call.message.message_id,
@@ -3156,24 +3402,20 @@ def confirm_renouncement_with_data(call, user_id, contract_address, network):
     # Display confirmation with token info
     try:
         # Basic contract validation by checking for token info
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "🔍 Fetching contract details...",
             call.message.chat.id,
             call.message.message_id)
         
         # Create a simple contract instance to check if we can interact with it
-        contract = web3.eth.contract(address=contract_address, abi=[
-            {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "owner", "outputs": [{"name": "", "type": "address"}], "type": "function"}
-        ])
+        contract = get_contract(web3, contract_address, OWNERSHIP_ABI)
         
         # Try to get token name and symbol
         try:
             token_name = contract.functions.name().call()
             token_symbol = contract.functions.symbol().call()
         except Exception as e:
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ Error: Could not read token information from contract. This may not be a valid token contract.\n\nError: {str(e)}",
                 call.message.chat.id,
                 call.message.message_id,
@@ -3185,7 +3427,7 @@ def confirm_renouncement_with_data(call, user_id, contract_address, network):
             owner = contract.functions.owner().call()
             is_owner = owner.lower() == wallet['address'].lower()
         except Exception as e:
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ Error: Could not read ownership information from contract. This contract may not have an owner function.\n\nError: {str(e)}",
                 call.message.chat.id,
                 call.message.message_id,
@@ -3193,7 +3435,7 @@ def confirm_renouncement_with_data(call, user_id, contract_address, network):
             return
             
         if not is_owner:
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ You are not the owner of this contract.\n\n"
                 f"Contract Owner: `{owner}`\n"
                 f"Your address: `{wallet['address']}`",
@@ -3208,7 +3450,7 @@ def confirm_renouncement_with_data(call, user_id, contract_address, network):
         btn_cancel = types.InlineKeyboardButton('❌ No, Cancel', callback_data='cancel_renounce')
         markup.add(btn_confirm, btn_cancel)
         
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"⚠️ **FINAL WARNING** ⚠️\n\n"
             f"You are about to renounce ownership of:\n"
             f"**Token:** {token_name} ({token_symbol})\n"
@@ -3226,20 +3468,20 @@ def confirm_renouncement_with_data(call, user_id, contract_address, network):
             reply_markup=markup,
             parse_mode='Markdown')
     except Exception as e:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             f"❌ Error checking contract: {str(e)}",
             call.message.chat.id,
             call.message.message_id,
             parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'back_to_renounce_options')
+@router.callback_data('back_to_renounce_options')
 def back_to_renounce_options(call):
     markup = types.InlineKeyboardMarkup(row_width=2)
     btn1 = types.InlineKeyboardButton('🪙 My Tokens', callback_data='renounce_my_tokens')
     btn2 = types.InlineKeyboardButton('📝 Custom Address', callback_data='renounce_custom_address')
     markup.add(btn1, btn2)
 
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "⚓ **Contract Renouncement**\n\n"
         "This will permanently renounce your ownership of the contract. "
         "This action CANNOT be undone!\n\n"
@@ -3249,12 +3491,13 @@ def back_to_renounce_options(call):
         reply_markup=markup,
         parse_mode='Markdown')
 
-@bot.callback_query_handler(func=lambda call: call.data == 'confirm_renounce')
+@router.callback_data('confirm_renounce')
 def execute_renouncement(call):
+    from contract_renouncement import renounce_contract_ownership
     user_id = call.from_user.id
     
     if user_id not in user_data or 'renounce_contract' not in user_data[user_id]:
-        bot.edit_message_text(
+        outbox.edit_message_text(
             "❌ Error: Contract information not found. Please start over.",
             call.message.chat.id,
             call.message.message_id)
@@ -3264,13 +3507,13 @@ def execute_renouncement(call):
     network = user_data[user_id]['renounce_network']
     
     # Show processing message
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "⏳ Processing renouncement transaction...",
         call.message.chat.id,
         call.message.message_id)
     
-    # Call the renouncement function in a separate thread
-    def execute_renouncement_thread():
+    # Send and confirm the transaction on the job executor
+    def execute_renouncement_job(call, job):
         try:
             success, result = renounce_contract_ownership(user_id, contract_address, network)
             
@@ -3279,7 +3522,7 @@ def execute_renouncement(call):
                 explorer_url = result['explorer_url']
                 tx_hash = result['tx_hash']
                 
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     f"✅ **Ownership Renounced Successfully!**\n\n"
                     f"Contract: `{contract_address}`\n"
                     f"Transaction Hash: `{tx_hash}`\n\n"
@@ -3290,26 +3533,23 @@ def execute_renouncement(call):
                     disable_web_page_preview=True)
             else:
                 # Error occurred
-                bot.edit_message_text(
+                outbox.edit_message_text(
                     f"❌ **Renouncement Failed**\n\n"
                     f"Error: {result}",
                     call.message.chat.id,
                     call.message.message_id,
                     parse_mode='Markdown')
         except Exception as e:
-            bot.edit_message_text(
+            outbox.edit_message_text(
                 f"❌ **Renouncement Failed**\n\n"
                 f"Error: {str(e)}",
                 call.message.chat.id,
                 call.message.message_id,
                 parse_mode='Markdown')
     
-    # Execute in a separate thread
-    import threading
-    thread = threading.Thread(target=execute_renouncement_thread)
-    thread.start()
+    submit_chain_job(call, 'renounce_ownership', execute_renouncement_job)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'cancel_renounce')
+@router.callback_data('cancel_renounce')
 def cancel_renouncement(call):
     user_id = call.from_user.id
     
@@ -3321,17 +3561,17 @@ def cancel_renouncement(call):
             del user_data[user_id]['renounce_network']
     
     # Return to main menu
-    bot.edit_message_text(
+    outbox.edit_message_text(
         "✅ Contract renouncement cancelled.",
         call.message.chat.id,
         call.message.message_id)
 
-@bot.message_handler(commands=['renounce'])
+@router.message_command('renounce')
 def renounce_command(message):
     # Simply call the existing renounce_contract_start function
     renounce_contract_start(message)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'tax_wallet_default')
+@router.callback_data('tax_wallet_default')
 def handle_default_tax_wallet(call):
     user_id = call.from_user.id
     
@@ -3378,7 +3618,7 @@ def handle_default_tax_wallet(call):
 **Select deployment network:**
     """
     
-    bot.edit_message_text(
+    outbox.edit_message_text(
         summary,
         call.message.chat.id,
         call.message.message_id,
@@ -3386,14 +3626,14 @@ def handle_default_tax_wallet(call):
         parse_mode='Markdown'
     )
 
-@bot.message_handler(func=lambda message: user_states.get(message.from_user.id) == UserState.ENTERING_TAX_WALLET)
+@router.message_state(UserState.ENTERING_TAX_WALLET)
 def handle_tax_wallet_input(message):
     user_id = message.from_user.id
     
     # Check if the input is a valid Ethereum address
     address = message.text.strip()
     if not address.startswith('0x') or len(address) != 42:
-        bot.send_message(
+        outbox.send_message(
             message.chat.id,
             "❌ Invalid Ethereum address. Please enter a valid address or click 'Use my wallet address'.",
             parse_mode='Markdown')
@@ -3435,10 +3675,12 @@ def handle_tax_wallet_input(message):
 **Select deployment network:**
     """
     
-    bot.send_message(
+    outbox.send_message(
         message.chat.id,
         summary,
         reply_markup=markup,
         parse_mode='Markdown'
     )
 
+
+router.register(bot)
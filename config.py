@@ -7,6 +7,106 @@ DATA_DIR = "data"
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
 TOKENS_FILE = os.path.join(DATA_DIR, "tokens.json")
 POOLS_FILE = os.path.join(DATA_DIR, "pools.json")
+DATABASE_FILE = os.getenv("DATABASE_FILE", os.path.join(DATA_DIR, "bot.db"))
+
+# Shared Node.js toolchain (ethers, solc, OpenZeppelin) used by all deployments
+TOOLCHAIN_DIR = os.getenv("TOOLCHAIN_DIR", os.path.join(DATA_DIR, "toolchain"))
+
+# Long-lived Node.js worker processes that compile and deploy contracts
+NODE_WORKER_POOL_SIZE = int(os.getenv("NODE_WORKER_POOL_SIZE", "2"))
+NODE_WORKER_REQUEST_TIMEOUT = int(os.getenv("NODE_WORKER_REQUEST_TIMEOUT", "300"))  # seconds
+NODE_WORKER_HEALTH_INTERVAL = int(os.getenv("NODE_WORKER_HEALTH_INTERVAL", "30"))  # seconds
+
+# Compiled contract artifacts (ABI + bytecode), shared by all deployments
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", os.path.join(DATA_DIR, "artifacts"))
+PREWARM_ARTIFACT_CACHE = os.getenv("PREWARM_ARTIFACT_CACHE", "true").lower() == "true"
+
+# Deploy engine per network: "node" (worker pool) or "native" (py-solc-x + web3 in-process)
+DEPLOY_ENGINES = {
+    'polygon': os.getenv("POLYGON_DEPLOY_ENGINE", "node"),
+    'ethereum': os.getenv("ETHEREUM_DEPLOY_ENGINE", "node"),
+}
+SOLC_VERSION = os.getenv("SOLC_VERSION", "0.8.20")  # solc binary used by the native engine
+
+def _env_list(name):
+    return [value.strip() for value in os.getenv(name, "").split(",") if value.strip()]
+
+# Extra RPC endpoints per network, tried after POLYGON_RPC / ETHEREUM_RPC (comma separated)
+POLYGON_RPC_FALLBACKS = _env_list("POLYGON_RPC_FALLBACKS")
+ETHEREUM_RPC_FALLBACKS = _env_list("ETHEREUM_RPC_FALLBACKS")
+# Endpoint transactions are sent to first (defaults to the primary RPC)
+POLYGON_WRITE_RPC = os.getenv("POLYGON_WRITE_RPC")
+ETHEREUM_WRITE_RPC = os.getenv("ETHEREUM_WRITE_RPC")
+# Circuit breaker: disable an endpoint after this many consecutive failures, retry it after the cooldown
+RPC_CIRCUIT_FAILURES = int(os.getenv("RPC_CIRCUIT_FAILURES", "3"))
+RPC_CIRCUIT_COOLDOWN = int(os.getenv("RPC_CIRCUIT_COOLDOWN", "30"))  # seconds
+RPC_HEALTH_INTERVAL = int(os.getenv("RPC_HEALTH_INTERVAL", "60"))  # seconds between latency probes
+
+# RPC connection pooling (one keep-alive session shared by all networks)
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "20"))  # connections kept per endpoint
+RPC_TIMEOUT = int(os.getenv("RPC_TIMEOUT", "30"))  # seconds
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "2"))  # seconds between new-block checks
+NONCE_RESYNC_INTERVAL = int(os.getenv("NONCE_RESYNC_INTERVAL", "60"))  # idle seconds before nonces are re-read from the chain
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "10"))  # blocks of eth_feeHistory used for priority fees
+FEE_REWARD_PERCENTILE = int(os.getenv("FEE_REWARD_PERCENTILE", "50"))  # priority fee percentile paid in those blocks
+FEE_BASE_MULTIPLIER = int(os.getenv("FEE_BASE_MULTIPLIER", "2"))  # maxFeePerGas headroom over the next base fee
+GAS_ESTIMATE_MARGIN = float(os.getenv("GAS_ESTIMATE_MARGIN", "0.2"))  # safety margin added to eth_estimateGas
+GAS_ESTIMATE_TTL = int(os.getenv("GAS_ESTIMATE_TTL", "3600"))  # seconds a per-shape gas estimate is reused for previews
+CONTRACT_CACHE_SIZE = int(os.getenv("CONTRACT_CACHE_SIZE", "1024"))  # contract objects kept per network
+
+# Multicall3 batches contract reads into one eth_call (same address on all major chains)
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+MULTICALL_BATCH_SIZE = int(os.getenv("MULTICALL_BATCH_SIZE", "100"))  # calls per eth_call
+
+# /balance portfolio: networks queried in parallel, results reused until the next block
+PORTFOLIO_NETWORKS = _env_list("PORTFOLIO_NETWORKS") or ['polygon', 'ethereum']
+PORTFOLIO_WORKERS = int(os.getenv("PORTFOLIO_WORKERS", "8"))  # threads shared by all balance lookups
+
+# Launcher contracts for one-transaction launches (token + pool + liquidity); deploy one per network
+# with `python token_launcher.py <network>`, leave unset to only offer the step-by-step flow
+LAUNCHER_ADDRESSES = {
+    'polygon': os.getenv("POLYGON_LAUNCHER_ADDRESS"),
+    'ethereum': os.getenv("ETHEREUM_LAUNCHER_ADDRESS"),
+}
+
+# Token metadata cache: symbol/name/decimals never change, fields the token reverted on are retried
+# after TOKEN_METADATA_NEGATIVE_TTL (RPC errors aren't cached), and contract owners are re-read after
+# TOKEN_OWNER_TTL
+TOKEN_METADATA_NEGATIVE_TTL = int(os.getenv("TOKEN_METADATA_NEGATIVE_TTL", "900"))  # seconds
+TOKEN_OWNER_TTL = int(os.getenv("TOKEN_OWNER_TTL", "300"))  # seconds
+
+# Background jobs for deploys, pool creation, locks and renouncements
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # operations running at once
+JOB_PER_USER_LIMIT = int(os.getenv("JOB_PER_USER_LIMIT", "1"))  # queued or running operations per user
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))  # operations waiting for a worker
+
+# Bot runtime: "threaded" (TeleBot polling) or "async" (AsyncTeleBot, also selected with --async)
+BOT_RUNTIME = os.getenv("BOT_RUNTIME", "threaded")
+ASYNC_HANDLER_THREADS = int(os.getenv("ASYNC_HANDLER_THREADS", "32"))  # threads for synchronous handlers
+BOT_HANDLER_THREADS = int(os.getenv("BOT_HANDLER_THREADS", "8"))  # TeleBot handler threads (threaded runtime)
+FAST_START = os.getenv("FAST_START", "false").lower() == "true"  # serve first, check the toolchain in the background (also --fast-start)
+
+# Conversation state (user states, wizard data, confirmation buttons): "memory" keeps it in this
+# process, "sqlite" shares it between processes through DATABASE_FILE and keeps it across restarts
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))  # seconds before an untouched conversation is dropped
+CALLBACK_DATA_TTL = int(os.getenv("CALLBACK_DATA_TTL", "3600"))  # seconds a confirmation button stays valid
+SESSION_MAX_SIZE = int(os.getenv("SESSION_MAX_SIZE", "10000"))  # keys kept per kind of state
+
+# Outbound Telegram requests are queued and sent within Telegram's rate limits
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))  # requests per second across all chats
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))  # requests per second per chat
+TELEGRAM_CHAT_BURST = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))  # requests a chat may send at once
+TELEGRAM_SENDER_THREADS = int(os.getenv("TELEGRAM_SENDER_THREADS", "4"))
+
+# How the threaded runtime receives updates: "polling" or "webhook"
+BOT_UPDATE_MODE = os.getenv("BOT_UPDATE_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # public URL registered with Telegram; unset to leave the webhook as is
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # checked against X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
 
 # User state enum
 class UserState:
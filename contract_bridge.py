@@ -1,52 +1,32 @@
-import subprocess
+import atexit
 import json
 import os
+import shutil
 import tempfile
-from pathlib import Path
+import threading
 
-def create_js_deployment_file(contract_data):
-    """
-    Creates a temporary JavaScript file that will compile and deploy the contract
-    using the provided contract data.
-    
-    Args:
-        contract_data (dict): Dictionary containing contract details
-        
-    Returns:
-        str: Path to the created JavaScript file
-    """
-    # Create a temporary directory to store our JS files
-    temp_dir = tempfile.mkdtemp()
-    
-    # Create the package.json file
-    package_json = {
-        "name": "token-deployer-temp",
-        "version": "1.0.0",
-        "description": "Temporary package for token deployment",
-        "main": "deploy.js",
-        "dependencies": {
-            "ethers": "^6.7.1",
-            "solc": "^0.8.20",
-            "@openzeppelin/contracts": "^4.9.3"
-        }
-    }
-    
-    with open(os.path.join(temp_dir, "package.json"), "w") as f:
-        json.dump(package_json, f, indent=2)
-    
-    # Create the deployment script
-    deploy_js = """
+from artifact_cache import CANONICAL_CONTRACT_NAME, get_artifact_cache, get_cache_key, get_feature_combinations
+from config import NODE_WORKER_POOL_SIZE, NODE_WORKER_REQUEST_TIMEOUT, NODE_WORKER_HEALTH_INTERVAL
+from contract_template import CONTRACT_TEMPLATE, FEATURE_TEMPLATES, OPTIMIZATION_SETTINGS
+from node_workers import NodeWorkerPool, NodeWorkerError
+from toolchain import ensure_toolchain, get_node_env
+
+# Shared JavaScript: contract generation, compilation, deployment and tax setup
+DEPLOY_LIB_JS = """
 const solc = require('solc');
 const ethers = require('ethers');
 const fs = require('fs');
 const path = require('path');
 
+// Packages come from the shared toolchain; fall back to a local node_modules
+const NODE_MODULES = process.env.TOOLCHAIN_NODE_MODULES || path.join(process.cwd(), 'node_modules');
+
 // Function to read imported files for solc compiler
 function findImports(importPath) {
   try {
     // Remove @openzeppelin prefix and convert to filesystem path
     const normalizedPath = importPath.replace('@openzeppelin/contracts/', '');
-    const fullPath = path.join(process.cwd(), 'node_modules', '@openzeppelin', 'contracts', normalizedPath);
+    const fullPath = path.join(NODE_MODULES, '@openzeppelin', 'contracts', normalizedPath);
     
     if (fs.existsSync(fullPath)) {
       return {
@@ -60,216 +40,12 @@ function findImports(importPath) {
   }
 }
 
-// Contract template with gas optimization features
-const CONTRACT_TEMPLATE = `// SPDX-License-Identifier: MIT
-pragma solidity ^0.8.20;
-
-import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
-import "@openzeppelin/contracts/access/Ownable.sol";
-{{IMPORTS}}
-
-contract {{TOKEN_NAME}} is ERC20, Ownable{{INHERITANCE}} {
-    uint8 private immutable _decimals;
-    {{VARIABLES}}
-    
-    // Tax settings
-    uint256 public buyTax;
-    uint256 public sellTax;
-    address public taxWallet;
-    
-    // Router addresses for tax detection
-    mapping(address => bool) public isRouter;
-    
-    constructor(
-        string memory name_,
-        string memory symbol_,
-        uint8 decimals_,
-        uint256 initialSupply_,
-        uint256 buyTax_,
-        uint256 sellTax_,
-        address taxWallet_
-    ) 
-        ERC20(name_, symbol_)
-        Ownable()
-        {{CONSTRUCTOR_INITIALIZERS}}
-    {
-        _decimals = decimals_;
-        {{CONSTRUCTOR_BODY}}
-        
-        // Initialize taxes to 0 - will be set in separate transactions after deployment
-        buyTax = 0;
-        sellTax = 0;
-        
-        // Set tax wallet - use provided address or default to msg.sender
-        taxWallet = taxWallet_ == address(0) ? msg.sender : taxWallet_;
-        
-        // Add known router addresses for tax detection
-        isRouter[address(0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2)] = true; // WETH
-        isRouter[address(0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D)] = true; // Uniswap V2 Router
-        isRouter[address(0xE592427A0AEce92De3Edee1F18E0157C05861564)] = true; // Uniswap V3 Router
-        isRouter[address(0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270)] = true; // WMATIC
-        isRouter[address(0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff)] = true; // QuickSwap Router
-        
-        _mint(msg.sender, initialSupply_ * 10 ** decimals_);
-    }
-
-    function decimals() public view virtual override returns (uint8) {
-        return _decimals;
-    }
-    
-    // Override transfer function to apply taxes
-    function _transfer(
-        address from,
-        address to,
-        uint256 amount
-    ) internal virtual override {
-        // Skip taxes for certain addresses or when taxes are zero
-        if (from == taxWallet || to == taxWallet || (buyTax == 0 && sellTax == 0)) {
-            super._transfer(from, to, amount);
-            return;
-        }
-        
-        uint256 taxAmount = 0;
-        
-        // Apply buy tax when buying from a router (router -> user)
-        if (isRouter[from]) {
-            // Tax calculation: 1% = 100 basis points, divided by 10000 to get the actual percentage
-            taxAmount = amount * buyTax / 10000;
-        }
-        // Apply sell tax when selling to a router (user -> router)
-        else if (isRouter[to]) {
-            // Tax calculation: 1% = 100 basis points, divided by 10000 to get the actual percentage
-            taxAmount = amount * sellTax / 10000;
-        }
-        
-        // Transfer tax amount to tax wallet if there's any tax
-        if (taxAmount > 0) {
-            super._transfer(from, taxWallet, taxAmount);
-            super._transfer(from, to, amount - taxAmount);
-        } else {
-            super._transfer(from, to, amount);
-        }
-    }
-    
-    // Function to set buy tax - separate transaction after deployment
-    function setBuyTax(uint256 newBuyTax) public onlyOwner {
-        require(newBuyTax <= 5000, "Tax cannot exceed 50%");
-        buyTax = newBuyTax;
-    }
-    
-    // Function to set sell tax - separate transaction after deployment
-    function setSellTax(uint256 newSellTax) public onlyOwner {
-        require(newSellTax <= 5000, "Tax cannot exceed 50%");
-        sellTax = newSellTax;
-    }
-    
-    // Function to update tax settings - combined function
-    function setTaxes(uint256 newBuyTax, uint256 newSellTax) public onlyOwner {
-        require(newBuyTax <= 5000 && newSellTax <= 5000, "Tax cannot exceed 50%");
-        buyTax = newBuyTax;
-        sellTax = newSellTax;
-    }
-    
-    // Function to update tax wallet
-    function setTaxWallet(address newTaxWallet) public onlyOwner {
-        require(newTaxWallet != address(0), "Cannot set to zero address");
-        taxWallet = newTaxWallet;
-    }
-    
-    // Function to add or remove router addresses
-    function setRouter(address router, bool isActive) public onlyOwner {
-        isRouter[router] = isActive;
-    }
-    
-    {{FUNCTIONS}}
-}`;
-
-// Feature imports and implementations
-const FEATURE_TEMPLATES = {
-  Mintable: {
-    imports: [],
-    inheritance: '',
-    variables: '',
-    constructorBody: '',
-    functions: `
-    function mint(address to, uint256 amount) public onlyOwner {
-        _mint(to, amount);
-    }`,
-  },
-  Burnable: {
-    imports: ['import "@openzeppelin/contracts/token/ERC20/extensions/ERC20Burnable.sol";'],
-    inheritance: ', ERC20Burnable',
-    variables: '',
-    constructorBody: '',
-    functions: '',
-  },
-  Pausable: {
-    imports: ['import "@openzeppelin/contracts/security/Pausable.sol";'],
-    inheritance: ', Pausable',
-    variables: '',
-    constructorBody: '',
-    functions: `
-    function pause() public onlyOwner {
-        _pause();
-    }
-
-    function unpause() public onlyOwner {
-        _unpause();
-    }`,
-  },
-  'Access Control': {
-    imports: ['import "@openzeppelin/contracts/access/AccessControl.sol";'],
-    inheritance: ', AccessControl',
-    variables: `
-    bytes32 public constant MINTER_ROLE = keccak256("MINTER_ROLE");
-    bytes32 public constant BURNER_ROLE = keccak256("BURNER_ROLE");
-    bytes32 public constant PAUSER_ROLE = keccak256("PAUSER_ROLE");`,
-    constructorBody: `
-        _grantRole(DEFAULT_ADMIN_ROLE, msg.sender);
-        _grantRole(MINTER_ROLE, msg.sender);
-        _grantRole(BURNER_ROLE, msg.sender);
-        _grantRole(PAUSER_ROLE, msg.sender);`,
-    functions: `
-    function mint(address to, uint256 amount) public onlyRole(MINTER_ROLE) {
-        _mint(to, amount);
-    }
+// Contract template, feature templates and optimizer settings come from contract_template.py
+const CONTRACT_TEMPLATE = """ + json.dumps(CONTRACT_TEMPLATE) + """;
 
-    function burn(address from, uint256 amount) public onlyRole(BURNER_ROLE) {
-        _burn(from, amount);
-    }
-    
-    function pause() public onlyRole(PAUSER_ROLE) {
-        _pause();
-    }
-    
-    function unpause() public onlyRole(PAUSER_ROLE) {
-        _unpause();
-    }`,
-  },
-  'Flash Minting': {
-    imports: ['import "@openzeppelin/contracts/token/ERC20/extensions/ERC20FlashMint.sol";'],
-    inheritance: ', ERC20FlashMint',
-    variables: '',
-    constructorBody: '',
-    functions: '',
-  },
-};
+const FEATURE_TEMPLATES = """ + json.dumps(FEATURE_TEMPLATES, indent=2) + """;
 
-// Gas optimization settings
-const OPTIMIZATION_SETTINGS = {
-  none: {
-    enabled: false,
-    runs: 200,
-  },
-  standard: {
-    enabled: true,
-    runs: 200,
-  },
-  high: {
-    enabled: true,
-    runs: 1000,
-  },
-};
+const OPTIMIZATION_SETTINGS = """ + json.dumps(OPTIMIZATION_SETTINGS, indent=2) + """;
 
 // Helper function to generate contract code
 function generateContractCode(contractDetails) {
@@ -357,7 +133,7 @@ function generateContractCode(contractDetails) {
       }
       
       variables += template.variables;
-      constructorBody += template.constructorBody;
+      constructorBody += template.constructor_body;
       
       // Special handling for combinations of features
       if (featureName === 'Pausable' && hasAccessControl) {
@@ -540,7 +316,7 @@ async function compileContract(contractCode, name, optimizationLevel = 'standard
 }
 
 // Deploy the contract
-async function deployContract(bytecode, abi, constructorArgs, privateKey, rpcUrl) {
+async function deployContract(bytecode, abi, constructorArgs, privateKey, rpcUrl, fees) {
   try {
     console.log('Deploying contract...');
     
@@ -551,17 +327,20 @@ async function deployContract(bytecode, abi, constructorArgs, privateKey, rpcUrl
     // Create contract factory
     const factory = new ethers.ContractFactory(abi, bytecode, wallet);
     
-    // Get current gas prices
-    const feeData = await provider.getFeeData();
-    const maxFeePerGas = feeData.maxFeePerGas || undefined;
-    const maxPriorityFeePerGas = feeData.maxPriorityFeePerGas || undefined;
+    // Fees from the bot's fee oracle (maxFeePerGas/maxPriorityFeePerGas or gasPrice),
+    // the provider's fee data only when none were passed
+    let feeOverrides = fees || {};
+    if (!feeOverrides.maxFeePerGas && !feeOverrides.gasPrice) {
+      const feeData = await provider.getFeeData();
+      feeOverrides = {
+        maxFeePerGas: feeData.maxFeePerGas || undefined,
+        maxPriorityFeePerGas: feeData.maxPriorityFeePerGas || undefined
+      };
+    }
     
     // Deploy with gas optimization
     console.log('Sending deployment transaction...');
-    const contract = await factory.deploy(...constructorArgs, {
-      maxFeePerGas,
-      maxPriorityFeePerGas
-    });
+    const contract = await factory.deploy(...constructorArgs, feeOverrides);
     
     // Wait for deployment
     console.log('Waiting for deployment confirmation...');
@@ -583,58 +362,10 @@ async function deployContract(bytecode, abi, constructorArgs, privateKey, rpcUrl
     };
   }
 }
+"""
 
-// Set tax values after deployment
-async function setTaxRates(contractAddress, abi, privateKey, rpcUrl, buyTax, sellTax) {
-  try {
-    if (buyTax === 0 && sellTax === 0) {
-      console.log('No taxes to set, skipping');
-      return { success: true, message: 'No taxes to set' };
-    }
-    
-    console.log(`Setting tax rates: Buy ${buyTax}%, Sell ${sellTax}%`);
-    
-    // Convert percentages to basis points (1% = 100 basis points)
-    const buyTaxBasisPoints = Math.floor(buyTax * 100);
-    const sellTaxBasisPoints = Math.floor(sellTax * 100);
-    
-    // Create provider and wallet
-    const provider = new ethers.JsonRpcProvider(rpcUrl);
-    const wallet = new ethers.Wallet(privateKey, provider);
-    
-    // Create contract instance
-    const contract = new ethers.Contract(contractAddress, abi, wallet);
-    
-    // Set buy tax if needed
-    if (buyTaxBasisPoints > 0) {
-      console.log(`Setting buy tax to ${buyTaxBasisPoints} basis points`);
-      const buyTaxTx = await contract.setBuyTax(buyTaxBasisPoints);
-      await buyTaxTx.wait();
-      console.log('Buy tax set successfully');
-    }
-    
-    // Set sell tax if needed
-    if (sellTaxBasisPoints > 0) {
-      console.log(`Setting sell tax to ${sellTaxBasisPoints} basis points`);
-      const sellTaxTx = await contract.setSellTax(sellTaxBasisPoints);
-      await sellTaxTx.wait();
-      console.log('Sell tax set successfully');
-    }
-    
-    return {
-      success: true,
-      buyTaxSet: buyTaxBasisPoints > 0,
-      sellTaxSet: sellTaxBasisPoints > 0
-    };
-  } catch (error) {
-    console.error('Error setting tax rates:', error);
-    return {
-      success: false,
-      error: error.message || 'Unknown error setting tax rates'
-    };
-  }
-}
-
+# Entry point for the standalone deploy.js script (contract details in argv)
+DEPLOY_MAIN_JS = """
 // Main function
 async function main() {
   try {
@@ -677,8 +408,8 @@ async function main() {
       symbol,
       tokenDecimals,
       totalSupply,
-      0, // Initial buyTax is 0, will be set in a separate transaction
-      0, // Initial sellTax is 0, will be set in a separate transaction
+      Math.floor(buyTax * 100), // Taxes in basis points, applied by the constructor
+      Math.floor(sellTax * 100),
       taxWalletAddress // Add tax wallet address parameter
     ];
     
@@ -696,22 +427,6 @@ async function main() {
       process.exit(1);
     }
     
-    // Set tax rates if needed
-    if (buyTax > 0 || sellTax > 0) {
-      const taxResult = await setTaxRates(
-        deploymentResult.address,
-        compilationResult.abi,
-        privateKey,
-        rpcUrl,
-        buyTax,
-        sellTax
-      );
-      
-      if (!taxResult.success) {
-        console.warn('Warning: Failed to set tax rates:', taxResult.error);
-      }
-    }
-    
     // Return the result as JSON
     const result = {
       success: true,
@@ -745,7 +460,103 @@ async function main() {
 }
 
 main();
+"""
+
+# Entry point for long-lived worker processes (see node_workers.py).
+# Requests and responses are newline-delimited JSON-RPC 2.0 frames on
+# stdin/stdout; all logging is redirected to stderr so it cannot corrupt them.
+WORKER_MAIN_JS = """
+const readline = require('readline');
+
+const writeFrame = (frame) => process.stdout.write(JSON.stringify(frame) + '\\n');
+console.log = (...args) => console.error(...args);
+console.info = console.log;
+console.warn = console.log;
+
+const WORKER_METHODS = {
+  ping: async () => ({
+    success: true,
+    pid: process.pid,
+    solcVersion: solc.version()
+  }),
+
+  // Generate the source without compiling, so the caller can look it up in its artifact cache
+  generate: async (params) => {
+    const optimizationLevel = params.optimizationLevel || 'standard';
+    return {
+      success: true,
+      contractCode: generateContractCode(params),
+      solcVersion: solc.version(),
+      optimizer: OPTIMIZATION_SETTINGS[optimizationLevel]
+    };
+  },
+
+  compile: async (params) => {
+    const contractCode = params.contractCode || generateContractCode(params);
+    const result = await compileContract(contractCode, params.name, params.optimizationLevel || 'standard');
+    return { ...result, contractCode, solcVersion: solc.version() };
+  },
+
+  deploy: async (params) => deployContract(
+    params.bytecode,
+    params.abi,
+    params.constructorArgs,
+    params.privateKey,
+    params.rpcUrl,
+    params.fees
+  ),
+};
+
+async function handleRequest(line) {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (error) {
+    writeFrame({ jsonrpc: '2.0', id: null, error: { code: -32700, message: 'Parse error' } });
+    return;
+  }
+
+  const handler = WORKER_METHODS[request.method];
+  if (!handler) {
+    writeFrame({ jsonrpc: '2.0', id: request.id, error: { code: -32601, message: `Unknown method: ${request.method}` } });
+    return;
+  }
+
+  try {
+    const result = await handler(request.params || {});
+    writeFrame({ jsonrpc: '2.0', id: request.id, result });
+  } catch (error) {
+    writeFrame({ jsonrpc: '2.0', id: request.id, error: { code: -32000, message: error.message || String(error) } });
+  }
+}
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+rl.on('line', (line) => {
+  if (line.trim()) {
+    handleRequest(line);
+  }
+});
+// The Python side closes stdin to shut the worker down
+rl.on('close', () => process.exit(0));
+"""
+
+def create_js_deployment_file(contract_data):
     """
+    Creates a temporary directory holding a standalone JavaScript file that
+    compiles and deploys the contract in one run. The bot itself deploys through
+    the worker pool; this script is kept for debugging a deployment by hand.
+    Node.js packages are resolved from the shared toolchain (see toolchain.py).
+    
+    Args:
+        contract_data (dict): Dictionary containing contract details
+        
+    Returns:
+        str: Path to the directory containing deploy.js
+    """
+    # Create a temporary directory to store the generated script
+    temp_dir = tempfile.mkdtemp(prefix="token-deploy-")
+    
+    deploy_js = DEPLOY_LIB_JS + DEPLOY_MAIN_JS
     
     # Write the deployment script to the temporary directory
     with open(os.path.join(temp_dir, "deploy.js"), "w") as f:
@@ -753,137 +564,221 @@ main();
     
     return temp_dir
 
-def deploy_contract_with_js(contract_data, private_key, rpc_url):
+_worker_pool = None
+_worker_pool_dir = None
+_worker_pool_lock = threading.Lock()
+
+def get_worker_pool():
+    """
+    Returns the shared pool of Node.js deployment workers, starting it on first use.
+    
+    Returns:
+        NodeWorkerPool: Running worker pool
+    """
+    global _worker_pool, _worker_pool_dir
+    
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            return _worker_pool
+        
+        toolchain_path = ensure_toolchain()
+        
+        # The worker script lives outside the read-only toolchain directory
+        script_dir = tempfile.mkdtemp(prefix="token-worker-")
+        script_path = os.path.join(script_dir, "worker.js")
+        with open(script_path, "w") as f:
+            f.write(DEPLOY_LIB_JS + WORKER_MAIN_JS)
+        
+        pool = NodeWorkerPool(
+            script_path,
+            size=NODE_WORKER_POOL_SIZE,
+            cwd=script_dir,
+            env=get_node_env(toolchain_path),
+            request_timeout=NODE_WORKER_REQUEST_TIMEOUT,
+            health_interval=NODE_WORKER_HEALTH_INTERVAL
+        )
+        try:
+            pool.start()
+        except Exception:
+            pool.stop()
+            shutil.rmtree(script_dir, ignore_errors=True)
+            raise
+        
+        _worker_pool = pool
+        _worker_pool_dir = script_dir
+        atexit.register(shutdown_worker_pool)
+        return pool
+
+def shutdown_worker_pool():
+    """Stops the Node.js worker pool and removes its script directory"""
+    global _worker_pool, _worker_pool_dir
+    
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.stop()
+            _worker_pool = None
+        if _worker_pool_dir:
+            shutil.rmtree(_worker_pool_dir, ignore_errors=True)
+            _worker_pool_dir = None
+
+def get_compiled_artifact(features, optimization_level="standard", pool=None):
+    """
+    Returns the ABI and bytecode for a feature set, compiling only on a cache miss.
+    
+    Args:
+        features (list): Selected token features
+        optimization_level (str): Key of OPTIMIZATION_SETTINGS
+        pool (NodeWorkerPool): Worker pool to use, defaults to the shared pool
+        
+    Returns:
+        dict: Compilation result with abi, bytecode, contractCode and a cached flag
+    """
+    pool = pool or get_worker_pool()
+    cache = get_artifact_cache()
+    
+    details = {
+        "name": CANONICAL_CONTRACT_NAME,
+        "features": features,
+        "optimizationLevel": optimization_level
+    }
+    generated = pool.call("generate", details)
+    key = get_cache_key(generated["contractCode"], generated["solcVersion"], generated["optimizer"])
+    
+    artifact = cache.get(key)
+    if artifact is not None:
+        return {"success": True, "cached": True, **artifact}
+    
+    compilation = pool.call("compile", {**details, "contractCode": generated["contractCode"]})
+    if not compilation.get("success"):
+        return compilation
+    
+    artifact = {
+        "abi": compilation["abi"],
+        "bytecode": compilation["bytecode"],
+        "contractCode": generated["contractCode"],
+        "solcVersion": generated["solcVersion"],
+        "optimizer": generated["optimizer"]
+    }
+    cache.put(key, artifact)
+    return {"success": True, "cached": False, **artifact}
+
+def prewarm_artifact_cache(optimization_level="standard"):
+    """
+    Compiles every feature combination that is not cached yet.
+    
+    Args:
+        optimization_level (str): Key of OPTIMIZATION_SETTINGS
+        
+    Returns:
+        dict: Number of combinations compiled, already cached and failed
+    """
+    summary = {"compiled": 0, "cached": 0, "failed": 0}
+    for features in get_feature_combinations():
+        try:
+            result = get_compiled_artifact(features, optimization_level)
+        except NodeWorkerError as e:
+            result = {"success": False, "error": str(e)}
+        
+        if not result.get("success"):
+            print(f"Failed to compile features {features}: {result.get('errors') or result.get('error')}")
+            summary["failed"] += 1
+        elif result["cached"]:
+            summary["cached"] += 1
+        else:
+            summary["compiled"] += 1
+    
+    print(f"Artifact cache warm: {summary['compiled']} compiled, {summary['cached']} already cached, {summary['failed']} failed")
+    return summary
+
+def deploy_contract_with_js(contract_data, private_key, rpc_url, fee_fields=None):
     """
-    Deploys a contract using Node.js and the JavaScript deployment script.
+    Compiles and deploys a contract, with its taxes set by the constructor,
+    using the long-lived Node.js worker pool.
     
     Args:
         contract_data (dict): Contract details
         private_key (str): Private key for deployment
         rpc_url (str): RPC URL for the network
+        fee_fields (dict): Fee fields from the network's fee oracle (wallet.get_fee_fields);
+            ethers prices the deployment itself if omitted
         
     Returns:
         dict: Deployment result
     """
     try:
-        # Create deployment data
-        deployment_data = {
-            "name": contract_data["name"],
-            "symbol": contract_data["symbol"],
-            "decimals": contract_data.get("decimals", 18),
-            "totalSupply": contract_data["total_supply"],
-            "features": contract_data.get("features", []),
-            "optimizationLevel": "standard",
-            "buyTax": contract_data.get("buy_tax", 0) / 100,  # Convert from basis points to percentage
-            "sellTax": contract_data.get("sell_tax", 0) / 100,  # Convert from basis points to percentage
-            "taxWallet": contract_data.get("tax_wallet", ""),  # Add tax wallet address
-            "privateKey": private_key,
-            "rpcUrl": rpc_url
-        }
-        
-        # Create temporary directory with JS files
-        temp_dir = create_js_deployment_file(deployment_data)
+        name = contract_data["name"]
+        symbol = contract_data["symbol"]
+        decimals = contract_data.get("decimals", 18)
+        buy_tax = contract_data.get("buy_tax", 0) / 100  # Convert from basis points to percentage
+        sell_tax = contract_data.get("sell_tax", 0) / 100  # Convert from basis points to percentage
         
-        # Install dependencies
-        print("Installing Node.js dependencies...")
+        pool = get_worker_pool()
         
-        # Check if we have a custom npm path from environment variable
-        npm_cmd = os.environ.get("NPM_PATH", "npm")
-        
-        if npm_cmd != "npm" and os.name == "nt" and npm_cmd.endswith("npm.cmd"):
-            # On Windows with a full path to npm.cmd, we need to use PowerShell
-            install_process = subprocess.run(
-                ["powershell", "-Command", f"& '{npm_cmd}' install"],
-                cwd=temp_dir,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+        # Compile the contract, or reuse the cached artifact for this feature set
+        compilation = get_compiled_artifact(contract_data.get("features", []), "standard", pool)
+        if compilation.get("success"):
+            print("Using cached contract artifact" if compilation["cached"] else "Contract compiled")
         else:
-            # Standard npm command
-            install_process = subprocess.run(
-                [npm_cmd, "install"], 
-                cwd=temp_dir, 
-                check=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE
-            )
+            print(f"Compilation failed: {compilation.get('errors') or compilation.get('error')}")
+            return {
+                "success": False,
+                "error": compilation.get("error", "Compilation failed"),
+                "errors": compilation.get("errors")
+            }
         
-        # Run the deployment script
-        print("Running deployment script...")
-        process = subprocess.run(
-            ["node", "deploy.js", json.dumps(deployment_data)],
-            cwd=temp_dir,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        # Prepare constructor arguments - the constructor applies the taxes (in basis points)
+        constructor_args = [
+            name,
+            symbol,
+            int(decimals or 18),
+            contract_data["total_supply"],
+            int(contract_data.get("buy_tax", 0)),
+            int(contract_data.get("sell_tax", 0)),
+            contract_data.get("tax_wallet") or "0x0000000000000000000000000000000000000000"
+        ]
         
-        # Parse the output
-        try:
-            # First, try to find a valid JSON object in the output
-            # Sometimes the Node.js script might output logs before the actual JSON result
-            stdout = process.stdout.strip()
-            # Find the first '{' character (start of JSON)
-            json_start = stdout.find('{')
-            if json_start >= 0:
-                json_str = stdout[json_start:]
-                result = json.loads(json_str)
-                return result
-            else:
-                # If no JSON found, check if there's a contract address in the output
-                # This is a fallback in case the JSON parsing fails but deployment succeeded
-                if "Contract deployed successfully:" in stdout:
-                    address_line = [line for line in stdout.split('\n') if "Contract deployed successfully:" in line][0]
-                    contract_address = address_line.split(":")[-1].strip()
-                    return {
-                        "success": True,
-                        "contractAddress": contract_address,
-                        "message": "Contract deployed but JSON parsing failed",
-                        "stdout": stdout,
-                        "stderr": process.stderr
-                    }
-                else:
-                    print("Error parsing deployment result:", stdout)
-                    return {
-                        "success": False,
-                        "error": "Failed to parse deployment result",
-                        "stdout": stdout,
-                        "stderr": process.stderr
-                    }
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            print("Output:", process.stdout)
-            
-            # Check if we can find the contract address in the output
-            if "Contract deployed successfully:" in process.stdout:
-                try:
-                    address_line = [line for line in process.stdout.split('\n') if "Contract deployed successfully:" in line][0]
-                    contract_address = address_line.split(":")[-1].strip()
-                    return {
-                        "success": True,
-                        "contractAddress": contract_address,
-                        "message": "Contract deployed but JSON parsing failed",
-                        "stdout": process.stdout,
-                        "stderr": process.stderr
-                    }
-                except Exception as ex:
-                    print(f"Error extracting address: {ex}")
-            
+        # Deploy the contract
+        print("Deploying contract...")
+        deployment = pool.call("deploy", {
+            "bytecode": compilation["bytecode"],
+            "abi": compilation["abi"],
+            "constructorArgs": constructor_args,
+            "privateKey": private_key,
+            "rpcUrl": rpc_url,
+            # Wei amounts as strings, JSON numbers lose precision above 2**53
+            "fees": {field: str(value) for field, value in fee_fields.items()} if fee_fields else None
+        })
+        
+        if not deployment.get("success"):
+            print(f"Deployment failed: {deployment.get('error')}")
             return {
                 "success": False,
-                "error": f"JSON parsing error: {e}",
-                "stdout": process.stdout,
-                "stderr": process.stderr
+                "error": deployment.get("error", "Unknown deployment error")
             }
-    except subprocess.CalledProcessError as e:
-        print(f"Deployment process error: {e}")
+        
+        return {
+            "success": True,
+            "contractCode": compilation["contractCode"],
+            "abi": compilation["abi"],
+            "bytecode": compilation["bytecode"],
+            "deployedContract": {
+                "address": deployment["address"],
+                "txHash": deployment["txHash"],
+                "blockNumber": deployment["blockNumber"],
+                "gasUsed": deployment["gasUsed"]
+            },
+            "taxSettings": {
+                "buyTax": buy_tax,
+                "sellTax": sell_tax,
+                "buyTaxBasisPoints": int(buy_tax * 100),
+                "sellTaxBasisPoints": int(sell_tax * 100)
+            }
+        }
+    except NodeWorkerError as e:
+        print(f"Node worker error: {e}")
         return {
             "success": False,
-            "error": f"Deployment process error: {e}",
-            "stdout": e.stdout if hasattr(e, 'stdout') else None,
-            "stderr": e.stderr if hasattr(e, 'stderr') else None
+            "error": f"Node worker error: {e}"
         }
     except Exception as e:
         print(f"Deployment error: {e}")
@@ -891,8 +786,3 @@ def deploy_contract_with_js(contract_data, private_key, rpc_url):
             "success": False,
             "error": str(e)
         }
-    finally:
-        # Clean up temporary directory (optional - you might want to keep it for debugging)
-        # import shutil
-        # shutil.rmtree(temp_dir)
-        pass 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from config import CONTRACT_CACHE_SIZE
+
+
+class ContractRegistry:
+    """
+    Contract objects for one network, built once and handed out on every request.
+
+    Each ABI is parsed into a contract factory the first time it is used, and
+    contract instances are kept per (ABI, address) with the address checksummed
+    once. Instances are evicted least-recently-used beyond max_size, since user
+    supplied token addresses would otherwise grow the cache without bound.
+    """
+
+    def __init__(self, web3, max_size=1024):
+        self.web3 = web3
+        self.max_size = max_size
+
+        self._factories = {}
+        self._contracts = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'factories': 0}
+
+    def _factory(self, abi):
+        # ABIs are module-level constants, so their identity is a stable key;
+        # the ABI itself is kept alongside so the id can't be reused
+        entry = self._factories.get(id(abi))
+        if entry is None or entry[0] is not abi:
+            entry = (abi, self.web3.eth.contract(abi=abi))
+            self._factories[id(abi)] = entry
+            self.stats['factories'] += 1
+        return entry[1]
+
+    def get(self, address, abi):
+        """
+        Contract instance for an address.
+
+        Args:
+            address (str): Contract address in any case
+            abi (list): ABI constant, e.g. ERC20_ABI
+
+        Returns:
+            Contract: Cached web3 contract instance
+        """
+        key = (id(abi), address.lower())
+        with self._lock:
+            entry = self._contracts.get(key)
+            if entry is not None and entry[0] is abi:
+                self._contracts.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+
+            self.stats['misses'] += 1
+            contract = self._factory(abi)(address=self.web3.to_checksum_address(address))
+            self._contracts[key] = (abi, contract)
+            if len(self._contracts) > self.max_size:
+                self._contracts.popitem(last=False)
+            return contract
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'size': len(self._contracts)}
+
+
+_registries = weakref.WeakKeyDictionary()
+_registries_lock = threading.Lock()
+
+
+def get_contract_registry(web3):
+    """Shared contract registry for a Web3 instance (one per network)"""
+    with _registries_lock:
+        registry = _registries.get(web3)
+        if registry is None:
+            registry = ContractRegistry(web3, max_size=CONTRACT_CACHE_SIZE)
+            _registries[web3] = registry
+        return registry
+
+
+def get_contract(web3, address, abi):
+    """Cached contract instance for address on web3's network"""
+    return get_contract_registry(web3).get(address, abi)
@@ -1,8 +1,11 @@
 from web3 import Web3
 import json
 from telebot import types
-from wallet import get_web3, sign_and_send_transaction, wait_for_transaction_receipt, get_explorer_url
+from wallet import get_web3, get_fee_fields, get_gas_estimator, send_transaction_with_nonce, wait_for_transaction_receipt, get_explorer_url
 from storage import get_user_wallet, save_token_to_db
+from token_metadata import get_token_metadata, get_token_owner, invalidate_token_owner
+from abi_codec import get_codec
+from contract_registry import get_contract
 
 # Ownership Renouncement ABI snippet - for the renounceOwnership function
 OWNERSHIP_ABI = [
@@ -53,10 +56,13 @@ OWNERSHIP_ABI = [
     }
 ]
 
+# Selectors are worked out once; calldata is encoded without any RPC calls
+OWNERSHIP_CODEC = get_codec(OWNERSHIP_ABI)
+
 def check_contract_ownership(web3, contract_address, wallet_address):
     """Check if the user is the owner of the contract"""
     try:
-        contract = web3.eth.contract(address=contract_address, abi=OWNERSHIP_ABI)
+        contract = get_contract(web3, contract_address, OWNERSHIP_ABI)
         owner = contract.functions.owner().call()
         return owner.lower() == wallet_address.lower()
     except Exception as e:
@@ -68,20 +74,15 @@ def check_contract_ownership(web3, contract_address, wallet_address):
 def get_token_info(web3, contract_address, wallet_address):
     """Get basic token information"""
     try:
-        contract = web3.eth.contract(address=contract_address, abi=OWNERSHIP_ABI)
+        contract = get_contract(web3, contract_address, OWNERSHIP_ABI)
         
         # Get token info
         token_info = {}
         
-        try:
-            token_info['name'] = contract.functions.name().call()
-        except:
-            token_info['name'] = "Unknown Token"
-            
-        try:
-            token_info['symbol'] = contract.functions.symbol().call()
-        except:
-            token_info['symbol'] = "???"
+        # Name and symbol never change, the owner is re-read after TOKEN_OWNER_TTL
+        metadata = get_token_metadata(web3, contract_address)
+        token_info['name'] = metadata['name'] if metadata['name'] is not None else "Unknown Token"
+        token_info['symbol'] = metadata['symbol'] if metadata['symbol'] is not None else "???"
             
         try:
             balance = contract.functions.balanceOf(wallet_address).call()
@@ -89,12 +90,9 @@ def get_token_info(web3, contract_address, wallet_address):
         except:
             token_info['balance'] = 0
             
-        try:
-            token_info['owner'] = contract.functions.owner().call()
-            token_info['is_owner'] = (token_info['owner'].lower() == wallet_address.lower())
-        except:
-            token_info['owner'] = None
-            token_info['is_owner'] = False
+        token_info['owner'] = get_token_owner(web3, contract_address)
+        token_info['is_owner'] = (token_info['owner'] is not None and
+                                  token_info['owner'].lower() == wallet_address.lower())
             
         return token_info
     except Exception as e:
@@ -118,42 +116,45 @@ def renounce_contract_ownership(user_id, contract_address, network='polygon'):
             return False, "You are not the owner of this contract"
         
         print("Ownership confirmed, preparing transaction")
-        # Create contract instance
-        contract = web3.eth.contract(address=contract_address, abi=OWNERSHIP_ABI)
         
         # Build the transaction
-        nonce = web3.eth.get_transaction_count(user_wallet['address'])
-        gas_price = web3.eth.gas_price
+        fee_fields = get_fee_fields(web3)
         
-        print(f"Using nonce: {nonce}, gas price: {gas_price}")
+        print(f"Using fees: {fee_fields}")
         
         # Get the transaction data
         try:
-            tx_data = contract.functions.renounceOwnership().build_transaction({
-                'chainId': web3.eth.chain_id,
-                'gas': 0, 
-                'gasPrice': 0, 
-                'nonce': 0
-            })['data']
+            tx_data = Web3.to_hex(OWNERSHIP_CODEC.encode('renounceOwnership'))
             print(f"Transaction data generated: {tx_data[:10]}...")
         except Exception as e:
             print(f"Error generating transaction data: {e}")
             return False, f"Failed to generate transaction data: {str(e)}"
         
-        # Prepare the transaction
-        tx = {
-            'from': user_wallet['address'],
-            'to': contract_address,
-            'gas': 200000,  # Gas limit
-            'gasPrice': gas_price,
-            'nonce': nonce,
-            'data': tx_data
-        }
+        gas_limit = get_gas_estimator(web3).estimate(
+            ('renounceOwnership',),
+            lambda: web3.eth.estimate_gas({
+                'from': user_wallet['address'],
+                'to': contract_address,
+                'data': tx_data
+            }),
+            200000
+        )
+        
+        # Prepare the transaction - the nonce comes from the shared nonce manager
+        def build_tx(nonce):
+            return {
+                'from': user_wallet['address'],
+                'to': contract_address,
+                'gas': gas_limit,  # Estimated gas limit
+                **fee_fields,
+                'nonce': nonce,
+                'data': tx_data
+            }
         
         print("Signing and sending transaction...")
         # Sign and send the transaction
         try:
-            tx_hash = sign_and_send_transaction(web3, tx, user_wallet['private_key'])
+            tx_hash = send_transaction_with_nonce(web3, user_wallet['address'], build_tx, user_wallet['private_key'])
             print(f"Transaction sent with hash: {tx_hash.hex()}")
         except Exception as e:
             print(f"Error sending transaction: {e}")
@@ -169,6 +170,7 @@ def renounce_contract_ownership(user_id, contract_address, network='polygon'):
             return False, f"Transaction sent but failed to get receipt: {str(e)}"
         
         if receipt.status == 1:  # Transaction successful
+            invalidate_token_owner(web3, contract_address)
             explorer_url = get_explorer_url(contract_address, network)
             print(f"Transaction successful! Explorer URL: {explorer_url}")
             return True, {
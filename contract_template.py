@@ -0,0 +1,344 @@
+import re
+
+# Solidity template shared by the Node.js and native deploy engines.
+# contract_bridge.py embeds these definitions into the JavaScript it generates.
+CONTRACT_TEMPLATE = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/access/Ownable.sol";
+{{IMPORTS}}
+
+contract {{TOKEN_NAME}} is ERC20, Ownable{{INHERITANCE}} {
+    uint8 private immutable _decimals;
+    {{VARIABLES}}
+    
+    // Tax settings
+    uint256 public buyTax;
+    uint256 public sellTax;
+    address public taxWallet;
+    
+    // Router addresses for tax detection
+    mapping(address => bool) public isRouter;
+    
+    constructor(
+        string memory name_,
+        string memory symbol_,
+        uint8 decimals_,
+        uint256 initialSupply_,
+        uint256 buyTax_,
+        uint256 sellTax_,
+        address taxWallet_
+    ) 
+        ERC20(name_, symbol_)
+        Ownable()
+        {{CONSTRUCTOR_INITIALIZERS}}
+    {
+        _decimals = decimals_;
+        {{CONSTRUCTOR_BODY}}
+        
+        // Taxes are set at deployment, so a launch doesn't need separate setter transactions
+        require(buyTax_ <= 5000 && sellTax_ <= 5000, "Tax cannot exceed 50%");
+        buyTax = buyTax_;
+        sellTax = sellTax_;
+        
+        // Set tax wallet - use provided address or default to msg.sender
+        taxWallet = taxWallet_ == address(0) ? msg.sender : taxWallet_;
+        
+        // Add known router addresses for tax detection
+        isRouter[address(0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2)] = true; // WETH
+        isRouter[address(0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D)] = true; // Uniswap V2 Router
+        isRouter[address(0xE592427A0AEce92De3Edee1F18E0157C05861564)] = true; // Uniswap V3 Router
+        isRouter[address(0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270)] = true; // WMATIC
+        isRouter[address(0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff)] = true; // QuickSwap Router
+        
+        _mint(msg.sender, initialSupply_ * 10 ** decimals_);
+    }
+
+    function decimals() public view virtual override returns (uint8) {
+        return _decimals;
+    }
+    
+    // Override transfer function to apply taxes
+    function _transfer(
+        address from,
+        address to,
+        uint256 amount
+    ) internal virtual override {
+        // Skip taxes for certain addresses or when taxes are zero
+        if (from == taxWallet || to == taxWallet || (buyTax == 0 && sellTax == 0)) {
+            super._transfer(from, to, amount);
+            return;
+        }
+        
+        uint256 taxAmount = 0;
+        
+        // Apply buy tax when buying from a router (router -> user)
+        if (isRouter[from]) {
+            // Tax calculation: 1% = 100 basis points, divided by 10000 to get the actual percentage
+            taxAmount = amount * buyTax / 10000;
+        }
+        // Apply sell tax when selling to a router (user -> router)
+        else if (isRouter[to]) {
+            // Tax calculation: 1% = 100 basis points, divided by 10000 to get the actual percentage
+            taxAmount = amount * sellTax / 10000;
+        }
+        
+        // Transfer tax amount to tax wallet if there's any tax
+        if (taxAmount > 0) {
+            super._transfer(from, taxWallet, taxAmount);
+            super._transfer(from, to, amount - taxAmount);
+        } else {
+            super._transfer(from, to, amount);
+        }
+    }
+    
+    // Function to change the buy tax after deployment
+    function setBuyTax(uint256 newBuyTax) public onlyOwner {
+        require(newBuyTax <= 5000, "Tax cannot exceed 50%");
+        buyTax = newBuyTax;
+    }
+    
+    // Function to change the sell tax after deployment
+    function setSellTax(uint256 newSellTax) public onlyOwner {
+        require(newSellTax <= 5000, "Tax cannot exceed 50%");
+        sellTax = newSellTax;
+    }
+    
+    // Function to update tax settings - combined function
+    function setTaxes(uint256 newBuyTax, uint256 newSellTax) public onlyOwner {
+        require(newBuyTax <= 5000 && newSellTax <= 5000, "Tax cannot exceed 50%");
+        buyTax = newBuyTax;
+        sellTax = newSellTax;
+    }
+    
+    // Function to update tax wallet
+    function setTaxWallet(address newTaxWallet) public onlyOwner {
+        require(newTaxWallet != address(0), "Cannot set to zero address");
+        taxWallet = newTaxWallet;
+    }
+    
+    // Function to add or remove router addresses
+    function setRouter(address router, bool isActive) public onlyOwner {
+        isRouter[router] = isActive;
+    }
+    
+    {{FUNCTIONS}}
+}"""
+
+FEATURE_TEMPLATES = {
+    'Mintable': {
+        'imports': [],
+        'inheritance': '',
+        'variables': '',
+        'constructor_body': '',
+        'functions': """
+    function mint(address to, uint256 amount) public onlyOwner {
+        _mint(to, amount);
+    }""",
+    },
+    'Burnable': {
+        'imports': ['import "@openzeppelin/contracts/token/ERC20/extensions/ERC20Burnable.sol";'],
+        'inheritance': ', ERC20Burnable',
+        'variables': '',
+        'constructor_body': '',
+        'functions': '',
+    },
+    'Pausable': {
+        'imports': ['import "@openzeppelin/contracts/security/Pausable.sol";'],
+        'inheritance': ', Pausable',
+        'variables': '',
+        'constructor_body': '',
+        'functions': """
+    function pause() public onlyOwner {
+        _pause();
+    }
+
+    function unpause() public onlyOwner {
+        _unpause();
+    }""",
+    },
+    'Access Control': {
+        'imports': ['import "@openzeppelin/contracts/access/AccessControl.sol";'],
+        'inheritance': ', AccessControl',
+        'variables': """
+    bytes32 public constant MINTER_ROLE = keccak256("MINTER_ROLE");
+    bytes32 public constant BURNER_ROLE = keccak256("BURNER_ROLE");
+    bytes32 public constant PAUSER_ROLE = keccak256("PAUSER_ROLE");""",
+        'constructor_body': """
+        _grantRole(DEFAULT_ADMIN_ROLE, msg.sender);
+        _grantRole(MINTER_ROLE, msg.sender);
+        _grantRole(BURNER_ROLE, msg.sender);
+        _grantRole(PAUSER_ROLE, msg.sender);""",
+        'functions': """
+    function mint(address to, uint256 amount) public onlyRole(MINTER_ROLE) {
+        _mint(to, amount);
+    }
+
+    function burn(address from, uint256 amount) public onlyRole(BURNER_ROLE) {
+        _burn(from, amount);
+    }
+    
+    function pause() public onlyRole(PAUSER_ROLE) {
+        _pause();
+    }
+    
+    function unpause() public onlyRole(PAUSER_ROLE) {
+        _unpause();
+    }""",
+    },
+    'Flash Minting': {
+        'imports': ['import "@openzeppelin/contracts/token/ERC20/extensions/ERC20FlashMint.sol";'],
+        'inheritance': ', ERC20FlashMint',
+        'variables': '',
+        'constructor_body': '',
+        'functions': '',
+    },
+}
+
+# Features are processed in this order to handle dependencies between them
+FEATURE_ORDER = ['Access Control', 'Pausable', 'Burnable', 'Mintable', 'Flash Minting']
+
+# Gas optimization settings
+OPTIMIZATION_SETTINGS = {
+    'none': {'enabled': False, 'runs': 200},
+    'standard': {'enabled': True, 'runs': 200},
+    'high': {'enabled': True, 'runs': 1000},
+}
+
+# pause/unpause restricted to PAUSER_ROLE when Access Control is selected
+ROLE_PAUSE_FUNCTIONS = {
+    'pause': """
+    function pause() public onlyRole(PAUSER_ROLE) {
+        _pause();
+    }""",
+    'unpause': """
+    function unpause() public onlyRole(PAUSER_ROLE) {
+        _unpause();
+    }""",
+}
+
+# Pausable hook, matching OpenZeppelin 4.x's ERC20 implementation
+BEFORE_TOKEN_TRANSFER_FUNCTION = """
+    function _beforeTokenTransfer(
+        address from,
+        address to,
+        uint256 amount
+    ) internal virtual override whenNotPaused {
+        super._beforeTokenTransfer(from, to, amount);
+    }"""
+
+
+def get_feature_names(features):
+    """
+    Normalize a feature list to feature names.
+    Features may be strings or dicts with a type/name and an optional enabled flag.
+    """
+    names = []
+    for feature in features or []:
+        name = feature
+        if isinstance(feature, dict):
+            if feature.get('enabled') is False:
+                continue
+            name = feature.get('type') or feature.get('name') or feature
+        name = str(name)
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def _split_functions(source):
+    """Split a block of Solidity functions into (name, source) pairs"""
+    parts = source.strip().split('function')
+    functions = []
+    for part in parts[1:]:
+        func = 'function' + part
+        functions.append((func[9:func.index('(')].strip(), func))
+    return functions
+
+
+def generate_contract_code(contract_details):
+    """
+    Generate the Solidity source for a token.
+    Mirrors generateContractCode in the deployment JavaScript, so both engines
+    produce identical source (and share compiled artifacts).
+
+    Args:
+        contract_details (dict): Token details - name and features are used
+
+    Returns:
+        str: Solidity source code
+    """
+    feature_names = get_feature_names(contract_details.get('features', []))
+    sorted_features = sorted(
+        feature_names,
+        key=lambda name: FEATURE_ORDER.index(name) if name in FEATURE_ORDER else len(FEATURE_ORDER)
+    )
+
+    has_access_control = 'Access Control' in sorted_features
+    has_pausable = 'Pausable' in sorted_features
+    has_burnable = 'Burnable' in sorted_features
+    has_mintable = 'Mintable' in sorted_features
+
+    imports = []
+    inheritance = ''
+    variables = ''
+    constructor_body = ''
+    # Keyed by function name so combined features don't declare a function twice
+    resolved_functions = {}
+
+    for feature_name in sorted_features:
+        template = FEATURE_TEMPLATES.get(feature_name)
+        if not template:
+            continue
+
+        for import_statement in template['imports']:
+            if import_statement not in imports:
+                imports.append(import_statement)
+
+        if template['inheritance'] and template['inheritance'] not in inheritance:
+            inheritance += template['inheritance']
+
+        variables += template['variables']
+        constructor_body += template['constructor_body']
+
+        if feature_name == 'Pausable' and has_access_control:
+            resolved_functions.update(ROLE_PAUSE_FUNCTIONS)
+        elif feature_name == 'Access Control':
+            for name, func in _split_functions(template['functions']):
+                # Only include role-restricted functions for features that were selected
+                if 'mint(' in func and not has_mintable:
+                    continue
+                if 'burn(' in func and not has_burnable:
+                    continue
+                if ('pause()' in func or 'unpause()' in func) and not has_pausable:
+                    continue
+                if '_beforeTokenTransfer' in func:
+                    continue
+                resolved_functions[name] = func
+        else:
+            for name, func in _split_functions(template['functions']):
+                if '_beforeTokenTransfer' in func:
+                    continue
+                resolved_functions[name] = func
+
+    if has_pausable:
+        resolved_functions['_beforeTokenTransfer'] = BEFORE_TOKEN_TRANSFER_FUNCTION
+
+    functions = '\n\n    '.join(resolved_functions.values())
+    token_name = re.sub(r'\s+', '', contract_details['name'])
+
+    constructor_initializers = ''
+    if has_access_control:
+        constructor_initializers += 'AccessControl()\n        '
+    if has_pausable:
+        constructor_initializers += 'Pausable()\n        '
+
+    return (CONTRACT_TEMPLATE
+            .replace('{{IMPORTS}}', '\n'.join(imports), 1)
+            .replace('{{TOKEN_NAME}}', token_name)
+            .replace('{{INHERITANCE}}', inheritance, 1)
+            .replace('{{VARIABLES}}', variables, 1)
+            .replace('{{CONSTRUCTOR_BODY}}', constructor_body, 1)
+            .replace('{{FUNCTIONS}}', functions, 1)
+            .replace('{{CONSTRUCTOR_INITIALIZERS}}', constructor_initializers, 1))
@@ -1,14 +1,70 @@
-import solcx
 from web3 import Web3
 import time
 
-from wallet import get_web3, sign_and_send_transaction, wait_for_transaction_receipt
+from wallet import get_web3, get_fee_fields, get_fee_oracle, get_gas_estimator, get_nonce_manager, sign_and_send_transaction, wait_for_transaction_receipt
 from storage import get_user_wallet, save_token_to_db
-from config import ERC20_BYTECODE
+from config import ERC20_BYTECODE, DEPLOY_ENGINES
 from contract_bridge import deploy_contract_with_js
+from native_deploy import deploy_contract_native
+from gas_estimator import DEFAULT_DEPLOY_GAS, deploy_shape
+from token_launcher import build_init_code, compile_token
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+def estimate_deploy_gas(web3, token_data, network, from_address):
+    """
+    Gas limit for deploying a token, from eth_estimateGas on the cached artifact's
+    bytecode and the constructor arguments.
+
+    Args:
+        web3 (Web3): Connection to the target network
+        token_data (dict): Token parameters collected by the bot
+        network (str): Target network, selects the deploy engine's artifact
+        from_address (str): Deployer address
+
+    Returns:
+        int: Gas limit including the safety margin; the gas recorded for the feature
+        set (or DEFAULT_DEPLOY_GAS) if the artifact or the estimate isn't available
+    """
+    estimator = get_gas_estimator(web3)
+    shape = deploy_shape(token_data['features'])
+    try:
+        artifact = compile_token(token_data['features'], network)
+        if not artifact.get('success'):
+            raise Exception(artifact.get('error', 'Compilation failed'))
+        init_code = build_init_code(artifact['bytecode'], artifact['abi'], [
+            token_data['name'],
+            token_data['symbol'],
+            int(token_data.get('decimals', 18) or 18),
+            int(token_data['total_supply']),
+            int(token_data.get('buy_tax', 0)),
+            int(token_data.get('sell_tax', 0)),
+            Web3.to_checksum_address(token_data.get('tax_wallet') or ZERO_ADDRESS)
+        ])
+    except Exception as e:
+        print(f"Deploy gas can't be estimated without the token artifact: {e}")
+        return estimator.get(shape, DEFAULT_DEPLOY_GAS)
+
+    return estimator.estimate(
+        shape,
+        lambda: web3.eth.estimate_gas({'from': from_address, 'data': Web3.to_hex(init_code)}),
+        DEFAULT_DEPLOY_GAS
+    )
 
 # Token deployment
-def deploy_token(user_id, token_data, network='polygon'):
+def deploy_token(user_id, token_data, network='polygon', progress=None):
+    """
+    Deploy a token with the user's wallet.
+
+    Args:
+        user_id: Telegram user ID
+        token_data (dict): Token parameters collected by the bot
+        network (str): Target network
+        progress (callable): Optional, called with status messages while deploying
+
+    Returns:
+        tuple: (contract_address, details dict) on success, (None, error message) on failure
+    """
     try:
         web3 = get_web3(network)
         user_wallet = get_user_wallet(user_id)
@@ -29,20 +85,22 @@ def deploy_token(user_id, token_data, network='polygon'):
         rpc_url = web3.provider.endpoint_uri
 
         # Calculate estimated gas for the transaction
-        gas_price = web3.eth.gas_price
-        gas_limit = 3000000  # Estimated gas limit for token deployment
+        fees = get_fee_oracle(web3).get_fees()
+        gas_price = fees['gas_price']
+        gas_limit = estimate_deploy_gas(web3, token_data, network, user_wallet['address'])
 
         # Calculate the total transaction cost in ETH/MATIC
         transaction_cost_wei = gas_price * gas_limit
         transaction_cost_eth = web3.from_wei(transaction_cost_wei, 'ether')
+        max_cost_wei = fees['max_fee'] * gas_limit
 
         # Get current balance
         current_balance_wei = web3.eth.get_balance(user_wallet['address'])
         current_balance_eth = web3.from_wei(current_balance_wei, 'ether')
 
         # Check if user has enough balance
-        if current_balance_wei < transaction_cost_wei:
-            return None, f"Insufficient balance. You need at least {transaction_cost_eth} {network.upper()} for gas fees. Current balance: {current_balance_eth} {network.upper()}"
+        if current_balance_wei < max_cost_wei:
+            return None, f"Insufficient balance. You need at least {web3.from_wei(max_cost_wei, 'ether')} {network.upper()} for gas fees. Current balance: {current_balance_eth} {network.upper()}"
 
         # Create deployment data for review
         deployment_details = {
@@ -61,13 +119,28 @@ def deploy_token(user_id, token_data, network='polygon'):
             'from_address': user_wallet['address']
         }
 
-        # Use the JavaScript bridge to deploy the contract
-        print(f"Deploying token {token_name} using JavaScript bridge...")
-        deployment_result = deploy_contract_with_js(
-            token_data,
-            user_wallet['private_key'],
-            rpc_url
-        )
+        if progress:
+            progress(f"🚀 Deploying {token_name} on {network.title()}...\n\n"
+                     f"⏳ Compiling and sending the deployment transaction...")
+
+        # Deploy with the engine configured for this network
+        if DEPLOY_ENGINES.get(network) == 'native':
+            print(f"Deploying token {token_name} in-process with py-solc-x...")
+            deployment_result = deploy_contract_native(
+                token_data,
+                user_wallet['private_key'],
+                web3
+            )
+        else:
+            print(f"Deploying token {token_name} using JavaScript bridge...")
+            deployment_result = deploy_contract_with_js(
+                token_data,
+                user_wallet['private_key'],
+                rpc_url,
+                get_fee_fields(web3)
+            )
+            # The Node.js engine sends from the same address, so the local nonce counter is stale
+            get_nonce_manager(web3).reset(Web3.to_checksum_address(user_wallet['address']))
 
         if not deployment_result.get('success', False):
             error_message = deployment_result.get('error', 'Unknown deployment error')
@@ -89,6 +162,11 @@ def deploy_token(user_id, token_data, network='polygon'):
 
         print(f"Contract deployed at: {contract_address}")
 
+        # Remember what this feature set really costs for the next preview
+        gas_used = deployment_result.get('deployedContract', {}).get('gasUsed')
+        if gas_used:
+            get_gas_estimator(web3).record(deploy_shape(features), int(gas_used))
+
         # Save token to database
         save_token_to_db(user_id, token_data, contract_address, network)
 
@@ -0,0 +1,166 @@
+import threading
+import time
+
+
+class PrefixTrie:
+    """Callback-data prefixes; a lookup walks the data once, however many prefixes there are"""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, prefix, value):
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(None, []).append(value)
+
+    def matches(self, data):
+        """Values of every prefix of data"""
+        found = []
+        node = self.root
+        for char in data:
+            node = node.get(char)
+            if node is None:
+                break
+            found.extend(node.get(None, ()))
+        return found
+
+
+def extract_command(text):
+    """Command name of a message like '/start@MyBot args', or None (same rule as telebot)"""
+    if not text or not text.startswith('/'):
+        return None
+    return text.split()[0].split('@')[0][1:]
+
+
+class DispatchRouter:
+    """
+    Routes updates to handlers through indexes instead of testing every handler's
+    predicate in turn: messages by command, exact text and conversation state,
+    callback queries by exact data and by data prefix.
+
+    When several handlers match, the one declared first wins, as with telebot's
+    own handler list. A handler can add a predicate (func) that is checked only
+    once its index matches.
+    """
+
+    def __init__(self, get_state):
+        self.get_state = get_state
+
+        self._order = 0
+        self._commands = {}
+        self._texts = {}
+        self._states = {}
+        self._callback_data = {}
+        self._callback_prefixes = PrefixTrie()
+        self._stats_lock = threading.Lock()
+        self.stats = {'messages': 0, 'callbacks': 0, 'unmatched': 0, 'routing_us': 0.0}
+
+    def _add(self, index, key, func):
+        def decorator(handler):
+            self._order += 1
+            index.setdefault(key, []).append((self._order, handler, func))
+            return handler
+        return decorator
+
+    def message_command(self, *commands):
+        """Handle /command messages"""
+        def decorator(handler):
+            for command in commands:
+                self._add(self._commands, command, None)(handler)
+            return handler
+        return decorator
+
+    def message_text(self, text):
+        """Handle messages whose text is exactly text, e.g. a keyboard button"""
+        return self._add(self._texts, text, None)
+
+    def message_state(self, state, func=None):
+        """Handle messages from users in a conversation state"""
+        return self._add(self._states, state, func)
+
+    def callback_data(self, data):
+        """Handle callback queries whose data is exactly data"""
+        return self._add(self._callback_data, data, None)
+
+    def callback_prefix(self, prefix):
+        """Handle callback queries whose data starts with prefix"""
+        def decorator(handler):
+            self._order += 1
+            self._callback_prefixes.add(prefix, (self._order, handler, None))
+            return handler
+        return decorator
+
+    @staticmethod
+    def _first_match(candidates, update):
+        for _, handler, func in sorted(candidates, key=lambda candidate: candidate[0]):
+            if func is None or func(update):
+                return handler
+        return None
+
+    def route_message(self, message):
+        """Handler for a text message, or None"""
+        text = message.text
+        candidates = list(self._texts.get(text, ()))
+
+        command = extract_command(text)
+        if command is not None:
+            candidates.extend(self._commands.get(command, ()))
+
+        if self._states:
+            state = self.get_state(message.from_user.id)
+            if state is not None:
+                candidates.extend(self._states.get(state, ()))
+        return self._first_match(candidates, message)
+
+    def route_callback_query(self, call):
+        """Handler for a callback query, or None"""
+        data = call.data or ''
+        candidates = list(self._callback_data.get(data, ()))
+        candidates.extend(self._callback_prefixes.matches(data))
+        return self._first_match(candidates, call)
+
+    def _timed_route(self, route, update, kind):
+        started = time.perf_counter()
+        handler = route(update)
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        with self._stats_lock:
+            self.stats[kind] += 1
+            self.stats['routing_us'] += elapsed_us
+            if handler is None:
+                self.stats['unmatched'] += 1
+        return handler
+
+    def register(self, bot):
+        """
+        Install the router on a TeleBot as one message and one callback query handler.
+        Each exposes its (timed) route function as .route, for runtimes that call
+        the chosen handler themselves.
+        """
+        def route_message(message):
+            return self._timed_route(self.route_message, message, 'messages')
+
+        def route_callback_query(call):
+            return self._timed_route(self.route_callback_query, call, 'callbacks')
+
+        def dispatch_message(message):
+            handler = route_message(message)
+            if handler is not None:
+                handler(message)
+
+        def dispatch_callback_query(call):
+            handler = route_callback_query(call)
+            if handler is not None:
+                handler(call)
+
+        dispatch_message.route = route_message
+        dispatch_callback_query.route = route_callback_query
+        bot.register_message_handler(dispatch_message, content_types=['text'])
+        bot.register_callback_query_handler(dispatch_callback_query, func=lambda call: True)
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        updates = stats['messages'] + stats['callbacks']
+        stats['avg_routing_us'] = round(stats.pop('routing_us') / updates, 1) if updates else 0.0
+        return stats
@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class FeeOracle:
+    """
+    Per-network fee suggestions, refreshed at most once per block.
+
+    One eth_feeHistory call yields the next block's base fee and the recent
+    priority fees paid at reward_percentile. Callers within min_refresh seconds
+    of the last check get the cached values without any RPC; after that only
+    the block number is checked, and fee history is fetched again once a new
+    block has arrived. Chains without EIP-1559 fall back to eth_gasPrice.
+    """
+
+    def __init__(self, web3, history_blocks=10, reward_percentile=50, base_fee_multiplier=2,
+                 min_refresh=2.0):
+        self.web3 = web3
+        self.history_blocks = history_blocks
+        self.reward_percentile = reward_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_refresh = min_refresh
+
+        self._fees = None
+        self._block = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'refreshes': 0, 'block_checks': 0}
+
+    def get_fees(self):
+        """
+        Current fee suggestion.
+
+        Returns:
+            dict: eip1559, base_fee, max_priority_fee, max_fee and gas_price (all in wei).
+                  max_fee is what a transaction may pay at most, gas_price the
+                  expected price per gas (base fee + priority fee, or eth_gasPrice).
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            if self._fees is not None and now - self._checked_at < self.min_refresh:
+                return self._fees
+
+            if self._fees is not None:
+                self.stats['block_checks'] += 1
+                if self.web3.eth.block_number == self._block:
+                    self._checked_at = now
+                    return self._fees
+
+            self._fees, self._block = self._fetch()
+            self._checked_at = time.monotonic()
+            self.stats['refreshes'] += 1
+            return self._fees
+
+    def _fetch(self):
+        try:
+            history = self.web3.eth.fee_history(self.history_blocks, 'latest', [self.reward_percentile])
+            base_fees = history['baseFeePerGas']
+        except Exception as e:
+            print(f"eth_feeHistory unavailable, using eth_gasPrice: {e}")
+            base_fees = None
+
+        if not base_fees or not base_fees[-1]:
+            gas_price = self.web3.eth.gas_price
+            fees = {
+                'eip1559': False,
+                'base_fee': 0,
+                'max_priority_fee': 0,
+                'max_fee': gas_price,
+                'gas_price': gas_price
+            }
+            return fees, self.web3.eth.block_number
+
+        # The last entry is the base fee of the block being built
+        next_base_fee = base_fees[-1]
+        rewards = sorted(block_rewards[0] for block_rewards in history.get('reward') or [] if block_rewards)
+        rewards = [reward for reward in rewards if reward > 0]
+        if rewards:
+            priority_fee = rewards[len(rewards) // 2]
+        else:
+            priority_fee = self.web3.eth.max_priority_fee
+
+        fees = {
+            'eip1559': True,
+            'base_fee': next_base_fee,
+            'max_priority_fee': priority_fee,
+            'max_fee': next_base_fee * self.base_fee_multiplier + priority_fee,
+            'gas_price': next_base_fee + priority_fee
+        }
+        latest_block = history['oldestBlock'] + len(base_fees) - 2
+        return fees, latest_block
+
+    def transaction_fields(self):
+        """Fee fields for a transaction dict: maxFeePerGas/maxPriorityFeePerGas, or gasPrice"""
+        fees = self.get_fees()
+        if fees['eip1559']:
+            return {
+                'maxFeePerGas': fees['max_fee'],
+                'maxPriorityFeePerGas': fees['max_priority_fee']
+            }
+        return {'gasPrice': fees['gas_price']}
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'block': self._block}
@@ -0,0 +1,93 @@
+import threading
+import time
+
+
+class GasEstimator:
+    """
+    Gas limits from eth_estimateGas plus a safety margin, remembered per call shape.
+
+    A shape key identifies transactions that cost about the same, e.g.
+    ('deploy', features) or ('pool_multicall', pool_exists). The last estimate
+    (or gas actually used, see record()) for a shape is kept for ttl seconds and
+    serves previews and real transactions that can't be estimated - for example
+    a mint sent right behind its not yet mined approval.
+    """
+
+    def __init__(self, margin=0.2, ttl=3600):
+        self.margin = margin
+        self.ttl = ttl
+
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.stats = {'estimates': 0, 'failures': 0, 'cache_hits': 0, 'defaults': 0}
+
+    def _with_margin(self, gas):
+        return int(gas * (1 + self.margin))
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def record(self, key, gas):
+        """Remember the gas a shape needed (an estimate or a receipt's gasUsed)"""
+        with self._lock:
+            self._cache[key] = (int(gas), time.monotonic())
+
+    def get(self, key, default):
+        """
+        Gas limit from the last estimate for a shape, without an RPC call.
+
+        Args:
+            key (tuple): Call shape
+            default (int): Limit used until the shape has been estimated once
+
+        Returns:
+            int: Gas limit including the safety margin
+        """
+        with self._lock:
+            gas = self._cached(key)
+            if gas is None:
+                self.stats['defaults'] += 1
+                return default
+            self.stats['cache_hits'] += 1
+        return self._with_margin(gas)
+
+    def estimate(self, key, estimate_gas, default):
+        """
+        Gas limit for a transaction from eth_estimateGas, for its preview or before sending it.
+
+        Args:
+            key (tuple): Call shape
+            estimate_gas (callable): Runs eth_estimateGas for the transaction
+            default (int): Limit used if estimation fails and nothing is cached
+
+        Returns:
+            int: Gas limit including the safety margin
+        """
+        try:
+            gas = estimate_gas()
+        except Exception as e:
+            print(f"Gas estimation failed for {key[0]}: {e}")
+            with self._lock:
+                self.stats['failures'] += 1
+            return self.get(key, default)
+
+        with self._lock:
+            self.stats['estimates'] += 1
+        self.record(key, gas)
+        return self._with_margin(gas)
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'shapes': len(self._cache)}
+
+
+# Gas of a token deployment when it can't be estimated and none has been measured yet
+DEFAULT_DEPLOY_GAS = 3000000
+
+
+def deploy_shape(features):
+    """Shape key for token deployments - the bytecode depends only on the feature set"""
+    return ('deploy', tuple(sorted(features or [])))
@@ -0,0 +1,182 @@
+import atexit
+import itertools
+import queue
+import threading
+import time
+
+from config import JOB_WORKERS, JOB_PER_USER_LIMIT, JOB_QUEUE_SIZE
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """A long-running operation submitted on behalf of a user"""
+
+    def __init__(self, job_id, user_id, name, fn, on_progress=None):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.name = name
+        self.fn = fn
+        self.on_progress = on_progress
+        self.state = QUEUED
+        self.error = None
+        self.last_progress = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def report(self, message):
+        """Pass a progress message to the job's progress callback, skipping repeats"""
+        if self.on_progress is None or message == self.last_progress:
+            return
+        self.last_progress = message
+        try:
+            self.on_progress(message)
+        except Exception as e:
+            print(f"Error reporting progress for job {self.name}#{self.job_id}: {e}")
+
+
+class JobExecutor:
+    """
+    Fixed pool of worker threads with a bounded queue.
+
+    Each user can have at most per_user_limit jobs queued or running, so one
+    user's slow deploy neither blocks other users nor races their own nonces.
+    """
+
+    def __init__(self, max_workers=4, per_user_limit=1, max_queue=100):
+        self.max_workers = max_workers
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._workers = []
+        self._active_by_user = {}
+        self._queued = 0
+        self._running = 0
+        self._stopped = False
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'wait_time': 0.0}
+
+    def start(self):
+        """Start the workers; a shut down executor stays stopped"""
+        with self._lock:
+            if self._workers or self._stopped:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, user_id, name, fn, on_progress=None):
+        """
+        Queue a job.
+
+        Args:
+            user_id: Owner of the job, used for the per-user limit
+            name (str): Job name for logs and stats
+            fn (callable): Called with the Job once a worker picks it up
+            on_progress (callable): Optional, called with progress messages from job.report
+
+        Returns:
+            dict: {'success': True, 'job': Job} or {'success': False, 'error': str}
+        """
+        self.start()
+        with self._lock:
+            if self._stopped:
+                return {'success': False, 'error': "The bot is shutting down. Please try again later."}
+            if self._active_by_user.get(user_id, 0) >= self.per_user_limit:
+                self._stats['rejected'] += 1
+                return {'success': False, 'error': "You already have an operation in progress. Please wait for it to finish."}
+            if self._queued >= self.max_queue:
+                self._stats['rejected'] += 1
+                return {'success': False, 'error': "The bot is busy right now. Please try again in a minute."}
+
+            job = Job(next(self._ids), user_id, name, fn, on_progress)
+            self._active_by_user[user_id] = self._active_by_user.get(user_id, 0) + 1
+            self._queued += 1
+            self._stats['submitted'] += 1
+
+        self._queue.put(job)
+        return {'success': True, 'job': job}
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run(job)
+
+    def _run(self, job):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            job.started_at = time.monotonic()
+            self._stats['wait_time'] += job.started_at - job.submitted_at
+        job.state = RUNNING
+
+        try:
+            job.fn(job)
+            job.state = DONE
+        except Exception as e:
+            print(f"Job {job.name}#{job.job_id} for user {job.user_id} failed: {e}")
+            job.error = e
+            job.state = FAILED
+        finally:
+            job.finished_at = time.monotonic()
+            with self._lock:
+                self._running -= 1
+                self._stats['completed' if job.state == DONE else 'failed'] += 1
+                remaining = self._active_by_user.get(job.user_id, 1) - 1
+                if remaining:
+                    self._active_by_user[job.user_id] = remaining
+                else:
+                    self._active_by_user.pop(job.user_id, None)
+
+    def get_stats(self):
+        with self._lock:
+            started = self._stats['completed'] + self._stats['failed'] + self._running
+            return {
+                'workers': len(self._workers),
+                'queued': self._queued,
+                'running': self._running,
+                'active_users': len(self._active_by_user),
+                'submitted': self._stats['submitted'],
+                'completed': self._stats['completed'],
+                'failed': self._stats['failed'],
+                'rejected': self._stats['rejected'],
+                'avg_wait_ms': round(self._stats['wait_time'] / started * 1000, 1) if started else 0
+            }
+
+    def shutdown(self, wait=True, timeout=None):
+        """Stop accepting jobs and let the workers finish what is already queued"""
+        with self._lock:
+            self._stopped = True
+            workers = self._workers
+            self._workers = []
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join(timeout)
+
+
+_job_executor = None
+_job_executor_lock = threading.Lock()
+
+
+def get_job_executor():
+    """Shared executor for chain-mutating bot operations"""
+    global _job_executor
+
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = JobExecutor(JOB_WORKERS, JOB_PER_USER_LIMIT, JOB_QUEUE_SIZE)
+            _job_executor.start()
+            atexit.register(_job_executor.shutdown, True, 5)
+    return _job_executor
@@ -1,9 +1,33 @@
 import time
+
+# Taken before the other imports so the startup report includes them
+STARTUP_STARTED = time.perf_counter()
+
+import asyncio
 import subprocess
 import sys
 import os
-from storage import init_data_storage
-from bot import bot
+import threading
+from telebot import types
+from config import (
+    PREWARM_ARTIFACT_CACHE, DEPLOY_ENGINES, BOT_RUNTIME, BOT_UPDATE_MODE, FAST_START,
+    WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_WORKERS
+)
+from storage import init_data_storage, claim_update
+from bot import bot, BOT_COMMANDS
+
+startup_steps = []
+
+def mark_startup(step):
+    """Record how long a startup step took, measured from the previous one"""
+    now = time.perf_counter()
+    previous = startup_steps[-1][1] if startup_steps else STARTUP_STARTED
+    startup_steps.append((step, now, now - previous))
+
+def print_startup_report():
+    total = time.perf_counter() - STARTUP_STARTED
+    steps = ", ".join(f"{step} {duration:.2f}s" for step, _, duration in startup_steps)
+    print(f"⏱️ Ready to serve after {total:.2f}s ({steps})")
 
 def check_dependencies():
     """Check if all required dependencies are installed"""
@@ -105,37 +129,150 @@ def check_dependencies():
         
     return True
 
+def prepare_deploy_engines():
+    """Install the Node.js toolchain, start the deployment workers and fetch solc"""
+    # Imported here so fast-start doesn't pay for them before serving
+    from toolchain import ensure_toolchain
+    from contract_bridge import get_worker_pool, prewarm_artifact_cache
+    from native_deploy import ensure_solc
+
+    # Install the shared Node.js toolchain once, so deployments don't run npm install
+    try:
+        toolchain_path = ensure_toolchain()
+        print(f"✅ Node.js toolchain ready: {toolchain_path}")
+    except Exception as e:
+        print(f"⚠️ Node.js toolchain could not be prepared: {e}")
+        print("It will be installed again on the first deployment.")
+
+    # Start the Node.js deployment workers so solc is loaded before the first deploy
+    if 'node' in DEPLOY_ENGINES.values():
+        try:
+            pool = get_worker_pool()
+            print(f"✅ {pool.size} Node.js deployment workers running")
+
+            # Compile all feature combinations in the background so deploys skip compilation
+            if PREWARM_ARTIFACT_CACHE:
+                threading.Thread(target=prewarm_artifact_cache, daemon=True).start()
+        except Exception as e:
+            print(f"⚠️ Node.js deployment workers could not be started: {e}")
+            print("They will be started again on the first deployment.")
+
+    # Install the solc binary for networks that deploy in-process
+    if 'native' in DEPLOY_ENGINES.values():
+        threading.Thread(target=ensure_solc, daemon=True).start()
+
+def warm_chain_imports():
+    """Load web3 and eth_account, which bot.py imports on first use, ahead of the first chain action"""
+    started = time.perf_counter()
+    import wallet  # noqa: F401
+    print(f"✅ Chain libraries loaded in {time.perf_counter() - started:.2f}s")
+
+def run_background_startup(set_commands):
+    """Fast-start: dependency checks and deploy engine warm-up after the bot is serving"""
+    started = time.perf_counter()
+    if not check_dependencies():
+        print("⚠️ Missing required dependencies - deployments with the Node.js engine will fail.")
+    prepare_deploy_engines()
+    if set_commands:
+        bot.set_my_commands([types.BotCommand(command, description) for command, description in BOT_COMMANDS])
+        print("✅ Bot commands set")
+    warm_chain_imports()
+    print(f"⏱️ Background startup finished in {time.perf_counter() - started:.2f}s")
+
+def start_serving(fast_start, set_commands=True):
+    """Called right before the bot starts receiving updates"""
+    print_startup_report()
+    if fast_start:
+        threading.Thread(
+            target=run_background_startup,
+            args=(set_commands,),
+            name="background-startup",
+            daemon=True
+        ).start()
+
 if __name__ == "__main__":
     print("🚀 Starting Token Deployer Bot...")
+    mark_startup("imports")
 
-    # Check dependencies
-    if not check_dependencies():
-        print("❌ Missing required dependencies. Please install them and try again.")
-        sys.exit(1)
+    fast_start = FAST_START or '--fast-start' in sys.argv
+
+    if not fast_start:
+        # Check dependencies
+        if not check_dependencies():
+            print("❌ Missing required dependencies. Please install them and try again.")
+            sys.exit(1)
+        mark_startup("dependency checks")
+
+        prepare_deploy_engines()
+        mark_startup("deploy engines")
+
+        warm_chain_imports()
+        mark_startup("chain libraries")
 
     # Initialize data storage
     init_data_storage()
     print("✅ Data storage initialized")
+    mark_startup("storage")
+
+    if BOT_RUNTIME == 'async' or '--async' in sys.argv:
+        from async_bot import run_async_bot
+
+        print("🤖 Bot is running on the async runtime...")
+        # The async runtime sets its own commands
+        start_serving(fast_start, set_commands=False)
+        try:
+            asyncio.run(run_async_bot())
+        except Exception as e:
+            print(f"Bot error: {str(e)}")
+            print("Bot stopped")
+        sys.exit(0)
+
+    if not fast_start:
+        # Set bot commands
+        bot.set_my_commands([types.BotCommand(command, description) for command, description in BOT_COMMANDS])
+
+        print("✅ Bot commands set")
+        mark_startup("bot commands")
+
+    if BOT_UPDATE_MODE == 'webhook':
+        from webhook import UpdateDeduplicator, WebhookServer
+
+        # Only one of several processes needs WEBHOOK_URL set to register the webhook
+        if WEBHOOK_URL:
+            bot.set_webhook(url=WEBHOOK_URL, secret_token=WEBHOOK_SECRET)
+            print(f"✅ Webhook registered: {WEBHOOK_URL}")
+
+        server = WebhookServer(
+            lambda update: bot.process_new_updates([types.Update.de_json(update)]),
+            host=WEBHOOK_HOST,
+            port=WEBHOOK_PORT,
+            path=WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET,
+            workers=WEBHOOK_WORKERS,
+            deduplicator=UpdateDeduplicator(claim_update=claim_update)
+        )
+        mark_startup("webhook server")
+        print(f"🤖 Bot is receiving updates on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}...")
+        start_serving(fast_start)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print("Bot stopped")
+        sys.exit(0)
 
-    # Set bot commands
-    bot.set_my_commands([
-        ("start", "Start the bot and show main menu"),
-        ("help", "Show help and instructions"),
-        ("tokens", "View your created tokens"),
-        ("wallet", "Wallet management"),
-        ("balance", "Check your wallet balance"),
-        ("renounce", "Renounce contract ownership"),
-        ("debug", "Show debug information")
-    ])
-
-    print("✅ Bot commands set")
     print("🤖 Bot is running...")
 
     # Remove webhook to avoid conflicts
     bot.remove_webhook()
-    time.sleep(0.5)
+    if not fast_start:
+        time.sleep(0.5)
+    mark_startup("webhook removal")
 
     # Start polling
+    start_serving(fast_start)
     try:
         bot.infinity_polling(none_stop=True, timeout=60)
     except Exception as e:
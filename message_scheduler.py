@@ -0,0 +1,281 @@
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+
+class TokenBucket:
+    """Allows rate operations per second on average, with bursts of up to capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class PendingMessage:
+    """
+    Result of a queued request. chat.id is known straight away; message_id and
+    result() wait until Telegram has answered.
+    """
+
+    def __init__(self, chat_id):
+        self.chat = SimpleNamespace(id=chat_id)
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def _resolve(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Telegram's response; raises the request's error if it failed"""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Message not sent yet")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    @property
+    def message_id(self):
+        return self.result().message_id
+
+
+def retry_after(error):
+    """Seconds Telegram asked us to wait if error is a 429 Too Many Requests, else None"""
+    if getattr(error, 'error_code', None) != 429:
+        return None
+    parameters = (getattr(error, 'result_json', None) or {}).get('parameters') or {}
+    return parameters.get('retry_after', 1)
+
+
+class MessageScheduler:
+    """
+    Outbound queue for Telegram requests, so handlers don't wait on Telegram
+    or get stuck behind its rate limits.
+
+    Requests are sent by a few sender threads, in order within each chat and
+    within a global and a per-chat token bucket. A queued edit of a message is
+    replaced by a newer edit of the same message if nothing was queued for the
+    chat in between, so only the latest text is sent. A 429 pauses the chat for
+    the retry_after Telegram asked for, and the request is sent again.
+    """
+
+    def __init__(self, bot, global_rate=30, chat_rate=1, chat_burst=3, senders=4, max_retries=5,
+                 max_idle_chats=1000):
+        self.bot = bot
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.senders = senders
+        self.max_retries = max_retries
+        self.max_idle_chats = max_idle_chats
+
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chats = {}
+        self._ready = deque()
+        self._edits = {}
+        self._condition = threading.Condition()
+        self._workers = []
+        self._stopped = False
+        self.stats = {'sent': 0, 'coalesced': 0, 'rate_limited': 0, 'failed': 0}
+
+    def start(self):
+        with self._condition:
+            if self._workers:
+                return
+            self._stopped = False
+            for i in range(self.senders):
+                worker = threading.Thread(target=self._sender_loop, name=f"telegram-sender-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _chat(self, chat_id):
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            if len(self._chats) >= self.max_idle_chats:
+                self._forget_idle_chats()
+            chat = SimpleNamespace(
+                queue=deque(),
+                bucket=TokenBucket(self.chat_rate, self.chat_burst),
+                paused_until=0.0,
+                busy=False)
+            self._chats[chat_id] = chat
+        return chat
+
+    def _forget_idle_chats(self):
+        """Drop chats with nothing queued whose limits have fully recovered"""
+        now = time.monotonic()
+        for chat_id, chat in list(self._chats.items()):
+            if (not chat.queue and not chat.busy and chat.paused_until <= now
+                    and chat.bucket.wait_time(now) == 0 and chat.bucket.tokens >= chat.bucket.capacity):
+                del self._chats[chat_id]
+
+    def _enqueue(self, chat_id, method, args, kwargs, edit_key=None):
+        self.start()
+        with self._condition:
+            if edit_key is not None:
+                queued = self._edits.get(edit_key)
+                if queued is not None and self._chat(chat_id).queue[-1] is queued:
+                    # Latest wins: the queued edit goes out with the new content. Only at the
+                    # tail of the chat queue, or it would overtake requests queued after it
+                    queued.args, queued.kwargs = args, kwargs
+                    self.stats['coalesced'] += 1
+                    return queued.pending
+
+            request = SimpleNamespace(
+                method=method, args=args, kwargs=kwargs, edit_key=edit_key,
+                pending=PendingMessage(chat_id), attempts=0)
+            chat = self._chat(chat_id)
+            chat.queue.append(request)
+            if edit_key is not None:
+                self._edits[edit_key] = request
+            if len(chat.queue) == 1 and not chat.busy:
+                self._ready.append(chat_id)
+            self._condition.notify()
+            return request.pending
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Queue bot.send_message; returns a PendingMessage"""
+        return self._enqueue(chat_id, 'send_message', (chat_id, text), kwargs)
+
+    def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        """
+        Queue bot.edit_message_text, replacing a queued edit of the same message.
+
+        Args:
+            text (str): New text
+            chat_id (int): Chat of the message
+            message_id: Message id, or the PendingMessage of a message queued with send_message
+
+        Returns:
+            PendingMessage: Resolves once the (latest) edit has been sent
+        """
+        key = id(message_id) if isinstance(message_id, PendingMessage) else message_id
+        return self._enqueue(chat_id, 'edit_message_text', (text, chat_id, message_id), kwargs,
+                             edit_key=(chat_id, key))
+
+    def delete_message(self, chat_id, message_id):
+        """Queue bot.delete_message"""
+        return self._enqueue(chat_id, 'delete_message', (chat_id, message_id), {})
+
+    def _next_request(self):
+        """Take the next sendable request, or return how long to wait for one"""
+        now = time.monotonic()
+        wait = None
+        for _ in range(len(self._ready)):
+            chat_id = self._ready.popleft()
+            chat = self._chats[chat_id]
+            delay = max(chat.paused_until - now, chat.bucket.wait_time(now),
+                        self._global_bucket.wait_time(now))
+            if delay > 0:
+                self._ready.append(chat_id)
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            chat.bucket.take(now)
+            self._global_bucket.take(now)
+            chat.busy = True
+            request = chat.queue.popleft()
+            if request.edit_key is not None and self._edits.get(request.edit_key) is request:
+                del self._edits[request.edit_key]
+            return chat_id, request, None
+        return None, None, wait
+
+    def _sender_loop(self):
+        while True:
+            with self._condition:
+                while True:
+                    chat_id, request, wait = self._next_request()
+                    if request is not None:
+                        break
+                    if self._stopped and not self._ready:
+                        return
+                    self._condition.wait(wait if wait is not None else 1.0)
+            self._send(chat_id, request)
+
+    def _send(self, chat_id, request):
+        request.attempts += 1
+        try:
+            # An edit of a message queued with send_message: the send went first and its
+            # PendingMessage is resolved before the chat is released, so this doesn't block
+            args = tuple(
+                arg.message_id if isinstance(arg, PendingMessage) else arg
+                for arg in request.args
+            )
+            result = getattr(self.bot, request.method)(*args, **request.kwargs)
+        except Exception as e:
+            wait = retry_after(e)
+            with self._condition:
+                chat = self._chats[chat_id]
+                if wait is not None and request.attempts <= self.max_retries:
+                    print(f"Telegram rate limit in chat {chat_id}, retrying in {wait}s")
+                    self.stats['rate_limited'] += 1
+                    chat.paused_until = time.monotonic() + wait
+                    superseded = request.edit_key is not None and request.edit_key in self._edits
+                    if not superseded:
+                        chat.queue.appendleft(request)
+                        if request.edit_key is not None:
+                            self._edits[request.edit_key] = request
+                    if superseded:
+                        # A newer edit of the same message is queued and will be sent instead
+                        request.pending._resolve()
+                    self._release(chat_id, chat)
+                    return
+                print(f"Error in {request.method} for chat {chat_id}: {e}")
+                self.stats['failed'] += 1
+                request.pending._resolve(error=e)
+                self._release(chat_id, chat)
+            return
+
+        with self._condition:
+            self.stats['sent'] += 1
+            request.pending._resolve(result=result)
+            self._release(chat_id, self._chats[chat_id])
+
+    def _release(self, chat_id, chat):
+        """Let the chat's next request go (caller holds the condition)"""
+        chat.busy = False
+        if chat.queue:
+            self._ready.append(chat_id)
+            self._condition.notify()
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                **self.stats,
+                'queued': sum(len(chat.queue) for chat in self._chats.values()),
+                'active_chats': sum(1 for chat in self._chats.values() if chat.queue or chat.busy)
+            }
+
+    def shutdown(self, wait=True, timeout=None):
+        """Stop the senders once everything queued has been sent"""
+        with self._condition:
+            self._stopped = True
+            workers = self._workers
+            self._workers = []
+            self._condition.notify_all()
+        if wait:
+            for worker in workers:
+                worker.join(timeout)
@@ -0,0 +1,160 @@
+from eth_abi import encode, decode
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from abi_codec import get_codec
+from config import MULTICALL3_ADDRESS, MULTICALL_BATCH_SIZE
+
+# aggregate3((address target, bool allowFailure, bytes callData)[]) returns (bool success, bytes returnData)[]
+AGGREGATE3_SELECTOR = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+
+def _normalize(entry, value):
+    """Checksum decoded addresses, like web3's contract calls do"""
+    if entry["type"] == "address":
+        return Web3.to_checksum_address(value)
+    if entry["type"] == "tuple":
+        return tuple(_normalize(component, item) for component, item in zip(entry["components"], value))
+    if entry["type"].endswith("[]"):
+        item_entry = dict(entry, type=entry["type"][:-2])
+        return [_normalize(item_entry, item) for item in value]
+    return value
+
+
+class Call:
+    """One contract read to be batched through Multicall3"""
+
+    def __init__(self, address, abi, function_name, args=()):
+        self.address = Web3.to_checksum_address(address)
+        self.function_name = function_name
+        self.codec = get_codec(abi).function(function_name)
+        self.call_data = self.codec.encode(*args)
+
+    def decode(self, return_data):
+        """Decode return data the way ContractFunction.call() would"""
+        values = self.codec.decode_output(return_data)
+        values = [_normalize(entry, value) for entry, value in zip(self.codec.outputs, values)]
+        return values[0] if len(values) == 1 else values
+
+
+# Per-call outcome from aggregate_with_status: the call ran (its value may still be None when the
+# contract returned nothing), reverted, or wasn't answered because the RPC failed
+OK = 'ok'
+REVERTED = 'reverted'
+ERROR = 'error'
+
+
+def _decode_or_none(call, success, return_data):
+    if not success or not return_data:
+        return REVERTED, None
+    try:
+        return OK, call.decode(return_data)
+    except Exception as e:
+        print(f"Error decoding {call.function_name} result: {e}")
+        return REVERTED, None
+
+
+def _call_sequentially(web3, calls, block_identifier):
+    results = []
+    for call in calls:
+        try:
+            return_data = web3.eth.call({"to": call.address, "data": call.call_data}, block_identifier)
+            results.append(_decode_or_none(call, True, bytes(return_data)))
+        except ContractLogicError as e:
+            print(f"{call.function_name} reverted: {e}")
+            results.append((REVERTED, None))
+        except Exception as e:
+            print(f"Error calling {call.function_name}: {e}")
+            results.append((ERROR, None))
+    return results
+
+
+async def _call_sequentially_async(web3, calls, block_identifier):
+    results = []
+    for call in calls:
+        try:
+            return_data = await web3.eth.call({"to": call.address, "data": call.call_data}, block_identifier)
+            results.append(_decode_or_none(call, True, bytes(return_data)))
+        except ContractLogicError as e:
+            print(f"{call.function_name} reverted: {e}")
+            results.append((REVERTED, None))
+        except Exception as e:
+            print(f"Error calling {call.function_name}: {e}")
+            results.append((ERROR, None))
+    return results
+
+
+def _batches(calls):
+    """(batch, aggregate3 call data) for every MULTICALL_BATCH_SIZE calls"""
+    for start in range(0, len(calls), MULTICALL_BATCH_SIZE):
+        batch = calls[start:start + MULTICALL_BATCH_SIZE]
+        call_data = AGGREGATE3_SELECTOR + encode(
+            ["(address,bool,bytes)[]"],
+            [[(call.address, True, call.call_data) for call in batch]]
+        )
+        yield batch, call_data
+
+
+def aggregate_with_status(web3, calls, block_identifier='latest'):
+    """
+    Run many contract reads in as few eth_calls as possible, reporting how each one went.
+
+    Args:
+        web3 (Web3): Connection to the network
+        calls (list): Call objects
+        block_identifier: Block to read at, so every batch sees the same state
+
+    Returns:
+        list: (status, value) per call; status is OK, REVERTED or ERROR and value is None unless OK
+    """
+    results = []
+    for batch, call_data in _batches(calls):
+        try:
+            return_data = web3.eth.call({"to": MULTICALL3_ADDRESS, "data": call_data}, block_identifier)
+            (responses,) = decode(["(bool,bytes)[]"], bytes(return_data))
+        except Exception as e:
+            # Multicall3 missing on this chain or the RPC rejected the batch
+            print(f"Multicall failed, falling back to individual calls: {e}")
+            results.extend(_call_sequentially(web3, batch, block_identifier))
+            continue
+
+        for call, (success, data) in zip(batch, responses):
+            results.append(_decode_or_none(call, success, data))
+    return results
+
+
+def aggregate(web3, calls, block_identifier='latest'):
+    """
+    Run many contract reads in as few eth_calls as possible.
+
+    Args:
+        web3 (Web3): Connection to the network
+        calls (list): Call objects
+        block_identifier: Block to read at, so every batch sees the same state
+
+    Returns:
+        list: Decoded result per call, or None for calls that reverted or couldn't be made
+    """
+    return [value for _, value in aggregate_with_status(web3, calls, block_identifier)]
+
+
+async def aggregate_with_status_async(web3, calls, block_identifier='latest'):
+    """aggregate_with_status for AsyncWeb3"""
+    results = []
+    for batch, call_data in _batches(calls):
+        try:
+            return_data = await web3.eth.call({"to": MULTICALL3_ADDRESS, "data": call_data}, block_identifier)
+            (responses,) = decode(["(bool,bytes)[]"], bytes(return_data))
+        except Exception as e:
+            print(f"Multicall failed, falling back to individual calls: {e}")
+            results.extend(await _call_sequentially_async(web3, batch, block_identifier))
+            continue
+
+        for call, (success, data) in zip(batch, responses):
+            results.append(_decode_or_none(call, success, data))
+    return results
+
+
+async def aggregate_async(web3, calls, block_identifier='latest'):
+    """aggregate for AsyncWeb3"""
+    return [value for _, value in await aggregate_with_status_async(web3, calls, block_identifier)]
@@ -0,0 +1,198 @@
+import threading
+
+from eth_account import Account
+
+from artifact_cache import CANONICAL_CONTRACT_NAME, get_artifact_cache, get_cache_key
+from config import SOLC_VERSION
+from contract_template import OPTIMIZATION_SETTINGS, generate_contract_code
+from gas_estimator import DEFAULT_DEPLOY_GAS, deploy_shape
+from toolchain import ensure_toolchain, get_node_modules_path
+from wallet import get_fee_fields, get_gas_estimator, send_transaction_with_nonce, wait_for_transaction_receipt
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+_solc_lock = threading.Lock()
+_solc_ready = False
+
+
+def ensure_solc():
+    """
+    Install the pinned solc binary if py-solc-x doesn't have it cached yet.
+
+    Returns:
+        str: The solc version in use
+    """
+    global _solc_ready
+
+    # py-solc-x is imported on first use so it doesn't slow down bot startup
+    import solcx
+
+    with _solc_lock:
+        if not _solc_ready:
+            installed = [str(version) for version in solcx.get_installed_solc_versions()]
+            if SOLC_VERSION not in installed:
+                print(f"Installing solc {SOLC_VERSION}...")
+                solcx.install_solc(SOLC_VERSION)
+            _solc_ready = True
+    return SOLC_VERSION
+
+
+def compile_contract_native(features, optimization_level="standard"):
+    """
+    Compile the token template in-process with py-solc-x, using the artifact cache.
+
+    Args:
+        features (list): Selected token features
+        optimization_level (str): Key of OPTIMIZATION_SETTINGS
+
+    Returns:
+        dict: Compilation result with abi, bytecode, contractCode and a cached flag
+    """
+    solc_version = ensure_solc()
+    optimizer = OPTIMIZATION_SETTINGS[optimization_level]
+    contract_code = generate_contract_code({"name": CANONICAL_CONTRACT_NAME, "features": features})
+
+    cache = get_artifact_cache()
+    key = get_cache_key(contract_code, solc_version, optimizer)
+    artifact = cache.get(key)
+    if artifact is not None:
+        return {"success": True, "cached": True, **artifact}
+
+    # OpenZeppelin sources are read from the shared Node.js toolchain
+    node_modules = get_node_modules_path(ensure_toolchain())
+    compiler_input = {
+        "language": "Solidity",
+        "sources": {"Token.sol": {"content": contract_code}},
+        "settings": {
+            "optimizer": optimizer,
+            "remappings": [f"@openzeppelin/={node_modules}/@openzeppelin/"],
+            "outputSelection": {"*": {"*": ["abi", "evm.bytecode.object"]}}
+        }
+    }
+
+    import solcx
+
+    try:
+        output = solcx.compile_standard(
+            compiler_input,
+            solc_version=solc_version,
+            allow_paths=[node_modules]
+        )
+    except solcx.exceptions.SolcError as e:
+        print(f"Compilation failed: {e}")
+        return {"success": False, "error": f"Compilation failed: {e}"}
+
+    errors = [error for error in output.get("errors", []) if error.get("severity") == "error"]
+    if errors:
+        print(f"Compilation failed: {errors}")
+        return {
+            "success": False,
+            "error": "Compilation failed",
+            "errors": [error.get("formattedMessage", error.get("message")) for error in errors]
+        }
+
+    contract = output.get("contracts", {}).get("Token.sol", {}).get(CANONICAL_CONTRACT_NAME)
+    if not contract:
+        return {"success": False, "error": "Failed to compile contract - no output found"}
+
+    artifact = {
+        "abi": contract["abi"],
+        "bytecode": contract["evm"]["bytecode"]["object"],
+        "contractCode": contract_code,
+        "solcVersion": solc_version,
+        "optimizer": optimizer
+    }
+    cache.put(key, artifact)
+    return {"success": True, "cached": False, **artifact}
+
+
+def _wait_for_success(web3, tx_hash):
+    """Wait for a transaction's receipt, raising if it reverted"""
+    receipt = wait_for_transaction_receipt(web3, tx_hash)
+    if receipt.status != 1:
+        raise Exception(f"Transaction {tx_hash.hex()} failed")
+    return receipt
+
+
+def deploy_contract_native(contract_data, private_key, web3):
+    """
+    Compiles and deploys a token in-process, signing with the bot's wallet helpers.
+    Returns the same result shape as contract_bridge.deploy_contract_with_js.
+
+    Args:
+        contract_data (dict): Contract details
+        private_key (str): Private key for deployment
+        web3 (Web3): Connection to the target network
+
+    Returns:
+        dict: Deployment result
+    """
+    try:
+        compilation = compile_contract_native(contract_data.get("features", []), "standard")
+        if not compilation.get("success"):
+            return compilation
+        print("Using cached contract artifact" if compilation["cached"] else "Contract compiled")
+
+        account = Account.from_key(private_key)
+        buy_tax_basis_points = int(contract_data.get("buy_tax", 0))
+        sell_tax_basis_points = int(contract_data.get("sell_tax", 0))
+
+        # The constructor applies the taxes, so the deployment is a single transaction
+        token = web3.eth.contract(abi=compilation["abi"], bytecode=compilation["bytecode"])
+        fee_fields = get_fee_fields(web3)
+        estimator = get_gas_estimator(web3)
+
+        print("Deploying contract...")
+        constructor = token.constructor(
+            contract_data["name"],
+            contract_data["symbol"],
+            int(contract_data.get("decimals", 18) or 18),
+            int(contract_data["total_supply"]),
+            buy_tax_basis_points,
+            sell_tax_basis_points,
+            contract_data.get("tax_wallet") or ZERO_ADDRESS
+        )
+        deploy_gas = estimator.estimate(
+            deploy_shape(contract_data.get("features")),
+            lambda: constructor.estimate_gas({"from": account.address}),
+            DEFAULT_DEPLOY_GAS
+        )
+        tx_hash = send_transaction_with_nonce(
+            web3,
+            account.address,
+            lambda nonce: constructor.build_transaction({
+                "from": account.address,
+                "nonce": nonce,
+                "gas": deploy_gas,
+                **fee_fields
+            }),
+            private_key
+        )
+        receipt = _wait_for_success(web3, tx_hash)
+        contract_address = receipt.contractAddress
+        print(f"Contract deployed successfully: {contract_address}")
+
+        return {
+            "success": True,
+            "contractCode": compilation["contractCode"],
+            "abi": compilation["abi"],
+            "bytecode": compilation["bytecode"],
+            "deployedContract": {
+                "address": contract_address,
+                "txHash": tx_hash.hex(),
+                "blockNumber": receipt.blockNumber,
+                "gasUsed": str(receipt.gasUsed)
+            },
+            "taxSettings": {
+                "buyTax": buy_tax_basis_points / 100,
+                "sellTax": sell_tax_basis_points / 100,
+                "buyTaxBasisPoints": buy_tax_basis_points,
+                "sellTaxBasisPoints": sell_tax_basis_points
+            }
+        }
+    except Exception as e:
+        print(f"Native deployment error: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
@@ -0,0 +1,304 @@
+import json
+import queue
+import subprocess
+import threading
+import time
+
+
+class NodeWorkerError(Exception):
+    """Raised when a worker call fails"""
+
+
+class NodeWorker:
+    """
+    A single long-lived Node.js process speaking newline-delimited
+    JSON-RPC 2.0 over stdin/stdout.
+    """
+
+    def __init__(self, script_path, cwd=None, env=None, name="node-worker"):
+        self.script_path = script_path
+        self.cwd = cwd
+        self.env = env
+        self.name = name
+        self.process = None
+        self.broken = False
+        self._responses = queue.Queue()
+        self._call_lock = threading.Lock()
+        self._next_id = 0
+
+    def start(self, startup_timeout=60):
+        """
+        Spawn the Node.js process and wait until it answers a ping.
+
+        Args:
+            startup_timeout (float): Seconds to wait for the first ping
+
+        Returns:
+            dict: The ping result (pid, solc version)
+        """
+        self.process = subprocess.Popen(
+            ["node", self.script_path],
+            cwd=self.cwd,
+            env=self.env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+        result = self.call("ping", timeout=startup_timeout)
+        print(f"✅ {self.name} started (pid {result.get('pid')}, solc {result.get('solcVersion')})")
+        return result
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"[{self.name}] Unexpected output: {line}")
+        # EOF - wake up any caller waiting for a response
+        self._responses.put(None)
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            print(f"[{self.name}] {line.rstrip()}")
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def call(self, method, params=None, timeout=None):
+        """
+        Send one request and wait for its response.
+
+        Args:
+            method (str): Worker method name
+            params (dict): Method parameters
+            timeout (float): Seconds to wait for the response, None to wait forever
+
+        Returns:
+            The method result
+
+        Raises:
+            NodeWorkerError: If the worker returned an error, crashed or timed out.
+                Crashes and timeouts also mark the worker as broken.
+        """
+        with self._call_lock:
+            if not self.is_alive():
+                self.broken = True
+                raise NodeWorkerError(f"{self.name} is not running")
+
+            self._next_id += 1
+            request_id = self._next_id
+            frame = json.dumps({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params or {}
+            })
+
+            try:
+                self.process.stdin.write(frame + "\n")
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError) as e:
+                self.broken = True
+                raise NodeWorkerError(f"{self.name} stdin closed: {e}")
+
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                remaining = max(0, deadline - time.monotonic()) if deadline else None
+                try:
+                    response = self._responses.get(timeout=remaining)
+                except queue.Empty:
+                    self.broken = True
+                    raise NodeWorkerError(f"{self.name} timed out after {timeout}s on {method}")
+
+                if response is None:
+                    self.broken = True
+                    raise NodeWorkerError(f"{self.name} exited with code {self.process.poll()}")
+
+                # Skip responses to earlier requests that timed out
+                if response.get("id") != request_id:
+                    continue
+
+                if "error" in response:
+                    error = response["error"] or {}
+                    raise NodeWorkerError(error.get("message", "Unknown worker error"))
+
+                return response.get("result")
+
+    def stop(self, timeout=5):
+        """Close stdin so the worker exits, killing it if it does not"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class NodeWorkerPool:
+    """
+    Fixed-size pool of NodeWorkers. Each call checks out an idle worker;
+    crashed or timed-out workers are replaced, and idle workers are pinged
+    periodically by a health-check thread.
+    """
+
+    def __init__(self, script_path, size=2, cwd=None, env=None,
+                 request_timeout=300, health_interval=30, startup_timeout=60):
+        self.script_path = script_path
+        self.size = size
+        self.cwd = cwd
+        self.env = env
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.startup_timeout = startup_timeout
+
+        self.restarts = 0
+        self._idle = queue.Queue()
+        self._workers = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._worker_counter = 0
+        self._stopped = threading.Event()
+        self._health_thread = None
+
+    def start(self):
+        """Start all workers and the health-check thread"""
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+        self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+        self._health_thread.start()
+
+    def _spawn(self, replacing=None):
+        """Start a new worker, optionally retiring the broken one it replaces"""
+        with self._lock:
+            if replacing in self._workers:
+                self._workers.remove(replacing)
+            self._pending += 1
+            self._worker_counter += 1
+            name = f"node-worker-{self._worker_counter}"
+
+        if replacing is not None:
+            replacing.stop(timeout=1)
+
+        worker = NodeWorker(self.script_path, cwd=self.cwd, env=self.env, name=name)
+        try:
+            worker.start(self.startup_timeout)
+        except Exception:
+            worker.stop(timeout=1)
+            raise
+        else:
+            with self._lock:
+                self._workers.append(worker)
+            return worker
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _replace(self, worker):
+        """Retire a broken worker and start a replacement"""
+        if self._stopped.is_set():
+            worker.stop(timeout=1)
+            return
+        print(f"Restarting {worker.name}...")
+        try:
+            self._idle.put(self._spawn(replacing=worker))
+            self.restarts += 1
+        except Exception as e:
+            # The health-check thread tops the pool back up later
+            print(f"Failed to restart Node worker: {e}")
+
+    def call(self, method, params=None, timeout=None):
+        """
+        Run a method on the next idle worker.
+
+        Args:
+            method (str): Worker method name
+            params (dict): Method parameters
+            timeout (float): Seconds to wait, defaults to the pool's request timeout
+
+        Returns:
+            The method result
+        """
+        if self._stopped.is_set():
+            raise NodeWorkerError("Node worker pool is stopped")
+
+        timeout = timeout or self.request_timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise NodeWorkerError(f"No Node worker available after {timeout}s")
+
+        try:
+            return worker.call(method, params, timeout=timeout)
+        finally:
+            if worker.broken or not worker.is_alive():
+                # Don't make the caller wait for the replacement to boot
+                threading.Thread(target=self._replace, args=(worker,), daemon=True).start()
+            else:
+                self._idle.put(worker)
+
+    def _health_loop(self):
+        while not self._stopped.wait(self.health_interval):
+            self.check_health()
+
+    def check_health(self):
+        """Ping every idle worker, replace dead ones and top the pool back up"""
+        idle_workers = []
+        while True:
+            try:
+                idle_workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        for worker in idle_workers:
+            try:
+                worker.call("ping", timeout=10)
+                self._idle.put(worker)
+            except NodeWorkerError as e:
+                print(f"Health check failed for {worker.name}: {e}")
+                self._replace(worker)
+
+        with self._lock:
+            missing = self.size - len(self._workers) - self._pending
+        for _ in range(missing):
+            if self._stopped.is_set():
+                break
+            try:
+                self._idle.put(self._spawn())
+                self.restarts += 1
+            except Exception as e:
+                print(f"Failed to start Node worker: {e}")
+                break
+
+    def get_stats(self):
+        with self._lock:
+            alive = sum(1 for worker in self._workers if worker.is_alive())
+        return {
+            "size": self.size,
+            "alive": alive,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts
+        }
+
+    def stop(self):
+        """Stop the health-check thread and all workers"""
+        self._stopped.set()
+        with self._lock:
+            workers = list(self._workers)
+            self._workers = []
+        for worker in workers:
+            worker.stop()
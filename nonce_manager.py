@@ -0,0 +1,89 @@
+import threading
+import time
+
+# Send errors after which the local counter can't be trusted any more
+NONCE_ERRORS = ("nonce too low", "already known", "replacement transaction underpriced", "nonce too high")
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces per address without asking the node each time,
+    so dependent transactions (a token approval and the pool mint) can be
+    broadcast back-to-back instead of waiting for each receipt.
+
+    The chain's pending nonce is re-read on first use, after resync_interval
+    seconds without allocations (which also closes gaps left by transactions
+    that were never sent) and after reset().
+    """
+
+    def __init__(self, fetch_nonce, resync_interval=60):
+        self.fetch_nonce = fetch_nonce
+        self.resync_interval = resync_interval
+
+        self._accounts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.stats = {'allocated': 0, 'synced': 0, 'released': 0, 'resets': 0}
+
+    def _account_lock(self, address):
+        with self._lock:
+            return self._locks.setdefault(address, threading.Lock())
+
+    def allocate(self, address):
+        """
+        Reserve the next nonce for an address.
+
+        Args:
+            address (str): Sender address
+
+        Returns:
+            int: Nonce to use
+        """
+        with self._account_lock(address):
+            now = time.monotonic()
+            state = self._accounts.get(address)
+            if state is None or now - state['last_used'] >= self.resync_interval:
+                state = {'next': self.fetch_nonce(address), 'last_used': now}
+                self._accounts[address] = state
+                self.stats['synced'] += 1
+
+            nonce = state['next']
+            state['next'] += 1
+            state['last_used'] = now
+            self.stats['allocated'] += 1
+            return nonce
+
+    def release(self, address, nonce):
+        """
+        Give back a nonce whose transaction was never broadcast.
+
+        If it was the last one handed out it is reused; otherwise the next
+        allocation re-reads the chain to avoid leaving a gap.
+        """
+        with self._account_lock(address):
+            state = self._accounts.get(address)
+            if state is None:
+                return
+            if state['next'] == nonce + 1:
+                state['next'] = nonce
+                self.stats['released'] += 1
+            else:
+                self._accounts.pop(address, None)
+                self.stats['resets'] += 1
+
+    def reset(self, address):
+        """Forget the local counter, e.g. after another process sent from the address"""
+        with self._account_lock(address):
+            if self._accounts.pop(address, None) is not None:
+                self.stats['resets'] += 1
+
+    def handle_send_error(self, address, nonce, error):
+        """Reconcile after a failed broadcast"""
+        if any(message in str(error).lower() for message in NONCE_ERRORS):
+            self.reset(address)
+        else:
+            self.release(address, nonce)
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'accounts': len(self._accounts)}
@@ -2,9 +2,23 @@ import math
 import time
 from web3 import Web3
 
-from wallet import get_web3, sign_and_send_transaction, wait_for_transaction_receipt
+from wallet import (
+    get_web3, get_fee_fields, get_fee_oracle, get_gas_estimator, reset_nonce, send_transaction_with_nonce,
+    wait_for_transaction_receipt
+)
 from storage import get_user_wallet, save_pool_to_db
 from config import POLYGON_ADDRESSES, UNISWAP_V3_FACTORY_ABI, ERC20_ABI, POSITION_MANAGER_WITH_POOL_CREATE_ABI
+from abi_codec import get_codec
+from contract_registry import get_contract
+
+# Calldata for the multicall is encoded locally - no build_transaction round-trips
+POSITION_MANAGER_CODEC = get_codec(POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+
+# Gas of the pool transactions until this bot has measured its own, keyed by whether the pool
+# exists: createAndInitializePoolIfNecessary deploys the pool contract (about 4.9M gas on mainnet)
+# and a full-range mint costs about 0.5M. An approval adds about 50k
+DEFAULT_MULTICALL_GAS = {False: 5500000, True: 600000}
+DEFAULT_APPROVE_GAS = 60000
 
 # Constants for tick math (same as in TypeScript code)
 TICK_MATH = {
@@ -41,6 +55,63 @@ def calculate_sqrt_price_x96(price):
     # Multiply by 2^96
     return int(sqrt_price * (2 ** 96))
 
+def build_pool_calldata(token0, token1, fee, amount0_desired, amount1_desired, pool_exists, recipient):
+    """
+    Calls for the position manager's multicall: createAndInitializePoolIfNecessary
+    for a new pool, then a full-range mint to recipient.
+
+    Returns:
+        list: Encoded calls (bytes)
+    """
+    # Calculate ticks for full range position
+    min_tick, max_tick = calculate_ticks(fee)
+    print(f"Using tick range: {min_tick} to {max_tick}")
+
+    # Set up multicall data - this needs to be a list of bytes objects
+    calldata = []
+
+    # If pool doesn't exist, add createAndInitializePoolIfNecessary to calldata
+    if not pool_exists:
+        # Calculate price based on the amounts
+        if amount1_desired > 0 and amount0_desired > 0:
+            price = float(amount1_desired) / float(amount0_desired)
+        else:
+            price = 1.0  # Default price (1:1)
+
+        sqrt_price_x96 = calculate_sqrt_price_x96(price)
+        print(f"Creating pool with sqrtPriceX96: {sqrt_price_x96}")
+
+        # Encode createAndInitializePoolIfNecessary function call
+        create_pool_data = POSITION_MANAGER_CODEC.encode(
+            'createAndInitializePoolIfNecessary', token0, token1, fee, sqrt_price_x96
+        )
+        calldata.append(create_pool_data)
+
+    # Set deadline 20 minutes from now
+    deadline = int(time.time()) + 1200
+
+    # Encode mint function call
+    mint_params = {
+        'token0': token0,
+        'token1': token1,
+        'fee': fee,
+        'tickLower': min_tick,
+        'tickUpper': max_tick,
+        'amount0Desired': amount0_desired,
+        'amount1Desired': amount1_desired,
+        'amount0Min': 0,  # Following the TypeScript example
+        'amount1Min': 0,  # Following the TypeScript example
+        'recipient': recipient,
+        'deadline': deadline
+    }
+
+    print(f"Mint params: {mint_params}")
+
+    # Encode mint function call
+    mint_data = POSITION_MANAGER_CODEC.encode('mint', mint_params)
+    calldata.append(mint_data)
+    return calldata
+
 # Uniswap V3 pool creation with transaction details - checks if pool exists and calculates costs
 def create_uniswap_pool(user_id, token_address, initial_liquidity, network='polygon'):
     try:
@@ -62,62 +133,81 @@ def create_uniswap_pool(user_id, token_address, initial_liquidity, network='poly
             position_manager_address = POLYGON_ADDRESSES['UNISWAP_V3_POSITION_MANAGER']
 
         # Get contract instances
-        factory_contract = web3.eth.contract(address=factory_address, abi=UNISWAP_V3_FACTORY_ABI)
-        token_contract = web3.eth.contract(address=token_address, abi=ERC20_ABI)
-        position_manager_contract = web3.eth.contract(address=position_manager_address, abi=POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+        factory_contract = get_contract(web3, factory_address, UNISWAP_V3_FACTORY_ABI)
+        token_contract = get_contract(web3, token_address, ERC20_ABI)
+        position_manager_contract = get_contract(web3, position_manager_address, POSITION_MANAGER_WITH_POOL_CREATE_ABI)
 
-        # Calculate estimated gas for pool creation
-        gas_price = web3.eth.gas_price
-        gas_limit = 5000000  # Estimated gas limit for pool creation and liquidity addition
+        # Convert liquidity amounts to float to ensure consistent types
+        token_amount = float(initial_liquidity['token_amount'])
+        eth_amount = float(initial_liquidity['eth_amount'])
+        token_amount_wei = web3.to_wei(token_amount, 'ether')
+        eth_amount_wei = web3.to_wei(eth_amount, 'ether')
 
-        # Calculate the total transaction cost in ETH/MATIC
+        # Sort the pair and check if the pool already exists - creating it costs most of the gas
+        if token_address.lower() < weth_address.lower():
+            token0, token1 = token_address, weth_address
+            amount0_desired, amount1_desired = token_amount_wei, eth_amount_wei
+            is_token0 = True
+        else:
+            token0, token1 = weth_address, token_address
+            amount0_desired, amount1_desired = eth_amount_wei, token_amount_wei
+            is_token0 = False
+        fee = 3000  # 0.3% fee tier
+        existing_pool = factory_contract.functions.getPool(token0, token1, fee).call()
+        pool_exists = existing_pool != '0x0000000000000000000000000000000000000000'
+
+        print(f"Pool exists: {pool_exists}, address: {existing_pool}")
+
+        # Estimate the gas of the approval (if one is needed) and the multicall
+        fees = get_fee_oracle(web3).get_fees()
+        gas_price = fees['gas_price']
+        estimator = get_gas_estimator(web3)
+        allowance = token_contract.functions.allowance(user_wallet['address'], position_manager_address).call()
+        if allowance < token_amount_wei:
+            approve_call = token_contract.functions.approve(position_manager_address, 2 * token_amount_wei)
+            approve_gas = estimator.estimate(
+                ('approve',),
+                lambda: approve_call.estimate_gas({'from': user_wallet['address']}),
+                DEFAULT_APPROVE_GAS
+            )
+            # The mint can't be estimated before the approval is mined, so the multicall is
+            # sent with the gas it used last time (or the default) - the limit shown here
+            multicall_gas = estimator.get(('pool_multicall', pool_exists), DEFAULT_MULTICALL_GAS[pool_exists])
+        else:
+            approve_gas = 0
+            multicall = position_manager_contract.functions.multicall(build_pool_calldata(
+                token0, token1, fee, amount0_desired, amount1_desired, pool_exists, user_wallet['address']))
+            multicall_gas = estimator.estimate(
+                ('pool_multicall', pool_exists),
+                lambda: multicall.estimate_gas({
+                    'from': user_wallet['address'],
+                    'value': eth_amount_wei if not is_token0 else 0
+                }),
+                DEFAULT_MULTICALL_GAS[pool_exists]
+            )
+        gas_limit = approve_gas + multicall_gas
+
+        # Calculate the expected and the maximum transaction cost in ETH/MATIC
         transaction_cost_wei = gas_price * gas_limit
         transaction_cost_eth = float(web3.from_wei(transaction_cost_wei, 'ether'))
+        max_cost_wei = fees['max_fee'] * gas_limit
+        max_cost_eth = float(web3.from_wei(max_cost_wei, 'ether'))
 
         # Get current balance
         current_balance_wei = web3.eth.get_balance(user_wallet['address'])
         current_balance_eth = float(web3.from_wei(current_balance_wei, 'ether'))
 
-        # Convert liquidity amounts to float to ensure consistent types
-        token_amount = float(initial_liquidity['token_amount'])
-        eth_amount = float(initial_liquidity['eth_amount'])
-
-        # Check if user has enough balance for gas
-        if current_balance_wei < transaction_cost_wei:
-            return None, f"Insufficient balance. You need at least {transaction_cost_eth} {network.upper()} for gas fees. Current balance: {current_balance_eth} {network.upper()}"
+        # Check if user has enough balance for gas - the node requires the maximum fee to be covered
+        if current_balance_wei < max_cost_wei:
+            return None, f"Insufficient balance. You need at least {max_cost_eth} {network.upper()} for gas fees. Current balance: {current_balance_eth} {network.upper()}"
 
         # Calculate total needed (gas + liquidity)
         total_needed_eth = transaction_cost_eth + eth_amount
+        max_total_eth = max_cost_eth + eth_amount
 
         # Check if user has enough balance for gas + liquidity
-        if current_balance_eth < total_needed_eth:
-            return None, f"Insufficient balance. You need {eth_amount} {network.upper()} for liquidity plus {transaction_cost_eth} {network.upper()} for gas. Current balance: {current_balance_eth} {network.upper()}"
-
-        # Convert amounts to wei
-        token_amount_wei = web3.to_wei(token_amount, 'ether')
-        eth_amount_wei = web3.to_wei(eth_amount, 'ether')
-
-        # Determine token0 and token1 (tokens must be sorted by address)
-        # Sort token addresses
-        if token_address.lower() < weth_address.lower():
-            token0 = token_address
-            token1 = weth_address
-            amount0_desired = token_amount_wei
-            amount1_desired = eth_amount_wei
-        else:
-            token0 = weth_address
-            token1 = token_address
-            amount0_desired = eth_amount_wei
-            amount1_desired = token_amount_wei
-
-        # Use 0.3% fee tier (3000)
-        fee = 3000
-
-        # Check if pool already exists
-        existing_pool = factory_contract.functions.getPool(token0, token1, fee).call()
-        pool_exists = existing_pool != '0x0000000000000000000000000000000000000000'
-        
-        print(f"Pool exists: {pool_exists}, address: {existing_pool}")
+        if current_balance_eth < max_total_eth:
+            return None, f"Insufficient balance. You need {eth_amount} {network.upper()} for liquidity plus up to {max_cost_eth} {network.upper()} for gas. Current balance: {current_balance_eth} {network.upper()}"
 
         # Prepare transaction details for review
         pool_details = {
@@ -129,6 +219,7 @@ def create_uniswap_pool(user_id, token_address, initial_liquidity, network='poly
             'gas_limit': gas_limit,
             'transaction_cost': transaction_cost_eth,
             'total_cost': total_needed_eth,
+            'max_cost': max_total_eth,
             'current_balance': current_balance_eth,
             'network': network,
             'from_address': user_wallet['address'],
@@ -145,7 +236,7 @@ def create_uniswap_pool(user_id, token_address, initial_liquidity, network='poly
         return None, str(e)
 
 # Execute pool creation and add liquidity - actually creates the pool and adds liquidity
-def execute_pool_creation(user_id, token_address, liquidity_data, network='polygon'):
+def execute_pool_creation(user_id, token_address, liquidity_data, network='polygon', progress=None):
     try:
         web3 = get_web3(network)
         user_wallet = get_user_wallet(user_id)
@@ -168,13 +259,18 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
             factory_address = POLYGON_ADDRESSES['UNISWAP_V3_FACTORY']
 
         # Create contract instances
-        factory_contract = web3.eth.contract(address=factory_address, abi=UNISWAP_V3_FACTORY_ABI)
-        token_contract = web3.eth.contract(address=token_address, abi=ERC20_ABI)
-        position_manager_contract = web3.eth.contract(address=position_manager_address, abi=POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+        factory_contract = get_contract(web3, factory_address, UNISWAP_V3_FACTORY_ABI)
+        token_contract = get_contract(web3, token_address, ERC20_ABI)
+        position_manager_contract = get_contract(web3, position_manager_address, POSITION_MANAGER_WITH_POOL_CREATE_ABI)
 
         # Use 0.3% fee tier
         fee = 3000
 
+        # Chain id and fees are read once for all transactions built below
+        chain_id = web3.eth.chain_id
+        fee_fields = get_fee_fields(web3)
+        estimator = get_gas_estimator(web3)
+
         # Convert liquidity amounts to wei
         token_amount = float(liquidity_data['token_amount'])
         eth_amount = float(liquidity_data['eth_amount'])
@@ -200,10 +296,8 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
         print(f"Is token0: {is_token0}")
 
         # STEP 1: Token Approval (similar to TypeScript code)
-        # Get fresh nonce
-        nonce = web3.eth.get_transaction_count(user_wallet['address'])
-        print(f"Starting with nonce: {nonce}")
-
+        approve_tx_hash = None
+        approve_receipt = None
         # Check current allowance
         allowance = token_contract.functions.allowance(
             user_wallet['address'], 
@@ -215,21 +309,32 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
         # Only approve if needed
         if allowance < token_amount_wei:
             print('Approving token for position manager...')
-            approve_tx = token_contract.functions.approve(
+            if progress:
+                progress("🚀 Creating Pool and Adding Liquidity...\n\n⏳ Step 1/2: Approving token spending...")
+            approve_call = token_contract.functions.approve(
                 position_manager_address,
                 2 * token_amount_wei  # Double for safety
-            ).build_transaction({
-                'chainId': web3.eth.chain_id,
-                'gas': 200000,
-                'gasPrice': web3.eth.gas_price,
-                'nonce': nonce,
-                'from': user_wallet['address']
-            })
-
-            approve_tx_hash = sign_and_send_transaction(web3, approve_tx, user_wallet['private_key'])
-            approve_receipt = wait_for_transaction_receipt(web3, approve_tx_hash)
-            print(f"Token approval tx hash: {approve_tx_hash.hex()}, status: {approve_receipt.status}")
-            nonce += 1
+            )
+            approve_gas = estimator.estimate(
+                ('approve',),
+                lambda: approve_call.estimate_gas({'from': user_wallet['address']}),
+                DEFAULT_APPROVE_GAS
+            )
+            approve_tx_hash = send_transaction_with_nonce(
+                web3,
+                user_wallet['address'],
+                lambda nonce: approve_call.build_transaction({
+                    'chainId': chain_id,
+                    'gas': approve_gas,
+                    **fee_fields,
+                    'nonce': nonce,
+                    'from': user_wallet['address']
+                }),
+                user_wallet['private_key']
+            )
+            print(f"Token approval tx hash: {approve_tx_hash.hex()}")
+            # The approval isn't awaited here - the multicall is sent right behind it
+            # with the next nonce, so both can be mined in the same block
         else:
             print("Token already approved for position manager, skipping approval")
 
@@ -239,104 +344,77 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
         print(f"Pool exists: {pool_exists}, address: {pool_address}")
 
         # STEP 3: Prepare multicall data (similar to TypeScript code)
-        # Get latest nonce
-        nonce = web3.eth.get_transaction_count(user_wallet['address'])
-
-        # Calculate ticks for full range position
-        min_tick, max_tick = calculate_ticks(fee)
-        print(f"Using tick range: {min_tick} to {max_tick}")
-
-        # Set up multicall data - this needs to be a list of bytes objects
-        calldata = []
-
-        # If pool doesn't exist, add createAndInitializePoolIfNecessary to calldata
-        if not pool_exists:
-            # Calculate price based on the amounts
-            if amount1_desired > 0 and amount0_desired > 0:
-                price = float(amount1_desired) / float(amount0_desired)
-            else:
-                price = 1.0  # Default price (1:1)
-            
-            sqrt_price_x96 = calculate_sqrt_price_x96(price)
-            print(f"Creating pool with sqrtPriceX96: {sqrt_price_x96}")
-
-            # Encode createAndInitializePoolIfNecessary function call
-            create_pool_tx = position_manager_contract.functions.createAndInitializePoolIfNecessary(
-                token0, token1, fee, sqrt_price_x96
-            ).build_transaction({
-                'chainId': web3.eth.chain_id,
-                'gas': 300000,
-                'gasPrice': web3.eth.gas_price,
-                'nonce': 0,  # Dummy nonce, not used in multicall
-                'from': user_wallet['address']
-            })
-            create_pool_data = create_pool_tx['data']
-            calldata.append(create_pool_data)
-
-        # Set deadline 20 minutes from now
-        deadline = int(time.time()) + 1200
-
-        # Encode mint function call
-        mint_params = {
-            'token0': token0,
-            'token1': token1,
-            'fee': fee,
-            'tickLower': min_tick,
-            'tickUpper': max_tick,
-            'amount0Desired': amount0_desired,
-            'amount1Desired': amount1_desired,
-            'amount0Min': 0,  # Following the TypeScript example
-            'amount1Min': 0,  # Following the TypeScript example
-            'recipient': user_wallet['address'],
-            'deadline': deadline
-        }
-
-        print(f"Mint params: {mint_params}")
-
-        # Encode mint function call
-        mint_tx = position_manager_contract.functions.mint(
-            mint_params
-        ).build_transaction({
-            'chainId': web3.eth.chain_id,
-            'gas': 300000,
-            'gasPrice': web3.eth.gas_price,
-            'nonce': 0,  # Dummy nonce, not used in multicall
-            'from': user_wallet['address']
-        })
-        mint_data = mint_tx['data']
-        calldata.append(mint_data)
+        calldata = build_pool_calldata(
+            token0, token1, fee, amount0_desired, amount1_desired, pool_exists, user_wallet['address'])
 
         # STEP 4: Execute multicall
         print(f"Executing multicall with {len(calldata)} functions")
+        if progress:
+            progress("🚀 Creating Pool and Adding Liquidity...\n\n⏳ Step 2/2: Creating pool and minting the position...")
         
         # The multicall function expects a list of bytes objects (encoded function calls)
         # Each item in the calldata array is the encoded function call (data field from build_transaction)
-        multicall_tx = position_manager_contract.functions.multicall(
-            calldata
-        ).build_transaction({
-            'chainId': web3.eth.chain_id,
-            'gas': 15000000,  # Increased gas limit to match successful transaction
-            'maxFeePerGas': web3.eth.gas_price,  # Use EIP-1559 transaction type
-            'maxPriorityFeePerGas': web3.eth.gas_price,
-            'nonce': nonce,
-            'from': user_wallet['address'],
-            'value': eth_amount_wei if not is_token0 else 0,  # Send ETH if it's token1
-            'type': 2  # EIP-1559 transaction type
-        })
-
         # Sign and send transaction
-        tx_hash = sign_and_send_transaction(web3, multicall_tx, user_wallet['private_key'])
-        receipt = wait_for_transaction_receipt(web3, tx_hash)
+        multicall = position_manager_contract.functions.multicall(calldata)
+        if approve_tx_hash is not None:
+            # Behind a pending approval the estimate would revert, so the multicall gets the
+            # gas it used last time, or the measured default
+            multicall_gas = estimator.get(('pool_multicall', pool_exists), DEFAULT_MULTICALL_GAS[pool_exists])
+        else:
+            multicall_gas = estimator.estimate(
+                ('pool_multicall', pool_exists),
+                lambda: multicall.estimate_gas({
+                    'from': user_wallet['address'],
+                    'value': eth_amount_wei if not is_token0 else 0
+                }),
+                DEFAULT_MULTICALL_GAS[pool_exists]
+            )
+        tx_hash = send_transaction_with_nonce(
+            web3,
+            user_wallet['address'],
+            lambda nonce: multicall.build_transaction({
+                'chainId': chain_id,
+                'gas': multicall_gas,
+                **fee_fields,  # EIP-1559 fees from the network's fee oracle where supported
+                'nonce': nonce,
+                'from': user_wallet['address'],
+                'value': eth_amount_wei if not is_token0 else 0  # Send ETH if it's token1
+            }),
+            user_wallet['private_key']
+        )
+
+        try:
+            if approve_tx_hash is not None:
+                approve_receipt = wait_for_transaction_receipt(web3, approve_tx_hash)
+                print(f"Token approval status: {approve_receipt.status}")
+            receipt = wait_for_transaction_receipt(web3, tx_hash)
+        except Exception:
+            # One of the pipelined transactions may be stuck - re-read the nonce from the chain
+            reset_nonce(web3, user_wallet['address'])
+            raise
         print(f"Multicall tx hash: {tx_hash.hex()}, status: {receipt.status}")
 
-        # Check if transaction was successful
+        # Check if both transactions were successful
+        if approve_receipt is not None and approve_receipt.status == 0:
+            reset_nonce(web3, user_wallet['address'])
+            return {
+                'status': 'failed',
+                'error': 'Token approval failed',
+                'tx_hash': approve_tx_hash.hex()
+            }
         if receipt.status == 0:
+            reset_nonce(web3, user_wallet['address'])
             return {
                 'status': 'failed',
                 'error': 'Transaction failed',
                 'tx_hash': tx_hash.hex()
             }
 
+        # Gas actually used, for the next transactions of these shapes and the next cost preview
+        estimator.record(('pool_multicall', pool_exists), receipt.gasUsed)
+        if approve_receipt is not None:
+            estimator.record(('approve',), approve_receipt.gasUsed)
+
         # STEP 5: Extract position ID from logs
         position_id = None
         if receipt.logs:
@@ -400,9 +478,6 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
             try:
                 print("Retrying with adjusted ticks...")
                 
-                # Get fresh nonce
-                nonce = web3.eth.get_transaction_count(user_wallet['address'])
-                
                 # Use exact full range with retry
                 retry_tick_spacing = get_tick_spacing(fee)
                 retry_min_tick = math.ceil(-887272 / retry_tick_spacing) * retry_tick_spacing
@@ -419,17 +494,10 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
                     sqrt_price_x96 = calculate_sqrt_price_x96(1.0)
                     print(f"Retrying pool creation with sqrtPriceX96: {sqrt_price_x96}")
                     
-                    # Encode using build_transaction and extract data
-                    create_pool_tx = position_manager_contract.functions.createAndInitializePoolIfNecessary(
-                        token0, token1, fee, sqrt_price_x96
-                    ).build_transaction({
-                        'chainId': web3.eth.chain_id,
-                        'gas': 300000,
-                        'gasPrice': web3.eth.gas_price,
-                        'nonce': 0,  # Dummy nonce, not used in multicall
-                        'from': user_wallet['address']
-                    })
-                    create_pool_data = create_pool_tx['data']
+                    # Encode createAndInitializePoolIfNecessary function call
+                    create_pool_data = POSITION_MANAGER_CODEC.encode(
+                        'createAndInitializePoolIfNecessary', token0, token1, fee, sqrt_price_x96
+                    )
                     retry_calldata.append(create_pool_data)
                 
                 # Set deadline 20 minutes from now
@@ -452,39 +520,39 @@ def execute_pool_creation(user_id, token_address, liquidity_data, network='polyg
                 
                 print(f"Retry mint params: {retry_mint_params}")
                 
-                # Encode using build_transaction and extract data
-                retry_mint_tx = position_manager_contract.functions.mint(
-                    retry_mint_params
-                ).build_transaction({
-                    'chainId': web3.eth.chain_id,
-                    'gas': 300000,
-                    'gasPrice': web3.eth.gas_price,
-                    'nonce': 0,  # Dummy nonce, not used in multicall
-                    'from': user_wallet['address']
-                })
-                retry_mint_data = retry_mint_tx['data']
+                # Encode mint function call
+                retry_mint_data = POSITION_MANAGER_CODEC.encode('mint', retry_mint_params)
                 retry_calldata.append(retry_mint_data)
                 
                 # Execute retry multicall
                 print(f"Executing retry multicall with {len(retry_calldata)} functions")
+                fee_fields = get_fee_fields(web3)
                 
                 # The multicall function expects a list of bytes objects (encoded function calls)
                 # Each item in the retry_calldata array is the encoded function call (data field from build_transaction)
-                retry_multicall_tx = position_manager_contract.functions.multicall(
-                    retry_calldata
-                ).build_transaction({
-                    'chainId': web3.eth.chain_id,
-                    'gas': 15000000,  # Increased gas limit to match successful transaction
-                    'maxFeePerGas': web3.eth.gas_price,  # Use EIP-1559 transaction type
-                    'maxPriorityFeePerGas': web3.eth.gas_price,
-                    'nonce': nonce,
-                    'from': user_wallet['address'],
-                    'value': eth_amount_wei if not is_token0 else 0,  # Send ETH if it's token1
-                    'type': 2  # EIP-1559 transaction type
-                })
-                
                 # Sign and send transaction
-                retry_tx_hash = sign_and_send_transaction(web3, retry_multicall_tx, user_wallet['private_key'])
+                retry_multicall = position_manager_contract.functions.multicall(retry_calldata)
+                retry_gas = get_gas_estimator(web3).estimate(
+                    ('pool_multicall', pool_exists),
+                    lambda: retry_multicall.estimate_gas({
+                        'from': user_wallet['address'],
+                        'value': eth_amount_wei if not is_token0 else 0
+                    }),
+                    DEFAULT_MULTICALL_GAS[pool_exists]
+                )
+                retry_tx_hash = send_transaction_with_nonce(
+                    web3,
+                    user_wallet['address'],
+                    lambda nonce: retry_multicall.build_transaction({
+                        'chainId': chain_id,
+                        'gas': retry_gas,
+                        **fee_fields,  # EIP-1559 fees from the network's fee oracle where supported
+                        'nonce': nonce,
+                        'from': user_wallet['address'],
+                        'value': eth_amount_wei if not is_token0 else 0  # Send ETH if it's token1
+                    }),
+                    user_wallet['private_key']
+                )
                 retry_receipt = wait_for_transaction_receipt(web3, retry_tx_hash)
                 print(f"Retry multicall tx hash: {retry_tx_hash.hex()}, status: {retry_receipt.status}")
                 
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from web3 import Web3
+
+from config import ERC20_ABI, MULTICALL3_ADDRESS, PORTFOLIO_NETWORKS, PORTFOLIO_WORKERS
+from multicall import Call, aggregate, aggregate_async
+from token_metadata import get_many_token_metadata, get_many_token_metadata_async
+from wallet import get_async_web3, get_web3
+
+NATIVE_SYMBOLS = {'polygon': 'MATIC', 'ethereum': 'ETH'}
+
+# Multicall3 also reads native balances, so they go in the same batch as the token balances
+GET_ETH_BALANCE_ABI = [{
+    "name": "getEthBalance",
+    "type": "function",
+    "inputs": [{"name": "addr", "type": "address"}],
+    "outputs": [{"name": "balance", "type": "uint256"}],
+    "stateMutability": "view"
+}]
+
+# (network, address) -> (block number, token addresses, network portfolio)
+_cache = {}
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PORTFOLIO_WORKERS, thread_name_prefix="portfolio")
+        return _executor
+
+
+def _to_units(amount, decimals):
+    return Decimal(amount) / (Decimal(10) ** (decimals or 0))
+
+
+def _normalize(address, token_addresses):
+    address = Web3.to_checksum_address(address)
+    token_addresses = tuple(dict.fromkeys(Web3.to_checksum_address(token) for token in token_addresses))
+    return address, token_addresses
+
+
+def _from_cache(key, block, token_addresses):
+    """The cached portfolio if it was read at this block for the same tokens, else None"""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == block and entry[1] == token_addresses:
+            _cache_stats['hits'] += 1
+            return entry[2]
+        _cache_stats['misses'] += 1
+    return None
+
+
+def _balance_calls(address, token_addresses):
+    calls = [Call(MULTICALL3_ADDRESS, GET_ETH_BALANCE_ABI, 'getEthBalance', (address,))]
+    calls += [Call(token, ERC20_ABI, 'balanceOf', (address,)) for token in token_addresses]
+    return calls
+
+
+def _build_portfolio(key, block, token_addresses, native_balance_wei, token_balances, metadata):
+    """Assemble a network portfolio from the balances read at block, and cache it"""
+    network = key[0]
+    tokens = []
+    for token, balance in zip(token_addresses, token_balances):
+        info = metadata.get(token, {})
+        # 0 is a real decimals() value; only tokens without one are assumed to use 18
+        decimals = 18 if info.get('decimals') is None else info['decimals']
+        tokens.append({
+            'address': token,
+            'symbol': info.get('symbol') or token[:8],
+            'balance': None if balance is None else _to_units(balance, decimals)
+        })
+
+    result = {
+        'network': network,
+        'block': block,
+        'native_symbol': NATIVE_SYMBOLS.get(network, 'ETH'),
+        'native_balance': Web3.from_wei(native_balance_wei, 'ether'),
+        'tokens': tokens
+    }
+    with _cache_lock:
+        _cache[key] = (block, token_addresses, result)
+    return result
+
+
+def get_network_portfolio(network, address, token_addresses):
+    """
+    Native and token balances of an address on one network, read at a single block.
+
+    Args:
+        network (str): 'polygon' or 'ethereum'
+        address (str): Wallet address
+        token_addresses (list): Token contracts to include
+
+    Returns:
+        dict: {'network', 'block', 'native_symbol', 'native_balance', 'tokens': [{'address', 'symbol', 'balance'}]}
+    """
+    web3 = get_web3(network)
+    address, token_addresses = _normalize(address, token_addresses)
+
+    # Balances only change with a new block, so one eth_blockNumber decides whether the cache is current
+    block = web3.eth.block_number
+    key = (network, address)
+    cached = _from_cache(key, block, token_addresses)
+    if cached is not None:
+        return cached
+
+    values = aggregate(web3, _balance_calls(address, token_addresses), block_identifier=block)
+
+    native_balance_wei = values[0]
+    if native_balance_wei is None:
+        # No Multicall3 on this chain
+        native_balance_wei = web3.eth.get_balance(address, block)
+
+    metadata = get_many_token_metadata(web3, token_addresses) if token_addresses else {}
+    return _build_portfolio(key, block, token_addresses, native_balance_wei, values[1:], metadata)
+
+
+async def get_network_portfolio_async(network, address, token_addresses):
+    """get_network_portfolio on AsyncWeb3, sharing its block-keyed cache"""
+    web3 = get_async_web3(network)
+    address, token_addresses = _normalize(address, token_addresses)
+
+    block = await web3.eth.block_number
+    key = (network, address)
+    cached = _from_cache(key, block, token_addresses)
+    if cached is not None:
+        return cached
+
+    values = await aggregate_async(web3, _balance_calls(address, token_addresses), block_identifier=block)
+
+    native_balance_wei = values[0]
+    if native_balance_wei is None:
+        native_balance_wei = await web3.eth.get_balance(address, block)
+
+    metadata = await get_many_token_metadata_async(web3, token_addresses) if token_addresses else {}
+    return _build_portfolio(key, block, token_addresses, native_balance_wei, values[1:], metadata)
+
+
+def _network_tokens(tokens, network):
+    return [token['contract_address'] for token in tokens if token.get('network') == network]
+
+
+def _network_error(network, address, error):
+    print(f"Error reading {network} portfolio for {address}: {error}")
+    return {'network': network, 'error': str(error)}
+
+
+def get_portfolio(address, tokens, networks=PORTFOLIO_NETWORKS):
+    """
+    Balances of a wallet on every network, queried in parallel.
+
+    Args:
+        address (str): Wallet address
+        tokens (list): The user's tokens as returned by get_user_tokens
+        networks (list): Networks to include
+
+    Returns:
+        dict: {'address', 'networks': [network portfolio or {'network', 'error'}]} in the order of networks
+    """
+    futures = []
+    for network in networks:
+        futures.append((network, _get_executor().submit(
+            get_network_portfolio, network, address, _network_tokens(tokens, network))))
+
+    results = []
+    for network, future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(_network_error(network, address, e))
+    return {'address': address, 'networks': results}
+
+
+async def get_portfolio_async(address, tokens, networks=PORTFOLIO_NETWORKS):
+    """get_portfolio as a coroutine: the networks are awaited concurrently on the event loop"""
+    results = await asyncio.gather(
+        *(get_network_portfolio_async(network, address, _network_tokens(tokens, network)) for network in networks),
+        return_exceptions=True)
+    return {'address': address, 'networks': [
+        _network_error(network, address, result) if isinstance(result, Exception) else result
+        for network, result in zip(networks, results)
+    ]}
+
+
+def get_portfolio_stats():
+    with _cache_lock:
+        return {**_cache_stats, 'size': len(_cache)}
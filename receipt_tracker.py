@@ -0,0 +1,165 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+def normalize_tx_hash(tx_hash):
+    """Lowercase 0x-prefixed hex string for a hash given as str, bytes or HexBytes"""
+    if isinstance(tx_hash, (bytes, bytearray)):
+        tx_hash = bytes(tx_hash).hex()
+    tx_hash = str(tx_hash).lower()
+    return tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash
+
+
+class PendingTransaction:
+
+    def __init__(self, tx_hash, deadline):
+        self.tx_hash = tx_hash
+        self.deadline = deadline
+        self.future = Future()
+        self.checked = False  # looked up directly once, in case it was mined before tracking started
+
+
+class ReceiptTracker:
+    """
+    Waits for receipts of many transactions on one network with a single poll loop.
+
+    The loop checks the block number every poll_interval seconds and, once per new
+    block, matches the block's transaction hashes against every pending hash. Only
+    matched transactions cost a receipt request. When more than max_catch_up_blocks
+    blocks were missed, every pending transaction is looked up directly instead. The
+    loop thread exits when nothing is pending and starts again on the next track().
+    """
+
+    def __init__(self, web3, poll_interval=2.0, max_catch_up_blocks=20):
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.max_catch_up_blocks = max_catch_up_blocks
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_block = None
+        self.stats = {'tracked': 0, 'resolved': 0, 'timeouts': 0, 'blocks_scanned': 0, 'catch_up_lookups': 0}
+
+    def track(self, tx_hash, timeout=120, callback=None):
+        """
+        Start waiting for a transaction's receipt.
+
+        Args:
+            tx_hash: Transaction hash (str, bytes or HexBytes)
+            timeout (float): Seconds before the future fails with TimeoutError
+            callback (callable): Optional, called with the Future once it is resolved
+
+        Returns:
+            Future: Resolves to the receipt
+        """
+        key = normalize_tx_hash(tx_hash)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = PendingTransaction(key, time.monotonic() + timeout)
+                self._pending[key] = pending
+                self.stats['tracked'] += 1
+            else:
+                pending.deadline = max(pending.deadline, time.monotonic() + timeout)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="receipt-tracker", daemon=True)
+                self._thread.start()
+
+        if callback is not None:
+            pending.future.add_done_callback(callback)
+        return pending.future
+
+    def wait(self, tx_hash, timeout=120):
+        """Block until the receipt is available, raising TimeoutError after timeout seconds"""
+        return self.track(tx_hash, timeout).result()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    self._last_block = None
+                    return
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"Receipt tracker poll failed: {e}")
+            self._expire()
+            time.sleep(self.poll_interval)
+
+    def _poll(self):
+        # The block number is read first, so the direct lookups below also cover every
+        # block up to it
+        latest = self.web3.eth.block_number
+
+        with self._lock:
+            unchecked = [pending for pending in self._pending.values() if not pending.checked]
+        for pending in unchecked:
+            pending.checked = True
+            self._fetch_receipt(pending)
+
+        if self._last_block is None:
+            self._last_block = latest
+        if latest <= self._last_block:
+            return
+
+        if latest - self._last_block > self.max_catch_up_blocks:
+            # Too many blocks missed (RPC stall or a long poll gap) to scan them all:
+            # look every pending transaction up directly instead. The lookups run after
+            # latest was read, so they cover every block up to it
+            with self._lock:
+                pending = list(self._pending.values())
+            self.stats['catch_up_lookups'] += len(pending)
+            for item in pending:
+                self._fetch_receipt(item)
+            self._last_block = latest
+            return
+
+        for number in range(self._last_block + 1, latest + 1):
+            block = self.web3.eth.get_block(number)
+            self.stats['blocks_scanned'] += 1
+            with self._lock:
+                matched = [
+                    self._pending[key] for key in map(normalize_tx_hash, block['transactions'])
+                    if key in self._pending
+                ]
+            for pending in matched:
+                self._fetch_receipt(pending)
+            self._last_block = number
+
+    def _fetch_receipt(self, pending):
+        try:
+            receipt = self.web3.eth.get_transaction_receipt(pending.tx_hash)
+        except Exception:
+            # Not mined yet (web3 raises TransactionNotFound)
+            return
+        if receipt:
+            self._resolve(pending, receipt)
+
+    def _resolve(self, pending, receipt):
+        with self._lock:
+            if self._pending.pop(pending.tx_hash, None) is None:
+                return
+            self.stats['resolved'] += 1
+        pending.future.set_result(receipt)
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [pending for pending in self._pending.values() if pending.deadline <= now]
+            for pending in expired:
+                del self._pending[pending.tx_hash]
+                self.stats['timeouts'] += 1
+        for pending in expired:
+            pending.future.set_exception(TimeoutError(f"Timeout waiting for receipt of {pending.tx_hash}"))
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'pending': len(self._pending)}
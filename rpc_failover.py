@@ -0,0 +1,179 @@
+import threading
+import time
+
+# Circuit states
+CLOSED = "closed"
+OPEN = "open"
+
+
+class RpcEndpoint:
+    """Latency and error tracking for one RPC URL"""
+
+    def __init__(self, url, failure_threshold=3, cooldown=30):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.latency = None  # exponentially weighted moving average, seconds
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self._lock:
+            self.requests += 1
+            self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+            self.consecutive_failures = 0
+            self.state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+            self.consecutive_failures += 1
+            # A failed trial after the cooldown re-opens the circuit straight away
+            if self.state == OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"RPC endpoint {self.url} disabled after {self.consecutive_failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def is_available(self):
+        """Closed circuits are available; open ones again once the cooldown has passed"""
+        return self.state == CLOSED or time.monotonic() - self.opened_at >= self.cooldown
+
+    def get_stats(self):
+        return {
+            "url": self.url,
+            "state": self.state,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+
+class EndpointRouter:
+    """
+    Routes requests across several endpoints of one network.
+
+    Reads go to the fastest available endpoint and fail over to the next one.
+    Writes go to the pinned write endpoint first, so a transaction and its
+    follow-ups hit the same node, and fail over only if it is down.
+    """
+
+    def __init__(self, urls, write_url=None, failure_threshold=3, cooldown=30):
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+
+        self.endpoints = [RpcEndpoint(url, failure_threshold, cooldown) for url in urls]
+        self.write_url = write_url or urls[0]
+        if self.write_url not in urls:
+            self.endpoints.append(RpcEndpoint(self.write_url, failure_threshold, cooldown))
+
+    def pin_writes(self, url):
+        """Send transactions to this endpoint first"""
+        if url not in [endpoint.url for endpoint in self.endpoints]:
+            self.endpoints.append(RpcEndpoint(url, self.endpoints[0].failure_threshold, self.endpoints[0].cooldown))
+        self.write_url = url
+
+    def read_order(self):
+        available = []
+        unavailable = []
+        for endpoint in self.endpoints:
+            (available if endpoint.is_available() else unavailable).append(endpoint)
+        # Unmeasured endpoints sort first so every endpoint gets a latency sample.
+        # Endpoints past their cooldown sort after healthy ones, so user requests
+        # only reach them when nothing else works; probe() brings them back.
+        available.sort(key=lambda endpoint: (endpoint.state != CLOSED, endpoint.latency or 0))
+        # Open circuits are still tried as a last resort
+        unavailable.sort(key=lambda endpoint: endpoint.opened_at)
+        return available + unavailable
+
+    def write_order(self):
+        pinned = [endpoint for endpoint in self.endpoints if endpoint.url == self.write_url]
+        if pinned and pinned[0].is_available():
+            return pinned + [endpoint for endpoint in self.read_order() if endpoint is not pinned[0]]
+        return [endpoint for endpoint in self.read_order() if endpoint not in pinned] + pinned
+
+    def execute(self, request, write=False, retry_on=(Exception,), is_failure=None):
+        """
+        Run a request against endpoints in routing order until one succeeds.
+
+        Args:
+            request (callable): Called with an RpcEndpoint, returns the response
+            write (bool): Use the write routing order
+            retry_on (tuple): Exception types that count as endpoint failures
+            is_failure (callable): Optional check marking a returned response as a failure
+
+        Returns:
+            The first successful response
+        """
+        last_error = None
+        last_response = None
+        for endpoint in (self.write_order() if write else self.read_order()):
+            started = time.monotonic()
+            try:
+                response = request(endpoint)
+            except retry_on as e:
+                last_error = self._record_error(endpoint, e)
+                continue
+
+            if self._record_response(endpoint, response, started, is_failure):
+                return response
+            last_response = response
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    async def execute_async(self, request, write=False, retry_on=(Exception,), is_failure=None):
+        """Like execute(), for a coroutine function request(endpoint)"""
+        last_error = None
+        last_response = None
+        for endpoint in (self.write_order() if write else self.read_order()):
+            started = time.monotonic()
+            try:
+                response = await request(endpoint)
+            except retry_on as e:
+                last_error = self._record_error(endpoint, e)
+                continue
+
+            if self._record_response(endpoint, response, started, is_failure):
+                return response
+            last_response = response
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def _record_error(self, endpoint, error):
+        endpoint.record_failure()
+        print(f"RPC request to {endpoint.url} failed: {error}")
+        return error
+
+    def _record_response(self, endpoint, response, started, is_failure):
+        """Record the outcome of a response, returning True if it can be used"""
+        if is_failure and is_failure(response):
+            endpoint.record_failure()
+            return False
+        endpoint.record_success(time.monotonic() - started)
+        return True
+
+    def probe(self, request):
+        """Send a cheap request to every endpoint to keep latency figures current"""
+        for endpoint in self.endpoints:
+            started = time.monotonic()
+            try:
+                request(endpoint)
+                endpoint.record_success(time.monotonic() - started)
+            except Exception:
+                endpoint.record_failure()
+
+    def get_stats(self):
+        return {
+            "write_url": self.write_url,
+            "endpoints": [endpoint.get_stats() for endpoint in self.endpoints]
+        }
@@ -0,0 +1,262 @@
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from config import SESSION_BACKEND, SESSION_MAX_SIZE
+from storage import (
+    get_session_row, save_session_row, delete_session_row, get_session_keys, purge_session_rows
+)
+
+
+class MemorySessionBackend:
+    """
+    In-process conversation state: least-recently-used eviction beyond max_size
+    and an expiry time per key.
+    """
+
+    def __init__(self, ttl, max_size=10000, purge_every=1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.purge_every = purge_every
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    def get(self, key):
+        """Value for key; raises KeyError if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                raise KeyError(key)
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._purge_expired()
+
+    def delete(self, key):
+        """Remove key, returning True if it was present"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def keys(self):
+        with self._lock:
+            self._purge_expired()
+            return list(self._entries)
+
+    def purge(self):
+        """Drop expired entries now"""
+        with self._lock:
+            self._purge_expired()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.stats['expired'] += len(expired)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteSessionBackend:
+    """
+    Conversation state in the bot's SQLite database, shared by every bot process
+    using it and kept across restarts. Values are pickled; keys are stored as JSON
+    so integer user ids come back as integers.
+    """
+
+    def __init__(self, namespace, ttl, max_size=10000, purge_every=100):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_size = max_size
+        self.purge_every = purge_every
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def get(self, key):
+        value = get_session_row(self.namespace, json.dumps(key))
+        if value is None:
+            self._count('misses')
+            raise KeyError(key)
+        self._count('hits')
+        return pickle.loads(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        save_session_row(self.namespace, json.dumps(key), pickle.dumps(value), expires_at)
+
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def delete(self, key):
+        return delete_session_row(self.namespace, json.dumps(key))
+
+    def keys(self):
+        return [json.loads(key) for key in get_session_keys(self.namespace)]
+
+    def purge(self):
+        """Drop expired rows and trim the namespace to max_size"""
+        expired, evicted = purge_session_rows(self.namespace, self.max_size)
+        self._count('expired', expired)
+        self._count('evicted', evicted)
+
+    def size(self):
+        return len(get_session_keys(self.namespace))
+
+
+class TrackedDict(dict):
+    """
+    A dict value read from a SessionDict. Top-level changes are written back to
+    the store; changes to nested lists or dicts are not, so assign a new value
+    instead of mutating one in place.
+    """
+
+    def __init__(self, store, key, data):
+        super().__init__(data)
+        self._store = store
+        self._key = key
+
+    def _save(self):
+        self._store[self._key] = dict(self)
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        self._save()
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self._save()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._save()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._save()
+        return item
+
+    def setdefault(self, name, default=None):
+        if name in self:
+            return self[name]
+        self[name] = default
+        return default
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._save()
+
+    def clear(self):
+        super().clear()
+        self._save()
+
+
+class SessionDict(MutableMapping):
+    """
+    Dict-like conversation state (user_states, user_data, callback data) on a
+    pluggable backend. Every key expires after the backend's ttl unless set()
+    gives it its own, so abandoned wizards don't accumulate.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __getitem__(self, key):
+        value = self.backend.get(key)
+        if isinstance(value, dict):
+            return TrackedDict(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def set(self, key, value, ttl=None):
+        """Store a value, optionally with its own expiry in seconds"""
+        if isinstance(value, dict):
+            # A copy, so later changes to the caller's dict behave the same on every backend
+            value = dict(value)
+        self.backend.set(key, value, ttl)
+
+    def __delitem__(self, key):
+        if not self.backend.delete(key):
+            raise KeyError(key)
+
+    def pop(self, key, *default):
+        """Remove a key and return its value, or default if it's missing or has expired"""
+        try:
+            value = self.backend.get(key)
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        # Deleting may find the key already expired, which is fine here
+        self.backend.delete(key)
+        return value
+
+    def __contains__(self, key):
+        try:
+            self.backend.get(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.backend.keys())
+
+    def __len__(self):
+        return self.backend.size()
+
+    def get_stats(self):
+        return {**self.backend.stats, 'size': self.backend.size()}
+
+
+def create_session_store(namespace, ttl, max_size=SESSION_MAX_SIZE, backend=SESSION_BACKEND):
+    """
+    Session store for one kind of conversation state.
+
+    Args:
+        namespace (str): Name of the state, e.g. 'user_data'
+        ttl (float): Seconds until an untouched key expires
+        max_size (int): Keys kept before the least recently used are evicted
+        backend (str): "memory" (this process only) or "sqlite" (shared, survives restarts)
+
+    Returns:
+        SessionDict: The store
+    """
+    if backend == 'sqlite':
+        return SessionDict(SQLiteSessionBackend(namespace, ttl, max_size))
+    return SessionDict(MemorySessionBackend(ttl, max_size))
@@ -1,151 +1,446 @@
 import json
 import os
+import sqlite3
+import threading
+import time
 from datetime import datetime
-from config import DATA_DIR, USERS_FILE, TOKENS_FILE, POOLS_FILE
+from config import DATA_DIR, USERS_FILE, TOKENS_FILE, POOLS_FILE, DATABASE_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT,
+    wallet_address TEXT NOT NULL,
+    private_key TEXT NOT NULL,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    token_name TEXT,
+    token_symbol TEXT,
+    contract_address TEXT,
+    total_supply TEXT,
+    buy_tax NUMERIC,
+    sell_tax NUMERIC,
+    tax_wallet TEXT,
+    features TEXT,
+    network TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tokens_user_id ON tokens (user_id);
+
+CREATE TABLE IF NOT EXISTS pools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    token_address TEXT,
+    pool_address TEXT,
+    liquidity_amount TEXT,
+    network TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pools_user_id ON pools (user_id);
+
+CREATE TABLE IF NOT EXISTS token_metadata (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    symbol TEXT,
+    name TEXT,
+    decimals INTEGER,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (chain_id, address)
+);
+
+CREATE TABLE IF NOT EXISTS processed_updates (
+    update_id INTEGER PRIMARY KEY,
+    received_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (namespace, expires_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Wallets by user id, filled lazily by get_user_wallet
+_wallet_cache = {}
+_wallet_cache_lock = threading.Lock()
+_wallet_cache_stats = {'hits': 0, 'misses': 0, 'generation': 0}
+
+# One connection per thread - sqlite3 connections must not be shared across threads
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def get_connection():
+    global _schema_ready
+
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        os.makedirs(os.path.dirname(DATABASE_FILE) or '.', exist_ok=True)
+        connection = sqlite3.connect(DATABASE_FILE, timeout=30)
+        connection.row_factory = sqlite3.Row
+        # WAL lets handler threads read while another thread writes
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        _local.connection = connection
+
+        with _schema_lock:
+            if not _schema_ready:
+                connection.executescript(SCHEMA)
+                _schema_ready = True
+    return connection
+
+def close_connection():
+    """Close this thread's connection (the next get_connection reopens DATABASE_FILE)"""
+    global _schema_ready
+
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        connection.close()
+        _local.connection = None
+    _schema_ready = False
+    invalidate_wallet_cache()
+
+def _load_json_file(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Skipping {path} during migration: {e}")
+        return {}
+
+def migrate_json_files(connection):
+    """
+    One-shot import of the legacy users/tokens/pools JSON files.
+    The JSON files are left in place as a backup.
+    """
+    if connection.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return
+
+    users = _load_json_file(USERS_FILE) if os.path.exists(USERS_FILE) else {}
+    tokens = _load_json_file(TOKENS_FILE) if os.path.exists(TOKENS_FILE) else {}
+    pools = _load_json_file(POOLS_FILE) if os.path.exists(POOLS_FILE) else {}
+
+    with connection:
+        for user_id, user in users.items():
+            connection.execute(
+                "INSERT OR REPLACE INTO users (user_id, username, wallet_address, private_key, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(user_id), user.get('username'), user['wallet_address'],
+                 user['private_key'], user.get('created_at'))
+            )
+
+        for user_id, user_tokens in tokens.items():
+            for token in user_tokens:
+                _insert_token(connection, str(user_id), token)
+
+        for user_id, user_pools in pools.items():
+            for pool in user_pools:
+                _insert_pool(connection, str(user_id), pool)
+
+        connection.execute(
+            "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+            (datetime.now().isoformat(),)
+        )
+    invalidate_wallet_cache()
+
+    if users or tokens or pools:
+        print(f"✅ Migrated {len(users)} users, {sum(len(t) for t in tokens.values())} tokens "
+              f"and {sum(len(p) for p in pools.values())} pools from JSON files")
 
 # Initialize data storage
 def init_data_storage():
     # Create data directory if it doesn't exist
     os.makedirs(DATA_DIR, exist_ok=True)
 
-    # Initialize users data
-    if not os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'w') as f:
-            json.dump({}, f, indent=4)
-    else:
-        # Make sure it's valid JSON
-        try:
-            with open(USERS_FILE, 'r') as f:
-                json.load(f)
-        except json.JSONDecodeError:
-            # If corrupted, create a new empty file
-            with open(USERS_FILE, 'w') as f:
-                json.dump({}, f, indent=4)
-
-    # Initialize tokens data
-    if not os.path.exists(TOKENS_FILE):
-        with open(TOKENS_FILE, 'w') as f:
-            json.dump({}, f, indent=4)
-    else:
-        # Make sure it's valid JSON
-        try:
-            with open(TOKENS_FILE, 'r') as f:
-                json.load(f)
-        except json.JSONDecodeError:
-            # If corrupted, create a new empty file
-            with open(TOKENS_FILE, 'w') as f:
-                json.dump({}, f, indent=4)
-
-    # Initialize pools data
-    if not os.path.exists(POOLS_FILE):
-        with open(POOLS_FILE, 'w') as f:
-            json.dump({}, f, indent=4)
-    else:
-        # Make sure it's valid JSON
-        try:
-            with open(POOLS_FILE, 'r') as f:
-                json.load(f)
-        except json.JSONDecodeError:
-            # If corrupted, create a new empty file
-            with open(POOLS_FILE, 'w') as f:
-                json.dump({}, f, indent=4)
+    migrate_json_files(get_connection())
 
-def save_user_wallet(user_id, username, wallet_data):
-    user_id = str(user_id)  # Convert to string for JSON keys
+def _insert_token(connection, user_id, token):
+    connection.execute(
+        "INSERT INTO tokens (user_id, token_name, token_symbol, contract_address, total_supply, "
+        "buy_tax, sell_tax, tax_wallet, features, network, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (user_id, token.get('token_name'), token.get('token_symbol'), token.get('contract_address'),
+         json.dumps(token.get('total_supply')), token.get('buy_tax'), token.get('sell_tax'),
+         token.get('tax_wallet', ''), json.dumps(token.get('features', [])),
+         token.get('network'), token.get('created_at'))
+    )
 
-    try:
-        # Ensure file exists
-        if not os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'w') as f:
-                json.dump({}, f, indent=4)
-
-        # Read current data
-        try:
-            with open(USERS_FILE, 'r') as f:
-                users = json.load(f)
-        except json.JSONDecodeError:
-            # If file is corrupted, start fresh
-            users = {}
-
-        # Update data
-        users[user_id] = {
-            'username': username,
-            'wallet_address': wallet_data['address'],
-            'private_key': wallet_data['private_key'],
-            'created_at': datetime.now().isoformat()
-        }
+def _insert_pool(connection, user_id, pool):
+    connection.execute(
+        "INSERT INTO pools (user_id, token_address, pool_address, liquidity_amount, network, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (user_id, pool.get('token_address'), pool.get('pool_address'),
+         json.dumps(pool.get('liquidity_amount')), pool.get('network'), pool.get('created_at'))
+    )
 
-        # Write data back
-        with open(USERS_FILE, 'w') as f:
-            json.dump(users, f, indent=4)
+def save_user_wallet(user_id, username, wallet_data):
+    user_id = str(user_id)
 
+    try:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO users (user_id, username, wallet_address, private_key, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, username, wallet_data['address'], wallet_data['private_key'],
+                 datetime.now().isoformat())
+            )
+        invalidate_wallet_cache(user_id)
         return True
     except Exception as e:
         print(f"Error saving wallet: {str(e)}")
         return False
 
 def get_user_wallet(user_id):
-    user_id = str(user_id)  # Convert to string for JSON keys
+    user_id = str(user_id)
+
+    # Read-through cache - almost every handler looks up the wallet
+    with _wallet_cache_lock:
+        if user_id in _wallet_cache:
+            _wallet_cache_stats['hits'] += 1
+            wallet = _wallet_cache[user_id]
+            return dict(wallet) if wallet else None
+        _wallet_cache_stats['misses'] += 1
+        generation = _wallet_cache_stats['generation']
 
     try:
-        with open(USERS_FILE, 'r') as f:
-            users = json.load(f)
+        row = get_connection().execute(
+            "SELECT wallet_address, private_key FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
 
-        if user_id in users:
-            return {
-                'address': users[user_id]['wallet_address'],
-                'private_key': users[user_id]['private_key']
+        wallet = None
+        if row:
+            wallet = {
+                'address': row['wallet_address'],
+                'private_key': row['private_key']
             }
-        return None
-    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+
+        # Users without a wallet are cached too; saving a wallet invalidates the entry.
+        # Skip the fill if an invalidation happened while we were reading.
+        with _wallet_cache_lock:
+            if generation == _wallet_cache_stats['generation']:
+                _wallet_cache[user_id] = wallet
+        return dict(wallet) if wallet else None
+    except sqlite3.Error as e:
         print(f"Error reading wallet data: {str(e)}")
-        # Initialize the file if it doesn't exist
-        if isinstance(e, FileNotFoundError):
-            with open(USERS_FILE, 'w') as f:
-                json.dump({}, f, indent=4)
     return None
 
+def invalidate_wallet_cache(user_id=None):
+    """Drop one user's cached wallet, or the whole cache if no user is given"""
+    with _wallet_cache_lock:
+        _wallet_cache_stats['generation'] += 1
+        if user_id is None:
+            _wallet_cache.clear()
+        else:
+            _wallet_cache.pop(str(user_id), None)
+
+def get_wallet_cache_stats():
+    with _wallet_cache_lock:
+        return {
+            'hits': _wallet_cache_stats['hits'],
+            'misses': _wallet_cache_stats['misses'],
+            'size': len(_wallet_cache)
+        }
+
+def get_user_ids():
+    rows = get_connection().execute("SELECT user_id FROM users ORDER BY user_id").fetchall()
+    return [row['user_id'] for row in rows]
+
 def save_token_to_db(user_id, token_data, contract_address, network):
-    user_id = str(user_id)  # Convert to string for JSON keys
-
-    with open(TOKENS_FILE, 'r') as f:
-        tokens = json.load(f)
-
-    if user_id not in tokens:
-        tokens[user_id] = []
-
-    tokens[user_id].append({
-        'token_name': token_data['name'],
-        'token_symbol': token_data['symbol'],
-        'contract_address': contract_address,
-        'total_supply': token_data['total_supply'],
-        'buy_tax': token_data['buy_tax'],
-        'sell_tax': token_data['sell_tax'],
-        'tax_wallet': token_data.get('tax_wallet', ''),
-        'features': token_data['features'],
-        'network': network,
-        'created_at': datetime.now().isoformat()
-    })
-
-    with open(TOKENS_FILE, 'w') as f:
-        json.dump(tokens, f, indent=4)
+    user_id = str(user_id)
+
+    connection = get_connection()
+    with connection:
+        _insert_token(connection, user_id, {
+            'token_name': token_data['name'],
+            'token_symbol': token_data['symbol'],
+            'contract_address': contract_address,
+            'total_supply': token_data['total_supply'],
+            'buy_tax': token_data['buy_tax'],
+            'sell_tax': token_data['sell_tax'],
+            'tax_wallet': token_data.get('tax_wallet', ''),
+            'features': token_data['features'],
+            'network': network,
+            'created_at': datetime.now().isoformat()
+        })
+
+def get_user_tokens(user_id):
+    """Tokens deployed by a user, oldest first, in the same shape tokens.json used"""
+    user_id = str(user_id)
+
+    rows = get_connection().execute(
+        "SELECT * FROM tokens WHERE user_id = ? ORDER BY id", (user_id,)
+    ).fetchall()
+    return [{
+        'token_name': row['token_name'],
+        'token_symbol': row['token_symbol'],
+        'contract_address': row['contract_address'],
+        'total_supply': json.loads(row['total_supply']),
+        'buy_tax': row['buy_tax'],
+        'sell_tax': row['sell_tax'],
+        'tax_wallet': row['tax_wallet'],
+        'features': json.loads(row['features']),
+        'network': row['network'],
+        'created_at': row['created_at']
+    } for row in rows]
 
 def save_pool_to_db(user_id, token_address, pool_address, liquidity_data, network):
-    user_id = str(user_id)  # Convert to string for JSON keys
+    user_id = str(user_id)
+
+    connection = get_connection()
+    with connection:
+        _insert_pool(connection, user_id, {
+            'token_address': token_address,
+            'pool_address': pool_address,
+            'liquidity_amount': liquidity_data,
+            'network': network,
+            'created_at': datetime.now().isoformat()
+        })
+
+def get_user_pools(user_id):
+    """Pools created by a user, oldest first, in the same shape pools.json used"""
+    user_id = str(user_id)
+
+    rows = get_connection().execute(
+        "SELECT * FROM pools WHERE user_id = ? ORDER BY id", (user_id,)
+    ).fetchall()
+    return [{
+        'token_address': row['token_address'],
+        'pool_address': row['pool_address'],
+        'liquidity_amount': json.loads(row['liquidity_amount']),
+        'network': row['network'],
+        'created_at': row['created_at']
+    } for row in rows]
+
+def delete_user_data(user_id):
+    """Delete a user's wallet and token records"""
+    user_id = str(user_id)
+
+    connection = get_connection()
+    with connection:
+        connection.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+        connection.execute("DELETE FROM tokens WHERE user_id = ?", (user_id,))
+    invalidate_wallet_cache(user_id)
+
+def get_token_metadata_rows(chain_id, addresses):
+    """Stored token metadata for checksum addresses on one chain, keyed by address"""
+    if not addresses:
+        return {}
+
+    placeholders = ", ".join("?" for _ in addresses)
+    rows = get_connection().execute(
+        f"SELECT * FROM token_metadata WHERE chain_id = ? AND address IN ({placeholders})",
+        (chain_id, *addresses)
+    ).fetchall()
+    return {row['address']: {
+        'symbol': row['symbol'],
+        'name': row['name'],
+        'decimals': row['decimals'],
+        'fetched_at': row['fetched_at']
+    } for row in rows}
+
+def save_token_metadata(chain_id, entries):
+    """Store token metadata; entries maps checksum address to a metadata dict with fetched_at"""
+    connection = get_connection()
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO token_metadata (chain_id, address, symbol, name, decimals, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(chain_id, address, entry['symbol'], entry['name'], entry['decimals'], entry['fetched_at'])
+             for address, entry in entries.items()]
+        )
+
+# How long handled Telegram update ids are remembered (Telegram stops retrying long before)
+PROCESSED_UPDATE_RETENTION = 24 * 3600
+
+def claim_update(update_id):
+    """
+    Record a Telegram update as handled. Shared by all bot processes using this database.
+
+    Returns:
+        bool: True if no process has claimed the update before
+    """
+    now = time.time()
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO processed_updates (update_id, received_at) VALUES (?, ?)",
+            (update_id, now)
+        )
+        if update_id % 1000 == 0:
+            connection.execute(
+                "DELETE FROM processed_updates WHERE received_at < ?",
+                (now - PROCESSED_UPDATE_RETENTION,)
+            )
+    return cursor.rowcount == 1
+
+def get_session_row(namespace, key):
+    """
+    Stored conversation state for a key, ignoring expired rows.
+
+    Returns:
+        bytes: The serialized value, or None
+    """
+    row = get_connection().execute(
+        "SELECT value FROM sessions WHERE namespace = ? AND key = ? AND expires_at > ?",
+        (namespace, key, time.time())
+    ).fetchone()
+    return row['value'] if row else None
+
+def save_session_row(namespace, key, value, expires_at):
+    connection = get_connection()
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, value, expires_at)
+        )
 
-    with open(POOLS_FILE, 'r') as f:
-        pools = json.load(f)
+def delete_session_row(namespace, key):
+    """Delete a key, returning True if a live row was removed"""
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute(
+            "DELETE FROM sessions WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        )
+    return cursor.rowcount > 0
 
-    if user_id not in pools:
-        pools[user_id] = []
+def get_session_keys(namespace):
+    """Keys of all live rows in a namespace"""
+    rows = get_connection().execute(
+        "SELECT key FROM sessions WHERE namespace = ? AND expires_at > ?",
+        (namespace, time.time())
+    ).fetchall()
+    return [row['key'] for row in rows]
 
-    pools[user_id].append({
-        'token_address': token_address,
-        'pool_address': pool_address,
-        'liquidity_amount': liquidity_data,
-        'network': network,
-        'created_at': datetime.now().isoformat()
-    })
+def purge_session_rows(namespace, max_rows):
+    """
+    Delete expired rows, then the rows closest to expiry beyond max_rows.
 
-    with open(POOLS_FILE, 'w') as f:
-        json.dump(pools, f, indent=4) 
\ No newline at end of file
+    Returns:
+        tuple: (expired rows deleted, live rows evicted)
+    """
+    connection = get_connection()
+    with connection:
+        expired = connection.execute(
+            "DELETE FROM sessions WHERE namespace = ? AND expires_at <= ?",
+            (namespace, time.time())
+        ).rowcount
+        evicted = connection.execute(
+            "DELETE FROM sessions WHERE namespace = ? AND key IN ("
+            "SELECT key FROM sessions WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (namespace, namespace, max_rows)
+        ).rowcount
+    return expired, evicted
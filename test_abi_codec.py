@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("eth_abi")
+
+from web3 import Web3
+
+from abi_codec import get_codec
+from config import POSITION_MANAGER_WITH_POOL_CREATE_ABI
+
+RENOUNCE_ABI = [{"name": "renounceOwnership", "type": "function", "inputs": [], "outputs": [],
+                 "stateMutability": "nonpayable"}]
+TOKEN = Web3.to_checksum_address("0x" + "11" * 20)
+WMATIC = Web3.to_checksum_address("0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270")
+WALLET = Web3.to_checksum_address("0x" + "22" * 20)
+
+MINT_PARAMS = {
+    'token0': WMATIC,
+    'token1': TOKEN,
+    'fee': 3000,
+    'tickLower': -887220,
+    'tickUpper': 887220,
+    'amount0Desired': 10 ** 18,
+    'amount1Desired': 5 * 10 ** 20,
+    'amount0Min': 0,
+    'amount1Min': 0,
+    'recipient': WALLET,
+    'deadline': 1700000000
+}
+
+def test_selectors():
+    """Test the selectors of the functions the bot sends value-bearing transactions to"""
+    print("Testing selectors...")
+    codec = get_codec(POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+    assert codec.function('mint').selector.hex() == "88316456"
+    assert codec.function('createAndInitializePoolIfNecessary').selector.hex() == "13ead562"
+    assert get_codec(RENOUNCE_ABI).encode('renounceOwnership').hex() == "715018a6"
+    print("✅ Selectors match")
+
+def test_struct_encoding():
+    """Test that a dict struct, a positional tuple and web3's own encoder agree"""
+    print("Testing struct encoding...")
+    codec = get_codec(POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+    from_dict = codec.encode('mint', MINT_PARAMS)
+    from_tuple = codec.encode('mint', tuple(MINT_PARAMS.values()))
+    assert from_dict == from_tuple
+    # selector + 11 static words
+    assert len(from_dict) == 4 + 11 * 32
+
+    contract = Web3().eth.contract(abi=POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+    # encodeABI was renamed encode_abi in later web3 6.x releases
+    encode_abi = getattr(contract, "encode_abi", None) or contract.encodeABI
+    assert "0x" + from_dict.hex() == encode_abi(fn_name='mint', args=[MINT_PARAMS])
+    create = codec.encode('createAndInitializePoolIfNecessary', WMATIC, TOKEN, 3000, 2 ** 96)
+    assert "0x" + create.hex() == encode_abi(
+        fn_name='createAndInitializePoolIfNecessary', args=[WMATIC, TOKEN, 3000, 2 ** 96])
+    print("✅ Structs encoded")
+
+def test_argument_count_and_unknown_function():
+    """Test that wrong calls are rejected before anything is sent"""
+    print("Testing errors...")
+    codec = get_codec(POSITION_MANAGER_WITH_POOL_CREATE_ABI)
+    with pytest.raises(ValueError, match="takes 4 arguments, got 3"):
+        codec.encode('createAndInitializePoolIfNecessary', WMATIC, TOKEN, 3000)
+    with pytest.raises(ValueError, match="not found"):
+        codec.encode('burnEverything')
+    assert get_codec(POSITION_MANAGER_WITH_POOL_CREATE_ABI) is codec, "built once per ABI"
+    print("✅ Bad calls rejected")
+
+if __name__ == "__main__":
+    test_selectors()
+    test_struct_encoding()
+    test_argument_count_and_unknown_function()
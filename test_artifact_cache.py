@@ -0,0 +1,86 @@
+import tempfile
+import artifact_cache
+from artifact_cache import ArtifactCache, get_cache_key, get_feature_combinations, normalize_source
+from contract_bridge import get_compiled_artifact
+
+SOURCE = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+contract Token is ERC20, Ownable {
+    // comment
+    uint256 public buyTax;
+}"""
+
+class FakePool:
+    """Records worker calls and answers generate/compile like the Node worker"""
+
+    def __init__(self):
+        self.calls = []
+
+    def call(self, method, params=None, timeout=None):
+        self.calls.append(method)
+        if method == "generate":
+            return {
+                "success": True,
+                "contractCode": SOURCE + "\n// " + ",".join(sorted(params["features"])),
+                "solcVersion": "0.8.20+commit.a1b79de6",
+                "optimizer": {"enabled": True, "runs": 200}
+            }
+        if method == "compile":
+            return {"success": True, "abi": [], "bytecode": "0x6080"}
+        raise AssertionError(f"unexpected method {method}")
+
+def test_cache_key():
+    """Test that the cache key ignores formatting but not code or settings"""
+    print("Testing artifact cache key...")
+    optimizer = {"enabled": True, "runs": 200}
+    key = get_cache_key(SOURCE, "0.8.20", optimizer)
+
+    # Trailing whitespace and blank lines don't matter
+    reformatted = SOURCE.replace(";", ";   ").replace("\n", "\n\n")
+    assert get_cache_key(reformatted, "0.8.20", optimizer) == key
+
+    # Line breaks are kept, so a comment can't swallow the following line
+    assert "// comment\n    uint256" in normalize_source(SOURCE)
+
+    assert get_cache_key(SOURCE.replace("buyTax", "sellTax"), "0.8.20", optimizer) != key
+    assert get_cache_key(SOURCE, "0.8.21", optimizer) != key
+    assert get_cache_key(SOURCE, "0.8.20", {"enabled": True, "runs": 1000}) != key
+    print("✅ Cache key is stable and sensitive to source, compiler and optimizer")
+
+def test_feature_combinations():
+    combinations = get_feature_combinations()
+    assert len(combinations) == 32
+    assert len({tuple(c) for c in combinations}) == 32
+    assert [] in combinations
+
+def test_compiled_artifact_is_cached():
+    """Test that a feature set is compiled once and then served from disk"""
+    print("Testing compiled artifact cache...")
+    cache_dir = tempfile.mkdtemp()
+    artifact_cache._artifact_cache = ArtifactCache(cache_dir)
+    try:
+        pool = FakePool()
+        first = get_compiled_artifact(["Mintable", "Burnable"], pool=pool)
+        assert first["success"] and not first["cached"]
+        assert pool.calls == ["generate", "compile"]
+
+        pool.calls = []
+        second = get_compiled_artifact(["Mintable", "Burnable"], pool=pool)
+        assert second["cached"]
+        assert second["bytecode"] == first["bytecode"]
+        assert pool.calls == ["generate"]
+
+        # A fresh cache instance reads the artifact back from disk
+        artifact_cache._artifact_cache = ArtifactCache(cache_dir)
+        pool.calls = []
+        assert get_compiled_artifact(["Mintable", "Burnable"], pool=pool)["cached"]
+        assert pool.calls == ["generate"]
+        print("✅ Artifact compiled once and reused")
+    finally:
+        artifact_cache._artifact_cache = None
+
+if __name__ == "__main__":
+    test_cache_key()
+    test_feature_combinations()
+    test_compiled_artifact_is_cached()
@@ -1,6 +1,8 @@
 import json
 import os
+import tempfile
 from contract_bridge import create_js_deployment_file
+from toolchain import get_manifest_hash, get_node_env, get_node_modules_path, verify_toolchain
 
 def test_js_file_creation():
     """Test that the JavaScript deployment file is created correctly"""
@@ -27,30 +29,42 @@ def test_js_file_creation():
     package_json_path = os.path.join(temp_dir, "package.json")
     deploy_js_path = os.path.join(temp_dir, "deploy.js")
     
-    if os.path.exists(package_json_path):
-        print(f"✅ package.json created at {package_json_path}")
-        
-        # Check the content of package.json
-        with open(package_json_path, "r") as f:
-            package_json = json.load(f)
-            print(f"  - Dependencies: {', '.join(package_json.get('dependencies', {}).keys())}")
-    else:
-        print("❌ package.json not created")
-    
-    if os.path.exists(deploy_js_path):
-        print(f"✅ deploy.js created at {deploy_js_path}")
-        
-        # Check the file size
-        file_size = os.path.getsize(deploy_js_path)
-        print(f"  - File size: {file_size} bytes")
-    else:
-        print("❌ deploy.js not created")
+    # Packages come from the shared toolchain, not a per-deployment package.json
+    assert not os.path.exists(package_json_path), "package.json should not be created per deployment"
+    print("✅ No per-deployment package.json")
+    
+    assert os.path.exists(deploy_js_path), "deploy.js not created"
+    print(f"✅ deploy.js created at {deploy_js_path}")
+    
+    # Check the file size
+    file_size = os.path.getsize(deploy_js_path)
+    print(f"  - File size: {file_size} bytes")
     
     print(f"\nTemporary directory: {temp_dir}")
     print("You can manually check the files or run the deployment script with:")
-    print(f"cd {temp_dir} && npm install && node deploy.js '{json.dumps(contract_data)}'")
+    print(f"cd {temp_dir} && TOOLCHAIN_NODE_MODULES={get_node_modules_path()} NODE_PATH={get_node_modules_path()} node deploy.js '{json.dumps(contract_data)}'")
     
     return temp_dir
 
+def test_toolchain_manifest():
+    """Test that the shared toolchain location is stable and verified before use"""
+    print("Testing shared toolchain manifest...")
+    
+    # The toolchain directory is content-addressed by the package manifest
+    assert get_manifest_hash() == get_manifest_hash()
+    print(f"✅ Manifest hash: {get_manifest_hash()[:16]}")
+    
+    # An empty directory is never mistaken for an installed toolchain
+    empty_dir = tempfile.mkdtemp()
+    assert not verify_toolchain(empty_dir)
+    print("✅ Incomplete toolchain rejected")
+    
+    # Node scripts resolve packages from the toolchain
+    env = get_node_env(empty_dir)
+    assert env["TOOLCHAIN_NODE_MODULES"] == os.path.join(empty_dir, "node_modules")
+    assert env["NODE_PATH"].startswith(env["TOOLCHAIN_NODE_MODULES"])
+    print("✅ Node environment points at the toolchain")
+
 if __name__ == "__main__":
-    temp_dir = test_js_file_creation() 
\ No newline at end of file
+    temp_dir = test_js_file_creation()
+    test_toolchain_manifest() 
\ No newline at end of file
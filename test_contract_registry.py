@@ -0,0 +1,63 @@
+from contract_registry import ContractRegistry
+
+ERC20_ABI = [{"type": "function", "name": "symbol", "inputs": [], "outputs": [{"name": "", "type": "string"}]}]
+OWNER_ABI = [{"type": "function", "name": "owner", "inputs": [], "outputs": [{"name": "", "type": "address"}]}]
+
+class FakeEth:
+    def __init__(self):
+        self.factories_built = 0
+
+    def contract(self, abi):
+        self.factories_built += 1
+
+        class Factory:
+            def __init__(self, address):
+                self.address = address
+                self.abi = abi
+        return Factory
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+        self.checksums = 0
+
+    def to_checksum_address(self, address):
+        self.checksums += 1
+        return address.upper()
+
+def test_contracts_are_built_once():
+    """Test that ABIs are parsed once and instances are shared per address"""
+    print("Testing contract registry...")
+    web3 = FakeWeb3()
+    registry = ContractRegistry(web3)
+
+    first = registry.get("0xabc", ERC20_ABI)
+    assert registry.get("0xABC", ERC20_ABI) is first, "address case doesn't matter"
+    assert first.address == "0XABC"
+
+    other = registry.get("0xdef", ERC20_ABI)
+    owner = registry.get("0xabc", OWNER_ABI)
+    assert other is not first and owner is not first
+    assert owner.abi is OWNER_ABI
+
+    assert web3.eth.factories_built == 2, "one factory per ABI"
+    assert web3.checksums == 3, "one checksum per instance"
+    stats = registry.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3
+    print("✅ Contracts built once")
+
+def test_lru_eviction():
+    """Test that the instance cache is bounded"""
+    print("Testing contract eviction...")
+    registry = ContractRegistry(FakeWeb3(), max_size=2)
+    first = registry.get("0x1", ERC20_ABI)
+    registry.get("0x2", ERC20_ABI)
+    registry.get("0x1", ERC20_ABI)
+    registry.get("0x3", ERC20_ABI)
+    assert registry.get("0x1", ERC20_ABI) is first, "recently used entry kept"
+    assert registry.get_stats()['size'] == 2
+    print("✅ Least recently used contracts evicted")
+
+if __name__ == "__main__":
+    test_contracts_are_built_once()
+    test_lru_eviction()
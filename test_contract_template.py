@@ -0,0 +1,65 @@
+import json
+import shutil
+import subprocess
+from artifact_cache import get_feature_combinations
+from contract_bridge import DEPLOY_LIB_JS
+from contract_template import generate_contract_code
+
+# Load the deployment library with solc/ethers stubbed out and print the
+# generated source for every request read from argv
+NODE_HARNESS = """
+const Module = require('module');
+const originalLoad = Module._load;
+Module._load = (request, ...args) => (request === 'solc' || request === 'ethers') ? {} : originalLoad(request, ...args);
+eval(require('fs').readFileSync(0, 'utf8') + `
+  const requests = JSON.parse(process.argv[1]);
+  console.error = () => {};
+  console.log = () => {};
+  process.stdout.write(JSON.stringify(requests.map(generateContractCode)));
+`);
+"""
+
+def test_template_matches_javascript():
+    """Test that the Python template renders the same source as the JavaScript one"""
+    if not shutil.which("node"):
+        print("Node.js not installed, skipping template comparison")
+        return
+
+    print("Comparing Python and JavaScript contract generation...")
+    requests = [{"name": "My Test Token", "features": features} for features in get_feature_combinations()]
+    requests.append({"name": "Token", "features": [{"type": "Pausable"}, {"name": "Burnable", "enabled": False}]})
+
+    process = subprocess.run(
+        ["node", "-e", NODE_HARNESS, json.dumps(requests)],
+        input=DEPLOY_LIB_JS,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    javascript_sources = json.loads(process.stdout)
+    assert len(javascript_sources) == len(requests)
+
+    for request, javascript_source in zip(requests, javascript_sources):
+        assert generate_contract_code(request) == javascript_source, f"Mismatch for {request['features']}"
+    print(f"✅ {len(requests)} feature combinations render identically")
+
+def test_template_features():
+    source = generate_contract_code({"name": "My Token", "features": ["Pausable", "Access Control"]})
+    assert "contract MyToken is ERC20, Ownable, AccessControl, Pausable {" in source
+    assert "function pause() public onlyRole(PAUSER_ROLE)" in source
+    assert "whenNotPaused" in source
+    assert "function mint(" not in source
+
+def test_constructor_applies_taxes():
+    """Test that taxes are set at deployment rather than by separate setter calls"""
+    source = generate_contract_code({"name": "Taxed", "features": []})
+    assert "buyTax = buyTax_;" in source
+    assert "sellTax = sellTax_;" in source
+    assert "buyTax = 0;" not in source
+    print("✅ Constructor applies taxes")
+
+if __name__ == "__main__":
+    test_template_matches_javascript()
+    test_template_features()
+    test_constructor_applies_taxes()
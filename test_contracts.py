@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("eth_abi")
+
+from gas_estimator import DEFAULT_DEPLOY_GAS, GasEstimator, deploy_shape
+
+# wallet.py needs the RPC endpoints from the local config
+contracts = pytest.importorskip("contracts", exc_type=ImportError)
+
+DEPLOYER = "0x" + "ab" * 20
+TOKEN_DATA = {'name': "Test", 'symbol': "TST", 'decimals': 18, 'total_supply': 1000000,
+              'buy_tax': 300, 'sell_tax': 500, 'features': ["Burnable"], 'tax_wallet': ''}
+CONSTRUCTOR_ABI = [{"type": "constructor", "inputs": [
+    {"name": "name", "type": "string"}, {"name": "symbol", "type": "string"},
+    {"name": "decimals", "type": "uint8"}, {"name": "totalSupply", "type": "uint256"},
+    {"name": "buyTax", "type": "uint256"}, {"name": "sellTax", "type": "uint256"},
+    {"name": "taxWallet", "type": "address"}]}]
+
+class FakeEth:
+    def __init__(self, gas):
+        self.gas = gas
+        self.requests = []
+
+    def estimate_gas(self, transaction):
+        self.requests.append(transaction)
+        if self.gas is None:
+            raise ValueError("execution reverted")
+        return self.gas
+
+class FakeWeb3:
+    def __init__(self, gas):
+        self.eth = FakeEth(gas)
+
+def use_fakes(monkeypatch, artifact):
+    estimator = GasEstimator(margin=0.2)
+    monkeypatch.setattr(contracts, "get_gas_estimator", lambda web3: estimator)
+    monkeypatch.setattr(contracts, "compile_token", lambda features, network: artifact)
+    return estimator
+
+def test_deploy_preview_estimated(monkeypatch):
+    """Test that the deploy preview runs eth_estimateGas on the artifact's init code"""
+    print("Testing deploy gas estimation...")
+    use_fakes(monkeypatch, {'success': True, 'abi': CONSTRUCTOR_ABI, 'bytecode': "0x6080"})
+    web3 = FakeWeb3(1000000)
+
+    assert contracts.estimate_deploy_gas(web3, TOKEN_DATA, 'polygon', DEPLOYER) == 1200000
+    (request,) = web3.eth.requests
+    assert request['from'] == DEPLOYER
+    assert request['data'].startswith("0x6080") and len(request['data']) > 2 + 4 + 64 * 7
+    print("✅ Deploy gas estimated")
+
+def test_deploy_preview_falls_back(monkeypatch):
+    """Test the recorded gas, then the default, when the deploy can't be estimated"""
+    print("Testing deploy gas fallback...")
+    estimator = use_fakes(monkeypatch, {'success': False, 'error': "toolchain missing"})
+    web3 = FakeWeb3(1000000)
+    assert contracts.estimate_deploy_gas(web3, TOKEN_DATA, 'polygon', DEPLOYER) == DEFAULT_DEPLOY_GAS
+    assert web3.eth.requests == []
+
+    estimator.record(deploy_shape(TOKEN_DATA['features']), 2000000)
+    monkeypatch.setattr(contracts, "compile_token",
+                        lambda features, network: {'success': True, 'abi': CONSTRUCTOR_ABI, 'bytecode': "0x6080"})
+    assert contracts.estimate_deploy_gas(FakeWeb3(None), TOKEN_DATA, 'polygon', DEPLOYER) == 2400000
+    print("✅ Deploy gas falls back")
+
+if __name__ == "__main__":
+    test_deploy_preview_estimated(pytest.MonkeyPatch())
+    test_deploy_preview_falls_back(pytest.MonkeyPatch())
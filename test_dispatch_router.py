@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+from dispatch_router import DispatchRouter, PrefixTrie, extract_command
+
+def make_message(text, user_id=1):
+    return SimpleNamespace(text=text, from_user=SimpleNamespace(id=user_id))
+
+def make_call(data, user_id=1):
+    return SimpleNamespace(data=data, from_user=SimpleNamespace(id=user_id))
+
+class FakeBot:
+    def __init__(self):
+        self.message_handlers = []
+        self.callback_query_handlers = []
+
+    def register_message_handler(self, function, **filters):
+        self.message_handlers.append(function)
+
+    def register_callback_query_handler(self, function, **filters):
+        self.callback_query_handlers.append(function)
+
+def test_message_routing():
+    """Test commands, button texts and conversation states"""
+    print("Testing message routing...")
+    states = {2: 'TOKEN_CREATION', 3: 'WALLET_SETUP'}
+    router = DispatchRouter(get_state=states.get)
+
+    @router.message_command('start')
+    def start(message): pass
+
+    @router.message_text('🪙 Create Token')
+    def create_token(message): pass
+
+    @router.message_state('TOKEN_CREATION')
+    def token_creation(message): pass
+
+    @router.message_state('WALLET_SETUP', func=lambda message: len(message.text) >= 64)
+    def import_wallet(message): pass
+
+    @router.message_command('debug')
+    def debug(message): pass
+
+    assert extract_command('/start@DevBot now') == 'start'
+    assert extract_command('hello') is None
+    assert router.route_message(make_message('/start')) is start
+    assert router.route_message(make_message('/start@DevBot')) is start
+    assert router.route_message(make_message('🪙 Create Token', user_id=2)) is create_token
+    assert router.route_message(make_message('MyToken', user_id=2)) is token_creation
+
+    # Declaration order wins: the state handler comes before /debug
+    assert router.route_message(make_message('/debug', user_id=2)) is token_creation
+    assert router.route_message(make_message('/debug')) is debug
+
+    assert router.route_message(make_message('0x' + 'a' * 64, user_id=3)) is import_wallet
+    assert router.route_message(make_message('short', user_id=3)) is None
+    print("✅ Messages routed")
+
+def test_callback_routing():
+    """Test exact callback data, prefixes and duplicate handlers"""
+    print("Testing callback routing...")
+    router = DispatchRouter(get_state=lambda user_id: None)
+
+    @router.callback_data('change_wallet')
+    def first_change_wallet(call): pass
+
+    @router.callback_prefix('lock_')
+    def lock_any(call): pass
+
+    @router.callback_prefix('lock_days_')
+    def lock_days(call): pass
+
+    @router.callback_data('change_wallet')
+    def second_change_wallet(call): pass
+
+    assert router.route_callback_query(make_call('change_wallet')) is first_change_wallet
+    # The shorter prefix was declared first, so it wins like telebot's handler list
+    assert router.route_callback_query(make_call('lock_days_30')) is lock_any
+    assert router.route_callback_query(make_call('unknown')) is None
+
+    trie = PrefixTrie()
+    trie.add('p_', 1)
+    trie.add('pool_amount_', 2)
+    assert trie.matches('pool_amount_1000') == [2]
+    assert trie.matches('p_123') == [1]
+    print("✅ Callbacks routed")
+
+def test_register_and_stats():
+    """Test dispatching through the registered handlers"""
+    print("Testing registration...")
+    router = DispatchRouter(get_state=lambda user_id: None)
+    handled = []
+
+    @router.callback_data('back_to_main')
+    def back_to_main(call):
+        handled.append(call.data)
+
+    bot = FakeBot()
+    router.register(bot)
+    bot.callback_query_handlers[0](make_call('back_to_main'))
+    bot.callback_query_handlers[0](make_call('nothing'))
+    bot.message_handlers[0](make_message('hi'))
+    assert handled == ['back_to_main']
+    assert bot.callback_query_handlers[0].route(make_call('back_to_main')) is back_to_main
+
+    stats = router.get_stats()
+    assert stats['callbacks'] == 3 and stats['messages'] == 1
+    assert stats['unmatched'] == 2
+    assert stats['avg_routing_us'] >= 0
+    print("✅ Router registered")
+
+if __name__ == "__main__":
+    test_message_routing()
+    test_callback_routing()
+    test_register_and_stats()
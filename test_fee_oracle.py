@@ -0,0 +1,68 @@
+from fee_oracle import FeeOracle
+
+GWEI = 10 ** 9
+
+class FakeEth:
+    """Stand-in node with a fixed fee history"""
+
+    def __init__(self, eip1559=True):
+        self.block_number = 100
+        self.eip1559 = eip1559
+        self.fee_history_calls = 0
+
+    def fee_history(self, block_count, newest_block, percentiles):
+        self.fee_history_calls += 1
+        if not self.eip1559:
+            raise ValueError("the method eth_feeHistory does not exist")
+        return {
+            'oldestBlock': self.block_number - 2,
+            'baseFeePerGas': [30 * GWEI, 32 * GWEI, 34 * GWEI, 40 * GWEI],
+            'reward': [[1 * GWEI], [3 * GWEI], [2 * GWEI]]
+        }
+
+    @property
+    def gas_price(self):
+        return 50 * GWEI
+
+    @property
+    def max_priority_fee(self):
+        return 1 * GWEI
+
+class FakeWeb3:
+    def __init__(self, eip1559=True):
+        self.eth = FakeEth(eip1559)
+
+def test_eip1559_fees_cached_per_block():
+    """Test fee suggestions from eth_feeHistory, fetched once per block"""
+    print("Testing EIP-1559 fee estimation...")
+    web3 = FakeWeb3()
+    oracle = FeeOracle(web3, min_refresh=0)
+
+    fees = oracle.get_fees()
+    assert fees['eip1559']
+    assert fees['base_fee'] == 40 * GWEI, "next block's base fee"
+    assert fees['max_priority_fee'] == 2 * GWEI, "median of recent rewards"
+    assert fees['max_fee'] == 82 * GWEI
+    assert fees['gas_price'] == 42 * GWEI
+    assert oracle.get_stats()['block'] == 100
+
+    for _ in range(10):
+        oracle.get_fees()
+    assert web3.eth.fee_history_calls == 1
+
+    web3.eth.block_number = 101
+    assert oracle.transaction_fields() == {'maxFeePerGas': 82 * GWEI, 'maxPriorityFeePerGas': 2 * GWEI}
+    assert web3.eth.fee_history_calls == 2
+    print("✅ Fees refreshed once per block")
+
+def test_legacy_fallback():
+    """Test networks without eth_feeHistory"""
+    print("Testing legacy fallback...")
+    oracle = FeeOracle(FakeWeb3(eip1559=False))
+    assert oracle.transaction_fields() == {'gasPrice': 50 * GWEI}
+    assert not oracle.get_fees()['eip1559']
+    print("✅ Legacy gas price used")
+
+if __name__ == "__main__":
+    test_eip1559_fees_cached_per_block()
+    test_legacy_fallback()
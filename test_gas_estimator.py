@@ -0,0 +1,42 @@
+import time
+from gas_estimator import GasEstimator, deploy_shape
+
+def test_estimates_with_margin_and_cache():
+    """Test estimates, the safety margin and reuse for previews"""
+    print("Testing gas estimation...")
+    estimator = GasEstimator(margin=0.2)
+    key = deploy_shape(["Mintable", "Burnable"])
+    assert key == deploy_shape(["Burnable", "Mintable"]), "feature order doesn't matter"
+
+    # Previews use the default until the shape has been seen
+    assert estimator.get(key, 3000000) == 3000000
+
+    assert estimator.estimate(key, lambda: 1000000, 3000000) == 1200000
+    assert estimator.get(key, 3000000) == 1200000
+
+    # Gas actually used replaces the estimate
+    estimator.record(key, 900000)
+    assert estimator.get(key, 3000000) == 1080000
+    print("✅ Estimates cached per shape")
+
+def test_failed_estimates_fall_back():
+    """Test that reverting estimates use the cached value, then the default"""
+    print("Testing estimation failures...")
+    estimator = GasEstimator(margin=0.5, ttl=0.05)
+
+    def revert():
+        raise ValueError("execution reverted: STF")
+
+    assert estimator.estimate(('pool_multicall', False), revert, 15000000) == 15000000
+    estimator.record(('pool_multicall', False), 400000)
+    assert estimator.estimate(('pool_multicall', False), revert, 15000000) == 600000
+
+    time.sleep(0.06)
+    assert estimator.get(('pool_multicall', False), 5000000) == 5000000, "expired"
+    stats = estimator.get_stats()
+    assert stats['failures'] == 2 and stats['estimates'] == 0
+    print("✅ Failed estimates fell back")
+
+if __name__ == "__main__":
+    test_estimates_with_margin_and_cache()
+    test_failed_estimates_fall_back()
@@ -0,0 +1,95 @@
+import threading
+import time
+from job_executor import JobExecutor, DONE, FAILED
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_slow_job_does_not_block_other_users():
+    """Test that one user's long job leaves workers free for others"""
+    print("Testing concurrent users...")
+    executor = JobExecutor(max_workers=2, per_user_limit=1, max_queue=10)
+    release = threading.Event()
+    finished = []
+
+    slow = executor.submit("alice", "deploy", lambda job: release.wait(5))
+    fast = executor.submit("bob", "lock", lambda job: finished.append("bob"))
+    assert slow["success"] and fast["success"]
+
+    wait_until(lambda: finished == ["bob"])
+    assert executor.get_stats()["running"] == 1
+
+    release.set()
+    wait_until(lambda: slow["job"].state == DONE)
+    executor.shutdown()
+    print("✅ Slow jobs don't block other users")
+
+def test_per_user_limit_and_queue_depth():
+    """Test that per-user and queue limits reject extra jobs"""
+    print("Testing limits...")
+    executor = JobExecutor(max_workers=1, per_user_limit=1, max_queue=1)
+    release = threading.Event()
+
+    assert executor.submit("alice", "deploy", lambda job: release.wait(5))["success"]
+    wait_until(lambda: executor.get_stats()["running"] == 1)
+
+    second = executor.submit("alice", "deploy", lambda job: None)
+    assert not second["success"] and "in progress" in second["error"]
+
+    assert executor.submit("bob", "lock", lambda job: None)["success"]
+    assert executor.get_stats()["queued"] == 1
+    full = executor.submit("carol", "lock", lambda job: None)
+    assert not full["success"] and "busy" in full["error"]
+
+    release.set()
+    wait_until(lambda: executor.get_stats()["completed"] == 2)
+    stats = executor.get_stats()
+    assert stats["rejected"] == 2 and stats["active_users"] == 0
+
+    # The limit is released once the job finishes
+    assert executor.submit("alice", "deploy", lambda job: None)["success"]
+    executor.shutdown()
+    print("✅ Limits enforced and released")
+
+def test_progress_and_failures():
+    """Test progress callbacks and that failing jobs free the user's slot"""
+    print("Testing progress and failures...")
+    executor = JobExecutor(max_workers=1, per_user_limit=1, max_queue=10)
+    messages = []
+
+    def run(job):
+        job.report("step 1")
+        job.report("step 1")
+        job.report("step 2")
+        raise RuntimeError("boom")
+
+    result = executor.submit("alice", "deploy", run, on_progress=messages.append)
+    wait_until(lambda: result["job"].state == FAILED)
+    assert messages == ["step 1", "step 2"], "repeated messages are skipped"
+    assert str(result["job"].error) == "boom"
+    assert executor.get_stats()["failed"] == 1
+    assert executor.submit("alice", "deploy", lambda job: None)["success"]
+    executor.shutdown()
+    print("✅ Progress reported and failures recorded")
+
+def test_submit_after_shutdown_rejected():
+    """Test that a shut down executor doesn't restart for new jobs"""
+    print("Testing shutdown...")
+    executor = JobExecutor(max_workers=1, per_user_limit=1, max_queue=10)
+    executor.start()
+    executor.shutdown()
+
+    result = executor.submit("alice", "deploy", lambda job: None)
+    assert not result["success"]
+    assert "shutting down" in result["error"]
+    assert executor.get_stats()["workers"] == 0
+    print("✅ Jobs rejected after shutdown")
+
+if __name__ == "__main__":
+    test_slow_job_does_not_block_other_users()
+    test_per_user_limit_and_queue_depth()
+    test_progress_and_failures()
+    test_submit_after_shutdown_rejected()
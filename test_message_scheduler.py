@@ -0,0 +1,124 @@
+import threading
+import time
+from types import SimpleNamespace
+from message_scheduler import MessageScheduler, TokenBucket
+
+class RateLimited(Exception):
+    """Shaped like telebot's ApiTelegramException for a 429"""
+    def __init__(self, retry_after):
+        super().__init__("Too Many Requests")
+        self.error_code = 429
+        self.result_json = {'ok': False, 'error_code': 429, 'parameters': {'retry_after': retry_after}}
+
+class FakeBot:
+    def __init__(self, delay=0.0, rate_limit_times=0):
+        self.calls = []
+        self.delay = delay
+        self.rate_limit_times = rate_limit_times
+        self.next_id = 100
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, text, **kwargs):
+        time.sleep(self.delay)
+        with self.lock:
+            if self.rate_limit_times:
+                self.rate_limit_times -= 1
+                raise RateLimited(0.05)
+            self.next_id += 1
+            self.calls.append(('send', chat_id, text, time.monotonic()))
+            return SimpleNamespace(chat=SimpleNamespace(id=chat_id), message_id=self.next_id)
+
+    def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append(('edit', chat_id, (message_id, text), time.monotonic()))
+            return True
+
+def test_token_bucket():
+    """Test bursts and refill"""
+    print("Testing token bucket...")
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = bucket.updated
+    bucket.take(now)
+    bucket.take(now)
+    assert abs(bucket.wait_time(now) - 0.1) < 1e-9
+    assert bucket.wait_time(now + 0.11) == 0
+    print("✅ Token bucket limits bursts")
+
+def test_edits_coalesce_and_keep_order():
+    """Test that queued edits of one message collapse into the latest"""
+    print("Testing edit coalescing...")
+    bot = FakeBot(delay=0.05)
+    scheduler = MessageScheduler(bot, global_rate=100, chat_rate=100, chat_burst=100, senders=2)
+
+    sent = scheduler.send_message(1, "⏳ Working...")
+    # Edits of a message that hasn't been sent yet refer to its PendingMessage
+    for step in range(5):
+        last = scheduler.edit_message_text(f"step {step}", sent.chat.id, sent)
+    last.result(timeout=5)
+
+    edits = [call for call in bot.calls if call[0] == 'edit']
+    assert bot.calls[0][0] == 'send', "the send goes before its edits"
+    assert edits[-1][2] == (sent.message_id, "step 4"), "latest edit wins"
+    assert len(edits) < 5
+    assert scheduler.get_stats()['coalesced'] >= 3
+    scheduler.shutdown()
+    print("✅ Edits coalesced")
+
+def test_edit_not_moved_ahead_of_later_requests():
+    """Test that an edit isn't coalesced into a queued edit that has requests behind it"""
+    print("Testing edit ordering...")
+    bot = FakeBot(delay=0.05)
+    scheduler = MessageScheduler(bot, global_rate=100, chat_rate=100, chat_burst=100, senders=2)
+
+    # Keeps the chat busy while the rest is queued
+    scheduler.send_message(1, "⏳ Working...")
+    scheduler.edit_message_text("first", 1, 50)
+    scheduler.send_message(1, "B")
+    scheduler.edit_message_text("final", 1, 50).result(timeout=5)
+
+    order = [call[2] for call in bot.calls[1:]]
+    assert order == [(50, "first"), "B", (50, "final")], "the final edit goes out after B"
+    assert scheduler.get_stats()['coalesced'] == 0
+    scheduler.shutdown()
+    print("✅ Edit order kept")
+
+def test_per_chat_rate_limit():
+    """Test that one chat is throttled without holding back another"""
+    print("Testing per-chat limits...")
+    bot = FakeBot()
+    scheduler = MessageScheduler(bot, global_rate=100, chat_rate=20, chat_burst=1, senders=2)
+
+    results = [scheduler.send_message(1, f"busy {i}") for i in range(4)]
+    other = scheduler.send_message(2, "quiet")
+    other.result(timeout=5)
+    for pending in results:
+        pending.result(timeout=5)
+
+    busy_times = [call[3] for call in bot.calls if call[1] == 1]
+    quiet_time = [call[3] for call in bot.calls if call[1] == 2][0]
+    assert busy_times[-1] - busy_times[0] >= 3 / 20 * 0.9, "chat 1 throttled"
+    assert quiet_time < busy_times[-1], "chat 2 not stuck behind chat 1"
+    scheduler.shutdown()
+    print("✅ Chats throttled independently")
+
+def test_retries_after_429():
+    """Test that rate-limited requests are retried after retry_after"""
+    print("Testing 429 retries...")
+    bot = FakeBot(rate_limit_times=2)
+    scheduler = MessageScheduler(bot, global_rate=100, chat_rate=100, chat_burst=100, senders=1)
+
+    started = time.monotonic()
+    pending = scheduler.send_message(7, "hello")
+    assert pending.message_id == 101
+    assert time.monotonic() - started >= 0.1, "waited retry_after twice"
+    assert scheduler.get_stats()['rate_limited'] == 2
+    scheduler.shutdown()
+    print("✅ 429s retried")
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_edits_coalesce_and_keep_order()
+    test_edit_not_moved_ahead_of_later_requests()
+    test_per_chat_rate_limit()
+    test_retries_after_429()
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+
+pytest.importorskip("eth_abi")
+
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+import multicall
+from config import ERC20_ABI, MULTICALL3_ADDRESS
+from multicall import ERROR, OK, REVERTED, Call, aggregate, aggregate_async, aggregate_with_status
+
+TOKEN = Web3.to_checksum_address("0x" + "11" * 20)
+BROKEN = Web3.to_checksum_address("0x" + "22" * 20)
+WALLET = "0x" + "ab" * 20
+BALANCE_OF = Web3.keccak(text="balanceOf(address)")[:4]
+
+class FakeEth:
+    """TOKEN answers balanceOf, BROKEN reverts; Multicall3 can be switched off"""
+    def __init__(self, multicall=True):
+        self.multicall = multicall
+        self.down = False
+        self.requests = []
+
+    def _answer(self, target, data):
+        if target != TOKEN:
+            return False, b""
+        (owner,) = decode(["address"], bytes(data[4:]))
+        return True, encode(["uint256"], [int(owner, 16) % 1000])
+
+    def call(self, transaction, block_identifier):
+        self.requests.append((transaction["to"], block_identifier))
+        if self.down:
+            raise ConnectionError("RPC unavailable")
+        data = bytes(transaction["data"])
+        if transaction["to"] == MULTICALL3_ADDRESS:
+            if not self.multicall:
+                return b""  # no code at the address
+            (requests,) = decode(["(address,bool,bytes)[]"], data[4:])
+            return encode(["(bool,bytes)[]"],
+                          [[self._answer(Web3.to_checksum_address(t), d) for t, _, d in requests]])
+        success, return_data = self._answer(transaction["to"], data)
+        if not success:
+            raise ContractLogicError("execution reverted")
+        return return_data
+
+class FakeWeb3:
+    def __init__(self, **kwargs):
+        self.eth = FakeEth(**kwargs)
+
+class AsyncFakeEth(FakeEth):
+    async def call(self, transaction, block_identifier):
+        return FakeEth.call(self, transaction, block_identifier)
+
+class AsyncFakeWeb3:
+    def __init__(self, **kwargs):
+        self.eth = AsyncFakeEth(**kwargs)
+
+def calls():
+    return [Call(TOKEN, ERC20_ABI, "balanceOf", [WALLET]), Call(BROKEN, ERC20_ABI, "balanceOf", [WALLET])]
+
+def test_call_encode_decode():
+    """Test calldata and return value decoding for one call"""
+    print("Testing calls...")
+    call = Call(TOKEN.lower(), ERC20_ABI, "balanceOf", [WALLET])
+    assert call.address == TOKEN
+    assert call.call_data[:4] == BALANCE_OF
+    assert call.decode(encode(["uint256"], [42])) == 42
+
+    owner = Call(TOKEN, [{"name": "owner", "type": "function", "inputs": [],
+                          "outputs": [{"name": "", "type": "address"}]}], "owner")
+    assert owner.decode(encode(["address"], [WALLET])) == Web3.to_checksum_address(WALLET), "checksummed"
+    print("✅ Calls encoded and decoded")
+
+def test_aggregate_batches_and_reverts():
+    """Test one eth_call per batch, pinned to the block, with reverted calls as None"""
+    print("Testing aggregate...")
+    web3 = FakeWeb3()
+    assert aggregate(web3, calls(), block_identifier=123) == [int(WALLET, 16) % 1000, None]
+    assert web3.eth.requests == [(MULTICALL3_ADDRESS, 123)]
+    assert [status for status, _ in aggregate_with_status(web3, calls())] == [OK, REVERTED]
+    print("✅ Calls aggregated")
+
+def test_fallback_without_multicall(monkeypatch):
+    """Test individual calls when Multicall3 is missing, and RPC errors reported as such"""
+    print("Testing fallback...")
+    web3 = FakeWeb3(multicall=False)
+    assert aggregate(web3, calls()) == [int(WALLET, 16) % 1000, None]
+    assert [to for to, _ in web3.eth.requests] == [MULTICALL3_ADDRESS, TOKEN, BROKEN]
+
+    web3 = FakeWeb3()
+    web3.eth.down = True
+    assert [status for status, _ in aggregate_with_status(web3, calls())] == [ERROR, ERROR]
+
+    # Batches are split by MULTICALL_BATCH_SIZE
+    monkeypatch.setattr(multicall, "MULTICALL_BATCH_SIZE", 1)
+    web3 = FakeWeb3()
+    aggregate(web3, calls())
+    assert len(web3.eth.requests) == 2
+    print("✅ Fallback used")
+
+def test_aggregate_async():
+    """Test the AsyncWeb3 variant"""
+    print("Testing aggregate_async...")
+    web3 = AsyncFakeWeb3()
+    assert asyncio.run(aggregate_async(web3, calls(), 7)) == [int(WALLET, 16) % 1000, None]
+    web3 = AsyncFakeWeb3(multicall=False)
+    assert asyncio.run(aggregate_async(web3, calls())) == [int(WALLET, 16) % 1000, None]
+    print("✅ Async calls aggregated")
+
+if __name__ == "__main__":
+    test_call_encode_decode()
+    test_aggregate_batches_and_reverts()
+    test_fallback_without_multicall(pytest.MonkeyPatch())
+    test_aggregate_async()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import time
+from contract_bridge import WORKER_MAIN_JS
+from node_workers import NodeWorkerPool, NodeWorkerError
+
+# Stand-in for DEPLOY_LIB_JS so the worker protocol can be tested without solc/ethers
+STUB_LIB_JS = """
+const solc = { version: () => '0.8.20-stub' };
+function generateContractCode(details) { return `contract ${details.name.replace(/\\s+/g, '')} {}`; }
+async function compileContract(code, name) { return { success: true, abi: [], bytecode: '0x00' }; }
+async function deployContract() { throw new Error('no network in tests'); }
+console.log('library loaded');
+"""
+
+def test_worker_pool():
+    """Test compile requests, error frames and crash recovery of the Node worker pool"""
+    if not shutil.which("node"):
+        print("Node.js not installed, skipping worker pool test")
+        return
+
+    print("Testing Node worker pool...")
+    script_dir = tempfile.mkdtemp()
+    script_path = os.path.join(script_dir, "worker.js")
+    with open(script_path, "w") as f:
+        f.write(STUB_LIB_JS + WORKER_MAIN_JS)
+
+    pool = NodeWorkerPool(script_path, size=2, cwd=script_dir, request_timeout=20, health_interval=60)
+    pool.start()
+    try:
+        # Logging goes to stderr, so stdout only carries the response frame
+        result = pool.call("compile", {"name": "Test Token", "features": ["Mintable"]})
+        assert result["success"]
+        assert result["contractCode"] == "contract TestToken {}"
+        assert result["solcVersion"] == "0.8.20-stub"
+        print("✅ compile request answered")
+
+        # Exceptions in a method come back as JSON-RPC errors and keep the worker
+        try:
+            pool.call("deploy", {})
+            assert False, "deploy should have failed"
+        except NodeWorkerError as e:
+            assert "no network in tests" in str(e)
+        assert pool.get_stats()["alive"] == 2
+        print("✅ error frame returned without restarting the worker")
+
+        # Kill every worker and check the pool replaces them
+        for worker in list(pool._workers):
+            worker.process.kill()
+            worker.process.wait()
+        pool.check_health()
+
+        deadline = time.time() + 20
+        while pool.get_stats()["alive"] < 2 and time.time() < deadline:
+            time.sleep(0.1)
+        assert pool.get_stats()["alive"] == 2
+        assert pool.restarts == 2
+        assert pool.call("ping")["success"]
+        print("✅ crashed workers restarted")
+    finally:
+        pool.stop()
+        shutil.rmtree(script_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_worker_pool()
@@ -0,0 +1,81 @@
+import threading
+import time
+from nonce_manager import NonceManager
+
+class FakeChain:
+    """Stand-in node returning the pending nonce of each address"""
+
+    def __init__(self):
+        self.nonces = {}
+        self.requests = 0
+
+    def get_transaction_count(self, address):
+        self.requests += 1
+        return self.nonces.get(address, 0)
+
+def test_consecutive_allocation():
+    """Test that nonces are handed out without asking the node each time"""
+    print("Testing consecutive allocation...")
+    chain = FakeChain()
+    chain.nonces["0xA"] = 5
+    manager = NonceManager(chain.get_transaction_count)
+
+    assert [manager.allocate("0xA") for _ in range(3)] == [5, 6, 7]
+    assert manager.allocate("0xB") == 0
+    assert chain.requests == 2
+
+    # Concurrent senders never share a nonce
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.allocate("0xA"))) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == list(range(8, 58))
+    print("✅ Consecutive nonces allocated")
+
+def test_resync_after_idle():
+    """Test that the chain is re-read after resync_interval without allocations"""
+    print("Testing idle resync...")
+    chain = FakeChain()
+    manager = NonceManager(chain.get_transaction_count, resync_interval=0.05)
+    assert manager.allocate("0xA") == 0
+
+    chain.nonces["0xA"] = 10  # another process sent transactions meanwhile
+    time.sleep(0.06)
+    assert manager.allocate("0xA") == 10
+    assert manager.get_stats()["synced"] == 2
+    print("✅ Counter resynced after idle")
+
+def test_release_and_errors():
+    """Test giving back unsent nonces and recovering from nonce errors"""
+    print("Testing release and send errors...")
+    chain = FakeChain()
+    manager = NonceManager(chain.get_transaction_count)
+
+    first = manager.allocate("0xA")
+    second = manager.allocate("0xA")
+    manager.release("0xA", second)
+    assert manager.allocate("0xA") == second, "last nonce is reused"
+
+    # Releasing an earlier nonce would leave a gap, so the chain is re-read
+    manager.allocate("0xA")
+    manager.release("0xA", first)
+    chain.nonces["0xA"] = 1
+    assert manager.allocate("0xA") == 1
+
+    # A non-nonce error gives the nonce back, a nonce error forces a resync
+    nonce = manager.allocate("0xA")
+    manager.handle_send_error("0xA", nonce, Exception("insufficient funds for gas"))
+    assert manager.allocate("0xA") == nonce
+
+    chain.nonces["0xA"] = 7
+    manager.handle_send_error("0xA", nonce, ValueError({"message": "nonce too low"}))
+    assert manager.allocate("0xA") == 7
+    assert manager.get_stats()["resets"] == 2
+    print("✅ Nonces reconciled after failures")
+
+if __name__ == "__main__":
+    test_consecutive_allocation()
+    test_resync_after_idle()
+    test_release_and_errors()
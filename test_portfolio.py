@@ -0,0 +1,145 @@
+import asyncio
+from decimal import Decimal
+import pytest
+
+pytest.importorskip("eth_abi")
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from config import MULTICALL3_ADDRESS
+
+# wallet.py needs the RPC endpoints from the local config
+portfolio = pytest.importorskip("portfolio", exc_type=ImportError)
+
+WALLET = Web3.to_checksum_address("0x" + "ab" * 20)
+TOKEN = Web3.to_checksum_address("0x" + "11" * 20)
+GET_ETH_BALANCE = Web3.keccak(text="getEthBalance(address)")[:4]
+BALANCE_OF = Web3.keccak(text="balanceOf(address)")[:4]
+
+class FakeEth:
+    """Multicall3 answering getEthBalance and balanceOf at a block that can be advanced"""
+    def __init__(self):
+        self.block_number = 100
+        self.down = False
+        self.calls = 0
+
+    def _answer(self, target, data):
+        selector = bytes(data[:4])
+        if target == MULTICALL3_ADDRESS and selector == GET_ETH_BALANCE:
+            return True, encode(["uint256"], [2 * 10**18])
+        if target == TOKEN and selector == BALANCE_OF:
+            return True, encode(["uint256"], [5 * 10**17 + self.block_number])
+        return False, b""
+
+    def get_balance(self, address, block_identifier):
+        if self.down:
+            raise ConnectionError("RPC unavailable")
+        return 2 * 10**18
+
+    def call(self, transaction, block_identifier):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("RPC unavailable")
+        assert block_identifier == self.block_number, "read pinned to the block"
+        (requests,) = decode(["(address,bool,bytes)[]"], bytes(transaction["data"][4:]))
+        return encode(["(bool,bytes)[]"],
+                      [[self._answer(Web3.to_checksum_address(t), d) for t, _, d in requests]])
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+class AsyncFakeEth:
+    """Awaitable view of a FakeEth"""
+    def __init__(self, eth):
+        self.sync = eth
+
+    @property
+    async def block_number(self):
+        if self.sync.down:
+            raise ConnectionError("RPC unavailable")
+        return self.sync.block_number
+
+    async def get_balance(self, address, block_identifier):
+        return self.sync.get_balance(address, block_identifier)
+
+    async def call(self, transaction, block_identifier):
+        return self.sync.call(transaction, block_identifier)
+
+class AsyncFakeWeb3:
+    def __init__(self, web3):
+        self.eth = AsyncFakeEth(web3.eth)
+
+def use_fake_networks(monkeypatch):
+    networks = {'polygon': FakeWeb3(), 'ethereum': FakeWeb3()}
+    metadata = {TOKEN: {'symbol': 'TKN', 'name': 'Token', 'decimals': 18}}
+
+    async def get_metadata_async(web3, addresses):
+        return metadata
+
+    monkeypatch.setattr(portfolio, "get_web3", lambda network: networks[network])
+    monkeypatch.setattr(portfolio, "get_async_web3", lambda network: AsyncFakeWeb3(networks[network]))
+    monkeypatch.setattr(portfolio, "get_many_token_metadata", lambda web3, addresses: metadata)
+    monkeypatch.setattr(portfolio, "get_many_token_metadata_async", get_metadata_async)
+    portfolio._cache.clear()
+    return networks
+
+def user_tokens():
+    return [{'contract_address': TOKEN.lower(), 'network': 'polygon'}]
+
+def test_portfolio_cached_per_block(monkeypatch):
+    """Test that balances are read once per block and re-read when a new block arrives"""
+    print("Testing block-keyed portfolio cache...")
+    polygon = use_fake_networks(monkeypatch)['polygon']
+    hits = portfolio.get_portfolio_stats()['hits']
+
+    first = portfolio.get_network_portfolio('polygon', WALLET.lower(), [TOKEN])
+    assert first['native_balance'] == Decimal(2)
+    assert first['tokens'] == [{'address': TOKEN, 'symbol': 'TKN', 'balance': Decimal("0.5000000000000001")}]
+    assert polygon.eth.calls == 1, "one batched read"
+
+    assert portfolio.get_network_portfolio('polygon', WALLET, [TOKEN]) is first
+    assert polygon.eth.calls == 1
+    assert portfolio.get_portfolio_stats()['hits'] == hits + 1
+
+    polygon.eth.block_number = 101
+    second = portfolio.get_network_portfolio('polygon', WALLET, [TOKEN])
+    assert second['block'] == 101 and polygon.eth.calls == 2, "a new block is read again"
+
+    # The async path shares the cache
+    assert asyncio.run(portfolio.get_network_portfolio_async('polygon', WALLET, [TOKEN])) is second
+    assert polygon.eth.calls == 2
+    print("✅ Portfolio cached per block")
+
+def test_token_decimals(monkeypatch):
+    """Test that a 0-decimals token isn't scaled like an 18-decimals one"""
+    print("Testing token decimals...")
+    use_fake_networks(monkeypatch)
+    for decimals, balance in ((0, Decimal(5 * 10**17 + 100)), (None, Decimal("0.5000000000000001"))):
+        metadata = {TOKEN: {'symbol': 'TKN', 'name': 'Token', 'decimals': decimals}}
+        monkeypatch.setattr(portfolio, "get_many_token_metadata", lambda web3, addresses: metadata)
+        portfolio._cache.clear()
+        result = portfolio.get_network_portfolio('polygon', WALLET, [TOKEN])
+        assert result['tokens'][0]['balance'] == balance
+    print("✅ Token decimals respected")
+
+def test_network_errors_isolated(monkeypatch):
+    """Test that one failing network doesn't hide the others"""
+    print("Testing per-network errors...")
+    networks = use_fake_networks(monkeypatch)
+    networks['ethereum'].eth.down = True
+
+    for read in (lambda: portfolio.get_portfolio(WALLET, user_tokens(), ['polygon', 'ethereum']),
+                 lambda: asyncio.run(portfolio.get_portfolio_async(WALLET, user_tokens(), ['polygon', 'ethereum']))):
+        portfolio._cache.clear()
+        result = read()
+        polygon, ethereum = result['networks']
+        assert polygon['network'] == 'polygon' and polygon['tokens'][0]['symbol'] == 'TKN'
+        assert ethereum == {'network': 'ethereum', 'error': "RPC unavailable"}
+    print("✅ Network errors isolated")
+
+if __name__ == "__main__":
+    test_portfolio_cached_per_block(pytest.MonkeyPatch())
+    test_token_decimals(pytest.MonkeyPatch())
+    test_network_errors_isolated(pytest.MonkeyPatch())
@@ -0,0 +1,115 @@
+import threading
+import time
+from receipt_tracker import ReceiptTracker, normalize_tx_hash
+
+class FakeEth:
+    """Stand-in chain: blocks are mined on demand"""
+
+    def __init__(self):
+        self.blocks = [[]]
+        self.receipts = {}
+        self.receipt_requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def block_number(self):
+        return len(self.blocks) - 1
+
+    def get_block(self, number):
+        return {"transactions": list(self.blocks[number])}
+
+    def get_transaction_receipt(self, tx_hash):
+        self.receipt_requests += 1
+        if tx_hash not in self.receipts:
+            raise ValueError("Transaction not found")
+        return self.receipts[tx_hash]
+
+    def mine(self, tx_hashes):
+        with self.lock:
+            for tx_hash in tx_hashes:
+                self.receipts[tx_hash] = {"transactionHash": tx_hash, "status": 1}
+            self.blocks.append([bytes.fromhex(tx_hash[2:]) for tx_hash in tx_hashes])
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def tx_hash(i):
+    return "0x" + f"{i:064x}"
+
+def test_many_transactions_one_loop():
+    """Test that receipts for many transactions are matched per block"""
+    print("Testing block matching...")
+    web3 = FakeWeb3()
+    tracker = ReceiptTracker(web3, poll_interval=0.01)
+    hashes = [tx_hash(i) for i in range(200)]
+    futures = [tracker.track(h, timeout=5) for h in hashes]
+
+    web3.eth.mine(hashes[:100])
+    web3.eth.mine(hashes[100:])
+    receipts = [future.result(timeout=5) for future in futures]
+    assert [receipt["transactionHash"] for receipt in receipts] == hashes
+
+    # One direct lookup per transaction plus one per match, no per-transaction polling
+    assert web3.eth.receipt_requests <= 2 * len(hashes)
+    assert tracker.pending_count() == 0
+    print("✅ 200 receipts resolved by one poll loop")
+
+def test_already_mined_and_callbacks():
+    """Test transactions mined before tracking and done callbacks"""
+    print("Testing already-mined transactions...")
+    web3 = FakeWeb3()
+    web3.eth.mine([tx_hash(1)])
+    for _ in range(30):
+        web3.eth.mine([])
+
+    tracker = ReceiptTracker(web3, poll_interval=0.01)
+    done = threading.Event()
+    future = tracker.track(bytes.fromhex(tx_hash(1)[2:]), timeout=5, callback=lambda f: done.set())
+    assert future.result(timeout=5)["status"] == 1
+    assert done.wait(1)
+    print("✅ Already-mined transaction resolved")
+
+def test_catch_up_after_stall():
+    """Test that a transaction mined during a gap longer than the catch-up window is found"""
+    print("Testing stalls...")
+    web3 = FakeWeb3()
+    tracker = ReceiptTracker(web3, poll_interval=0.05, max_catch_up_blocks=20)
+    future = tracker.track(tx_hash(5), timeout=2)
+    wait_for(lambda: web3.eth.receipt_requests >= 1)
+
+    web3.eth.mine([tx_hash(5)])
+    for _ in range(25):
+        web3.eth.mine([])
+    assert future.result(timeout=2)["status"] == 1
+    print("✅ Transaction found after a stall")
+
+def test_timeout():
+    """Test that unmined transactions time out"""
+    print("Testing timeouts...")
+    tracker = ReceiptTracker(FakeWeb3(), poll_interval=0.01)
+    try:
+        tracker.wait(tx_hash(9), timeout=0.05)
+        assert False, "expected a timeout"
+    except TimeoutError:
+        pass
+    assert tracker.get_stats()["timeouts"] == 1
+    print("✅ Unmined transaction timed out")
+
+def test_normalize_tx_hash():
+    assert normalize_tx_hash("0xABCD") == "0xabcd"
+    assert normalize_tx_hash(bytes.fromhex("abcd")) == "0xabcd"
+    assert normalize_tx_hash("abcd") == "0xabcd"
+
+if __name__ == "__main__":
+    test_many_transactions_one_loop()
+    test_already_mined_and_callbacks()
+    test_catch_up_after_stall()
+    test_timeout()
+    test_normalize_tx_hash()
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from rpc_failover import EndpointRouter, OPEN, CLOSED
+
+class FlakyNode:
+    """Stand-in RPC node answering after a delay, or failing"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, payload):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("connection refused")
+        return {"result": payload}
+
+def make_router(nodes, **kwargs):
+    router = EndpointRouter(list(nodes), **kwargs)
+    request = lambda payload: lambda endpoint: nodes[endpoint.url](payload)
+    return router, request
+
+def test_reads_prefer_fastest_endpoint():
+    print("Testing latency-aware routing...")
+    nodes = {"slow": FlakyNode(delay=0.02), "fast": FlakyNode(delay=0.0)}
+    router, request = make_router(nodes)
+
+    # The first requests sample every endpoint, then reads stick to the fastest
+    for _ in range(5):
+        router.execute(request("eth_blockNumber"))
+    router.probe(request("eth_blockNumber"))
+    before = nodes["slow"].calls
+    for _ in range(5):
+        router.execute(request("eth_blockNumber"))
+    assert nodes["slow"].calls == before
+    assert router.read_order()[0].url == "fast"
+    print("✅ Reads routed to the fastest endpoint")
+
+def test_failover_and_circuit_breaker():
+    print("Testing failover and circuit breaking...")
+    nodes = {"primary": FlakyNode(fail=True), "backup": FlakyNode()}
+    router, request = make_router(nodes, failure_threshold=2, cooldown=0.2)
+
+    # Every request succeeds through the backup
+    for _ in range(3):
+        assert router.execute(request("eth_call"), retry_on=(ConnectionError,)) == {"result": "eth_call"}
+    primary = router.endpoints[0]
+    assert primary.state == OPEN
+    calls = nodes["primary"].calls
+
+    # While the circuit is open the primary is skipped
+    router.execute(request("eth_call"), retry_on=(ConnectionError,))
+    assert nodes["primary"].calls == calls
+
+    # After the cooldown a successful probe closes the circuit again
+    nodes["primary"].fail = False
+    time.sleep(0.25)
+    router.probe(request("eth_blockNumber"))
+    assert primary.state == CLOSED
+    print("✅ Failed endpoint skipped, then restored")
+
+def test_writes_are_pinned():
+    nodes = {"fast": FlakyNode(), "writer": FlakyNode(delay=0.01)}
+    router, request = make_router(nodes, write_url="writer")
+    router.endpoints[0].latency = 0.001
+    router.endpoints[1].latency = 0.5
+
+    router.execute(request("eth_sendRawTransaction"), write=True)
+    assert nodes["writer"].calls == 1 and nodes["fast"].calls == 0
+
+    # Writes fall back to other endpoints when the pinned one is down
+    nodes["writer"].fail = True
+    router.execute(request("eth_sendRawTransaction"), write=True, retry_on=(ConnectionError,))
+    assert nodes["fast"].calls == 1
+
+def test_rate_limited_responses_fail_over():
+    nodes = {"limited": FlakyNode(), "backup": FlakyNode()}
+    router, _ = make_router(nodes)
+    responses = {"limited": {"error": {"code": -32005, "message": "rate limited"}}, "backup": {"result": "0x1"}}
+    result = router.execute(lambda endpoint: responses[endpoint.url],
+                            is_failure=lambda response: "error" in response)
+    assert result == {"result": "0x1"}
+
+def test_async_requests_share_endpoint_health():
+    print("Testing async failover...")
+    nodes = {"primary": FlakyNode(fail=True), "backup": FlakyNode()}
+    router, request = make_router(nodes, failure_threshold=1)
+
+    async def send(payload):
+        return await router.execute_async(lambda endpoint: asyncio.to_thread(request(payload), endpoint),
+                                          retry_on=(ConnectionError,))
+
+    assert asyncio.run(send("eth_getBalance")) == {"result": "eth_getBalance"}
+    assert router.endpoints[0].state == OPEN
+
+    # The circuit opened by the async request also applies to sync ones
+    calls = nodes["primary"].calls
+    router.execute(request("eth_call"), retry_on=(ConnectionError,))
+    assert nodes["primary"].calls == calls
+    print("✅ Async requests fail over and share circuit state")
+
+if __name__ == "__main__":
+    test_reads_prefer_fastest_endpoint()
+    test_failover_and_circuit_breaker()
+    test_writes_are_pinned()
+    test_rate_limited_responses_fail_over()
+    test_async_requests_share_endpoint_health()
@@ -0,0 +1,68 @@
+import time
+from session_store import MemorySessionBackend, SQLiteSessionBackend, SessionDict
+from test_storage import use_temp_storage
+
+def check_store(store):
+    store[1] = {'step': 'name'}
+    store[1]['token_name'] = 'Test'
+    assert store[1] == {'step': 'name', 'token_name': 'Test'}, "top-level changes are written back"
+
+    data = store[1]
+    data['features'] = [False, False]
+    data.pop('step')
+    assert store[1] == {'token_name': 'Test', 'features': [False, False]}
+
+    store['c_1_100'] = 'confirm'
+    assert 'c_1_100' in store and 2 not in store
+    assert sorted(map(str, store)) == ['1', 'c_1_100']
+    del store['c_1_100']
+    assert store.get('c_1_100') is None
+
+    store.set(2, 'short-lived', ttl=0.05)
+    assert store[2] == 'short-lived'
+    time.sleep(0.06)
+    assert 2 not in store, "per-key expiry"
+
+    # Callback data taken by a job that sat in the queue past its expiry
+    store.set('e_1_100', {'type': 'execute_pool'}, ttl=0.05)
+    assert store.pop('e_1_100', None) == {'type': 'execute_pool'}
+    store.set('e_1_101', {'type': 'execute_pool'}, ttl=0.05)
+    time.sleep(0.06)
+    assert store.pop('e_1_101', None) is None
+
+def test_memory_store():
+    """Test the in-memory backend"""
+    print("Testing memory session store...")
+    check_store(SessionDict(MemorySessionBackend(ttl=60)))
+
+    # Least recently used keys are evicted beyond max_size
+    store = SessionDict(MemorySessionBackend(ttl=60, max_size=2))
+    store[1], store[2] = 'a', 'b'
+    assert store[1] == 'a'
+    store[3] = 'c'
+    assert 2 not in store and 1 in store
+    assert store.get_stats()['evicted'] == 1
+    print("✅ Memory store expires and evicts keys")
+
+def test_sqlite_store():
+    """Test the SQLite backend shared between processes"""
+    print("Testing SQLite session store...")
+    use_temp_storage()
+    check_store(SessionDict(SQLiteSessionBackend('user_data', ttl=60)))
+
+    # A second store on the same namespace sees the same state, like another process would
+    first = SessionDict(SQLiteSessionBackend('user_states', ttl=60, max_size=2))
+    second = SessionDict(SQLiteSessionBackend('user_states', ttl=60))
+    first[7] = 'token_creation'
+    assert second[7] == 'token_creation'
+    assert 7 not in SessionDict(SQLiteSessionBackend('other', ttl=60)), "namespaces are separate"
+
+    first[8], first[9] = 'a', 'b'
+    first.backend.purge()
+    assert len(first) == 2 and 7 not in first
+    assert first.get_stats()['evicted'] == 1
+    print("✅ SQLite store shared and bounded")
+
+if __name__ == "__main__":
+    test_memory_store()
+    test_sqlite_store()
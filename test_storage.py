@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import threading
+import storage
+
+def use_temp_storage():
+    """Point storage at a fresh temporary directory with legacy JSON files"""
+    temp_dir = tempfile.mkdtemp()
+    storage.close_connection()
+    storage.DATA_DIR = temp_dir
+    storage.DATABASE_FILE = os.path.join(temp_dir, "bot.db")
+    storage.USERS_FILE = os.path.join(temp_dir, "users.json")
+    storage.TOKENS_FILE = os.path.join(temp_dir, "tokens.json")
+    storage.POOLS_FILE = os.path.join(temp_dir, "pools.json")
+    return temp_dir
+
+def test_json_migration():
+    """Test that existing JSON data is imported once"""
+    print("Testing JSON migration...")
+    use_temp_storage()
+    with open(storage.USERS_FILE, "w") as f:
+        json.dump({"42": {"username": "alice", "wallet_address": "0xabc", "private_key": "0xkey",
+                          "created_at": "2024-01-01T00:00:00"}}, f)
+    with open(storage.TOKENS_FILE, "w") as f:
+        json.dump({"42": [{"token_name": "Test", "token_symbol": "TST", "contract_address": "0xtoken",
+                           "total_supply": 10 ** 30, "buy_tax": 250, "sell_tax": 2.5, "tax_wallet": "",
+                           "features": ["Mintable"], "network": "polygon",
+                           "created_at": "2024-01-01T00:00:00"}]}, f)
+
+    storage.init_data_storage()
+    storage.init_data_storage()
+
+    assert storage.get_user_wallet(42) == {"address": "0xabc", "private_key": "0xkey"}
+    tokens = storage.get_user_tokens("42")
+    assert len(tokens) == 1, "migration must only run once"
+    assert tokens[0]["total_supply"] == 10 ** 30
+    assert tokens[0]["buy_tax"] == 250 and tokens[0]["sell_tax"] == 2.5
+    assert tokens[0]["features"] == ["Mintable"]
+    print("✅ JSON files migrated")
+
+def test_concurrent_writes():
+    """Test that writes from several handler threads are all kept"""
+    print("Testing concurrent writes...")
+    use_temp_storage()
+    storage.init_data_storage()
+
+    def deploy(user_id):
+        for i in range(20):
+            storage.save_token_to_db(user_id, {
+                "name": f"Token {i}", "symbol": "TKN", "total_supply": 1000,
+                "buy_tax": 0, "sell_tax": 0, "features": []
+            }, f"0x{i:040x}", "polygon")
+        storage.close_connection()
+
+    threads = [threading.Thread(target=deploy, args=(user_id,)) for user_id in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for user_id in range(5):
+        assert len(storage.get_user_tokens(user_id)) == 20
+    print("✅ No writes lost")
+
+def test_wallet_and_delete():
+    use_temp_storage()
+    storage.init_data_storage()
+
+    assert storage.get_user_wallet(7) is None
+    assert storage.save_user_wallet(7, "bob", {"address": "0x1", "private_key": "0x2"})
+    assert storage.save_user_wallet(7, "bob", {"address": "0x3", "private_key": "0x4"})
+    assert storage.get_user_wallet(7)["address"] == "0x3"
+    assert storage.get_user_ids() == ["7"]
+
+    storage.save_pool_to_db(7, "0xtoken", "0xpool", {"amount": 1}, "polygon")
+    assert storage.get_user_pools(7)[0]["liquidity_amount"] == {"amount": 1}
+
+    storage.delete_user_data(7)
+    assert storage.get_user_wallet(7) is None
+    assert storage.get_user_tokens(7) == []
+
+def test_wallet_cache():
+    """Test that wallet lookups are served from the cache and invalidated on writes"""
+    print("Testing wallet cache...")
+    use_temp_storage()
+    storage.init_data_storage()
+
+    before = storage.get_wallet_cache_stats()
+    assert storage.get_user_wallet(9) is None
+    assert storage.get_user_wallet(9) is None
+    stats = storage.get_wallet_cache_stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+
+    # Saving replaces the cached "no wallet" entry
+    storage.save_user_wallet(9, "carol", {"address": "0x9", "private_key": "0xk"})
+    wallet = storage.get_user_wallet(9)
+    assert wallet["address"] == "0x9"
+
+    # Callers can't modify the cached entry
+    wallet["address"] = "changed"
+    assert storage.get_user_wallet(9)["address"] == "0x9"
+
+    storage.delete_user_data(9)
+    assert storage.get_user_wallet(9) is None
+    print("✅ Wallet cache hits and invalidation work")
+
+def test_token_metadata_rows():
+    """Test that token metadata is stored per chain and address, including failed lookups"""
+    print("Testing token metadata table...")
+    use_temp_storage()
+    storage.init_data_storage()
+
+    storage.save_token_metadata(137, {
+        "0xToken": {"symbol": "TST", "name": "Test", "decimals": 18, "fetched_at": 1.0},
+        "0xBroken": {"symbol": None, "name": None, "decimals": None, "fetched_at": 2.0}
+    })
+    storage.save_token_metadata(1, {
+        "0xToken": {"symbol": "ETHTST", "name": "Other", "decimals": 6, "fetched_at": 3.0}
+    })
+
+    rows = storage.get_token_metadata_rows(137, ["0xToken", "0xBroken", "0xMissing"])
+    assert set(rows) == {"0xToken", "0xBroken"}
+    assert rows["0xToken"] == {"symbol": "TST", "name": "Test", "decimals": 18, "fetched_at": 1.0}
+    assert rows["0xBroken"]["symbol"] is None
+    assert storage.get_token_metadata_rows(1, ["0xToken"])["0xToken"]["decimals"] == 6
+    assert storage.get_token_metadata_rows(137, []) == {}
+    print("✅ Token metadata stored per chain")
+
+def test_claim_update():
+    """Test that each Telegram update can only be claimed once"""
+    print("Testing update claims...")
+    use_temp_storage()
+    storage.init_data_storage()
+
+    assert storage.claim_update(500)
+    assert not storage.claim_update(500)
+    assert storage.claim_update(501)
+    print("✅ Updates claimed once")
+
+if __name__ == "__main__":
+    test_json_migration()
+    test_concurrent_writes()
+    test_wallet_and_delete()
+    test_wallet_cache()
+    test_token_metadata_rows()
+    test_claim_update()
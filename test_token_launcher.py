@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("eth_abi")
+
+# wallet.py needs the RPC endpoints from the local config
+token_launcher = pytest.importorskip("token_launcher", exc_type=ImportError)
+
+LAUNCHER = "0x" + "11" * 20
+OWNER = "0x" + "22" * 20
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+Q96 = 2**96
+
+def test_predict_token_address():
+    """Test the CREATE2 address against a vector computed outside web3"""
+    print("Testing token address prediction...")
+    salt = bytes(31) + b"\x01"
+    init_code = bytes.fromhex("6080604052")
+
+    # keccak256(0xff ++ launcher ++ keccak256(abi.encode(owner, salt)) ++ keccak256(init_code))[12:]
+    expected = "0x3Ff81Ac5AaE96a57f2616d31427a6d41a5DF4BB6"
+    assert token_launcher.predict_token_address(LAUNCHER, OWNER, salt, init_code) == expected
+    assert token_launcher.predict_token_address(LAUNCHER, "0x" + "33" * 20, salt, init_code) != expected, \
+        "the salt is bound to the sender"
+    print("✅ Token address predicted")
+
+def test_encode_sqrt_price_x96():
+    """Test sqrtPriceX96 for prices with exact and truncated square roots"""
+    print("Testing sqrtPriceX96...")
+    assert token_launcher.encode_sqrt_price_x96(1, 1) == Q96
+    assert token_launcher.encode_sqrt_price_x96(1, 4) == 2 * Q96
+    assert token_launcher.encode_sqrt_price_x96(4, 1) == Q96 // 2
+    # sqrt(1/100) * 2**96 = 7922816251426433759354395033.6, rounded down
+    assert token_launcher.encode_sqrt_price_x96(100, 1) == 7922816251426433759354395033
+    print("✅ sqrtPriceX96 exact")
+
+def test_sort_pair():
+    """Test that the pair is ordered by address regardless of checksum case"""
+    print("Testing pair ordering...")
+    low = "0x00000000000000000000000000000000000000Aa"
+    high = "0xFFfFfFffFFfffFFfFFfFFFFFffFFFffffFfFFFfF"
+    assert token_launcher.sort_pair(low, WETH, 1000, 5) == (low, WETH, 1000, 5)
+    assert token_launcher.sort_pair(high, WETH, 1000, 5) == (WETH, high, 5, 1000)
+    print("✅ Pair sorted")
+
+def test_build_init_code():
+    """Test that constructor arguments are ABI-encoded after the bytecode"""
+    print("Testing init code...")
+    abi = [{"type": "constructor", "inputs": [{"name": "name", "type": "string"},
+                                              {"name": "supply", "type": "uint256"}]}]
+    expected = bytes.fromhex(
+        "6080"
+        + "40".rjust(64, "0")           # offset of the string
+        + "05".rjust(64, "0")           # supply
+        + "02".rjust(64, "0")           # string length
+        + "4869".ljust(64, "0")         # "Hi"
+    )
+    assert token_launcher.build_init_code("0x6080", abi, ["Hi", 5]) == expected
+    assert token_launcher.build_init_code("6080", [], []) == bytes.fromhex("6080"), "no constructor"
+    print("✅ Init code built")
+
+if __name__ == "__main__":
+    test_predict_token_address()
+    test_encode_sqrt_price_x96()
+    test_sort_pair()
+    test_build_init_code()
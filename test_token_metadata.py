@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("web3")
+
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+import storage
+import token_metadata
+from config import MULTICALL3_ADDRESS
+from test_storage import use_temp_storage
+
+SELECTORS = {Web3.keccak(text=f"{field}()")[:4]: field for field in ("symbol", "name", "decimals")}
+TOKEN = Web3.to_checksum_address("0x" + "11" * 20)
+BROKEN = Web3.to_checksum_address("0x" + "22" * 20)
+
+class FakeWeb3:
+    """Answers Multicall3 aggregate3 batches for tokens with fixed metadata"""
+    def __init__(self, chain_id, tokens):
+        self.chain_id = chain_id
+        self.tokens = tokens
+        self.down = False
+        self.calls = 0
+        self.eth = self
+
+    def _answer(self, target, call_data):
+        value = self.tokens.get(target, {}).get(SELECTORS[bytes(call_data[:4])])
+        if value is None:
+            return False, b""
+        return True, encode(["uint8" if isinstance(value, int) else "string"], [value])
+
+    def call(self, transaction, block_identifier):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("RPC unavailable")
+        assert transaction["to"] == MULTICALL3_ADDRESS
+        (requests,) = decode(["(address,bool,bytes)[]"], bytes(transaction["data"][4:]))
+        responses = [self._answer(Web3.to_checksum_address(target), data) for target, _, data in requests]
+        return encode(["(bool,bytes)[]"], [responses])
+
+def use_temp_metadata_storage():
+    use_temp_storage()
+    storage.init_data_storage()
+    token_metadata._metadata_cache.clear()
+
+def test_metadata_cached_and_reverts_negative_cached():
+    """Test that metadata is fetched once and fields a token reverted on are remembered"""
+    print("Testing token metadata cache...")
+    use_temp_metadata_storage()
+    web3 = FakeWeb3(137, {TOKEN: {"symbol": "TKN", "name": "Token", "decimals": 18},
+                          BROKEN: {"symbol": "BRK"}})
+
+    metadata = token_metadata.get_many_token_metadata(web3, [TOKEN.lower(), BROKEN])
+    assert metadata[TOKEN] == {"symbol": "TKN", "name": "Token", "decimals": 18}
+    assert metadata[BROKEN] == {"symbol": "BRK", "name": None, "decimals": None}
+    assert web3.calls == 1, "one batched eth_call"
+
+    web3.down = True
+    assert token_metadata.get_token_metadata(web3, BROKEN)["symbol"] == "BRK"
+    assert web3.calls == 1, "reverted fields are cached until the negative TTL"
+
+    # A restart keeps the database rows
+    token_metadata._metadata_cache.clear()
+    assert token_metadata.get_token_metadata(web3, TOKEN)["decimals"] == 18
+    assert web3.calls == 1
+    print("✅ Metadata cached")
+
+def test_rpc_errors_not_cached():
+    """Test that an RPC outage isn't remembered as missing metadata"""
+    print("Testing RPC errors...")
+    use_temp_metadata_storage()
+    web3 = FakeWeb3(1, {TOKEN: {"symbol": "TKN", "name": "Token", "decimals": 6}})
+    web3.down = True
+
+    assert token_metadata.get_token_metadata(web3, TOKEN) == {"symbol": None, "name": None, "decimals": None}
+    assert storage.get_token_metadata_rows(1, [TOKEN]) == {}, "nothing stored"
+
+    web3.down = False
+    assert token_metadata.get_token_metadata(web3, TOKEN)["symbol"] == "TKN"
+    print("✅ RPC errors retried")
+
+def test_owner_cached_only_on_revert(monkeypatch):
+    """Test that a missing owner() is cached but a failed owner read isn't"""
+    print("Testing owner cache...")
+    web3 = FakeWeb3(1, {})
+    outcomes = [ConnectionError("RPC unavailable"), ContractLogicError("execution reverted")]
+    reads = []
+
+    def owner_call():
+        reads.append(1)
+        raise outcomes[len(reads) - 1]
+
+    contract = SimpleNamespace(functions=SimpleNamespace(owner=lambda: SimpleNamespace(call=owner_call)))
+    monkeypatch.setattr(token_metadata, "get_contract", lambda web3, address, abi: contract)
+    token_metadata._owner_cache.clear()
+
+    assert token_metadata.get_token_owner(web3, TOKEN) is None
+    assert token_metadata._owner_cache == {}, "the RPC error isn't cached"
+
+    assert token_metadata.get_token_owner(web3, TOKEN) is None
+    assert token_metadata.get_token_owner(web3, TOKEN) is None
+    assert len(reads) == 2, "the revert is cached"
+    print("✅ Owner cached on revert only")
+
+if __name__ == "__main__":
+    test_metadata_cached_and_reverts_negative_cached()
+    test_rpc_errors_not_cached()
+    test_owner_cached_only_on_revert(pytest.MonkeyPatch())
@@ -0,0 +1,88 @@
+import threading
+import time
+from webhook import UpdateDeduplicator, WebhookServer, post_update
+
+def start_server(**kwargs):
+    received = []
+    done = threading.Event()
+
+    def handle_update(update):
+        received.append(update["update_id"])
+        done.set()
+
+    server = WebhookServer(handle_update, host="127.0.0.1", port=0, reuse_port=False, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/webhook"
+    return server, url, received
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_updates_are_dispatched_once():
+    """Test that posted updates reach the handler and retries are dropped"""
+    print("Testing webhook dispatch...")
+    server, url, received = start_server(secret_token="s3cret")
+    try:
+        update = {"update_id": 1001, "message": {"message_id": 1, "text": "/start"}}
+        assert post_update(url, update, "s3cret") == 200
+        assert post_update(url, update, "s3cret") == 200, "duplicates are still acknowledged"
+        assert post_update(url, {"update_id": 1002}, "s3cret") == 200
+
+        wait_for(lambda: len(received) == 2)
+        assert sorted(received) == [1001, 1002]
+        stats = server.get_stats()
+        assert stats["received"] == 2 and stats["duplicates"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Updates dispatched once")
+
+def test_requests_are_validated():
+    """Test the secret token, path and body checks"""
+    print("Testing webhook validation...")
+    server, url, received = start_server(secret_token="s3cret")
+    try:
+        assert post_update(url, {"update_id": 1}, "wrong") == 403
+        assert post_update(url, {"update_id": 1}) == 403
+        assert post_update(url.replace("/webhook", "/other"), {"update_id": 1}, "s3cret") == 404
+        assert post_update(url, {"no_id": True}, "s3cret") == 400
+        assert server.get_stats()["rejected"] == 3
+        assert received == []
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Invalid requests rejected")
+
+def test_shared_claims_across_processes():
+    """Test that a shared claim check dedups updates seen by another process"""
+    print("Testing shared deduplication...")
+    claimed = set()
+    lock = threading.Lock()
+
+    def claim_update(update_id):
+        with lock:
+            if update_id in claimed:
+                return False
+            claimed.add(update_id)
+            return True
+
+    first = UpdateDeduplicator(claim_update=claim_update)
+    second = UpdateDeduplicator(claim_update=claim_update)
+    assert first.is_new(7)
+    assert not second.is_new(7)
+    assert second.is_new(8)
+
+    # The in-memory window is bounded
+    small = UpdateDeduplicator(max_size=2)
+    for update_id in (1, 2, 3):
+        assert small.is_new(update_id)
+    assert small.is_new(1), "oldest id was evicted"
+    print("✅ Claims shared between deduplicators")
+
+if __name__ == "__main__":
+    test_updates_are_dispatched_once()
+    test_requests_are_validated()
+    test_shared_claims_across_processes()
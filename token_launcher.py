@@ -0,0 +1,516 @@
+import math
+import os
+import secrets
+import threading
+import time
+from decimal import Decimal
+
+from eth_abi import encode
+from web3 import Web3
+from web3.logs import DISCARD
+
+from abi_codec import abi_type
+from config import DEPLOY_ENGINES, LAUNCHER_ADDRESSES, POLYGON_ADDRESSES
+from contract_registry import get_contract
+from gas_estimator import deploy_shape
+from pool import calculate_ticks
+from storage import get_user_wallet, save_token_to_db, save_pool_to_db
+from wallet import (
+    get_web3, get_fee_oracle, get_fee_fields, get_gas_estimator, send_transaction_with_nonce,
+    wait_for_transaction_receipt
+)
+
+# Deploys a token with CREATE2, creates and initializes its Uniswap V3 pool against
+# WETH/WMATIC and mints a full-range position, all in the caller's transaction.
+# Deployed once per network; its address goes in POLYGON_LAUNCHER_ADDRESS / ETHEREUM_LAUNCHER_ADDRESS.
+LAUNCHER_SOURCE = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+interface IERC20Minimal {
+    function approve(address spender, uint256 amount) external returns (bool);
+    function transfer(address to, uint256 amount) external returns (bool);
+    function balanceOf(address account) external view returns (uint256);
+}
+
+interface IOwnable {
+    function transferOwnership(address newOwner) external;
+}
+
+interface IWETH9 {
+    function deposit() external payable;
+    function withdraw(uint256 amount) external;
+}
+
+interface INonfungiblePositionManager {
+    struct MintParams {
+        address token0;
+        address token1;
+        uint24 fee;
+        int24 tickLower;
+        int24 tickUpper;
+        uint256 amount0Desired;
+        uint256 amount1Desired;
+        uint256 amount0Min;
+        uint256 amount1Min;
+        address recipient;
+        uint256 deadline;
+    }
+
+    function createAndInitializePoolIfNecessary(address token0, address token1, uint24 fee, uint160 sqrtPriceX96)
+        external payable returns (address pool);
+
+    function mint(MintParams calldata params)
+        external payable returns (uint256 tokenId, uint128 liquidity, uint256 amount0, uint256 amount1);
+}
+
+contract TokenLauncher {
+    struct LaunchParams {
+        bytes initCode;
+        bytes32 salt;
+        uint24 fee;
+        uint160 sqrtPriceX96;
+        int24 tickLower;
+        int24 tickUpper;
+        uint256 tokenAmount;
+        uint256 deadline;
+    }
+
+    INonfungiblePositionManager public immutable positionManager;
+    address public immutable weth;
+
+    event Launched(address indexed owner, address indexed token, address pool, uint256 positionId);
+
+    constructor(address positionManager_, address weth_) {
+        positionManager = INonfungiblePositionManager(positionManager_);
+        weth = weth_;
+    }
+
+    receive() external payable {
+        require(msg.sender == weth, "Only WETH");
+    }
+
+    // Salts are bound to the caller, so nobody can take a launch's address first
+    function computeTokenAddress(address owner, bytes32 salt, bytes32 initCodeHash) public view returns (address) {
+        bytes32 deploySalt = keccak256(abi.encode(owner, salt));
+        return address(uint160(uint256(keccak256(abi.encodePacked(bytes1(0xff), address(this), deploySalt, initCodeHash)))));
+    }
+
+    function launch(LaunchParams calldata params)
+        external payable returns (address token, address pool, uint256 positionId)
+    {
+        bytes memory initCode = params.initCode;
+        bytes32 deploySalt = keccak256(abi.encode(msg.sender, params.salt));
+        assembly {
+            token := create2(0, add(initCode, 0x20), mload(initCode), deploySalt)
+        }
+        require(token != address(0), "Token deployment failed");
+
+        // The constructor minted the supply to this contract
+        IWETH9(weth).deposit{value: msg.value}();
+        bool tokenFirst = token < weth;
+        (address token0, address token1) = tokenFirst ? (token, weth) : (weth, token);
+
+        pool = positionManager.createAndInitializePoolIfNecessary(token0, token1, params.fee, params.sqrtPriceX96);
+        IERC20Minimal(token).approve(address(positionManager), params.tokenAmount);
+        IERC20Minimal(weth).approve(address(positionManager), msg.value);
+        (positionId, , , ) = positionManager.mint(INonfungiblePositionManager.MintParams({
+            token0: token0,
+            token1: token1,
+            fee: params.fee,
+            tickLower: params.tickLower,
+            tickUpper: params.tickUpper,
+            amount0Desired: tokenFirst ? params.tokenAmount : msg.value,
+            amount1Desired: tokenFirst ? msg.value : params.tokenAmount,
+            amount0Min: 0,
+            amount1Min: 0,
+            recipient: msg.sender,
+            deadline: params.deadline
+        }));
+
+        // Everything the position didn't take goes to the caller, along with the token's ownership
+        uint256 tokensLeft = IERC20Minimal(token).balanceOf(address(this));
+        if (tokensLeft > 0) {
+            IERC20Minimal(token).transfer(msg.sender, tokensLeft);
+        }
+        uint256 wethLeft = IERC20Minimal(weth).balanceOf(address(this));
+        if (wethLeft > 0) {
+            IWETH9(weth).withdraw(wethLeft);
+            (bool refunded, ) = msg.sender.call{value: wethLeft}("");
+            require(refunded, "Refund failed");
+        }
+        IOwnable(token).transferOwnership(msg.sender);
+
+        emit Launched(msg.sender, token, pool, positionId);
+    }
+}
+"""
+
+LAUNCHER_ABI = [
+    {
+        "name": "launch",
+        "type": "function",
+        "stateMutability": "payable",
+        "inputs": [{
+            "name": "params",
+            "type": "tuple",
+            "components": [
+                {"name": "initCode", "type": "bytes"},
+                {"name": "salt", "type": "bytes32"},
+                {"name": "fee", "type": "uint24"},
+                {"name": "sqrtPriceX96", "type": "uint160"},
+                {"name": "tickLower", "type": "int24"},
+                {"name": "tickUpper", "type": "int24"},
+                {"name": "tokenAmount", "type": "uint256"},
+                {"name": "deadline", "type": "uint256"}
+            ]
+        }],
+        "outputs": [
+            {"name": "token", "type": "address"},
+            {"name": "pool", "type": "address"},
+            {"name": "positionId", "type": "uint256"}
+        ]
+    },
+    {
+        "name": "weth",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "address"}]
+    },
+    {
+        "name": "Launched",
+        "type": "event",
+        "anonymous": False,
+        "inputs": [
+            {"name": "owner", "type": "address", "indexed": True},
+            {"name": "token", "type": "address", "indexed": True},
+            {"name": "pool", "type": "address", "indexed": False},
+            {"name": "positionId", "type": "uint256", "indexed": False}
+        ]
+    }
+]
+
+# Roles are granted to the deployer - the launcher - and it can't hand them on
+UNSUPPORTED_FEATURES = {'Access Control'}
+
+POOL_FEE = 3000  # 0.3% fee tier, as for pools created separately
+
+# Uniswap V3 position manager and wrapped native token the launcher is deployed with
+LAUNCHER_CONSTRUCTOR_ARGS = {
+    'polygon': (POLYGON_ADDRESSES['UNISWAP_V3_POSITION_MANAGER'], POLYGON_ADDRESSES['WMATIC']),
+    'ethereum': ('0xC36442b4a4522E871399CD717aBDD847Ab11FE88', '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2'),
+}
+
+# Launcher address -> its WETH/WMATIC address (immutable in the contract)
+_weth_addresses = {}
+_weth_lock = threading.Lock()
+
+
+def get_launcher_address(network):
+    """Launcher contract configured for a network, or None"""
+    return LAUNCHER_ADDRESSES.get(network) or None
+
+
+def can_launch(network, features):
+    """Whether a token with these features can be launched in one transaction on network"""
+    return get_launcher_address(network) is not None and not UNSUPPORTED_FEATURES.intersection(features or [])
+
+
+def launch_shape(features):
+    """Gas estimator shape key for launches, which depend on the feature set like deployments"""
+    return ('launch',) + deploy_shape(features)[1:]
+
+
+def predict_token_address(launcher_address, owner, salt, init_code):
+    """
+    Address the launcher will deploy a token at (TokenLauncher.computeTokenAddress).
+
+    Args:
+        launcher_address (str): Launcher contract
+        owner (str): Address sending the launch transaction
+        salt (bytes): 32-byte salt passed to launch
+        init_code (bytes): Token bytecode with the encoded constructor arguments
+
+    Returns:
+        str: Checksum address
+    """
+    deploy_salt = Web3.keccak(encode(['address', 'bytes32'], [Web3.to_checksum_address(owner), salt]))
+    digest = Web3.keccak(
+        b'\xff' + bytes.fromhex(launcher_address[2:]) + bytes(deploy_salt) + bytes(Web3.keccak(init_code))
+    )
+    return Web3.to_checksum_address(digest[12:])
+
+
+def sort_pair(token_address, weth_address, token_amount, eth_amount):
+    """
+    Order a token/WETH pair the way Uniswap does, by address.
+
+    Returns:
+        tuple: (token0, token1, amount0, amount1)
+    """
+    if token_address.lower() < weth_address.lower():
+        return token_address, weth_address, token_amount, eth_amount
+    return weth_address, token_address, eth_amount, token_amount
+
+
+def encode_sqrt_price_x96(amount0, amount1):
+    """Initial sqrtPriceX96 for a pool priced at amount1 / amount0 (raw units), computed exactly"""
+    return math.isqrt((amount1 << 192) // amount0)
+
+
+def build_init_code(bytecode, abi, constructor_args):
+    """Creation bytecode followed by the ABI-encoded constructor arguments"""
+    constructor = next((item for item in abi if item.get("type") == "constructor"), {"inputs": []})
+    types = [abi_type(entry) for entry in constructor["inputs"]]
+    return bytes.fromhex(bytecode.removeprefix("0x")) + encode(types, constructor_args)
+
+
+def compile_token(features, network):
+    """Token artifact from the network's deploy engine (usually from the artifact cache)"""
+    if DEPLOY_ENGINES.get(network) == 'native':
+        from native_deploy import compile_contract_native
+        return compile_contract_native(features, "standard")
+    from contract_bridge import get_compiled_artifact
+    return get_compiled_artifact(features, "standard")
+
+
+def _get_weth_address(web3, launcher_address):
+    with _weth_lock:
+        weth_address = _weth_addresses.get(launcher_address)
+    if weth_address is None:
+        weth_address = get_contract(web3, launcher_address, LAUNCHER_ABI).functions.weth().call()
+        with _weth_lock:
+            _weth_addresses[launcher_address] = weth_address
+    return weth_address
+
+
+def _to_raw_amount(amount, decimals):
+    return int(Decimal(str(amount)) * (Decimal(10) ** decimals))
+
+
+def prepare_launch(user_id, token_data, liquidity_data, network='polygon'):
+    """
+    Cost preview for a one-transaction launch.
+
+    Args:
+        user_id: Telegram user ID
+        token_data (dict): Token parameters collected by the bot
+        liquidity_data (dict): {'token_amount', 'eth_amount'} for the initial position
+        network (str): Target network
+
+    Returns:
+        dict: {'success': True, gas and cost details} or {'success': False, 'error': str}
+    """
+    try:
+        if not can_launch(network, token_data.get('features')):
+            return {'success': False, 'error': f"One-transaction launches aren't available for this token on {network.title()}"}
+
+        web3 = get_web3(network)
+        user_wallet = get_user_wallet(user_id)
+        if not user_wallet:
+            return {'success': False, 'error': "No wallet found for user"}
+
+        fees = get_fee_oracle(web3).get_fees()
+        gas_limit = get_gas_estimator(web3).get(launch_shape(token_data.get('features')), 6000000)
+        eth_amount_wei = web3.to_wei(Decimal(str(liquidity_data['eth_amount'])), 'ether')
+        max_cost_wei = fees['max_fee'] * gas_limit + eth_amount_wei
+        balance_wei = web3.eth.get_balance(user_wallet['address'])
+
+        if balance_wei < max_cost_wei:
+            return {
+                'success': False,
+                'error': f"Insufficient balance. You need up to {web3.from_wei(max_cost_wei, 'ether')} {network.upper()} "
+                         f"for liquidity and gas. Current balance: {web3.from_wei(balance_wei, 'ether')} {network.upper()}"
+            }
+
+        return {
+            'success': True,
+            'gas_price': web3.from_wei(fees['gas_price'], 'gwei'),
+            'gas_limit': gas_limit,
+            'transaction_cost': web3.from_wei(fees['gas_price'] * gas_limit, 'ether'),
+            'max_cost': web3.from_wei(max_cost_wei, 'ether'),
+            'current_balance': web3.from_wei(balance_wei, 'ether')
+        }
+    except Exception as e:
+        print(f"Launch preparation error: {e}")
+        return {'success': False, 'error': str(e)}
+
+
+def launch_token(user_id, token_data, liquidity_data, network='polygon', progress=None):
+    """
+    Deploy a token, create its pool and add full-range liquidity in one transaction.
+
+    The token is deployed by the launcher with its taxes set by the constructor and
+    the tax wallet defaulting to the user's address; the position, the remaining
+    supply and the token's ownership go to the user.
+
+    Args:
+        user_id: Telegram user ID
+        token_data (dict): Token parameters collected by the bot
+        liquidity_data (dict): {'token_amount', 'eth_amount'} for the initial position
+        network (str): Target network
+        progress (callable): Optional, called with status messages
+
+    Returns:
+        dict: {'status': 'success', 'token_address', 'pool_address', 'position_id', 'tx_hash'}
+              or {'status': 'failed', 'error'}
+    """
+    try:
+        features = token_data.get('features') or []
+        if not can_launch(network, features):
+            return {'status': 'failed', 'error': "One-transaction launches aren't available for this token"}
+
+        web3 = get_web3(network)
+        user_wallet = get_user_wallet(user_id)
+        if not user_wallet:
+            return {'status': 'failed', 'error': "No wallet found for user"}
+        owner = Web3.to_checksum_address(user_wallet['address'])
+        launcher_address = Web3.to_checksum_address(get_launcher_address(network))
+
+        if progress:
+            progress(f"🚀 Launching {token_data['name']} on {network.title()}...\n\n⏳ Preparing the token...")
+        compilation = compile_token(features, network)
+        if not compilation.get('success'):
+            return {'status': 'failed', 'error': compilation.get('error', 'Compilation failed')}
+
+        decimals = int(token_data.get('decimals', 18) or 18)
+        init_code = build_init_code(compilation['bytecode'], compilation['abi'], [
+            token_data['name'],
+            token_data['symbol'],
+            decimals,
+            int(token_data['total_supply']),
+            int(token_data.get('buy_tax', 0)),
+            int(token_data.get('sell_tax', 0)),
+            # The launcher is the deployer, so an empty tax wallet must not fall back to msg.sender
+            Web3.to_checksum_address(token_data.get('tax_wallet') or owner)
+        ])
+        salt = secrets.token_bytes(32)
+        token_address = predict_token_address(launcher_address, owner, salt, init_code)
+
+        token_amount = _to_raw_amount(liquidity_data['token_amount'], decimals)
+        eth_amount = web3.to_wei(Decimal(str(liquidity_data['eth_amount'])), 'ether')
+        weth_address = _get_weth_address(web3, launcher_address)
+        _, _, amount0, amount1 = sort_pair(token_address, weth_address, token_amount, eth_amount)
+        tick_lower, tick_upper = calculate_ticks(POOL_FEE)
+
+        launch = get_contract(web3, launcher_address, LAUNCHER_ABI).functions.launch((
+            init_code,
+            salt,
+            POOL_FEE,
+            encode_sqrt_price_x96(amount0, amount1),
+            tick_lower,
+            tick_upper,
+            token_amount,
+            int(time.time()) + 1200
+        ))
+
+        estimator = get_gas_estimator(web3)
+        shape = launch_shape(features)
+        gas = estimator.estimate(
+            shape,
+            lambda: launch.estimate_gas({'from': owner, 'value': eth_amount}),
+            6000000
+        )
+        fee_fields = get_fee_fields(web3)
+
+        if progress:
+            progress(f"🚀 Launching {token_data['name']} on {network.title()}...\n\n"
+                     f"⏳ Deploying the token, creating the pool and adding liquidity in one transaction...")
+        tx_hash = send_transaction_with_nonce(
+            web3,
+            owner,
+            lambda nonce: launch.build_transaction({
+                'from': owner,
+                'nonce': nonce,
+                'gas': gas,
+                'value': eth_amount,
+                **fee_fields
+            }),
+            user_wallet['private_key']
+        )
+        receipt = wait_for_transaction_receipt(web3, tx_hash)
+        if receipt.status != 1:
+            return {'status': 'failed', 'error': 'Launch transaction failed', 'tx_hash': tx_hash.hex()}
+        estimator.record(shape, receipt.gasUsed)
+
+        events = get_contract(web3, launcher_address, LAUNCHER_ABI).events.Launched().process_receipt(
+            receipt, errors=DISCARD)
+        pool_address, position_id = None, None
+        if events:
+            token_address = events[0]['args']['token']
+            pool_address = events[0]['args']['pool']
+            position_id = events[0]['args']['positionId']
+        print(f"Launched {token_address} with pool {pool_address}, position {position_id}")
+
+        save_token_to_db(user_id, token_data, token_address, network)
+        save_pool_to_db(user_id, token_address, pool_address, {
+            'token_amount': float(liquidity_data['token_amount']),
+            'eth_amount': float(liquidity_data['eth_amount'])
+        }, network)
+
+        return {
+            'status': 'success',
+            'token_address': token_address,
+            'pool_address': pool_address,
+            'position_id': position_id,
+            'tx_hash': tx_hash.hex()
+        }
+    except Exception as e:
+        print(f"Launch error: {e}")
+        return {'status': 'failed', 'error': str(e)}
+
+
+def deploy_launcher(network, private_key):
+    """
+    Compile and deploy the launcher contract for a network (once per network).
+
+    Args:
+        network (str): 'polygon' or 'ethereum'
+        private_key (str): Key paying for the deployment
+
+    Returns:
+        str: Launcher address
+    """
+    # py-solc-x is only needed here, like in the native deploy engine
+    import solcx
+    from native_deploy import ensure_solc
+
+    output = solcx.compile_standard({
+        "language": "Solidity",
+        "sources": {"TokenLauncher.sol": {"content": LAUNCHER_SOURCE}},
+        "settings": {
+            "optimizer": {"enabled": True, "runs": 200},
+            "outputSelection": {"*": {"TokenLauncher": ["abi", "evm.bytecode.object"]}}
+        }
+    }, solc_version=ensure_solc())
+    contract = output["contracts"]["TokenLauncher.sol"]["TokenLauncher"]
+
+    web3 = get_web3(network)
+    account = web3.eth.account.from_key(private_key)
+    constructor = web3.eth.contract(abi=contract["abi"], bytecode=contract["evm"]["bytecode"]["object"]).constructor(
+        *LAUNCHER_CONSTRUCTOR_ARGS[network]
+    )
+    gas = constructor.estimate_gas({'from': account.address})
+    tx_hash = send_transaction_with_nonce(
+        web3,
+        account.address,
+        lambda nonce: constructor.build_transaction({
+            'from': account.address,
+            'nonce': nonce,
+            'gas': int(gas * 1.2),
+            **get_fee_fields(web3)
+        }),
+        private_key
+    )
+    receipt = wait_for_transaction_receipt(web3, tx_hash)
+    if receipt.status != 1:
+        raise Exception(f"Launcher deployment {tx_hash.hex()} failed")
+    return receipt.contractAddress
+
+
+if __name__ == "__main__":
+    import sys
+
+    network = sys.argv[1] if len(sys.argv) > 1 else 'polygon'
+    address = deploy_launcher(network, os.environ["LAUNCHER_DEPLOYER_PRIVATE_KEY"])
+    print(f"✅ Launcher deployed at {address}; set {network.upper()}_LAUNCHER_ADDRESS={address}")
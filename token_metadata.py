@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+import weakref
+
+from web3 import Web3
+from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+
+from config import ERC20_ABI, TOKEN_METADATA_NEGATIVE_TTL, TOKEN_OWNER_TTL
+from contract_registry import get_contract
+from multicall import ERROR, Call, aggregate_with_status, aggregate_with_status_async
+from storage import get_token_metadata_rows, save_token_metadata
+
+METADATA_FIELDS = ("symbol", "name", "decimals")
+
+OWNER_ABI = [{
+    "name": "owner",
+    "type": "function",
+    "inputs": [],
+    "outputs": [{"name": "", "type": "address"}],
+    "stateMutability": "view"
+}]
+
+# (chain_id, checksum address) -> {'symbol', 'name', 'decimals', 'fetched_at'}, backed by the token_metadata table
+_metadata_cache = {}
+# (chain_id, checksum address) -> (owner, expires_at)
+_owner_cache = {}
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+# chain_id per Web3 instance, so cache keys don't cost an eth_chainId round trip
+_chain_ids = weakref.WeakKeyDictionary()
+
+
+def _get_chain_id(web3):
+    chain_id = _chain_ids.get(web3)
+    if chain_id is None:
+        chain_id = web3.eth.chain_id
+        _chain_ids[web3] = chain_id
+    return chain_id
+
+
+def _is_fresh(entry, now):
+    """Metadata never changes; entries with fields the token reverted on expire after the negative TTL"""
+    if all(entry[field] is not None for field in METADATA_FIELDS):
+        return True
+    return now - entry['fetched_at'] < TOKEN_METADATA_NEGATIVE_TTL
+
+
+def _public(entry):
+    return {field: entry[field] for field in METADATA_FIELDS}
+
+
+def _from_memory(chain_id, addresses, now):
+    """Cached metadata of the addresses that are in memory and still fresh"""
+    result = {}
+    with _cache_lock:
+        for address in addresses:
+            entry = _metadata_cache.get((chain_id, address))
+            if entry is not None and _is_fresh(entry, now):
+                result[address] = _public(entry)
+        _cache_stats['hits'] += len(result)
+    return result
+
+
+def _from_database(chain_id, missing, now):
+    """Second level: the database, shared across restarts. Returns (stored entries, addresses to fetch)"""
+    stored = {
+        address: entry for address, entry in get_token_metadata_rows(chain_id, missing).items()
+        if _is_fresh(entry, now)
+    }
+    return stored, [address for address in missing if address not in stored]
+
+
+def _metadata_calls(to_fetch):
+    return [Call(address, ERC20_ABI, field) for address in to_fetch for field in METADATA_FIELDS]
+
+
+def _store_fetched(chain_id, result, stored, to_fetch, outcomes, now):
+    """Cache what was read from the chain and add everything to result"""
+    fetched = {}
+    for i, address in enumerate(to_fetch):
+        statuses, values = zip(*outcomes[3 * i:3 * i + 3])
+        symbol, name, decimals = values
+        entry = {'symbol': symbol, 'name': name, 'decimals': decimals, 'fetched_at': now}
+        if ERROR in statuses:
+            # The RPC failed rather than the token: answer with what we got, but don't cache it
+            print(f"Token metadata for {address} on chain {chain_id} incomplete after RPC errors")
+            result[address] = _public(entry)
+            continue
+        if symbol is None and name is None and decimals is None:
+            print(f"Token metadata unavailable for {address} on chain {chain_id}")
+        fetched[address] = entry
+    if fetched:
+        try:
+            save_token_metadata(chain_id, fetched)
+        except Exception as e:
+            print(f"Error saving token metadata: {e}")
+
+    with _cache_lock:
+        _cache_stats['hits'] += len(stored)
+        _cache_stats['misses'] += len(to_fetch)
+        for address, entry in {**stored, **fetched}.items():
+            _metadata_cache[(chain_id, address)] = entry
+            result[address] = _public(entry)
+    return result
+
+
+def get_many_token_metadata(web3, token_addresses):
+    """
+    Get symbol, name and decimals for several tokens, fetching only the ones not cached yet.
+
+    Args:
+        web3 (Web3): Connection to the token's network
+        token_addresses (list): Token contract addresses
+
+    Returns:
+        dict: Checksum address -> {'symbol', 'name', 'decimals'}; fields that can't be read are None
+    """
+    chain_id = _get_chain_id(web3)
+    addresses = list(dict.fromkeys(Web3.to_checksum_address(address) for address in token_addresses))
+    now = time.time()
+
+    result = _from_memory(chain_id, addresses, now)
+    missing = [address for address in addresses if address not in result]
+    if not missing:
+        return result
+
+    stored, to_fetch = _from_database(chain_id, missing, now)
+    outcomes = aggregate_with_status(web3, _metadata_calls(to_fetch)) if to_fetch else []
+    return _store_fetched(chain_id, result, stored, to_fetch, outcomes, now)
+
+
+async def get_many_token_metadata_async(web3, token_addresses):
+    """
+    get_many_token_metadata for AsyncWeb3. Chain reads are awaited, database
+    reads and writes run in a worker thread.
+    """
+    chain_id = _chain_ids.get(web3)
+    if chain_id is None:
+        chain_id = await web3.eth.chain_id
+        _chain_ids[web3] = chain_id
+    addresses = list(dict.fromkeys(Web3.to_checksum_address(address) for address in token_addresses))
+    now = time.time()
+
+    result = _from_memory(chain_id, addresses, now)
+    missing = [address for address in addresses if address not in result]
+    if not missing:
+        return result
+
+    stored, to_fetch = await asyncio.to_thread(_from_database, chain_id, missing, now)
+    outcomes = await aggregate_with_status_async(web3, _metadata_calls(to_fetch)) if to_fetch else []
+    return await asyncio.to_thread(_store_fetched, chain_id, result, stored, to_fetch, outcomes, now)
+
+
+def get_token_metadata(web3, token_address):
+    """
+    Get symbol, name and decimals for one token.
+
+    Args:
+        web3 (Web3): Connection to the token's network
+        token_address (str): Token contract address
+
+    Returns:
+        dict: {'symbol', 'name', 'decimals'}; fields that can't be read are None
+    """
+    return get_many_token_metadata(web3, [token_address])[Web3.to_checksum_address(token_address)]
+
+
+def get_token_owner(web3, token_address):
+    """
+    Get a contract's owner, cached for TOKEN_OWNER_TTL seconds since ownership can change.
+
+    Args:
+        web3 (Web3): Connection to the token's network
+        token_address (str): Token contract address
+
+    Returns:
+        str: Owner address, or None if the contract has no owner() function or it
+        couldn't be read (only the former is cached)
+    """
+    key = (_get_chain_id(web3), Web3.to_checksum_address(token_address))
+    now = time.time()
+
+    with _cache_lock:
+        cached = _owner_cache.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+    try:
+        contract = get_contract(web3, key[1], OWNER_ABI)
+        owner = contract.functions.owner().call()
+    except (ContractLogicError, BadFunctionCallOutput):
+        # No owner() function, or it reverted
+        owner = None
+    except Exception as e:
+        # A timeout or RPC error says nothing about the contract, so it isn't cached
+        print(f"Error getting owner of {key[1]}: {e}")
+        return None
+
+    with _cache_lock:
+        _owner_cache[key] = (owner, now + TOKEN_OWNER_TTL)
+    return owner
+
+
+def invalidate_token_owner(web3, token_address):
+    """Forget a cached owner, e.g. after renouncing or transferring ownership"""
+    key = (_get_chain_id(web3), Web3.to_checksum_address(token_address))
+    with _cache_lock:
+        _owner_cache.pop(key, None)
+
+
+def get_token_metadata_stats():
+    with _cache_lock:
+        return {
+            'hits': _cache_stats['hits'],
+            'misses': _cache_stats['misses'],
+            'size': len(_metadata_cache),
+            'owners': len(_owner_cache)
+        }
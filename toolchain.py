@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+
+from config import TOOLCHAIN_DIR
+
+# Node.js packages required by the deployment scripts
+TOOLCHAIN_PACKAGE_JSON = {
+    "name": "token-deployer-toolchain",
+    "version": "1.0.0",
+    "private": True,
+    "description": "Shared Node.js toolchain for token deployment",
+    "dependencies": {
+        "ethers": "^6.7.1",
+        "solc": "^0.8.20",
+        "@openzeppelin/contracts": "^4.9.3"
+    }
+}
+
+# Marker written into a toolchain directory once it is fully installed
+STAMP_FILE = ".toolchain.json"
+LOCK_FILE = "package-lock.json"
+
+_toolchain_lock = threading.Lock()
+_toolchain_path = None
+
+
+def get_manifest_hash():
+    """Content hash of the toolchain package manifest"""
+    manifest = json.dumps(TOOLCHAIN_PACKAGE_JSON, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(manifest.encode("utf-8")).hexdigest()
+
+
+def get_toolchain_path():
+    """Directory the toolchain for the current manifest lives in"""
+    return os.path.join(TOOLCHAIN_DIR, get_manifest_hash()[:16])
+
+
+def get_node_modules_path(toolchain_path=None):
+    return os.path.join(toolchain_path or get_toolchain_path(), "node_modules")
+
+
+def hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def verify_toolchain(toolchain_path):
+    """
+    Check that a toolchain directory is complete and matches its lockfile.
+
+    Args:
+        toolchain_path (str): Toolchain directory
+
+    Returns:
+        bool: True if the toolchain can be used as-is
+    """
+    stamp_path = os.path.join(toolchain_path, STAMP_FILE)
+    lock_path = os.path.join(toolchain_path, LOCK_FILE)
+
+    if not os.path.exists(stamp_path) or not os.path.exists(lock_path):
+        return False
+
+    try:
+        with open(stamp_path, "r") as f:
+            stamp = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+
+    if stamp.get("manifest_hash") != get_manifest_hash():
+        return False
+
+    if stamp.get("lockfile_hash") != hash_file(lock_path):
+        return False
+
+    node_modules = get_node_modules_path(toolchain_path)
+    for package in TOOLCHAIN_PACKAGE_JSON["dependencies"]:
+        if not os.path.isdir(os.path.join(node_modules, *package.split("/"))):
+            return False
+
+    return True
+
+
+def _run_npm(args, cwd):
+    """Run npm, honouring the NPM_PATH detected at startup"""
+    npm_cmd = os.environ.get("NPM_PATH", "npm")
+
+    if npm_cmd != "npm" and os.name == "nt" and npm_cmd.endswith("npm.cmd"):
+        # On Windows with a full path to npm.cmd, we need to use PowerShell
+        command = ["powershell", "-Command", f"& '{npm_cmd}' {' '.join(args)}"]
+    else:
+        command = [npm_cmd] + args
+
+    return subprocess.run(
+        command,
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+
+def _make_read_only(path):
+    """Strip write permissions so deployments cannot modify the shared toolchain"""
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                mode = os.stat(file_path).st_mode
+                os.chmod(file_path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+            except OSError:
+                pass
+
+
+def _force_remove(func, path, exc_info):
+    # Read-only files have to be made writable again before removal on Windows
+    try:
+        os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)
+        func(path)
+    except OSError:
+        pass
+
+
+def install_toolchain():
+    """
+    Install the toolchain into a staging directory and atomically move it
+    into its content-addressed location.
+
+    Returns:
+        str: Path to the installed toolchain
+    """
+    target = get_toolchain_path()
+    os.makedirs(TOOLCHAIN_DIR, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=TOOLCHAIN_DIR)
+
+    try:
+        with open(os.path.join(staging, "package.json"), "w") as f:
+            json.dump(TOOLCHAIN_PACKAGE_JSON, f, indent=2)
+
+        print(f"Installing Node.js toolchain into {target}...")
+        _run_npm(["install", "--no-audit", "--no-fund"], staging)
+
+        lock_path = os.path.join(staging, LOCK_FILE)
+        if not os.path.exists(lock_path):
+            raise Exception("npm install did not produce a package-lock.json")
+
+        with open(os.path.join(staging, STAMP_FILE), "w") as f:
+            json.dump({
+                "manifest_hash": get_manifest_hash(),
+                "lockfile_hash": hash_file(lock_path)
+            }, f, indent=2)
+
+        _make_read_only(staging)
+
+        if os.path.exists(target):
+            # Another process finished first, or a broken install is in the way
+            if verify_toolchain(target):
+                return target
+            shutil.rmtree(target, onerror=_force_remove)
+
+        os.rename(staging, target)
+        staging = None
+        print("✅ Node.js toolchain installed")
+        return target
+    finally:
+        if staging and os.path.exists(staging):
+            shutil.rmtree(staging, onerror=_force_remove)
+
+
+def ensure_toolchain():
+    """
+    Return the shared toolchain directory, installing it on first use.
+
+    Returns:
+        str: Path to a verified toolchain directory
+    """
+    global _toolchain_path
+
+    with _toolchain_lock:
+        # Already verified in this process - the directory is never modified in place
+        if _toolchain_path and os.path.isdir(_toolchain_path):
+            return _toolchain_path
+
+        target = get_toolchain_path()
+        if not verify_toolchain(target):
+            target = install_toolchain()
+
+        _toolchain_path = target
+        return target
+
+
+def get_node_env(toolchain_path=None):
+    """Environment for running Node.js scripts against the shared toolchain"""
+    node_modules = get_node_modules_path(toolchain_path)
+    env = os.environ.copy()
+    existing = env.get("NODE_PATH")
+    env["NODE_PATH"] = node_modules + (os.pathsep + existing if existing else "")
+    env["TOOLCHAIN_NODE_MODULES"] = node_modules
+    return env
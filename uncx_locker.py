@@ -6,6 +6,11 @@ from eth_typing import Address, ChecksumAddress
 from web3.contract import Contract
 from web3.types import TxParams, Wei
 
+from contract_registry import get_contract
+from multicall import Call, aggregate, aggregate_async
+from token_metadata import get_many_token_metadata, get_many_token_metadata_async
+from wallet import allocate_nonce, get_fee_fields, get_gas_estimator, get_nonce_manager
+
 # UNCX Lock Contract ABI - Fixed with correct function signatures
 UNCX_LOCK_ABI = [{
     "name":
@@ -345,8 +350,39 @@ ERC20_ABI = [{
     "stateMutability": "view"
 }]
 
+# Uniswap V3 Pool ABI (token0, token1 and fee of a locked position's pool)
+UNISWAP_V3_POOL_ABI = [{
+    "name": "token0",
+    "type": "function",
+    "inputs": [],
+    "outputs": [{
+        "name": "",
+        "type": "address"
+    }],
+    "stateMutability": "view"
+}, {
+    "name": "token1",
+    "type": "function",
+    "inputs": [],
+    "outputs": [{
+        "name": "",
+        "type": "address"
+    }],
+    "stateMutability": "view"
+}, {
+    "name": "fee",
+    "type": "function",
+    "inputs": [],
+    "outputs": [{
+        "name": "",
+        "type": "uint24"
+    }],
+    "stateMutability": "view"
+}]
+
 # Contract addresses
 UNISWAP_V3_POSITION_NFT = "0xC36442b4a4522E871399CD717aBDD847Ab11FE88"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 # Define network types
 NetworkName = str  # 'ethereum' | 'arbitrum' | 'optimism' | 'polygon' | 'base' | 'bsc' | 'avalanche' | 'celo' | 'sepolia'
@@ -437,6 +473,130 @@ class LockedPosition:
         return f"LockedPosition(lock_id={self.lock_id}, nft_id={self.nft_id}, {self.token0_symbol}/{self.token1_symbol}, unlock_date={self.unlock_date_formatted}, status={status})"
 
 
+def _symbols_from_metadata(token_addresses: List[str],
+                           metadata: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Symbol per checksum address, or the truncated address if the symbol can't be read"""
+    symbols = {}
+    for address in token_addresses:
+        address = Web3.to_checksum_address(address)
+        symbol = metadata.get(address, {}).get("symbol")
+        symbols[address] = symbol if symbol is not None else address[:6]
+    return symbols
+
+
+def _build_positions(token_ids: List[int], details: List[Any],
+                     symbols: Dict[str, str]) -> List[Position]:
+    """Position objects from batched positions() results"""
+    positions = []
+    for token_id, position in zip(token_ids, details):
+        if position is None:
+            print(f"Error fetching position details for token {token_id}")
+            continue
+        positions.append(
+            Position(token_id=str(token_id),
+                     token0=position[2],
+                     token1=position[3],
+                     fee=position[4],
+                     liquidity=str(position[7]),
+                     token0_symbol=symbols[position[2]],
+                     token1_symbol=symbols[position[3]]))
+    return positions
+
+
+def _position_tokens(details: List[Any]) -> List[str]:
+    return [
+        token for position in details if position is not None
+        for token in (position[2], position[3])
+    ]
+
+
+def _lock_ids(user_locks: List[Any]) -> List[str]:
+    # Fall back to the index as lock ID if getUserLockAtIndex fails
+    return [
+        str(user_lock[0]) if user_lock is not None else str(index)
+        for index, user_lock in enumerate(user_locks)
+    ]
+
+
+def _lock_pools(locks: List[Any]) -> List[str]:
+    return list(dict.fromkeys(
+        lock[2] for lock in locks
+        if lock is not None and lock[2] != ZERO_ADDRESS))
+
+
+def _pool_calls(pools: List[str]) -> List[Call]:
+    return [
+        Call(pool, UNISWAP_V3_POOL_ABI, function_name)
+        for pool in pools for function_name in ("token0", "token1", "fee")
+    ]
+
+
+def _pool_info(pools: List[str], pool_results: List[Any]) -> Dict[str, Tuple[str, str, int]]:
+    """(token0, token1, fee) per pool from batched pool reads"""
+    pool_info = {}
+    for i, pool in enumerate(pools):
+        token0, token1, fee = pool_results[3 * i:3 * i + 3]
+        if token0 is None or token1 is None or fee is None:
+            print(f"Error getting pool information for {pool}")
+            continue
+        pool_info[pool] = (token0, token1, fee)
+    return pool_info
+
+
+def _build_locked_positions(lock_ids: List[str], locks: List[Any],
+                            pool_info: Dict[str, Tuple[str, str, int]],
+                            symbols: Dict[str, str]) -> List[LockedPosition]:
+    """LockedPosition objects from batched getLock results"""
+    locked_positions = []
+    for lock_id, lock in zip(lock_ids, locks):
+        if lock is None:
+            print(f"Error fetching detailed lock information for lock {lock_id}")
+            # Create a minimal lock object with just the ID
+            locked_positions.append(
+                LockedPosition(
+                    lock_id=lock_id,
+                    nft_id="Unknown",
+                    token0=ZERO_ADDRESS,
+                    token1=ZERO_ADDRESS,
+                    token0_symbol="Unknown",
+                    token1_symbol="Unknown",
+                    fee=0,
+                    unlock_date=int(time.time()) + 3600,  # Placeholder unlock date
+                    liquidity="0"))
+            continue
+
+        if lock[2] in pool_info:
+            token0, token1, fee = pool_info[lock[2]]
+            locked_positions.append(
+                LockedPosition(
+                    lock_id=lock_id,
+                    nft_id=str(lock[3]),  # nft_id
+                    token0=token0,
+                    token1=token1,
+                    token0_symbol=symbols[token0],
+                    token1_symbol=symbols[token1],
+                    fee=fee,
+                    unlock_date=lock[8],  # unlockDate
+                    liquidity=
+                    "N/A"  # We don't have liquidity information from the pool
+                ))
+            continue
+
+        # Fallback: Return lock with basic information
+        locked_positions.append(
+            LockedPosition(
+                lock_id=lock_id,
+                nft_id=str(lock[3]),  # nft_id
+                token0=ZERO_ADDRESS,
+                token1=ZERO_ADDRESS,
+                token0_symbol="Unknown",
+                token1_symbol="Unknown",
+                fee=0,
+                unlock_date=lock[8],  # unlockDate
+                liquidity="0"))
+    return locked_positions
+
+
 class LiquidityLocker:
     """
     Python implementation of UNCX Liquidity Locker functionality
@@ -462,14 +622,9 @@ class LiquidityLocker:
         self.native_currency = NETWORK_CURRENCY_SYMBOLS.get(
             self.network_name, "ETH")
 
-        # Initialize contracts
-        self.position_contract = self.web3.eth.contract(
-            address=Web3.to_checksum_address(UNISWAP_V3_POSITION_NFT),
-            abi=UNISWAP_V3_POSITION_ABI)
-
-        self.lock_contract = self.web3.eth.contract(
-            address=Web3.to_checksum_address(self.lock_contract_address),
-            abi=UNCX_LOCK_ABI)
+        # Initialize contracts (shared per network through the contract registry)
+        self.position_contract = get_contract(self.web3, UNISWAP_V3_POSITION_NFT, UNISWAP_V3_POSITION_ABI)
+        self.lock_contract = get_contract(self.web3, self.lock_contract_address, UNCX_LOCK_ABI)
 
     def _get_network_name(self, chain_id: int) -> NetworkName:
         """
@@ -506,19 +661,33 @@ class LiquidityLocker:
         Returns:
             The token symbol
         """
+        return self.get_token_symbols([token_address])[
+            Web3.to_checksum_address(token_address)]
+
+    def get_token_symbols(self, token_addresses: List[str]) -> Dict[str, str]:
+        """
+        Get symbols for several tokens, reading uncached ones in one batched call
+
+        Args:
+            token_addresses: Token contract addresses
+
+        Returns:
+            Dict mapping each checksum address to its symbol
+        """
         try:
-            token_contract = self.web3.eth.contract(
-                address=Web3.to_checksum_address(token_address), abi=ERC20_ABI)
-            return token_contract.functions.symbol().call()
+            metadata = get_many_token_metadata(self.web3, token_addresses)
         except Exception as e:
-            print(f"Error getting token symbol: {e}")
-            return token_address[:
-                                 6]  # Return truncated address if symbol lookup fails
+            print(f"Error getting token symbols: {e}")
+            metadata = {}
+        return _symbols_from_metadata(token_addresses, metadata)
 
     def get_positions(self, wallet_address: str) -> List[Position]:
         """
         Get all Uniswap V3 positions for a wallet
 
+        Reads are batched through Multicall3: one call for the token IDs,
+        one for the position details and one for the token symbols.
+
         Args:
             wallet_address: The wallet address
 
@@ -536,53 +705,25 @@ class LiquidityLocker:
             if balance == 0:
                 return positions
 
-            # Fetch all positions
-            for i in range(balance):
-                position = self._get_position_details(wallet_address, i)
-                if position:
-                    positions.append(position)
-
-            return positions
+            position_manager = self.position_contract.address
+            token_ids = aggregate(self.web3, [
+                Call(position_manager, UNISWAP_V3_POSITION_ABI,
+                     "tokenOfOwnerByIndex", [wallet_address, i])
+                for i in range(balance)
+            ])
+            token_ids = [token_id for token_id in token_ids if token_id is not None]
+
+            details = aggregate(self.web3, [
+                Call(position_manager, UNISWAP_V3_POSITION_ABI, "positions",
+                     [token_id]) for token_id in token_ids
+            ])
+
+            symbols = self.get_token_symbols(_position_tokens(details))
+            return _build_positions(token_ids, details, symbols)
         except Exception as e:
             print(f"Error fetching positions: {e}")
             return []
 
-    def _get_position_details(self, wallet_address: str,
-                              index: int) -> Optional[Position]:
-        """
-        Get details for a single position
-
-        Args:
-            wallet_address: The wallet address
-            index: The position index
-
-        Returns:
-            Position object or None if error
-        """
-        try:
-            # Get token ID for the position
-            token_id = self.position_contract.functions.tokenOfOwnerByIndex(
-                wallet_address, index).call()
-
-            # Get position details
-            position = self.position_contract.functions.positions(
-                token_id).call()
-
-            # Get token symbols
-            token0_symbol = self.get_token_symbol(position[2])  # token0
-            token1_symbol = self.get_token_symbol(position[3])  # token1
-
-            return Position(token_id=str(token_id),
-                            token0=position[2],
-                            token1=position[3],
-                            fee=position[4],
-                            liquidity=str(position[7]),
-                            token0_symbol=token0_symbol,
-                            token1_symbol=token1_symbol)
-        except Exception as e:
-            print(f"Error fetching position details: {e}")
-            return None
-
     def is_approved(self, wallet_address: str) -> bool:
         """
         Check if UNCX is approved to transfer the user's NFT positions
@@ -635,7 +776,7 @@ class LiquidityLocker:
             
             while retry_count < max_retries:
                 try:
-                    nonce = self.web3.eth.get_transaction_count(wallet_address)
+                    nonce = allocate_nonce(self.web3, wallet_address)
                     break
                 except Exception as e:
                     print(f"Error getting nonce (attempt {retry_count+1}): {e}")
@@ -649,13 +790,22 @@ class LiquidityLocker:
                 }
 
             # Build transaction
-            tx = self.position_contract.functions.setApprovalForAll(
-                lock_address, True).build_transaction({
+            try:
+                approval = self.position_contract.functions.setApprovalForAll(lock_address, True)
+                gas = get_gas_estimator(self.web3).estimate(
+                    ('setApprovalForAll',),
+                    lambda: approval.estimate_gas({'from': wallet_address}),
+                    200000
+                )
+                tx = approval.build_transaction({
                     'from': wallet_address,
                     'nonce': nonce,
-                    'gas': 200000,
-                    'gasPrice': self.web3.eth.gas_price
+                    'gas': gas,
+                    **get_fee_fields(self.web3)
                 })
+            except Exception:
+                get_nonce_manager(self.web3).release(wallet_address, nonce)
+                raise
 
             return {
                 "success": True,
@@ -742,7 +892,7 @@ class LiquidityLocker:
             
             while retry_count < max_retries:
                 try:
-                    nonce = self.web3.eth.get_transaction_count(wallet_address)
+                    nonce = allocate_nonce(self.web3, wallet_address)
                     break
                 except Exception as e:
                     print(f"Error getting nonce (attempt {retry_count+1}): {e}")
@@ -756,13 +906,23 @@ class LiquidityLocker:
                 }
 
             # Build transaction
-            tx = self.lock_contract.functions.lock(lock_params).build_transaction({
-                'from': wallet_address,
-                'value': flat_fee_wei,
-                'nonce': nonce,
-                'gas': 1000000,
-                'gasPrice': self.web3.eth.gas_price
-            })
+            try:
+                lock_call = self.lock_contract.functions.lock(lock_params)
+                gas = get_gas_estimator(self.web3).estimate(
+                    ('uncx_lock',),
+                    lambda: lock_call.estimate_gas({'from': wallet_address, 'value': flat_fee_wei}),
+                    1000000
+                )
+                tx = lock_call.build_transaction({
+                    'from': wallet_address,
+                    'value': flat_fee_wei,
+                    'nonce': nonce,
+                    'gas': gas,
+                    **get_fee_fields(self.web3)
+                })
+            except Exception:
+                get_nonce_manager(self.web3).release(wallet_address, nonce)
+                raise
 
             return {
                 "success": True,
@@ -782,6 +942,10 @@ class LiquidityLocker:
         """
         Get all locked positions for a wallet
 
+        Reads are batched through Multicall3: one call per stage (lock IDs,
+        lock details, pool tokens and fees, token symbols) instead of one
+        round trip per lock.
+
         Args:
             wallet_address: The wallet address
 
@@ -806,152 +970,30 @@ class LiquidityLocker:
             if num_locks == 0:
                 return locked_positions
 
-            # Fetch all locks
-            for i in range(num_locks):
-                try:
-                    lock = self._get_lock_details(wallet_address, i)
-                    if lock:
-                        locked_positions.append(lock)
-                except Exception as e:
-                    print(f"Error fetching lock at index {i}: {e}")
-                    # Continue to the next lock instead of failing completely
-
-            return locked_positions
+            lock_address = self.lock_contract.address
+            user_locks = aggregate(self.web3, [
+                Call(lock_address, UNCX_LOCK_ABI, "getUserLockAtIndex",
+                     [wallet_address, i]) for i in range(num_locks)
+            ])
+            lock_ids = _lock_ids(user_locks)
+
+            locks = aggregate(self.web3, [
+                Call(lock_address, UNCX_LOCK_ABI, "getLock", [int(lock_id)])
+                for lock_id in lock_ids
+            ])
+
+            # Get token addresses and fee from each lock's pool
+            pools = _lock_pools(locks)
+            pool_info = _pool_info(pools, aggregate(self.web3, _pool_calls(pools)))
+
+            symbols = self.get_token_symbols([
+                token for info in pool_info.values() for token in info[:2]
+            ])
+            return _build_locked_positions(lock_ids, locks, pool_info, symbols)
         except Exception as e:
             print(f"Error fetching locked positions: {e}")
             return []
 
-    def _get_lock_details(self, wallet_address: str,
-                          index: int) -> Optional[LockedPosition]:
-        """
-        Get details for a single lock
-
-        Args:
-            wallet_address: The wallet address
-            index: The lock index
-
-        Returns:
-            LockedPosition object or None if error
-        """
-        try:
-            # Get lock details from getUserLockAtIndex
-            # Handle the contract response structure correctly
-            try:
-                user_lock = self.lock_contract.functions.getUserLockAtIndex(
-                    wallet_address, index).call()
-                lock_id = str(user_lock[0])
-            except Exception as decode_error:
-                print(f"Error decoding getUserLockAtIndex response: {decode_error}")
-                # Try to extract the lock_id from the raw response
-                try:
-                    # Get the lock ID directly using getLock with the index
-                    # This is a fallback approach
-                    lock_id = str(index)
-                    # Continue with this lock_id
-                except Exception:
-                    print(f"Could not extract lock ID from error: {decode_error}")
-                    return None
-
-            try:
-                # Get more detailed lock information using getLock function
-                lock = self.lock_contract.functions.getLock(lock_id).call()
-
-                # Check if the lock has a valid pool address
-                if lock[2] != "0x0000000000000000000000000000000000000000":
-                    # Try to get token information from the pool
-                    try:
-                        # Create a minimal pool interface to get token0 and token1
-                        pool_abi = [{
-                            "name":
-                            "token0",
-                            "type":
-                            "function",
-                            "inputs": [],
-                            "outputs": [{
-                                "name": "",
-                                "type": "address"
-                            }],
-                            "stateMutability":
-                            "view"
-                        }, {
-                            "name":
-                            "token1",
-                            "type":
-                            "function",
-                            "inputs": [],
-                            "outputs": [{
-                                "name": "",
-                                "type": "address"
-                            }],
-                            "stateMutability":
-                            "view"
-                        }, {
-                            "name": "fee",
-                            "type": "function",
-                            "inputs": [],
-                            "outputs": [{
-                                "name": "",
-                                "type": "uint24"
-                            }],
-                            "stateMutability": "view"
-                        }]
-
-                        pool_contract = self.web3.eth.contract(
-                            address=Web3.to_checksum_address(lock[2]),
-                            abi=pool_abi)
-
-                        # Get token addresses and fee from the pool
-                        token0 = pool_contract.functions.token0().call()
-                        token1 = pool_contract.functions.token1().call()
-                        fee = pool_contract.functions.fee().call()
-
-                        # Get token symbols
-                        token0_symbol = self.get_token_symbol(token0)
-                        token1_symbol = self.get_token_symbol(token1)
-
-                        return LockedPosition(
-                            lock_id=lock_id,
-                            nft_id=str(lock[3]),  # nft_id
-                            token0=token0,
-                            token1=token1,
-                            token0_symbol=token0_symbol,
-                            token1_symbol=token1_symbol,
-                            fee=fee,
-                            unlock_date=lock[8],  # unlockDate
-                            liquidity=
-                            "N/A"  # We don't have liquidity information from the pool
-                        )
-                    except Exception as pool_error:
-                        print(f"Error getting pool information: {pool_error}")
-
-                # Fallback: Return lock with basic information
-                return LockedPosition(
-                    lock_id=lock_id,
-                    nft_id=str(lock[3]),  # nft_id
-                    token0="0x0000000000000000000000000000000000000000",
-                    token1="0x0000000000000000000000000000000000000000",
-                    token0_symbol="Unknown",
-                    token1_symbol="Unknown",
-                    fee=0,
-                    unlock_date=lock[8],  # unlockDate
-                    liquidity="0")
-            except Exception as lock_error:
-                print(f"Error fetching detailed lock information: {lock_error}")
-                # Create a minimal lock object with just the ID
-                return LockedPosition(
-                    lock_id=lock_id,
-                    nft_id="Unknown",
-                    token0="0x0000000000000000000000000000000000000000",
-                    token1="0x0000000000000000000000000000000000000000",
-                    token0_symbol="Unknown",
-                    token1_symbol="Unknown",
-                    fee=0,
-                    unlock_date=int(time.time()) + 3600,  # Placeholder unlock date
-                    liquidity="0")
-        except Exception as e:
-            print(f"Error fetching lock details: {e}")
-            return None
-
     def interpret_uncx_error(self, error_code: str) -> str:
         """
         Interpret UNCX Locker error codes
@@ -984,3 +1026,97 @@ class LiquidityLocker:
         }
 
         return error_map.get(error_code, f"Error: {error_code}")
+
+
+class AsyncLiquidityLocker:
+    """
+    Read-only counterpart of LiquidityLocker for AsyncWeb3, used by the asyncio
+    runtime. Locking and approvals stay on LiquidityLocker through the job executor.
+    """
+
+    def __init__(self, web3_provider, network_name: NetworkName = "polygon"):
+        """
+        Args:
+            web3_provider: An AsyncWeb3 instance connected to the network
+            network_name: Network the instance is connected to
+        """
+        self.web3 = web3_provider
+        self.network_name = network_name
+        self.lock_contract_address = Web3.to_checksum_address(UNCX_LOCK_ADDRESSES.get(
+            network_name, UNCX_LOCK_ADDRESSES["polygon"]))
+        self.position_manager = Web3.to_checksum_address(UNISWAP_V3_POSITION_NFT)
+
+    async def get_token_symbols(self, token_addresses: List[str]) -> Dict[str, str]:
+        """Same as LiquidityLocker.get_token_symbols"""
+        try:
+            metadata = await get_many_token_metadata_async(self.web3, token_addresses)
+        except Exception as e:
+            print(f"Error getting token symbols: {e}")
+            metadata = {}
+        return _symbols_from_metadata(token_addresses, metadata)
+
+    async def get_positions(self, wallet_address: str) -> List[Position]:
+        """Same as LiquidityLocker.get_positions"""
+        wallet_address = Web3.to_checksum_address(wallet_address)
+
+        try:
+            (balance,) = await aggregate_async(self.web3, [
+                Call(self.position_manager, UNISWAP_V3_POSITION_ABI, "balanceOf", [wallet_address])
+            ])
+            if not balance:
+                return []
+
+            token_ids = await aggregate_async(self.web3, [
+                Call(self.position_manager, UNISWAP_V3_POSITION_ABI,
+                     "tokenOfOwnerByIndex", [wallet_address, i])
+                for i in range(balance)
+            ])
+            token_ids = [token_id for token_id in token_ids if token_id is not None]
+
+            details = await aggregate_async(self.web3, [
+                Call(self.position_manager, UNISWAP_V3_POSITION_ABI, "positions",
+                     [token_id]) for token_id in token_ids
+            ])
+
+            symbols = await self.get_token_symbols(_position_tokens(details))
+            return _build_positions(token_ids, details, symbols)
+        except Exception as e:
+            print(f"Error fetching positions: {e}")
+            return []
+
+    async def get_locked_positions(self, wallet_address: str) -> List[LockedPosition]:
+        """Same as LiquidityLocker.get_locked_positions"""
+        wallet_address = Web3.to_checksum_address(wallet_address)
+
+        try:
+            (num_locks,) = await aggregate_async(self.web3, [
+                Call(self.lock_contract_address, UNCX_LOCK_ABI, "getNumUserLocks", [wallet_address])
+            ])
+            if num_locks is None:
+                print("Error getting number of locks, attempting fallback method to retrieve locks...")
+                num_locks = 10  # Try to get up to 10 locks
+
+            if num_locks == 0:
+                return []
+
+            user_locks = await aggregate_async(self.web3, [
+                Call(self.lock_contract_address, UNCX_LOCK_ABI, "getUserLockAtIndex",
+                     [wallet_address, i]) for i in range(num_locks)
+            ])
+            lock_ids = _lock_ids(user_locks)
+
+            locks = await aggregate_async(self.web3, [
+                Call(self.lock_contract_address, UNCX_LOCK_ABI, "getLock", [int(lock_id)])
+                for lock_id in lock_ids
+            ])
+
+            pools = _lock_pools(locks)
+            pool_info = _pool_info(pools, await aggregate_async(self.web3, _pool_calls(pools)))
+
+            symbols = await self.get_token_symbols([
+                token for info in pool_info.values() for token in info[:2]
+            ])
+            return _build_locked_positions(lock_ids, locks, pool_info, symbols)
+        except Exception as e:
+            print(f"Error fetching locked positions: {e}")
+            return []
@@ -1,13 +1,200 @@
+import asyncio
+import threading
+import time
+import weakref
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
 from eth_account import Account
-from web3 import Web3
-from config import POLYGON_RPC, ETHEREUM_RPC
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.providers.async_base import AsyncBaseProvider
+from web3.providers.base import BaseProvider
+from config import (
+    POLYGON_RPC, ETHEREUM_RPC, POLYGON_RPC_FALLBACKS, ETHEREUM_RPC_FALLBACKS,
+    POLYGON_WRITE_RPC, ETHEREUM_WRITE_RPC, RPC_POOL_SIZE, RPC_TIMEOUT,
+    RPC_CIRCUIT_FAILURES, RPC_CIRCUIT_COOLDOWN, RPC_HEALTH_INTERVAL, RECEIPT_POLL_INTERVAL,
+    NONCE_RESYNC_INTERVAL, FEE_HISTORY_BLOCKS, FEE_REWARD_PERCENTILE, FEE_BASE_MULTIPLIER,
+    GAS_ESTIMATE_MARGIN, GAS_ESTIMATE_TTL
+)
+from fee_oracle import FeeOracle
+from gas_estimator import GasEstimator
+from nonce_manager import NonceManager
+from receipt_tracker import ReceiptTracker
+from rpc_failover import EndpointRouter
+
+RPC_ENDPOINTS = {
+    'polygon': [POLYGON_RPC] + POLYGON_RPC_FALLBACKS,
+    'ethereum': [ETHEREUM_RPC] + ETHEREUM_RPC_FALLBACKS
+}
+WRITE_ENDPOINTS = {
+    'polygon': POLYGON_WRITE_RPC,
+    'ethereum': ETHEREUM_WRITE_RPC
+}
+
+# Methods that submit transactions - routed to the pinned write endpoint
+WRITE_METHODS = {'eth_sendRawTransaction', 'eth_sendTransaction'}
+# JSON-RPC error codes providers use for rate limiting
+RATE_LIMIT_ERROR_CODES = {-32005, 429}
+
+# One Web3 instance per network, all sharing a pooled keep-alive HTTP session
+_web3_registry = {}
+_async_web3_registry = {}
+# One receipt tracker, nonce manager, fee oracle and gas estimator per Web3 instance
+_receipt_trackers = weakref.WeakKeyDictionary()
+_nonce_managers = weakref.WeakKeyDictionary()
+_fee_oracles = weakref.WeakKeyDictionary()
+_gas_estimators = weakref.WeakKeyDictionary()
+_web3_registry_lock = threading.Lock()
+_http_session = None
+
+def get_http_session():
+    """Shared requests session with connection pooling for all RPC endpoints"""
+    global _http_session
+
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=sum(len(urls) for urls in RPC_ENDPOINTS.values()),
+            pool_maxsize=RPC_POOL_SIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http_session = session
+    return _http_session
+
+def _is_rate_limited(response):
+    error = response.get('error') if isinstance(response, dict) else None
+    return bool(error) and isinstance(error, dict) and error.get('code') in RATE_LIMIT_ERROR_CODES
+
+class FailoverProvider(BaseProvider):
+    """
+    Web3 provider spreading requests over several HTTP endpoints of one network,
+    with latency-aware routing, circuit breaking and pinned writes (see rpc_failover.py).
+    """
+
+    def __init__(self, urls, write_url=None):
+        super().__init__()
+        self.router = EndpointRouter(
+            urls,
+            write_url=write_url,
+            failure_threshold=RPC_CIRCUIT_FAILURES,
+            cooldown=RPC_CIRCUIT_COOLDOWN
+        )
+        self._providers = {}
+        self._providers_lock = threading.Lock()
+
+    @property
+    def endpoint_uri(self):
+        # Used when handing an RPC URL to the Node.js deployer, which sends transactions
+        return self.router.write_url
+
+    def _get_provider(self, url):
+        with self._providers_lock:
+            provider = self._providers.get(url)
+            if provider is None:
+                provider = Web3.HTTPProvider(
+                    url,
+                    request_kwargs={'timeout': RPC_TIMEOUT},
+                    session=get_http_session()
+                )
+                self._providers[url] = provider
+            return provider
+
+    def make_request(self, method, params):
+        return self.router.execute(
+            lambda endpoint: self._get_provider(endpoint.url).make_request(method, params),
+            write=method in WRITE_METHODS,
+            retry_on=(requests.RequestException, ValueError),
+            is_failure=_is_rate_limited
+        )
+
+    def is_connected(self, show_traceback=False):
+        try:
+            return 'result' in self.make_request('web3_clientVersion', [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+
+    def probe(self):
+        self.router.probe(lambda endpoint: self._get_provider(endpoint.url).make_request('eth_blockNumber', []))
+
+def _probe_loop(provider):
+    while True:
+        time.sleep(RPC_HEALTH_INTERVAL)
+        provider.probe()
 
 # Web3 setup
 def get_web3(network='polygon'):
-    if network == 'polygon':
-        return Web3(Web3.HTTPProvider(POLYGON_RPC))
-    else:
-        return Web3(Web3.HTTPProvider(ETHEREUM_RPC))
+    network = 'polygon' if network == 'polygon' else 'ethereum'
+
+    with _web3_registry_lock:
+        web3 = _web3_registry.get(network)
+        if web3 is None:
+            provider = FailoverProvider(RPC_ENDPOINTS[network], WRITE_ENDPOINTS[network])
+            web3 = Web3(provider)
+            _web3_registry[network] = web3
+
+            # Keep latency figures of idle endpoints current
+            if len(provider.router.endpoints) > 1:
+                threading.Thread(target=_probe_loop, args=(provider,), daemon=True).start()
+        return web3
+
+class AsyncFailoverProvider(AsyncBaseProvider):
+    """
+    AsyncWeb3 counterpart of FailoverProvider, sharing its router so sync and
+    async requests see the same endpoint latencies and circuit states.
+    """
+
+    def __init__(self, router):
+        super().__init__()
+        self.router = router
+        self._providers = {}
+
+    def _get_provider(self, url):
+        provider = self._providers.get(url)
+        if provider is None:
+            provider = AsyncHTTPProvider(url, request_kwargs={'timeout': RPC_TIMEOUT})
+            self._providers[url] = provider
+        return provider
+
+    async def make_request(self, method, params):
+        return await self.router.execute_async(
+            lambda endpoint: self._get_provider(endpoint.url).make_request(method, params),
+            write=method in WRITE_METHODS,
+            retry_on=(aiohttp.ClientError, asyncio.TimeoutError, ValueError),
+            is_failure=_is_rate_limited
+        )
+
+    async def is_connected(self, show_traceback=False):
+        try:
+            return 'result' in await self.make_request('web3_clientVersion', [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+
+def get_async_web3(network='polygon'):
+    """
+    AsyncWeb3 instance for a network, for code running on the asyncio runtime.
+    Must be used from a single event loop.
+    """
+    network = 'polygon' if network == 'polygon' else 'ethereum'
+
+    with _web3_registry_lock:
+        web3 = _async_web3_registry.get(network)
+    if web3 is None:
+        router = get_web3(network).provider.router
+        web3 = AsyncWeb3(AsyncFailoverProvider(router))
+        with _web3_registry_lock:
+            web3 = _async_web3_registry.setdefault(network, web3)
+    return web3
+
+def get_rpc_stats():
+    """Routing statistics for every network that has been used"""
+    with _web3_registry_lock:
+        return {network: web3.provider.router.get_stats() for network, web3 in _web3_registry.items()}
 
 # Wallet creation
 def create_wallet():
@@ -89,36 +276,97 @@ def sign_and_send_transaction(web3, transaction, private_key):
         return tx_hash
     except Exception as e:
         print(f"Error sending transaction: {e}")
+        if 'nonce' in transaction:
+            get_nonce_manager(web3).handle_send_error(acct.address, transaction['nonce'], e)
         raise Exception(f"Failed to send transaction: {e}")
 
-# Modified wait_for_receipt function
+def get_receipt_tracker(web3):
+    """Shared receipt tracker for a Web3 instance (one poll loop per network)"""
+    with _web3_registry_lock:
+        tracker = _receipt_trackers.get(web3)
+        if tracker is None:
+            tracker = ReceiptTracker(web3, poll_interval=RECEIPT_POLL_INTERVAL)
+            _receipt_trackers[web3] = tracker
+        return tracker
+
+def get_nonce_manager(web3):
+    """Shared nonce manager for a Web3 instance"""
+    with _web3_registry_lock:
+        manager = _nonce_managers.get(web3)
+        if manager is None:
+            manager = NonceManager(
+                lambda address: web3.eth.get_transaction_count(address, 'pending'),
+                resync_interval=NONCE_RESYNC_INTERVAL
+            )
+            _nonce_managers[web3] = manager
+        return manager
+
+def get_fee_oracle(web3):
+    """Shared fee oracle for a Web3 instance (fee history fetched once per block)"""
+    with _web3_registry_lock:
+        oracle = _fee_oracles.get(web3)
+        if oracle is None:
+            oracle = FeeOracle(
+                web3,
+                history_blocks=FEE_HISTORY_BLOCKS,
+                reward_percentile=FEE_REWARD_PERCENTILE,
+                base_fee_multiplier=FEE_BASE_MULTIPLIER
+            )
+            _fee_oracles[web3] = oracle
+        return oracle
+
+def get_gas_estimator(web3):
+    """Shared gas estimator for a Web3 instance (estimates cached per call shape)"""
+    with _web3_registry_lock:
+        estimator = _gas_estimators.get(web3)
+        if estimator is None:
+            estimator = GasEstimator(margin=GAS_ESTIMATE_MARGIN, ttl=GAS_ESTIMATE_TTL)
+            _gas_estimators[web3] = estimator
+        return estimator
+
+def get_fee_fields(web3):
+    """Fee fields to merge into a transaction dict (EIP-1559 where the network supports it)"""
+    return get_fee_oracle(web3).transaction_fields()
+
+def allocate_nonce(web3, address):
+    """Next nonce for an address, handed out locally so transactions can be sent back-to-back"""
+    return get_nonce_manager(web3).allocate(Web3.to_checksum_address(address))
+
+def reset_nonce(web3, address):
+    """Re-read an address's nonce from the chain on its next transaction, e.g. after a pipelined one failed"""
+    get_nonce_manager(web3).reset(Web3.to_checksum_address(address))
+
+def send_transaction_with_nonce(web3, address, build_transaction, private_key):
+    """
+    Allocate the next nonce for address, build the transaction with it and send it
+    without waiting for the receipt.
+
+    Args:
+        web3 (Web3): Connection to the network
+        address (str): Sender address
+        build_transaction (callable): Called with the nonce, returns the transaction dict
+        private_key (str): Sender's private key
+
+    Returns:
+        HexBytes: Transaction hash
+    """
+    address = Web3.to_checksum_address(address)
+    nonce = get_nonce_manager(web3).allocate(address)
+    try:
+        transaction = build_transaction(nonce)
+    except Exception:
+        get_nonce_manager(web3).release(address, nonce)
+        raise
+    print(f"Sending transaction with nonce {nonce}")
+    return sign_and_send_transaction(web3, transaction, private_key)
+
 def wait_for_transaction_receipt(web3, tx_hash, timeout=120):
-    """Wait for transaction receipt in a way that works with any Web3.py version"""
+    """Wait for a transaction receipt through the network's shared receipt tracker"""
     print(f"Waiting for receipt for tx: {tx_hash.hex()}")
-
     try:
-        print("Using wait_for_transaction_receipt")
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
-    except Exception as e:
-        print(f"First receipt method failed: {e}")
-        try:
-            print("Trying waitForTransactionReceipt")
-            receipt = web3.eth.waitForTransactionReceipt(tx_hash, timeout=timeout)
-        except Exception as e2:
-            print(f"Second receipt method failed: {e2}")
-            # As a last fallback, poll manually
-            print("Falling back to manual polling")
-            import time
-            start_time = time.time()
-            while time.time() < start_time + timeout:
-                try:
-                    receipt = web3.eth.getTransactionReceipt(tx_hash)
-                    if receipt:
-                        return receipt
-                except Exception:
-                    pass
-                time.sleep(2)
-            raise Exception("Timeout waiting for transaction receipt")
+        receipt = get_receipt_tracker(web3).wait(tx_hash, timeout)
+    except TimeoutError:
+        raise Exception("Timeout waiting for transaction receipt")
 
     print("Got transaction receipt")
     return receipt
@@ -0,0 +1,169 @@
+import hmac
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdateDeduplicator:
+    """
+    Remembers recent update_ids so updates Telegram re-delivers are handled once.
+
+    The in-memory window covers retries to this process; claim_update, if given,
+    is a shared check (e.g. the database) covering retries that land on another
+    process behind the same load balancer.
+    """
+
+    def __init__(self, max_size=10000, claim_update=None):
+        self.max_size = max_size
+        self.claim_update = claim_update
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_new(self, update_id):
+        with self._lock:
+            if update_id in self._seen:
+                return False
+            self._seen[update_id] = True
+            if len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+
+        if self.claim_update is not None:
+            try:
+                return self.claim_update(update_id)
+            except Exception as e:
+                # Better to risk a duplicate than to drop the update
+                print(f"Error claiming update {update_id}: {e}")
+        return True
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    HTTP endpoint Telegram posts updates to.
+
+    Requests are acknowledged as soon as the update is queued, and updates are
+    handled by a bounded pool of workers. Several bot processes can listen on
+    the same port (SO_REUSEPORT) and share the load.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handle_update, host="0.0.0.0", port=8443, path="/webhook",
+                 secret_token=None, workers=8, deduplicator=None, reuse_port=True):
+        self.handle_update = handle_update
+        self.path = path
+        self.secret_token = secret_token
+        self.deduplicator = deduplicator or UpdateDeduplicator()
+        self.reuse_port = reuse_port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webhook")
+        self.stats = {'received': 0, 'duplicates': 0, 'rejected': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+        super().__init__((host, port), WebhookRequestHandler)
+
+    def server_bind(self):
+        if self.reuse_port and hasattr(socket, "SO_REUSEPORT"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def dispatch(self, update):
+        try:
+            self.handle_update(update)
+        except Exception as e:
+            self.count('failed')
+            print(f"Error handling update {update.get('update_id')}: {e}")
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+
+    def _respond(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        server = self.server
+        if self.path != server.path:
+            self._respond(404)
+            return
+
+        if server.secret_token:
+            token = self.headers.get(SECRET_TOKEN_HEADER, "")
+            if not hmac.compare_digest(token.encode(), server.secret_token.encode()):
+                server.count('rejected')
+                self._respond(403)
+                return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            update = json.loads(self.rfile.read(length))
+            update_id = update["update_id"]
+        except (ValueError, KeyError, TypeError):
+            server.count('rejected')
+            self._respond(400)
+            return
+
+        # Duplicates are acknowledged too, otherwise Telegram keeps retrying them
+        if server.deduplicator.is_new(update_id):
+            server.count('received')
+            server.executor.submit(server.dispatch, update)
+        else:
+            server.count('duplicates')
+        self._respond(200)
+
+    def log_message(self, format, *args):
+        # Telegram posts every update - don't log each request
+        pass
+
+
+def post_update(url, update, secret_token=None, timeout=10):
+    """
+    Post an update the way Telegram does, for trying webhook mode locally.
+
+    Args:
+        url (str): Webhook URL, e.g. http://127.0.0.1:8443/webhook
+        update (dict): Telegram Update object
+        secret_token (str): Value for the secret token header
+
+    Returns:
+        int: HTTP status code
+    """
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(update).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    if secret_token:
+        request.add_header(SECRET_TOKEN_HEADER, secret_token)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+if __name__ == "__main__":
+    # Stand-in for Telegram: python webhook.py <url> <update.json> [secret]
+    import sys
+
+    with open(sys.argv[2]) as f:
+        status = post_update(sys.argv[1], json.load(f), sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"Webhook answered {status}")